@@ -0,0 +1,140 @@
+"""
+Exporta ``AuditLog`` a un archivo NDJSON o CSV comprimido con gzip.
+
+Uso:
+    python manage.py export_audit_log --output auditoria.ndjson.gz --desde 2026-01-01 --hasta 2026-03-31
+    python manage.py export_audit_log --output auditoria.csv.gz --format csv --event-type LOGIN_FAILURE
+    python manage.py export_audit_log --output auditoria.ndjson.gz --user 42 --cursor <token>
+    python manage.py export_audit_log --output auditoria.ndjson.gz --resume
+
+Las filas se leen con un cursor del lado del servidor en orden cronológico y
+cada bloque de ``--chunk-size`` filas se escribe como un miembro gzip
+completo. Tras cada bloque se guarda ``<output>.cursor`` con el cursor y el
+tamaño confirmado del archivo; si la exportación se interrumpe (SIGINT,
+SIGTERM o un error) ``--resume`` trunca lo escrito a medias y continúa desde
+ese cursor. Al terminar el checkpoint se elimina.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import signal
+import threading
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from callcentersite.apps.audit import export
+
+FILTROS = ("desde", "hasta", "event_type", "user", "username", "result")
+
+
+class Command(BaseCommand):
+    help = "Exporta la auditoria a NDJSON o CSV comprimido, reanudable por cursor"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", required=True, help="Archivo .gz de destino")
+        parser.add_argument(
+            "--format",
+            dest="formato",
+            choices=export.FORMATOS,
+            default="ndjson",
+            help="Formato de las filas",
+        )
+        parser.add_argument("--desde", help="Fecha o fecha-hora ISO 8601 inicial (inclusiva)")
+        parser.add_argument("--hasta", help="Fecha o fecha-hora ISO 8601 final (inclusiva)")
+        parser.add_argument("--event-type", help="Solo este tipo de evento")
+        parser.add_argument("--user", help="Solo este id de usuario")
+        parser.add_argument("--username", help="Solo este nombre de usuario")
+        parser.add_argument("--result", help="Solo este resultado")
+        parser.add_argument("--cursor", help="Continuar despues de este cursor")
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continuar la exportacion interrumpida desde <output>.cursor",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=getattr(settings, "AUDIT_EXPORT_CHUNK_SIZE", 5000),
+            help="Filas por bloque (y por checkpoint)",
+        )
+
+    def handle(self, *args, **options):
+        salida = Path(options["output"])
+        checkpoint = salida.with_name(salida.name + ".cursor")
+        formato = options["formato"]
+        filtros = {filtro: options[filtro] for filtro in FILTROS if options[filtro]}
+
+        cursor = options["cursor"]
+        confirmado = 0
+        filas = 0
+        if options["resume"]:
+            if not checkpoint.exists():
+                raise CommandError(f"No hay exportacion que reanudar ({checkpoint} no existe)")
+            estado = json.loads(checkpoint.read_text(encoding="utf-8"))
+            if estado["formato"] != formato or estado["filtros"] != filtros:
+                raise CommandError(
+                    "El checkpoint corresponde a otra exportacion: "
+                    f"formato={estado['formato']} filtros={estado['filtros']}"
+                )
+            cursor, confirmado, filas = estado["cursor"], estado["bytes"], estado["filas"]
+        elif checkpoint.exists():
+            raise CommandError(
+                f"{salida} tiene una exportacion interrumpida; use --resume o borre {checkpoint}"
+            )
+
+        try:
+            queryset = export.queryset_exportacion(filtros, cursor)
+        except ValidationError as exc:
+            raise CommandError(str(exc.detail)) from exc
+
+        stop = threading.Event()
+        anteriores = {
+            signum: signal.signal(signum, lambda *_: stop.set())
+            for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+        try:
+            with open(salida, "r+b" if options["resume"] else "wb") as archivo:
+                # Descarta el bloque que quedó a medias en la interrupción
+                archivo.truncate(confirmado)
+                archivo.seek(confirmado)
+                for bloque in export.bloques(
+                    queryset,
+                    formato,
+                    chunk_size=options["chunk_size"],
+                    encabezado=not options["resume"],
+                ):
+                    archivo.write(export.miembro_gzip(bloque.texto))
+                    archivo.flush()
+                    os.fsync(archivo.fileno())
+                    cursor = bloque.cursor or cursor
+                    filas += bloque.filas
+                    _guardar_checkpoint(checkpoint, {
+                        "formato": formato,
+                        "filtros": filtros,
+                        "cursor": cursor,
+                        "bytes": archivo.tell(),
+                        "filas": filas,
+                    })
+                    if stop.is_set():
+                        self.stdout.write(
+                            f"Exportacion interrumpida tras {filas} filas; "
+                            f"continuar con --resume (cursor {cursor})"
+                        )
+                        return
+        finally:
+            for signum, manejador in anteriores.items():
+                signal.signal(signum, manejador)
+
+        checkpoint.unlink(missing_ok=True)
+        self.stdout.write(self.style.SUCCESS(f"Exportadas {filas} filas a {salida}"))
+
+
+def _guardar_checkpoint(ruta: Path, estado: dict) -> None:
+    temporal = ruta.with_name(f".{ruta.name}.tmp")
+    temporal.write_text(json.dumps(estado), encoding="utf-8")
+    os.replace(temporal, ruta)
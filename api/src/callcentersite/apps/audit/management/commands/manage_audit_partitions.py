@@ -0,0 +1,95 @@
+"""
+Mantenimiento de las particiones mensuales de las tablas de auditoria.
+
+Uso:
+    python manage.py manage_audit_partitions
+    python manage.py manage_audit_partitions --months-ahead=6
+    python manage.py manage_audit_partitions --retention-days=365 --drop
+    python manage.py manage_audit_partitions --dry-run
+
+Crea las particiones del mes actual y los ``--months-ahead`` siguientes y
+desprende las que solo contienen filas anteriores a la retencion
+(``AUDIT_LOG_RETENTION_DAYS`` por defecto). Las desprendidas se mueven al
+esquema ``AUDIT_ARCHIVE_SCHEMA`` o se eliminan con ``--drop``. Pensado para
+cron diario; en motores distintos de PostgreSQL no hace nada.
+"""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from callcentersite.apps.common.particiones import (
+    TABLAS_AUDITORIA,
+    crear_particiones_siguientes,
+    es_particionada,
+    retirar_particiones,
+)
+
+
+class Command(BaseCommand):
+    help = "Crea particiones mensuales de auditoria y retira las vencidas"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=getattr(settings, "AUDIT_PARTITIONS_MONTHS_AHEAD", 3),
+            help="Meses futuros con particion creada por adelantado",
+        )
+        parser.add_argument(
+            "--retention-days",
+            type=int,
+            default=getattr(settings, "AUDIT_LOG_RETENTION_DAYS", 730),
+            help="Dias de auditoria que deben seguir adjuntos",
+        )
+        parser.add_argument(
+            "--archive-schema",
+            default=getattr(settings, "AUDIT_ARCHIVE_SCHEMA", "audit_archive"),
+            help="Esquema al que se mueven las particiones retiradas",
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Eliminar las particiones retiradas en lugar de archivarlas",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Solo listar las particiones que se retirarian",
+        )
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - timedelta(days=options["retention_days"])
+
+        for tabla, columna in TABLAS_AUDITORIA.items():
+            if not es_particionada(connection, tabla):
+                self.stdout.write(f"{tabla}: no particionada, se omite")
+                continue
+
+            if not options["dry_run"]:
+                creadas = crear_particiones_siguientes(
+                    connection, tabla, columna, options["months_ahead"]
+                )
+                for nombre in creadas:
+                    self.stdout.write(f"{tabla}: creada {nombre}")
+
+            retiradas = retirar_particiones(
+                connection,
+                tabla,
+                limite,
+                esquema_archivo=None if options["drop"] else options["archive_schema"],
+                eliminar=options["drop"],
+                simular=options["dry_run"],
+            )
+            destino = "eliminada" if options["drop"] else f"archivada en {options['archive_schema']}"
+            if options["dry_run"]:
+                destino = "se retiraria"
+            for nombre in retiradas:
+                self.stdout.write(f"{tabla}: {nombre} {destino}")
+
+        self.stdout.write(self.style.SUCCESS("Particiones de auditoria al dia"))
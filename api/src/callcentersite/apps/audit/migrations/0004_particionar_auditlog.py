@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:00
+
+from django.db import migrations
+
+from callcentersite.apps.common.particiones import convertir_a_particionada
+
+
+def particionar(apps, schema_editor):
+    """Particionado mensual por timestamp (solo PostgreSQL; no-op en otros motores)."""
+    convertir_a_particionada(schema_editor.connection, "audit_auditlog", "timestamp")
+
+
+class Migration(migrations.Migration):
+
+    # El CHECK del historico se valida en su propia transaccion, sin bloquear inserciones
+    atomic = False
+
+    dependencies = [
+        ("audit", "0003_auditlog_timestamp_default"),
+    ]
+
+    operations = [
+        # Sin reversa: la tabla particionada es equivalente para Django
+        migrations.RunPython(particionar, migrations.RunPython.noop),
+    ]
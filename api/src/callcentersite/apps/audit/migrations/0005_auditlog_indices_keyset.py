@@ -0,0 +1,27 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("audit", "0004_particionar_auditlog"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(fields=["user", "timestamp", "id"], name="audit_user_ts_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(
+                fields=["event_type", "timestamp", "id"], name="audit_event_type_ts_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="auditlog",
+            index=models.Index(fields=["result", "timestamp", "id"], name="audit_result_ts_idx"),
+        ),
+    ]
@@ -4,10 +4,15 @@ from __future__ import annotations
 
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 
 class AuditLog(models.Model):
-    """Registro de acciones relevantes."""
+    """Registro de acciones relevantes.
+
+    En PostgreSQL la tabla está particionada por mes sobre ``timestamp``
+    (``apps.common.particiones``, ``manage_audit_partitions``).
+    """
 
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL
@@ -27,7 +32,8 @@ class AuditLog(models.Model):
     # Información de contexto
     ip_address = models.GenericIPAddressField(null=True, blank=True)
     user_agent = models.TextField(null=True, blank=True)
-    timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Hora del evento, no de la insercion: el escritor asincrono inserta en lotes
+    timestamp = models.DateTimeField(default=timezone.now, editable=False, db_index=True)
 
     # Valores de cambio
     old_values = models.JSONField(null=True, blank=True)
@@ -49,6 +55,12 @@ class AuditLog(models.Model):
         verbose_name = "registro de auditoría"
         verbose_name_plural = "registros de auditoría"
         ordering = ("-timestamp",)
+        # (filtro, timestamp, id): búsqueda paginada por clave
+        indexes = [
+            models.Index(fields=["user", "timestamp", "id"], name="audit_user_ts_idx"),
+            models.Index(fields=["event_type", "timestamp", "id"], name="audit_event_type_ts_idx"),
+            models.Index(fields=["result", "timestamp", "id"], name="audit_result_ts_idx"),
+        ]
         default_permissions = ()
         permissions = [("view_auditlog", "Puede ver los registros de auditoría")]
 
@@ -60,9 +72,16 @@ class AuditLog(models.Model):
     def save(self, *args, **kwargs):  # type: ignore[override]
         if self.pk:
             raise RuntimeError("Los registros de auditoría son inmutables")
-        # Sincronizar event_type y action si solo uno está definido
+        self.prepare_for_insert()
+        super().save(*args, **kwargs)
+
+    def prepare_for_insert(self) -> None:
+        """Sincroniza event_type y action si solo uno está definido.
+
+        ``bulk_create`` no llama a ``save()``; el escritor asíncrono lo invoca
+        antes de encolar.
+        """
         if self.event_type and not self.action:
             self.action = self.event_type
         elif self.action and not self.event_type:
             self.event_type = self.action
-        super().save(*args, **kwargs)
@@ -0,0 +1,35 @@
+"""Serializers de auditoría."""
+
+from __future__ import annotations
+
+from rest_framework import serializers
+
+from .models import AuditLog
+
+
+class AuditLogSerializer(serializers.ModelSerializer):
+    """Registro de auditoría (solo lectura)."""
+
+    username = serializers.CharField(source="user.username", read_only=True, allow_null=True)
+
+    class Meta:
+        model = AuditLog
+        fields = [
+            "id",
+            "timestamp",
+            "user",
+            "username",
+            "event_type",
+            "action",
+            "resource",
+            "resource_id",
+            "result",
+            "error_message",
+            "ip_address",
+            "user_agent",
+            "details",
+            "metadata",
+            "old_values",
+            "new_values",
+        ]
+        read_only_fields = fields
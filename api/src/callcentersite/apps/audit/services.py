@@ -5,6 +5,7 @@ from __future__ import annotations
 from typing import Any, Dict
 
 from .models import AuditLog
+from .writer import record
 
 
 class AuditService:
@@ -25,7 +26,8 @@ class AuditService:
         old_values: Dict[str, Any] | None = None,
         new_values: Dict[str, Any] | None = None,
     ) -> None:
-        AuditLog.objects.create(
+        record(
+            AuditLog,
             user=user if getattr(user, "is_authenticated", False) else None,
             action=action,
             resource=resource or "system",
@@ -0,0 +1,15 @@
+"""URLs de auditoría."""
+
+from __future__ import annotations
+
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from .views import AuditLogViewSet
+
+router = DefaultRouter()
+router.register(r"logs", AuditLogViewSet, basename="audit-log")
+
+urlpatterns = [
+    path("", include(router.urls)),
+]
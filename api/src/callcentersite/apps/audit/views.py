@@ -0,0 +1,89 @@
+"""Vistas de consulta y exportación de auditoría."""
+
+from __future__ import annotations
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+
+from callcentersite.apps.common.pagination import KeysetPagination, codificar_cursor
+from callcentersite.apps.users.mixins_permisos import GranularPermission
+
+from . import export
+from .models import AuditLog
+from .serializers import AuditLogSerializer
+
+CAPACIDAD_VER_AUDITORIA = "sistema.administracion.auditoria.ver"
+CAPACIDAD_EXPORTAR_AUDITORIA = "sistema.administracion.auditoria.exportar"
+
+
+class AuditLogViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Búsqueda en ``AuditLog`` paginada por clave ``(timestamp, id)``.
+
+    GET /api/v1/audit/logs/?user=&event_type=&result=&desde=&hasta=
+        &cursor=&page_size=&estimar_total=1
+
+    Cada página cuesta lo mismo sin importar su profundidad: no hay COUNT ni
+    OFFSET. Cada filtro tiene su índice ``(filtro, timestamp, id)``.
+    """
+
+    queryset = AuditLog.objects.select_related("user")
+    serializer_class = AuditLogSerializer
+    pagination_class = KeysetPagination
+    permission_classes = [GranularPermission]
+    permission_map = {
+        "list": CAPACIDAD_VER_AUDITORIA,
+        "retrieve": CAPACIDAD_VER_AUDITORIA,
+        "exportar": CAPACIDAD_EXPORTAR_AUDITORIA,
+    }
+    filter_backends = []
+
+    def get_queryset(self):
+        return export.filtrar_logs(super().get_queryset(), self.request.query_params)
+
+    @action(detail=False, methods=["get"])
+    def exportar(self, request):
+        """
+        Exporta en streaming, comprimido con gzip y en orden cronológico.
+
+        GET /api/v1/audit/logs/exportar/?formato=ndjson|csv&desde=&hasta=
+            &event_type=&user=&username=&result=&cursor=&despues_id=
+
+        Para continuar una descarga interrumpida basta con ``despues_id`` (el
+        ``id`` de la última fila recibida completa) o con un ``cursor``.
+        """
+        params = request.query_params
+        formato = params.get("formato", "ndjson")
+        if formato not in export.FORMATOS:
+            raise ValidationError({"formato": f"Use uno de: {', '.join(export.FORMATOS)}"})
+
+        cursor = params.get("cursor") or self._cursor_de_id(params.get("despues_id"))
+        queryset = export.queryset_exportacion(params, cursor)
+
+        respuesta = StreamingHttpResponse(
+            export.gzip_continuo(
+                export.bloques(
+                    queryset,
+                    formato,
+                    chunk_size=getattr(settings, "AUDIT_EXPORT_CHUNK_SIZE", 5000),
+                )
+            ),
+            content_type="application/gzip",
+        )
+        nombre = f"auditoria-{timezone.now():%Y%m%d%H%M%S}.{formato}.gz"
+        respuesta["Content-Disposition"] = f'attachment; filename="{nombre}"'
+        return respuesta
+
+    @staticmethod
+    def _cursor_de_id(despues_id: str | None) -> str | None:
+        if not despues_id:
+            return None
+        try:
+            momento = AuditLog.objects.values_list("timestamp", flat=True).get(pk=int(despues_id))
+        except (ValueError, AuditLog.DoesNotExist) as exc:
+            raise ValidationError({"despues_id": "Registro de auditoría inexistente"}) from exc
+        return codificar_cursor(momento, int(despues_id))
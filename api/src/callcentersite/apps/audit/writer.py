@@ -0,0 +1,418 @@
+"""
+Escritor asíncrono de auditoría.
+
+Los registros de ``AuditLog`` y ``AuditoriaPermiso`` se encolan en memoria y
+un hilo de fondo los inserta con ``bulk_create`` cada ``AUDIT_ASYNC_BATCH_SIZE``
+registros o cada ``AUDIT_ASYNC_FLUSH_MS`` milisegundos, lo que ocurra antes.
+El request solo paga el ``put`` en la cola.
+
+Garantías:
+
+- Se encola en ``transaction.on_commit``: si la transacción del request se
+  revierte el registro se descarta, igual que con el INSERT síncrono, y el
+  hilo nunca ve filas que referencian datos aún no confirmados.
+- Cola acotada (``AUDIT_ASYNC_QUEUE_SIZE``): si se llena, el registro se
+  escribe en línea en lugar de perderse.
+- Una fila que la base de datos rechaza (integridad, tipo de dato) se aísla
+  del lote y va al spool como ``rechazado-*``; un lote que falla por
+  cualquier otro motivo también, y el hilo sigue drenando la cola.
+- Si la base de datos no está disponible el lote se vuelca a
+  ``AUDIT_SPOOL_DIR`` (JSON de ``django.core.serializers``) y se reintenta
+  cuando vuelve a haber conexión. Cada archivo lo reinserta un solo proceso:
+  se reclama con un rename atómico antes de leerlo.
+- Al terminar el proceso (``atexit``) se vacía la cola durante
+  ``AUDIT_ASYNC_SHUTDOWN_TIMEOUT`` segundos; lo que no alcance a escribirse
+  va al spool.
+
+Con ``AUDIT_ASYNC_ENABLED = False`` ``record()`` hace el INSERT directo.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Iterable
+
+from django.conf import settings
+from django.core import serializers
+from django.db import (
+    DatabaseError,
+    InterfaceError,
+    OperationalError,
+    connection,
+    models,
+    transaction,
+)
+
+logger = logging.getLogger(__name__)
+
+ERRORES_CONEXION = (OperationalError, InterfaceError)
+
+
+class AuditWriter:
+    """Cola acotada de registros de auditoría drenada por un hilo."""
+
+    def __init__(
+        self,
+        *,
+        queue_size: int = 10000,
+        batch_size: int = 500,
+        flush_ms: int = 250,
+        spool_dir: str | Path | None = None,
+        shutdown_timeout: float = 10.0,
+        autostart: bool = True,
+    ) -> None:
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_ms / 1000
+        self.spool_dir = Path(spool_dir) if spool_dir else None
+        self.shutdown_timeout = shutdown_timeout
+        self.autostart = autostart
+
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+        self._spool_pendiente = True
+
+        self.escritos = 0
+        self.desbordes = 0
+        self.spooleados = 0
+        self.rechazados = 0
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def enqueue(self, instancia: models.Model) -> bool:
+        """Encola ``instancia``; False si la cola está llena."""
+        if self.autostart:
+            self._ensure_thread()
+        try:
+            self._queue.put_nowait(instancia)
+        except queue.Full:
+            self.desbordes += 1
+            return False
+        return True
+
+    def flush(self) -> int:
+        """Escribe en el hilo actual todo lo encolado. Retorna cuántos tomó."""
+        total = 0
+        while True:
+            lote = self._take(timeout=0)
+            if not lote:
+                return total
+            self.write(lote)
+            total += len(lote)
+
+    def stop(self, timeout: float | None = None) -> None:
+        """Detiene el hilo drenando la cola; lo que no se alcance va al spool."""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._stop.set()
+        self._thread.join(self.shutdown_timeout if timeout is None else timeout)
+        if self._thread.is_alive():
+            restantes = self._take(timeout=0, limite=self.queue_size)
+            if restantes:
+                logger.warning(
+                    "Escritor de auditoría no terminó a tiempo; %s registros al spool",
+                    len(restantes),
+                )
+                self._spool(restantes)
+        self._thread = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "pendientes": self._queue.qsize(),
+            "escritos": self.escritos,
+            "desbordes": self.desbordes,
+            "spooleados": self.spooleados,
+            "rechazados": self.rechazados,
+        }
+
+    # ------------------------------------------------------------------
+    # Escritura
+    # ------------------------------------------------------------------
+
+    def write(self, instancias: Iterable[models.Model]) -> None:
+        """Inserta agrupando por modelo; ante caída de la BD usa el spool."""
+        por_modelo: dict[type[models.Model], list[models.Model]] = defaultdict(list)
+        for instancia in instancias:
+            por_modelo[type(instancia)].append(instancia)
+
+        for modelo, objetos in por_modelo.items():
+            try:
+                self._insert(modelo, objetos)
+            except ERRORES_CONEXION as exc:
+                logger.warning("Auditoría sin base de datos (%s); lote al spool", exc)
+                _reset_connection()
+                self._spool(objetos)
+            except Exception:
+                logger.exception("Lote de auditoría no escrito; al spool de rechazados")
+                self.rechazados += len(objetos)
+                self._spool(objetos, prefijo="rechazado")
+            else:
+                if self._spool_pendiente:
+                    self.replay_spool()
+
+    def _insert(self, modelo: type[models.Model], objetos: list[models.Model]) -> None:
+        try:
+            with transaction.atomic():
+                modelo._default_manager.bulk_create(objetos, batch_size=self.batch_size)
+            self.escritos += len(objetos)
+            return
+        except ERRORES_CONEXION:
+            raise
+        except DatabaseError:
+            pass
+
+        # Una fila inválida (p. ej. usuario borrado entretanto) no debe tumbar el lote
+        rechazados = []
+        for objeto in objetos:
+            objeto.pk = None
+            try:
+                with transaction.atomic():
+                    modelo._default_manager.bulk_create([objeto])
+                self.escritos += 1
+            except ERRORES_CONEXION:
+                raise
+            except DatabaseError:
+                logger.exception("Registro de auditoría rechazado por la base de datos")
+                rechazados.append(objeto)
+        if rechazados:
+            self.rechazados += len(rechazados)
+            self._spool(rechazados, prefijo="rechazado")
+
+    # ------------------------------------------------------------------
+    # Spool en disco
+    # ------------------------------------------------------------------
+
+    def _spool(self, objetos: list[models.Model], prefijo: str = "audit") -> None:
+        """Un archivo por modelo, para que reinsertarlo sea todo o nada."""
+        por_modelo: dict[type[models.Model], list[models.Model]] = defaultdict(list)
+        for objeto in objetos:
+            por_modelo[type(objeto)].append(objeto)
+
+        for modelo_objetos in por_modelo.values():
+            datos = serializers.serialize("json", modelo_objetos)
+            if self.spool_dir is None:
+                logger.error("Auditoría perdida (sin AUDIT_SPOOL_DIR): %s", datos)
+                continue
+            try:
+                self.spool_dir.mkdir(parents=True, exist_ok=True)
+                nombre = f"{prefijo}-{time.time_ns()}-{os.getpid()}.json"
+                temporal = self.spool_dir / f".{nombre}.tmp"
+                temporal.write_text(datos, encoding="utf-8")
+                os.replace(temporal, self.spool_dir / nombre)
+            except OSError:
+                logger.exception("No se pudo escribir el spool de auditoría: %s", datos)
+                continue
+            if prefijo == "audit":
+                self.spooleados += len(modelo_objetos)
+                self._spool_pendiente = True
+
+    def replay_spool(self) -> int:
+        """
+        Reinserta los archivos del spool en orden. Retorna filas escritas.
+
+        Todos los procesos comparten ``AUDIT_SPOOL_DIR``: antes de leer un
+        archivo se reclama renombrándolo (``os.replace`` es atómico) a un nombre
+        oculto con el pid. Si otro proceso lo reclamó primero el rename falla y
+        se salta, así que cada archivo se inserta una sola vez.
+        """
+        self._spool_pendiente = False
+        if self.spool_dir is None or not self.spool_dir.is_dir():
+            return 0
+        self._liberar_reclamados()
+
+        total = 0
+        for archivo in sorted(self.spool_dir.glob("audit-*.json")):
+            reclamado = archivo.with_name(f".reclamado-{os.getpid()}-{archivo.name}")
+            try:
+                os.replace(archivo, reclamado)
+            except FileNotFoundError:
+                continue
+            try:
+                objetos = [
+                    deserializado.object
+                    for deserializado in serializers.deserialize(
+                        "json", reclamado.read_text(encoding="utf-8")
+                    )
+                ]
+                if objetos:
+                    self._insert(type(objetos[0]), objetos)
+                    total += len(objetos)
+            except ERRORES_CONEXION:
+                _reset_connection()
+                os.replace(reclamado, archivo)
+                self._spool_pendiente = True
+                break
+            except Exception:
+                os.replace(reclamado, archivo)
+                raise
+            reclamado.unlink(missing_ok=True)
+        return total
+
+    def _liberar_reclamados(self) -> None:
+        """Devuelve al spool los archivos reclamados por procesos que ya no existen."""
+        for reclamado in self.spool_dir.glob(".reclamado-*-audit-*.json"):
+            _, pid, nombre = reclamado.name.split("-", 2)
+            if _proceso_vivo(int(pid)):
+                continue
+            try:
+                os.replace(reclamado, reclamado.with_name(nombre))
+            except FileNotFoundError:
+                continue
+
+    # ------------------------------------------------------------------
+    # Hilo
+    # ------------------------------------------------------------------
+
+    def _ensure_thread(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == pid and self._thread is not None and self._thread.is_alive():
+                return
+            if self._pid != pid:
+                # Tras un fork la cola heredada pertenece al proceso padre
+                self._queue = queue.Queue(maxsize=self.queue_size)
+                self._pid = pid
+                atexit.register(self.stop)
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="audit-writer", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            while not self._stop.is_set():
+                lote = self._take(timeout=self.flush_interval)
+                try:
+                    if lote:
+                        self.write(lote)
+                    elif self._spool_pendiente:
+                        self.replay_spool()
+                except Exception:
+                    # Sin el hilo la cola crecería sin consumidor hasta el fin del proceso
+                    logger.exception("Error en el escritor de auditoría; lote al spool")
+                    if lote:
+                        self.rechazados += len(lote)
+                        self._spool(lote, prefijo="rechazado")
+            self.flush()
+        except Exception:
+            logger.exception("Error en el escritor de auditoría")
+        finally:
+            connection.close()
+
+    def _take(self, timeout: float, limite: int | None = None) -> list[models.Model]:
+        """Hasta ``limite`` registros esperando como mucho ``timeout`` segundos."""
+        limite = limite or self.batch_size
+        lote: list[models.Model] = []
+        fin = time.monotonic() + timeout
+        while len(lote) < limite:
+            restante = fin - time.monotonic()
+            try:
+                if restante > 0:
+                    lote.append(self._queue.get(timeout=restante))
+                else:
+                    lote.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return lote
+
+
+def _proceso_vivo(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _reset_connection() -> None:
+    """Descarta la conexión rota para reconectar en el siguiente lote."""
+    if not connection.in_atomic_block:
+        connection.close()
+
+
+_writer: AuditWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def get_writer() -> AuditWriter:
+    """Escritor del proceso, configurado desde settings."""
+    global _writer
+    if _writer is None:
+        with _writer_lock:
+            if _writer is None:
+                _writer = AuditWriter(
+                    queue_size=getattr(settings, "AUDIT_ASYNC_QUEUE_SIZE", 10000),
+                    batch_size=getattr(settings, "AUDIT_ASYNC_BATCH_SIZE", 500),
+                    flush_ms=getattr(settings, "AUDIT_ASYNC_FLUSH_MS", 250),
+                    spool_dir=getattr(settings, "AUDIT_SPOOL_DIR", None),
+                    shutdown_timeout=getattr(settings, "AUDIT_ASYNC_SHUTDOWN_TIMEOUT", 10),
+                )
+    return _writer
+
+
+def record(modelo: type[models.Model], **campos: Any) -> models.Model:
+    """
+    Registra una fila de auditoría de ``modelo``.
+
+    Con ``AUDIT_ASYNC_ENABLED`` la instancia se devuelve sin ``pk``: la
+    inserta el escritor en el siguiente lote.
+    """
+    instancia = modelo(**campos)
+    if not getattr(settings, "AUDIT_ASYNC_ENABLED", False):
+        instancia.save()
+        return instancia
+
+    preparar = getattr(instancia, "prepare_for_insert", None)
+    if preparar is not None:
+        preparar()
+    transaction.on_commit(lambda: _enqueue_or_save(instancia))
+    return instancia
+
+
+def record_many(modelo: type[models.Model], filas: Iterable[dict[str, Any]]) -> list[models.Model]:
+    """
+    ``record`` para varias filas de ``modelo``.
+
+    Sin ``AUDIT_ASYNC_ENABLED`` se insertan con un solo ``bulk_create``; con
+    él se encolan todas al confirmar la transacción.
+    """
+    instancias = [modelo(**campos) for campos in filas]
+    if hasattr(modelo, "prepare_for_insert"):
+        for instancia in instancias:
+            instancia.prepare_for_insert()
+    if not instancias:
+        return instancias
+
+    if not getattr(settings, "AUDIT_ASYNC_ENABLED", False):
+        modelo._default_manager.bulk_create(instancias)
+        return instancias
+
+    def _encolar() -> None:
+        for instancia in instancias:
+            _enqueue_or_save(instancia)
+
+    transaction.on_commit(_encolar)
+    return instancias
+
+
+def _enqueue_or_save(instancia: models.Model) -> None:
+    if not get_writer().enqueue(instancia):
+        # Cola llena: se escribe en línea antes que perder el registro
+        instancia.save()
@@ -0,0 +1,175 @@
+"""
+Coalescencia de escrituras de ``UserSession.last_activity_at``.
+
+``update_session_activity`` se llama en cada request autenticado; escribir
+la fila de la sesión cada vez convierte cada request en un UPDATE sobre una
+fila caliente. ``ActivityCoalescer`` guarda en memoria la última actividad
+de cada sesión y un hilo la escribe con un único ``bulk_update`` cada
+``SESSION_ACTIVITY_FLUSH_SECONDS`` segundos.
+
+La actividad de un usuario dentro de ``SESSION_ACTIVITY_GRANULARITY_SECONDS``
+desde la última registrada se considera sin cambios y no toca la base de
+datos. Así ``last_activity_at`` puede ir por detrás de la actividad real como
+mucho ``granularidad + intervalo de flush``, muy por debajo del timeout de
+inactividad (``jobs.INACTIVITY_TIMEOUT_MINUTES``). ``close_inactive_sessions``
+vacía el coalescedor del proceso antes de decidir qué sesiones cerrar.
+
+Cada ``flush()`` descarta las actividades registradas que ya salieron de la
+granularidad: la memoria sigue a los usuarios activos, no a todos los vistos
+desde el arranque del proceso.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import threading
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.utils import timezone
+
+from callcentersite.apps.users.models import UserSession
+
+logger = logging.getLogger(__name__)
+
+CAMPOS_ACTIVIDAD = ["last_activity_at", "ip_address", "user_agent"]
+
+
+class ActivityCoalescer:
+    """Última actividad por sesión, escrita en lote por un hilo."""
+
+    def __init__(
+        self,
+        *,
+        granularity_seconds: float = 30,
+        flush_seconds: float = 5,
+        autostart: bool = True,
+    ) -> None:
+        self.granularity = timedelta(seconds=granularity_seconds)
+        self.flush_seconds = flush_seconds
+        self.autostart = autostart
+
+        self._lock = threading.Lock()
+        # user_id -> momento de la última actividad registrada
+        self._registrada: dict[int, datetime] = {}
+        # session_id -> sesión con la actividad pendiente de escribir
+        self._pendientes: dict[int, UserSession] = {}
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+
+        self.escrituras = 0
+        self.omitidas = 0
+
+    def is_fresh(self, user_id: int, momento: datetime) -> bool:
+        """True si ``user_id`` ya tiene actividad registrada dentro de la granularidad."""
+        with self._lock:
+            registrada = self._registrada.get(user_id)
+            if registrada is not None and momento - registrada < self.granularity:
+                self.omitidas += 1
+                return True
+        return False
+
+    def touch(self, session: UserSession, momento: datetime) -> None:
+        """Deja ``session`` (ya con ip/user agent actualizados) pendiente de escribir."""
+        if self.autostart:
+            self._ensure_thread()
+        session.last_activity_at = momento
+        with self._lock:
+            self._registrada[session.user_id] = momento
+            self._pendientes[session.pk] = session
+
+    def flush(self) -> int:
+        """Escribe lo pendiente en un UPDATE. Retorna sesiones actualizadas."""
+        vencida = timezone.now() - self.granularity
+        with self._lock:
+            pendientes, self._pendientes = self._pendientes, {}
+            # Pasada la granularidad la entrada ya no evita escrituras
+            self._registrada = {
+                user_id: momento
+                for user_id, momento in self._registrada.items()
+                if momento > vencida
+            }
+        if not pendientes:
+            return 0
+        try:
+            # Solo sesiones que siguen activas: un cierre concurrente no se revierte
+            actualizadas = UserSession.objects.filter(is_active=True).bulk_update(
+                list(pendientes.values()), CAMPOS_ACTIVIDAD
+            )
+        except DatabaseError:
+            logger.exception("No se pudo escribir la actividad de %s sesiones", len(pendientes))
+            with self._lock:
+                for session_id, session in pendientes.items():
+                    self._pendientes.setdefault(session_id, session)
+            return 0
+        self.escrituras += 1
+        return actualizadas
+
+    def stop(self) -> None:
+        """Detiene el hilo escribiendo lo pendiente."""
+        if self._thread is None or self._pid != os.getpid():
+            return
+        self._stop.set()
+        self._thread.join(self.flush_seconds * 2)
+        self._thread = None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "pendientes": len(self._pendientes),
+            "registradas": len(self._registrada),
+            "escrituras": self.escrituras,
+            "omitidas": self.omitidas,
+        }
+
+    def _ensure_thread(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == pid and self._thread is not None and self._thread.is_alive():
+                return
+            if self._pid != pid:
+                # Tras un fork lo pendiente pertenece al proceso padre
+                self._registrada = {}
+                self._pendientes = {}
+                self._pid = pid
+                atexit.register(self.stop)
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="session-activity", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            while not self._stop.wait(self.flush_seconds):
+                self.flush()
+            self.flush()
+        except Exception:
+            logger.exception("Error en el coalescedor de actividad de sesiones")
+        finally:
+            connection.close()
+
+
+_coalescer: ActivityCoalescer | None = None
+_coalescer_lock = threading.Lock()
+
+
+def get_activity_coalescer() -> ActivityCoalescer | None:
+    """Coalescedor del proceso; None con ``SESSION_ACTIVITY_COALESCE`` desactivado."""
+    global _coalescer
+    if not getattr(settings, "SESSION_ACTIVITY_COALESCE", False):
+        return None
+    if _coalescer is None:
+        with _coalescer_lock:
+            if _coalescer is None:
+                granularidad = getattr(settings, "SESSION_ACTIVITY_GRANULARITY_SECONDS", 30)
+                _coalescer = ActivityCoalescer(
+                    granularity_seconds=granularidad,
+                    flush_seconds=getattr(settings, "SESSION_ACTIVITY_FLUSH_SECONDS", 5),
+                )
+    return _coalescer
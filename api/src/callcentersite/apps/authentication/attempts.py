@@ -0,0 +1,321 @@
+"""
+Conteo de intentos fallidos de login en ventana deslizante, en memoria.
+
+Contar filas de ``LoginAttempt`` en cada intento fallido convierte un ataque
+de credential stuffing en un range scan por intento sobre una tabla que solo
+crece. ``LoginAttemptCounter`` mantiene por username y por IP un arreglo fijo
+de ``LOGIN_ATTEMPTS_WINDOW_BUCKETS`` contadores que cubren
+``LOGIN_ATTEMPTS_WINDOW_SECONDS``; registrar un fallo o decidir un bloqueo
+cuesta O(buckets) en el peor caso y O(1) en el habitual, sin consultas.
+
+- Las filas de ``LoginAttempt`` siguen escribiéndose (forense) por el
+  escritor de auditoría en lotes (``apps.audit.writer.record``); esa es la
+  persistencia del contador: al primer uso en cada proceso un hilo
+  reconstruye la ventana con los fallos guardados antes de ese momento, sin
+  consultas en el request ni el lock tomado durante la lectura. Pasados
+  ``LOGIN_ATTEMPTS_WARMUP_LAG_SECONDS`` relee para sumar las filas que otros
+  procesos aún tenían en la cola del escritor. Hasta que termina, el proceso
+  cuenta solo lo que ve él mismo.
+- La cantidad de claves está acotada (``LOGIN_ATTEMPTS_MAX_KEYS``); al
+  llenarse se descarta la clave con el fallo más antiguo.
+- Los umbrales se aplican por proceso: con N workers el conteo de cada uno
+  parte de lo persistido al arrancar más lo que ve él mismo.
+
+La tabla se poda con ``jobs.prune_login_attempts``
+(``python manage.py prune_login_attempts``). Con
+``LOGIN_ATTEMPTS_WINDOW_ENABLED = False`` los conteos se hacen en la base de
+datos y no hay límite por IP.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db import DatabaseError, connection
+from django.utils import timezone
+
+from .models import LoginAttempt
+
+logger = logging.getLogger(__name__)
+
+
+class LoginThrottled(PermissionDenied):
+    """Demasiados fallos recientes del username o de la IP."""
+
+
+class _Ventana:
+    """Buckets circulares de una clave y su total."""
+
+    __slots__ = ("cuentas", "ultimo", "total")
+
+    def __init__(self, buckets: int, slot: int) -> None:
+        self.cuentas = array("I", bytes(4 * buckets))
+        self.ultimo = slot
+        self.total = 0
+
+
+class SlidingWindowCounter:
+    """Conteo por clave en ``buckets`` intervalos de ``window_seconds / buckets``."""
+
+    def __init__(self, *, window_seconds: float, buckets: int, max_keys: int) -> None:
+        self.window_seconds = window_seconds
+        self.buckets = max(1, buckets)
+        self.bucket_seconds = window_seconds / self.buckets
+        self.max_keys = max(1, max_keys)
+        self._ventanas: OrderedDict[str, _Ventana] = OrderedDict()
+        self.descartadas = 0
+
+    def add(self, clave: str, momento: float, cantidad: int = 1) -> int:
+        """Suma ``cantidad`` a ``clave`` en ``momento``; retorna el total de la ventana."""
+        slot = self._slot(momento)
+        ventana = self._ventanas.get(clave)
+        if ventana is None:
+            if len(self._ventanas) >= self.max_keys:
+                self._ventanas.popitem(last=False)
+                self.descartadas += 1
+            ventana = self._ventanas[clave] = _Ventana(self.buckets, slot)
+        else:
+            self._ventanas.move_to_end(clave)
+            if slot <= ventana.ultimo - self.buckets:
+                # Más viejo que la ventana de la clave: ya no cuenta
+                return ventana.total
+            if slot > ventana.ultimo:
+                self._avanzar(ventana, slot)
+        ventana.cuentas[slot % self.buckets] += cantidad
+        ventana.total += cantidad
+        return ventana.total
+
+    def count(self, clave: str, momento: float, window_seconds: float | None = None) -> int:
+        """Total de ``clave`` en la ventana (o en los últimos ``window_seconds``)."""
+        ventana = self._ventanas.get(clave)
+        if ventana is None:
+            return 0
+        slot = self._slot(momento)
+        total = self._avanzar(ventana, slot)
+        if window_seconds is None or window_seconds >= self.window_seconds:
+            return total
+        ultimos = min(self.buckets, max(1, math.ceil(window_seconds / self.bucket_seconds)))
+        return sum(ventana.cuentas[(slot - i) % self.buckets] for i in range(ultimos))
+
+    def reset(self, clave: str) -> None:
+        self._ventanas.pop(clave, None)
+
+    def clear(self) -> None:
+        self._ventanas.clear()
+
+    def __len__(self) -> int:
+        return len(self._ventanas)
+
+    def _slot(self, momento: float) -> int:
+        return int(momento // self.bucket_seconds)
+
+    def _avanzar(self, ventana: _Ventana, slot: int) -> int:
+        """Vacía los buckets que salieron de la ventana hasta ``slot``."""
+        salto = slot - ventana.ultimo
+        if salto <= 0:
+            return ventana.total
+        if salto >= self.buckets:
+            for i in range(self.buckets):
+                ventana.cuentas[i] = 0
+            ventana.total = 0
+        else:
+            for s in range(ventana.ultimo + 1, slot + 1):
+                i = s % self.buckets
+                ventana.total -= ventana.cuentas[i]
+                ventana.cuentas[i] = 0
+        ventana.ultimo = slot
+        return ventana.total
+
+
+class LoginAttemptCounter:
+    """Fallos de login recientes por username y por IP."""
+
+    def __init__(
+        self,
+        *,
+        window_seconds: float = 900,
+        buckets: int = 60,
+        max_keys: int = 100_000,
+        max_per_username: int = 10,
+        max_per_ip: int = 200,
+        load: bool = True,
+        background: bool = True,
+        lag_seconds: float = 0,
+    ) -> None:
+        self.window_seconds = window_seconds
+        self.max_per_username = max_per_username
+        self.max_per_ip = max_per_ip
+        self.load = load
+        self.background = background
+        self.lag_seconds = lag_seconds
+
+        opciones = {"window_seconds": window_seconds, "buckets": buckets, "max_keys": max_keys}
+        self.por_usuario = SlidingWindowCounter(**opciones)
+        self.por_ip = SlidingWindowCounter(**opciones)
+        self._lock = threading.Lock()
+        self._pid: int | None = None
+
+        self.fallos = 0
+        self.rechazados = 0
+
+    def record_failure(
+        self, username: str | None, ip_address: str | None, momento: float | None = None
+    ) -> tuple[int, int]:
+        """Registra un fallo; retorna los fallos en ventana de (username, IP)."""
+        self._ensure_loaded()
+        momento = time.time() if momento is None else momento
+        with self._lock:
+            self.fallos += 1
+            return (
+                self.por_usuario.add(username, momento) if username else 0,
+                self.por_ip.add(ip_address, momento) if ip_address else 0,
+            )
+
+    def failures(
+        self,
+        *,
+        username: str | None = None,
+        ip_address: str | None = None,
+        window_seconds: float | None = None,
+    ) -> int:
+        """Fallos recientes de ``username`` o de ``ip_address``."""
+        self._ensure_loaded()
+        contador, clave = (
+            (self.por_usuario, username) if username is not None else (self.por_ip, ip_address)
+        )
+        with self._lock:
+            return contador.count(clave, time.time(), window_seconds)
+
+    def is_throttled(self, username: str | None, ip_address: str | None) -> bool:
+        """True si el username o la IP superaron su umbral de fallos en la ventana."""
+        self._ensure_loaded()
+        momento = time.time()
+        with self._lock:
+            bloqueado = (
+                bool(username)
+                and self.por_usuario.count(username, momento) >= self.max_per_username
+            ) or (
+                bool(ip_address)
+                and self.por_ip.count(ip_address, momento) >= self.max_per_ip
+            )
+            if bloqueado:
+                self.rechazados += 1
+        return bloqueado
+
+    def reset_username(self, username: str) -> None:
+        with self._lock:
+            self.por_usuario.reset(username)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "usuarios": len(self.por_usuario),
+                "ips": len(self.por_ip),
+                "fallos": self.fallos,
+                "rechazados": self.rechazados,
+                "descartadas": self.por_usuario.descartadas + self.por_ip.descartadas,
+            }
+
+    def _ensure_loaded(self) -> None:
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            # Tras un fork lo contado pertenece al proceso padre
+            self.por_usuario.clear()
+            self.por_ip.clear()
+            self._pid = pid
+            if not self.load:
+                return
+            # Lo que falle desde ahora se cuenta en memoria; de la base solo lo anterior
+            hasta = timezone.now()
+        if self.background:
+            threading.Thread(
+                target=self._calentar,
+                args=(pid, hasta),
+                name="login-attempts-warmup",
+                daemon=True,
+            ).start()
+        else:
+            self._calentar(pid, hasta)
+
+    def _calentar(self, pid: int, hasta: datetime) -> None:
+        """Suma a la ventana los fallos guardados antes de ``hasta``."""
+        try:
+            vistos = self._cargar(pid, hasta, set())
+            if self.lag_seconds > 0:
+                # Filas anteriores a ``hasta`` que seguían en la cola del escritor
+                time.sleep(self.lag_seconds)
+                self._cargar(pid, hasta, vistos)
+        finally:
+            if self.background:
+                connection.close()
+
+    def _cargar(self, pid: int, hasta: datetime, vistos: set[int]) -> set[int]:
+        """Lee los fallos de ``LoginAttempt`` sin el lock; omite los ids en ``vistos``."""
+        desde = hasta - timedelta(seconds=self.window_seconds)
+        filas = (
+            LoginAttempt.objects.filter(success=False, timestamp__gte=desde, timestamp__lt=hasta)
+            .order_by("timestamp")
+            .values_list("pk", "username", "ip_address", "timestamp")
+        )
+        lote = []
+        try:
+            for fila in filas.iterator(chunk_size=2000):
+                if fila[0] in vistos:
+                    continue
+                vistos.add(fila[0])
+                lote.append(fila)
+                if len(lote) >= 2000:
+                    self._sumar(pid, lote)
+                    lote = []
+            self._sumar(pid, lote)
+        except DatabaseError:
+            logger.exception("No se pudo reconstruir la ventana de intentos de login")
+        return vistos
+
+    def _sumar(self, pid: int, filas: list[tuple]) -> None:
+        with self._lock:
+            if self._pid != pid:
+                # El proceso se bifurcó durante la lectura
+                return
+            for _, username, ip_address, momento in filas:
+                segundos = momento.timestamp()
+                if username:
+                    self.por_usuario.add(username, segundos)
+                if ip_address:
+                    self.por_ip.add(ip_address, segundos)
+
+
+_counter: LoginAttemptCounter | None = None
+_counter_lock = threading.Lock()
+
+
+def get_attempt_counter() -> LoginAttemptCounter | None:
+    """Contador del proceso; None con ``LOGIN_ATTEMPTS_WINDOW_ENABLED`` desactivado."""
+    global _counter
+    if not getattr(settings, "LOGIN_ATTEMPTS_WINDOW_ENABLED", False):
+        return None
+    if _counter is None:
+        with _counter_lock:
+            if _counter is None:
+                _counter = LoginAttemptCounter(
+                    window_seconds=getattr(settings, "LOGIN_ATTEMPTS_WINDOW_SECONDS", 900),
+                    buckets=getattr(settings, "LOGIN_ATTEMPTS_WINDOW_BUCKETS", 60),
+                    max_keys=getattr(settings, "LOGIN_ATTEMPTS_MAX_KEYS", 100_000),
+                    max_per_username=getattr(settings, "LOGIN_ATTEMPTS_MAX_PER_USERNAME", 10),
+                    max_per_ip=getattr(settings, "LOGIN_ATTEMPTS_MAX_PER_IP", 200),
+                    lag_seconds=getattr(settings, "LOGIN_ATTEMPTS_WARMUP_LAG_SECONDS", 1.0),
+                )
+    return _counter
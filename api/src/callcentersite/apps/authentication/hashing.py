@@ -0,0 +1,359 @@
+"""
+Hashing de contraseñas fuera del hilo del request.
+
+Verificar una contraseña cuesta decenas de milisegundos de CPU; en un cambio
+de turno cientos de agentes inician sesión a la vez y el hashing síncrono
+deja a los workers (gunicorn o mod_wsgi) sin CPU para el resto de
+endpoints. ``PasswordHashingPool`` ejecuta el hashing en un pool acotado de
+procesos (``spawn``, con prioridad reducida con ``nice``) y el request
+espera el resultado:
+
+- Control de admisión para todo el host: cada tarea toma una de
+  ``PASSWORD_HASHING_MAX_CONCURRENT`` ranuras, archivos con ``flock`` en
+  ``PASSWORD_HASHING_SLOTS_DIR`` compartidos por todos los procesos web. Si
+  no hay ranura libre en ``PASSWORD_HASHING_ADMISSION_TIMEOUT`` segundos, o
+  el hash no termina en ``PASSWORD_HASHING_TASK_TIMEOUT``, se lanza
+  ``HashingPoolBusy`` (el login responde 503) en lugar de acumular requests.
+  Tras un timeout la ranura se libera cuando el hash termina de verdad.
+  La espera del request queda acotada por ambos timeouts.
+- Intérprete: los procesos del pool se lanzan con
+  ``PASSWORD_HASHING_PYTHON``; por defecto ``sys.executable`` si es un
+  Python y, si no (bajo mod_wsgi es httpd), el Python de ``sys.exec_prefix``.
+- Métricas: profundidad de cola actual y máxima del proceso, completadas,
+  fallidas, rechazadas y latencia media (``stats()``).
+- Rehash al iniciar sesión: si el hash guardado no usa el hasher preferido
+  o su factor de trabajo (``PASSWORD_HASH_ITERATIONS``), ``check_password``
+  devuelve el hash nuevo para guardarlo.
+
+Los workers no configuran Django: reciben instancias de hasher ya
+construidas y solo ejecutan ``verify``/``encode``. Con
+``PASSWORD_HASHING_POOL_ENABLED = False`` todo se ejecuta en línea.
+"""
+
+from __future__ import annotations
+
+import atexit
+import fcntl
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+import bcrypt
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    PBKDF2PasswordHasher,
+    get_hasher,
+    identify_hasher,
+    is_password_usable,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class HashingPoolBusy(Exception):
+    """El pool de hashing no admitió la tarea a tiempo."""
+
+
+class TunablePBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 con iteraciones desde ``PASSWORD_HASH_ITERATIONS``.
+
+    Mismo ``algorithm`` que el hasher de Django, así que reconoce los hashes
+    existentes y ``must_update`` los marca para rehash cuando cambia el
+    factor. Las iteraciones son atributo de instancia para que viajen al
+    pool al serializarla.
+    """
+
+    def __init__(self) -> None:
+        self.iterations = getattr(
+            settings, "PASSWORD_HASH_ITERATIONS", PBKDF2PasswordHasher.iterations
+        )
+
+
+# ----------------------------------------------------------------------
+# Funciones ejecutadas en los procesos del pool
+# ----------------------------------------------------------------------
+
+
+def _inicializar_worker(nice: int) -> None:
+    if nice:
+        try:
+            os.nice(nice)
+        except OSError:
+            pass
+
+
+def _verificar(hasher, password: str, encoded: str) -> bool:
+    return hasher.verify(password, encoded)
+
+
+def _codificar(hasher, password: str, salt: str) -> str:
+    return hasher.encode(password, salt)
+
+
+def _bcrypt_hashpw(password: str, rounds: int) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds=rounds)).decode("utf-8")
+
+
+def _bcrypt_checkpw(password: str, hashed: str) -> bool:
+    try:
+        return bcrypt.checkpw(password.encode("utf-8"), hashed.encode("utf-8"))
+    except ValueError:
+        return False
+
+
+# ----------------------------------------------------------------------
+# Pool
+# ----------------------------------------------------------------------
+
+
+def interprete_python() -> str:
+    """
+    Python con el que lanzar los procesos del pool.
+
+    Bajo mod_wsgi ``sys.executable`` es el binario de Apache y ``spawn`` lo
+    ejecutaría en lugar del intérprete.
+    """
+    if os.path.basename(sys.executable).startswith("python"):
+        return sys.executable
+    version = f"python{sys.version_info.major}.{sys.version_info.minor}"
+    return os.path.join(sys.exec_prefix, "bin", version)
+
+
+class RanurasHashing:
+    """``cantidad`` ranuras compartidas por los procesos del host (``flock``)."""
+
+    def __init__(self, directorio: str, cantidad: int) -> None:
+        self.directorio = directorio
+        self.cantidad = max(1, cantidad)
+
+    def adquirir(self, timeout: float) -> int | None:
+        """Descriptor de una ranura bloqueada, o None si no hubo lugar en ``timeout``."""
+        os.makedirs(self.directorio, mode=0o700, exist_ok=True)
+        limite = time.monotonic() + timeout
+        # Cada proceso empieza por una ranura distinta para no competir por la primera
+        inicio = os.getpid() % self.cantidad
+        while True:
+            for desplazamiento in range(self.cantidad):
+                ranura = (inicio + desplazamiento) % self.cantidad
+                fd = os.open(
+                    os.path.join(self.directorio, f"ranura-{ranura}"),
+                    os.O_RDWR | os.O_CREAT,
+                    0o600,
+                )
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    return fd
+                except BlockingIOError:
+                    os.close(fd)
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                return None
+            time.sleep(min(0.01, restante))
+
+    def liberar(self, fd: int) -> None:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        finally:
+            os.close(fd)
+
+
+class PasswordHashingPool:
+    """Pool de procesos acotado con control de admisión para todo el host."""
+
+    def __init__(
+        self,
+        *,
+        workers: int = 1,
+        max_concurrent: int = 4,
+        slots_dir: str | None = None,
+        admission_timeout: float = 2.0,
+        task_timeout: float = 10.0,
+        nice: int = 10,
+        python: str | None = None,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.admission_timeout = admission_timeout
+        self.task_timeout = task_timeout
+        self.nice = nice
+        self.python = python or interprete_python()
+
+        self._ranuras = RanurasHashing(
+            slots_dir or os.path.join(tempfile.gettempdir(), "callcentersite-hashing"),
+            max_concurrent,
+        )
+        self._lock = threading.Lock()
+        self._executor: ProcessPoolExecutor | None = None
+        self._pid: int | None = None
+
+        self.pendientes = 0
+        self.max_pendientes = 0
+        self.completadas = 0
+        self.fallidas = 0
+        self.rechazadas = 0
+        self._segundos = 0.0
+
+    def run(self, funcion: Callable[..., Any], *args: Any) -> Any:
+        """Ejecuta ``funcion(*args)`` en el pool y espera el resultado."""
+        inicio = time.monotonic()
+        ranura = self._ranuras.adquirir(self.admission_timeout)
+        if ranura is None:
+            with self._lock:
+                self.rechazadas += 1
+            logger.warning(
+                "Pool de hashing saturado (%s ranuras ocupadas); tarea rechazada",
+                self._ranuras.cantidad,
+            )
+            raise HashingPoolBusy("Servicio de autenticación saturado, intente nuevamente")
+
+        with self._lock:
+            self.pendientes += 1
+            self.max_pendientes = max(self.max_pendientes, self.pendientes)
+        exito = False
+        liberar = True
+        try:
+            futuro = self._get_executor().submit(funcion, *args)
+            try:
+                resultado = futuro.result(timeout=self.task_timeout)
+            except FuturesTimeoutError as exc:
+                # cancel() no detiene un hash que ya corre en el worker: la ranura
+                # sigue ocupada hasta que termine, o el límite del host no se cumple
+                futuro.cancel()
+                liberar = False
+                futuro.add_done_callback(lambda _: self._ranuras.liberar(ranura))
+                logger.warning("Hashing sin respuesta en %ss", self.task_timeout)
+                raise HashingPoolBusy(
+                    "Servicio de autenticación saturado, intente nuevamente"
+                ) from exc
+            exito = True
+            return resultado
+        except BrokenProcessPool:
+            # Un worker murió (p. ej. OOM): el siguiente intento crea otro pool
+            self._reset_executor()
+            raise
+        finally:
+            with self._lock:
+                self.pendientes -= 1
+                if exito:
+                    self.completadas += 1
+                    self._segundos += time.monotonic() - inicio
+                else:
+                    self.fallidas += 1
+            if liberar:
+                self._ranuras.liberar(ranura)
+
+    def stats(self) -> dict[str, float]:
+        with self._lock:
+            return {
+                "pendientes": self.pendientes,
+                "max_pendientes": self.max_pendientes,
+                "completadas": self.completadas,
+                "fallidas": self.fallidas,
+                "rechazadas": self.rechazadas,
+                "latencia_media_ms": (
+                    self._segundos / self.completadas * 1000 if self.completadas else 0.0
+                ),
+            }
+
+    def shutdown(self) -> None:
+        if self._executor is not None and self._pid == os.getpid():
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        pid = os.getpid()
+        if self._executor is not None and self._pid == pid:
+            return self._executor
+        with self._lock:
+            if self._executor is None or self._pid != pid:
+                contexto = multiprocessing.get_context("spawn")
+                contexto.set_executable(self.python)
+                # Tras un fork el pool heredado pertenece al proceso padre
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=contexto,
+                    initializer=_inicializar_worker,
+                    initargs=(self.nice,),
+                )
+                if self._pid != pid:
+                    atexit.register(self.shutdown)
+                self._pid = pid
+        return self._executor
+
+    def _reset_executor(self) -> None:
+        with self._lock:
+            self._executor = None
+
+
+_pool: PasswordHashingPool | None = None
+_pool_lock = threading.Lock()
+
+
+def get_hashing_pool() -> PasswordHashingPool | None:
+    """Pool del proceso; None con ``PASSWORD_HASHING_POOL_ENABLED`` desactivado."""
+    global _pool
+    if not getattr(settings, "PASSWORD_HASHING_POOL_ENABLED", False):
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = PasswordHashingPool(
+                    workers=getattr(settings, "PASSWORD_HASHING_WORKERS", 1),
+                    max_concurrent=getattr(settings, "PASSWORD_HASHING_MAX_CONCURRENT", 4),
+                    slots_dir=getattr(settings, "PASSWORD_HASHING_SLOTS_DIR", "") or None,
+                    admission_timeout=getattr(settings, "PASSWORD_HASHING_ADMISSION_TIMEOUT", 2.0),
+                    task_timeout=getattr(settings, "PASSWORD_HASHING_TASK_TIMEOUT", 10.0),
+                    nice=getattr(settings, "PASSWORD_HASHING_NICE", 10),
+                    python=getattr(settings, "PASSWORD_HASHING_PYTHON", "") or None,
+                )
+    return _pool
+
+
+def run_hashing(funcion: Callable[..., Any], *args: Any) -> Any:
+    """``funcion(*args)`` en el pool si está habilitado, si no en línea."""
+    pool = get_hashing_pool()
+    if pool is None:
+        return funcion(*args)
+    return pool.run(funcion, *args)
+
+
+def bcrypt_hash(password: str, rounds: int) -> str:
+    """Hash bcrypt de ``password`` calculado en el pool."""
+    return run_hashing(_bcrypt_hashpw, password, rounds)
+
+
+def bcrypt_check(password: str, hashed: str) -> bool:
+    """Verifica un hash bcrypt en el pool."""
+    return run_hashing(_bcrypt_checkpw, password, hashed)
+
+
+def check_password(password: str | None, encoded: str | None) -> tuple[bool, str | None]:
+    """
+    Verifica ``password`` contra ``encoded`` en el pool.
+
+    Retorna ``(valida, nuevo_hash)``; ``nuevo_hash`` solo se informa si la
+    contraseña es válida y el hash guardado debe actualizarse al hasher
+    preferido o a su factor de trabajo actual.
+    """
+    if password is None or not is_password_usable(encoded):
+        return False, None
+    try:
+        hasher = identify_hasher(encoded)
+    except ValueError:
+        return False, None
+
+    if not run_hashing(_verificar, hasher, password, encoded):
+        return False, None
+
+    preferido = get_hasher("default")
+    if hasher.algorithm != preferido.algorithm or preferido.must_update(encoded):
+        return True, run_hashing(_codificar, preferido, password, preferido.salt())
+    return True, None
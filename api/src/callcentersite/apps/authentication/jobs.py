@@ -4,18 +4,27 @@ from __future__ import annotations
 
 from datetime import timedelta
 
+from django.conf import settings
 from django.utils import timezone
 
 from callcentersite.apps.audit.models import AuditLog
 from callcentersite.apps.notifications.models import InternalMessage
 from callcentersite.apps.users.models import UserSession
 
+from .activity import get_activity_coalescer
+from .models import LoginAttempt
+
 INACTIVITY_TIMEOUT_MINUTES = 30
 
 
 def close_inactive_sessions() -> dict:
     """Cierra sesiones inactivas y registra auditoría y notificaciones."""
 
+    # La actividad acumulada en este proceso cuenta antes de decidir
+    coalescer = get_activity_coalescer()
+    if coalescer is not None:
+        coalescer.flush()
+
     threshold = timezone.now() - timedelta(minutes=INACTIVITY_TIMEOUT_MINUTES)
     inactive_sessions = (
         UserSession.objects.filter(is_active=True, last_activity_at__lte=threshold)
@@ -56,3 +65,29 @@ def close_inactive_sessions() -> dict:
         'closed_sessions': closed_sessions,
         'threshold_minutes': INACTIVITY_TIMEOUT_MINUTES,
     }
+
+
+def prune_login_attempts(retention_days: int | None = None, batch_size: int = 5000) -> dict:
+    """
+    Elimina los intentos de login anteriores a ``LOGIN_ATTEMPTS_RETENTION_DAYS``.
+
+    Borra por lotes de ``batch_size`` ids (índice ``login_attempt_ts_idx``)
+    para no mantener un DELETE largo sobre la tabla.
+    """
+
+    if retention_days is None:
+        retention_days = getattr(settings, 'LOGIN_ATTEMPTS_RETENTION_DAYS', 90)
+    threshold = timezone.now() - timedelta(days=retention_days)
+    antiguos = LoginAttempt.objects.filter(timestamp__lt=threshold).order_by()
+
+    deleted = 0
+    while True:
+        ids = list(antiguos.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            break
+        deleted += LoginAttempt.objects.filter(pk__in=ids).delete()[0]
+
+    return {
+        'deleted_attempts': deleted,
+        'retention_days': retention_days,
+    }
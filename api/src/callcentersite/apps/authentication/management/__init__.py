@@ -0,0 +1 @@
+"""Paquete de management para autenticación."""
@@ -0,0 +1 @@
+"""Comandos personalizados de autenticación."""
@@ -0,0 +1,78 @@
+"""
+Benchmark del cierre de sesiones previas (sesión única) en el login.
+
+Uso:
+    python manage.py benchmark_single_session
+    python manage.py benchmark_single_session --sesiones 0 1 10 100 1000 --iteraciones=20
+
+Para cada cantidad de sesiones previas crea un usuario temporal con esas
+sesiones activas, mide ``close_previous_sessions`` y revierte todo al
+terminar. Se informa la latencia media, el p95 y las consultas SQL por
+llamada: deben mantenerse planas aunque crezca el número de sesiones.
+"""
+
+from __future__ import annotations
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+
+from callcentersite.apps.users.models import UserSession
+
+from ...services import close_previous_sessions
+
+
+class Command(BaseCommand):
+    help = "Mide el cierre de sesiones previas segun el numero de sesiones activas"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sesiones",
+            nargs="+",
+            type=int,
+            default=[0, 1, 10, 100],
+            help="Cantidades de sesiones previas a medir",
+        )
+        parser.add_argument(
+            "--iteraciones",
+            type=int,
+            default=10,
+            help="Llamadas medidas por cantidad de sesiones",
+        )
+
+    def handle(self, *args, **options):
+        request = RequestFactory().post(
+            "/api/v1/auth/login/", REMOTE_ADDR="10.0.0.1", HTTP_USER_AGENT="benchmark"
+        )
+        for cantidad in options["sesiones"]:
+            tiempos = []
+            consultas = 0
+            with transaction.atomic():
+                user = get_user_model().objects.create_user(
+                    username="benchmark_single_session",
+                    password=None,
+                    email="benchmark_single_session@example.com",
+                )
+                for iteracion in range(options["iteraciones"]):
+                    UserSession.objects.bulk_create(
+                        UserSession(user=user, session_key=f"bench-{iteracion}-{i}")
+                        for i in range(cantidad)
+                    )
+                    with CaptureQueriesContext(connection) as queries:
+                        started = time.perf_counter()
+                        close_previous_sessions(user, request)
+                        tiempos.append(time.perf_counter() - started)
+                    consultas = max(consultas, len(queries))
+                transaction.set_rollback(True)
+
+            tiempos.sort()
+            media = sum(tiempos) / len(tiempos)
+            p95 = tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))]
+            self.stdout.write(
+                f"{cantidad:>6} sesiones previas: media {media * 1000:.3f} ms, "
+                f"p95 {p95 * 1000:.3f} ms, {consultas} consultas SQL"
+            )
@@ -0,0 +1,48 @@
+"""
+Poda de la tabla de intentos de login.
+
+Uso:
+    python manage.py prune_login_attempts
+    python manage.py prune_login_attempts --days=30 --batch-size=10000
+
+Los bloqueos se deciden con el contador en memoria
+(``apps.authentication.attempts``); ``LoginAttempt`` solo se conserva para
+forense durante ``LOGIN_ATTEMPTS_RETENTION_DAYS`` días. Programar en cron
+diario.
+"""
+
+from __future__ import annotations
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ...jobs import prune_login_attempts
+
+
+class Command(BaseCommand):
+    help = "Elimina los intentos de login fuera del periodo de retencion"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=getattr(settings, "LOGIN_ATTEMPTS_RETENTION_DAYS", 90),
+            help="Dias de intentos que se conservan",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Filas eliminadas por DELETE",
+        )
+
+    def handle(self, *args, **options):
+        resultado = prune_login_attempts(
+            retention_days=options["days"], batch_size=options["batch_size"]
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{resultado['deleted_attempts']} intentos eliminados "
+                f"(retencion {resultado['retention_days']} dias)"
+            )
+        )
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("authentication", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="loginattempt",
+            index=models.Index(fields=["timestamp"], name="login_attempt_ts_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="loginattempt",
+            index=models.Index(fields=["username", "timestamp"], name="login_attempt_user_ts_idx"),
+        ),
+    ]
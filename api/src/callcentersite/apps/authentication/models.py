@@ -52,3 +52,7 @@ class LoginAttempt(models.Model):
         verbose_name = "intento de inicio de sesión"
         verbose_name_plural = "intentos de inicio de sesión"
         ordering = ("-timestamp",)
+        indexes = [
+            models.Index(fields=["timestamp"], name="login_attempt_ts_idx"),
+            models.Index(fields=["username", "timestamp"], name="login_attempt_user_ts_idx"),
+        ]
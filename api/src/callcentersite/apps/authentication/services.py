@@ -5,18 +5,23 @@ from __future__ import annotations
 from datetime import timedelta
 from typing import TYPE_CHECKING
 
-import bcrypt
 from django.contrib.auth import get_user_model
-from django.contrib.auth.hashers import check_password
 from django.core.exceptions import PermissionDenied, ObjectDoesNotExist, ValidationError
+from django.db import transaction
 from django.utils import timezone
+from django.utils.crypto import constant_time_compare
 from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
 
+from . import hashing
+from .activity import get_activity_coalescer
+from .attempts import LoginThrottled, get_attempt_counter
 from .models import LoginAttempt
 from callcentersite.apps.audit.models import AuditLog
+from callcentersite.apps.audit.writer import record, record_many
 from callcentersite.apps.notifications.models import InternalMessage
 from callcentersite.apps.users.models import PasswordHistory, UserSession
+from callcentersite.middleware.session_security import FINGERPRINT_CLAIM, session_fingerprint
 
 if TYPE_CHECKING:
     from django.http import HttpRequest
@@ -34,22 +39,45 @@ class LoginAttemptService:
         user_agent: str,
         success: bool,
         reason: str | None = None,
+        count: bool = True,
     ) -> None:
-        LoginAttempt.objects.create(
+        """
+        Guarda el intento (en lote con el escritor de auditoría) y, si falló,
+        lo suma a la ventana en memoria salvo con ``count=False``.
+        """
+        record(
+            LoginAttempt,
             username=username,
             ip_address=ip_address,
             user_agent=user_agent,
             success=success,
             reason=reason,
         )
+        counter = get_attempt_counter()
+        if counter is None:
+            return
+        if not success and count:
+            counter.record_failure(username, ip_address)
+        elif success:
+            counter.reset_username(username)
 
     @staticmethod
     def count_recent_failures(username: str, window: timedelta) -> int:
+        counter = get_attempt_counter()
+        if counter is not None and window.total_seconds() <= counter.window_seconds:
+            return counter.failures(username=username, window_seconds=window.total_seconds())
+
         threshold = timezone.now() - window
         return LoginAttempt.objects.filter(
             username=username, success=False, timestamp__gte=threshold
         ).count()
 
+    @staticmethod
+    def is_throttled(username: str, ip_address: str) -> bool:
+        """Demasiados fallos recientes del username o de la IP (sin consultas)."""
+        counter = get_attempt_counter()
+        return counter is not None and counter.is_throttled(username, ip_address)
+
 
 class AuthenticationService:
     """
@@ -100,6 +128,15 @@ class AuthenticationService:
         ip_address = _get_client_ip(request)
         user_agent = request.META.get('HTTP_USER_AGENT', '')
 
+        # 0. Demasiados fallos recientes del username o de la IP: se rechaza
+        # sin consultar la base de datos ni calcular el hash
+        if LoginAttemptService.is_throttled(username, ip_address):
+            LoginAttemptService.register_attempt(
+                username, ip_address, user_agent, success=False,
+                reason='demasiados_intentos', count=False
+            )
+            raise LoginThrottled('Demasiados intentos fallidos. Intente más tarde')
+
         # 1. Intentar obtener usuario (sin revelar si existe o no)
         try:
             user = User.objects.get(username=username)
@@ -110,7 +147,8 @@ class AuthenticationService:
 
         # 2. Si usuario no existe, retornar error genérico
         if not user_exists:
-            AuditLog.objects.create(
+            record(
+                AuditLog,
                 user=None,
                 event_type='LOGIN_FAILURE',
                 result='FAILURE',
@@ -118,11 +156,15 @@ class AuthenticationService:
                 user_agent=user_agent,
                 details={'username': username, 'reason': 'usuario_inexistente'}
             )
+            LoginAttemptService.register_attempt(
+                username, ip_address, user_agent, success=False, reason='usuario_inexistente'
+            )
             raise Exception('Credenciales inválidas')
 
         # 3. Verificar si usuario está activo
         if user.status != 'ACTIVO':
-            AuditLog.objects.create(
+            record(
+                AuditLog,
                 user=user,
                 event_type='LOGIN_FAILURE',
                 result='FAILURE',
@@ -130,6 +172,9 @@ class AuthenticationService:
                 user_agent=user_agent,
                 details={'reason': 'usuario_inactivo'}
             )
+            LoginAttemptService.register_attempt(
+                username, ip_address, user_agent, success=False, reason='usuario_inactivo'
+            )
             raise PermissionDenied('Usuario inactivo')
 
         # 4. Verificar si usuario está bloqueado
@@ -146,7 +191,8 @@ class AuthenticationService:
                 ])
 
                 # Auditar desbloqueo automático
-                AuditLog.objects.create(
+                record(
+                    AuditLog,
                     user=user,
                     event_type='USER_UNLOCKED',
                     result='SUCCESS',
@@ -160,7 +206,8 @@ class AuthenticationService:
                     (user.locked_until - timezone.now()).total_seconds() / 60
                 ) if user.locked_until else 0
 
-                AuditLog.objects.create(
+                record(
+                    AuditLog,
                     user=user,
                     event_type='LOGIN_FAILURE',
                     result='FAILURE',
@@ -168,10 +215,18 @@ class AuthenticationService:
                     user_agent=user_agent,
                     details={'reason': 'cuenta_bloqueada', 'minutes_remaining': minutes_remaining}
                 )
+                LoginAttemptService.register_attempt(
+                    username, ip_address, user_agent, success=False, reason='cuenta_bloqueada'
+                )
                 raise PermissionDenied(f'Cuenta bloqueada. Tiempo restante: {minutes_remaining} minutos')
 
-        # 5. Verificar contraseña
-        if not check_password(password, user.password):
+        # 5. Verificar contraseña en el pool de hashing (HashingPoolBusy si está saturado)
+        password_ok, new_password_hash = hashing.check_password(password, user.password)
+        if not password_ok:
+            LoginAttemptService.register_attempt(
+                username, ip_address, user_agent, success=False, reason='credenciales_invalidas'
+            )
+
             # Contraseña incorrecta - incrementar contador
             user.failed_login_attempts += 1
             user.last_failed_login_at = timezone.now()
@@ -194,7 +249,8 @@ class AuthenticationService:
                 ])
 
                 # Auditar bloqueo
-                AuditLog.objects.create(
+                record(
+                    AuditLog,
                     user=user,
                     event_type='USER_LOCKED',
                     result='SUCCESS',
@@ -220,7 +276,8 @@ class AuthenticationService:
                 user.save(update_fields=['failed_login_attempts', 'last_failed_login_at'])
 
             # Auditar intento fallido
-            AuditLog.objects.create(
+            record(
+                AuditLog,
                 user=user,
                 event_type='LOGIN_FAILURE',
                 result='FAILURE',
@@ -236,44 +293,27 @@ class AuthenticationService:
             raise Exception('Credenciales inválidas')
 
         # 6. Credenciales válidas - Login exitoso
+        LoginAttemptService.register_attempt(username, ip_address, user_agent, success=True)
 
         # Cerrar sesiones previas (sesión única)
-        previous_sessions = UserSession.objects.filter(user=user, is_active=True)
-        for session in previous_sessions:
-            session.close(reason='NEW_SESSION')
-
-            # Auditar cierre de sesión previa
-            AuditLog.objects.create(
-                user=user,
-                event_type='SESSION_CLOSED',
-                result='SUCCESS',
-                ip_address=ip_address,
-                user_agent=user_agent,
-                details={'reason': 'new_session', 'old_session': session.session_key[:8]}
-            )
-
-            # Notificar sobre nueva sesión
-            InternalMessage.objects.create(
-                recipient=user,
-                sender=None,
-                subject='Nueva sesión iniciada',
-                body=f'Se ha iniciado una nueva sesión en tu cuenta. Si no fuiste tú, contacta al administrador.',
-                message_type='info',
-                priority='medium',
-                created_by_system=True
-            )
+        close_previous_sessions(user, request)
 
         # Resetear contador de intentos fallidos
         user.failed_login_attempts = 0
         user.last_failed_login_at = None
         user.last_login_at = timezone.now()
         user.last_login_ip = ip_address
-        user.save(update_fields=[
+        update_fields = [
             'failed_login_attempts',
             'last_failed_login_at',
             'last_login_at',
             'last_login_ip'
-        ])
+        ]
+        # Rehash al hasher preferido / factor de trabajo actual
+        if new_password_hash:
+            user.password = new_password_hash
+            update_fields.append('password')
+        user.save(update_fields=update_fields)
 
         # Crear nueva sesión
         # Manejar request.session que puede no existir en tests
@@ -291,10 +331,11 @@ class AuthenticationService:
         )
 
         # Generar tokens JWT
-        tokens = TokenService.generate_jwt_tokens(user)
+        tokens = TokenService.generate_jwt_tokens(user, request)
 
         # Auditar login exitoso
-        AuditLog.objects.create(
+        record(
+            AuditLog,
             user=user,
             event_type='LOGIN_SUCCESS',
             result='SUCCESS',
@@ -333,7 +374,8 @@ class AuthenticationService:
                 # Blacklist no disponible en el entorno de pruebas
                 pass
 
-        AuditLog.objects.create(
+        record(
+            AuditLog,
             user=user,
             event_type='LOGOUT_SUCCESS',
             result='SUCCESS',
@@ -353,29 +395,35 @@ class TokenService:
     """Gestiona generación, validación y refresh de tokens JWT."""
 
     @staticmethod
-    def _build_claims(user: User) -> dict:
+    def _build_claims(user: User, request: HttpRequest | None = None) -> dict:
         roles = []
         if hasattr(user, "groups"):
             roles = list(user.groups.values_list("name", flat=True))
-        return {
+        claims = {
             "user_id": user.id,
             "username": user.username,
             "email": user.email,
             "segment": getattr(user, "segment", ""),
             "roles": roles,
         }
+        if request is not None:
+            # SessionSecurityMiddleware compara IP/UA contra el token, sin sesión en BD
+            claims[FINGERPRINT_CLAIM] = session_fingerprint(request)
+        return claims
 
     @staticmethod
-    def _apply_claims(token: RefreshToken | AccessToken, user: User) -> None:
-        for key, value in TokenService._build_claims(user).items():
+    def _apply_claims(
+        token: RefreshToken | AccessToken, user: User, request: HttpRequest | None = None
+    ) -> None:
+        for key, value in TokenService._build_claims(user, request).items():
             token[key] = value
 
     @staticmethod
-    def generate_jwt_tokens(user: User) -> dict:
+    def generate_jwt_tokens(user: User, request: HttpRequest | None = None) -> dict:
         refresh = RefreshToken.for_user(user)
-        TokenService._apply_claims(refresh, user)
+        TokenService._apply_claims(refresh, user, request)
         access = refresh.access_token
-        TokenService._apply_claims(access, user)
+        TokenService._apply_claims(access, user, request)
         return {"access": str(access), "refresh": str(refresh)}
 
     @staticmethod
@@ -405,7 +453,7 @@ class TokenService:
         return user
 
     @staticmethod
-    def refresh_access_token(refresh_token_str: str) -> dict:
+    def refresh_access_token(refresh_token_str: str, request: HttpRequest | None = None) -> dict:
         try:
             refresh_token = RefreshToken(refresh_token_str)
             refresh_token.check_blacklist()
@@ -417,6 +465,14 @@ class TokenService:
                 raise Exception("Refresh token expirado")
             raise Exception("Token inválido o en blacklist")
 
+        huella = refresh_token.get(FINGERPRINT_CLAIM)
+        if (
+            request is not None
+            and huella
+            and not constant_time_compare(huella, session_fingerprint(request))
+        ):
+            raise Exception("Token emitido para otro dispositivo")
+
         user_id = refresh_token.get("user_id")
         user = User.objects.filter(id=user_id).first()
         if not user:
@@ -430,9 +486,9 @@ class TokenService:
             raise Exception("Token inválido o en blacklist")
 
         new_refresh = RefreshToken.for_user(user)
-        TokenService._apply_claims(new_refresh, user)
+        TokenService._apply_claims(new_refresh, user, request)
         new_access = new_refresh.access_token
-        TokenService._apply_claims(new_access, user)
+        TokenService._apply_claims(new_access, user, request)
 
         return {"access": str(new_access), "refresh": str(new_refresh)}
 
@@ -448,7 +504,18 @@ def _get_client_ip(request: HttpRequest) -> str:
 
 
 def update_session_activity(user: User, request: HttpRequest) -> None:
-    """Actualiza la última actividad de la sesión activa del usuario."""
+    """
+    Actualiza la última actividad de la sesión activa del usuario.
+
+    Con ``SESSION_ACTIVITY_COALESCE`` la escritura se acumula en memoria y se
+    hace en lote (``activity.ActivityCoalescer``); la actividad dentro de la
+    granularidad configurada no consulta la base de datos.
+    """
+
+    now = timezone.now()
+    coalescer = get_activity_coalescer()
+    if coalescer is not None and coalescer.is_fresh(user.id, now):
+        return
 
     session = (
         UserSession.objects.filter(user=user, is_active=True)
@@ -459,7 +526,7 @@ def update_session_activity(user: User, request: HttpRequest) -> None:
     if not session:
         return
 
-    session.last_activity_at = timezone.now()
+    session.last_activity_at = now
 
     ip_address = _get_client_ip(request)
     user_agent = request.META.get('HTTP_USER_AGENT', '')
@@ -469,34 +536,66 @@ def update_session_activity(user: User, request: HttpRequest) -> None:
     if user_agent:
         session.user_agent = user_agent
 
+    if coalescer is not None:
+        coalescer.touch(session, now)
+        return
+
     session.save(update_fields=['last_activity_at', 'ip_address', 'user_agent'])
 
 
 def close_previous_sessions(user: User, request: HttpRequest) -> int:
-    """Cierra sesiones activas para garantizar sesión única."""
+    """
+    Cierra sesiones activas para garantizar sesión única.
 
-    active_sessions = list(UserSession.objects.filter(user=user, is_active=True))
-    for session in active_sessions:
-        session.close(reason='NEW_SESSION')
+    Un solo UPDATE cierra todas las sesiones y la auditoría y las
+    notificaciones se insertan en lote, dentro de una transacción: el costo
+    del login no crece con el número de sesiones previas.
+    """
 
-        AuditLog.objects.create(
-            user=user,
-            event_type='SESSION_CLOSED',
-            result='SUCCESS',
-            details={'session_key': session.session_key},
+    ip_address = _get_client_ip(request)
+    user_agent = request.META.get('HTTP_USER_AGENT', '')
+
+    with transaction.atomic():
+        previous_sessions = list(
+            UserSession.objects.select_for_update()
+            .filter(user=user, is_active=True)
+            .values_list('id', 'session_key')
         )
+        if not previous_sessions:
+            return 0
 
-        InternalMessage.objects.create(
-            recipient=user,
-            sender=None,
-            subject='Nueva sesión iniciada',
-            body='Se cerró tu sesión anterior por iniciar en otro dispositivo.',
-            message_type='info',
-            priority='medium',
-            created_by_system=True,
+        UserSession.objects.filter(id__in=[pk for pk, _ in previous_sessions]).update(
+            is_active=False,
+            logged_out_at=timezone.now(),
+            logout_reason='NEW_SESSION',
+        )
+
+        record_many(AuditLog, (
+            {
+                'user': user,
+                'event_type': 'SESSION_CLOSED',
+                'result': 'SUCCESS',
+                'ip_address': ip_address,
+                'user_agent': user_agent,
+                'details': {'reason': 'new_session', 'old_session': session_key[:8]},
+            }
+            for _, session_key in previous_sessions
+        ))
+
+        InternalMessage.objects.bulk_create(
+            InternalMessage(
+                recipient=user,
+                sender=None,
+                subject='Nueva sesión iniciada',
+                body='Se cerró tu sesión anterior por iniciar en otro dispositivo.',
+                message_type='info',
+                priority='medium',
+                created_by_system=True,
+            )
+            for _ in previous_sessions
         )
 
-    return len(active_sessions)
+    return len(previous_sessions)
 
 
 def create_user_session(user: User, request: HttpRequest) -> UserSession:
@@ -521,16 +620,13 @@ def create_user_session(user: User, request: HttpRequest) -> UserSession:
 def hash_password(password: str) -> str:
     """Genera hash bcrypt con cost factor 12."""
 
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=12)).decode('utf-8')
+    return hashing.bcrypt_hash(password, 12)
 
 
 def verify_password(password: str, hashed_password: str) -> bool:
     """Verifica un password plano contra su hash bcrypt."""
 
-    try:
-        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
-    except ValueError:
-        return False
+    return hashing.bcrypt_check(password, hashed_password)
 
 
 def validate_password_history(user: User, new_password: str) -> None:
@@ -545,6 +641,10 @@ def validate_password_history(user: User, new_password: str) -> None:
 def handle_failed_login(username: str) -> None:
     """Incrementa contador y bloquea cuenta tras 3 intentos."""
 
+    counter = get_attempt_counter()
+    if counter is not None:
+        counter.record_failure(username, None)
+
     try:
         user = User.objects.get(username=username)
     except User.DoesNotExist:
@@ -560,7 +660,8 @@ def handle_failed_login(username: str) -> None:
         user.lock_reason = 'MAX_FAILED_ATTEMPTS'
         update_fields += ['is_locked', 'locked_until', 'lock_reason']
 
-        AuditLog.objects.create(
+        record(
+            AuditLog,
             user=user,
             event_type='USER_LOCKED',
             result='SUCCESS',
@@ -600,7 +701,8 @@ def unlock_user_manual(admin_user: User, target_user: User) -> None:
         'last_failed_login_at',
     ])
 
-    AuditLog.objects.create(
+    record(
+        AuditLog,
         user=target_user,
         event_type='USER_UNLOCKED',
         result='SUCCESS',
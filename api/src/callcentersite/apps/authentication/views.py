@@ -1,13 +1,23 @@
 """Vistas DRF para autenticación y gestión de tokens."""
 
+import math
+
 from rest_framework import status
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from .attempts import LoginThrottled, get_attempt_counter
+from .hashing import HashingPoolBusy
 from .services import AuthenticationService, TokenService
 
 
+def _retry_after_seconds() -> int:
+    """Lo que tarda en salir de la ventana el bucket de fallos más viejo."""
+    counter = get_attempt_counter()
+    return math.ceil(counter.por_ip.bucket_seconds) if counter is not None else 60
+
+
 class LoginAPIView(APIView):
     permission_classes = [AllowAny]
 
@@ -18,6 +28,18 @@ class LoginAPIView(APIView):
         try:
             tokens = AuthenticationService.login(username=username, password=password, request=request)
             return Response(tokens, status=status.HTTP_200_OK)
+        except LoginThrottled as exc:
+            return Response(
+                {"detail": str(exc)},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(_retry_after_seconds())},
+            )
+        except HashingPoolBusy as exc:
+            return Response(
+                {"detail": str(exc)},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers={"Retry-After": "1"},
+            )
         except Exception as exc:  # pragma: no cover - comportamiento validado en tests de servicios
             return Response({"detail": str(exc)}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -31,7 +53,7 @@ class RefreshTokenAPIView(APIView):
             return Response({"detail": "Refresh token requerido"}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
-            tokens = TokenService.refresh_access_token(refresh)
+            tokens = TokenService.refresh_access_token(refresh, request)
         except Exception as exc:  # pragma: no cover - verificado vía tests unitarios
             return Response({"detail": str(exc)}, status=status.HTTP_401_UNAUTHORIZED)
 
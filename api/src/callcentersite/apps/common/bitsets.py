@@ -0,0 +1,392 @@
+"""
+Codificacion de conjuntos de capacidades como mapas de bits.
+
+Cada capacidad recibe un ``bit_indice`` entero estable (``BitIndexedModel``)
+y un conjunto de capacidades se representa como un ``int`` de Python con
+esos bits encendidos. En base de datos se guarda como ``bytea`` little-endian
+(``a_bytes``/``desde_bytes``), de modo que el bit ``i`` queda en el byte
+``i // 8``.
+
+La usan tanto ``apps.permissions`` como ``apps.users.models_permisos_granular``:
+cada grupo guarda el mapa de sus capacidades y el conjunto de un usuario es
+el OR de sus grupos (mas concesiones) enmascarado por las revocaciones.
+``MapasCapacidades`` implementa ese calculo una vez para ambos esquemas.
+
+Los indices salen de ``SecuenciaBitIndice`` y nunca se reutilizan: cada
+proceso guarda en memoria el mapa codigo <-> indice (``IndiceCapacidades``)
+y un indice reasignado tras un borrado se traduciria a la capacidad vieja en
+los procesos que aun no recargaron. Los cambios de capacidades se avisan al
+resto de procesos por el canal LISTEN/NOTIFY de ``apps.permissions.notify``,
+que llama a ``invalidar_indices``.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import defaultdict
+from typing import Callable, Iterable
+
+from django.db import models, transaction
+from django.db.models import F, Max, Q
+from django.utils import timezone
+
+
+def mascara(indices: Iterable[int]) -> int:
+    """Mapa de bits con los ``indices`` encendidos."""
+    resultado = 0
+    for indice in indices:
+        resultado |= 1 << indice
+    return resultado
+
+
+def indices(bitmap: int) -> list[int]:
+    """Indices encendidos en ``bitmap``, en orden ascendente."""
+    resultado = []
+    indice = 0
+    while bitmap:
+        if bitmap & 1:
+            resultado.append(indice)
+        bitmap >>= 1
+        indice += 1
+    return resultado
+
+
+def contiene(bitmap: int, indice: int | None) -> bool:
+    return indice is not None and bool(bitmap >> indice & 1)
+
+
+def a_bytes(bitmap: int) -> bytes:
+    """Serializa el mapa para un ``BinaryField`` (little-endian, sin ceros finales)."""
+    return bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+
+
+def desde_bytes(datos: bytes | memoryview | None) -> int:
+    """Inverso de ``a_bytes``; acepta el ``memoryview`` que devuelve psycopg."""
+    return int.from_bytes(bytes(datos or b""), "little")
+
+
+class BitIndexedModel(models.Model):
+    """
+    Modelo abstracto con un ``bit_indice`` unico asignado al crear.
+
+    El indice sale de la secuencia del modelo (``siguiente_indice``): no
+    cambia mientras la fila exista y no se reasigna cuando se borra.
+    """
+
+    bit_indice = models.PositiveIntegerField(
+        unique=True,
+        null=True,
+        editable=False,
+        help_text="Posicion estable de la capacidad en los mapas de bits",
+    )
+
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if self.bit_indice is not None:
+            return super().save(*args, **kwargs)
+
+        try:
+            with transaction.atomic():
+                self.bit_indice = siguiente_indice(type(self))
+                return super().save(*args, **kwargs)
+        except Exception:
+            self.bit_indice = None
+            raise
+
+
+def siguiente_indice(modelo: type[models.Model]) -> int:
+    """
+    Reserva el proximo indice de ``modelo``.
+
+    El ``UPDATE`` bloquea la fila de la secuencia hasta el fin de la
+    transaccion, asi que las altas concurrentes se serializan. Un alta que
+    falla deja un hueco, nunca un indice repetido.
+    """
+    from .models import SecuenciaBitIndice
+
+    etiqueta = modelo._meta.label_lower
+    secuencia = SecuenciaBitIndice.objects.filter(modelo=etiqueta)
+    with transaction.atomic():
+        if not secuencia.update(siguiente=F("siguiente") + 1):
+            # Sin fila sembrada por migracion: parte del maximo existente
+            SecuenciaBitIndice.objects.get_or_create(
+                modelo=etiqueta, defaults={"siguiente": _siguiente_libre(modelo)}
+            )
+            secuencia.update(siguiente=F("siguiente") + 1)
+        return secuencia.values_list("siguiente", flat=True).get() - 1
+
+
+def _siguiente_libre(modelo: type[models.Model]) -> int:
+    maximo = modelo._default_manager.aggregate(maximo=Max("bit_indice"))["maximo"]
+    return 0 if maximo is None else maximo + 1
+
+
+def asignar_bits_iniciales(capacidad, grupo_capacidad, grupo) -> None:
+    """
+    Asigna ``bit_indice`` por orden de id y calcula el mapa de cada grupo.
+
+    Para las migraciones que introducen los mapas; recibe los modelos
+    historicos del esquema.
+    """
+    capacidades = list(capacidad.objects.order_by("id"))
+    for indice, fila in enumerate(capacidades):
+        fila.bit_indice = indice
+    capacidad.objects.bulk_update(capacidades, ["bit_indice"], batch_size=500)
+
+    bitmaps: dict[int, int] = defaultdict(int)
+    for grupo_id, bit_indice in grupo_capacidad.objects.filter(
+        capacidad__activa=True
+    ).values_list("grupo_id", "capacidad__bit_indice"):
+        bitmaps[grupo_id] |= 1 << bit_indice
+
+    grupos = list(grupo.objects.all())
+    for fila in grupos:
+        fila.capacidades_bitmap = a_bytes(bitmaps.get(fila.id, 0))
+    grupo.objects.bulk_update(grupos, ["capacidades_bitmap"], batch_size=500)
+
+
+def sembrar_secuencia(secuencia, capacidad, etiqueta: str) -> None:
+    """Inicializa la secuencia de ``etiqueta`` tras el mayor indice asignado (migraciones)."""
+    maximo = capacidad.objects.aggregate(maximo=Max("bit_indice"))["maximo"]
+    secuencia.objects.update_or_create(
+        modelo=etiqueta, defaults={"siguiente": 0 if maximo is None else maximo + 1}
+    )
+
+
+class IndiceCapacidades:
+    """
+    Mapa en memoria codigo <-> ``bit_indice`` de un modelo de capacidades.
+
+    Se carga con una consulta en el primer uso y se descarta con
+    ``invalidar()`` cuando cambia alguna capacidad, en este proceso por
+    senales y en el resto por ``invalidar_indices``. Si se consulta un codigo
+    o un bit desconocido se recarga una vez, asi que las capacidades creadas
+    por otros procesos se descubren aunque se pierda el aviso.
+    """
+
+    def __init__(self, modelo: str | type[models.Model], campo_codigo: str) -> None:
+        self._modelo = modelo
+        self.campo_codigo = campo_codigo
+        self._mapas: tuple[dict[str, int], dict[int, str]] | None = None
+        self._lock = threading.Lock()
+        self.etiqueta = (
+            modelo.lower() if isinstance(modelo, str) else modelo._meta.label_lower
+        )
+        _indices[self.etiqueta] = self
+
+    @property
+    def modelo(self) -> type[models.Model]:
+        if isinstance(self._modelo, str):
+            from django.apps import apps
+
+            self._modelo = apps.get_model(self._modelo)
+        return self._modelo
+
+    def _cargar(self, recargar: bool = False) -> tuple[dict[str, int], dict[int, str]]:
+        mapas = self._mapas
+        if mapas is None or recargar:
+            with self._lock:
+                if self._mapas is None or recargar:
+                    por_codigo = dict(
+                        self.modelo._default_manager.filter(bit_indice__isnull=False).values_list(
+                            self.campo_codigo, "bit_indice"
+                        )
+                    )
+                    self._mapas = (
+                        por_codigo,
+                        {indice: codigo for codigo, indice in por_codigo.items()},
+                    )
+                mapas = self._mapas
+        return mapas
+
+    def indice(self, codigo: str) -> int | None:
+        por_codigo, _ = self._cargar()
+        if codigo not in por_codigo:
+            por_codigo, _ = self._cargar(recargar=True)
+        return por_codigo.get(codigo)
+
+    def mascara(self, codigos: Iterable[str]) -> int:
+        return mascara(
+            indice for indice in (self.indice(codigo) for codigo in codigos) if indice is not None
+        )
+
+    def codigos(self, bitmap: int) -> frozenset[str]:
+        _, por_indice = self._cargar()
+        encendidos = indices(bitmap)
+        if any(indice not in por_indice for indice in encendidos):
+            _, por_indice = self._cargar(recargar=True)
+        return frozenset(por_indice[indice] for indice in encendidos if indice in por_indice)
+
+    def invalidar(self) -> None:
+        with self._lock:
+            self._mapas = None
+
+
+_indices: dict[str, IndiceCapacidades] = {}
+
+
+def invalidar_indices(etiquetas: Iterable[str] | None = None) -> None:
+    """Descarta los mapas de los modelos ``etiquetas`` (``app_label.modelo``); todos con None."""
+    if etiquetas is None:
+        seleccion = list(_indices.values())
+    else:
+        seleccion = [_indices[etiqueta] for etiqueta in etiquetas if etiqueta in _indices]
+    for indice in seleccion:
+        indice.invalidar()
+
+
+class MapasCapacidades:
+    """
+    Mapas de bits de grupos y usuarios sobre un esquema de permisos.
+
+    Cada grupo guarda en ``capacidades_bitmap`` el OR de los ``bit_indice``
+    de sus capacidades activas y el mapa de un usuario es::
+
+        (OR de sus grupos vigentes | concesiones vigentes) & ~revocaciones vigentes
+
+    Lo que difiere entre esquemas se recibe al construir: los modelos, el
+    campo de grupo activo, que asignaciones y excepciones estan vigentes y el
+    campo/valor que marca una revocacion (``None`` si el esquema no tiene).
+    """
+
+    def __init__(
+        self,
+        *,
+        indice: IndiceCapacidades,
+        grupo: type[models.Model],
+        grupo_capacidad: type[models.Model],
+        usuario_grupo: type[models.Model],
+        excepcion: type[models.Model],
+        asignacion_vigente: Callable[[object], Q],
+        excepcion_vigente: Callable[[object], Q],
+        grupo_activo: str | None = None,
+        revocacion: tuple[str, str] | None = None,
+    ) -> None:
+        self.indice = indice
+        self.grupo = grupo
+        self.grupo_capacidad = grupo_capacidad
+        self.usuario_grupo = usuario_grupo
+        self.excepcion = excepcion
+        self.asignacion_vigente = asignacion_vigente
+        self.excepcion_vigente = excepcion_vigente
+        self.grupo_activo = grupo_activo
+        self.revocacion = revocacion
+
+    def recalcular_grupos(self, grupo_ids: Iterable[int]) -> None:
+        """Recalcula ``capacidades_bitmap`` de los grupos indicados."""
+        grupo_ids = set(grupo_ids)
+        if not grupo_ids:
+            return
+
+        indices_por_grupo: dict[int, list[int]] = defaultdict(list)
+        for grupo_id, bit_indice in self.grupo_capacidad.objects.filter(
+            grupo_id__in=grupo_ids,
+            capacidad__activa=True,
+            capacidad__bit_indice__isnull=False,
+        ).values_list("grupo_id", "capacidad__bit_indice"):
+            indices_por_grupo[grupo_id].append(bit_indice)
+
+        grupos = list(self.grupo.objects.filter(id__in=grupo_ids).only("id"))
+        for grupo in grupos:
+            grupo.capacidades_bitmap = a_bytes(mascara(indices_por_grupo.get(grupo.id, ())))
+        self.grupo.objects.bulk_update(grupos, ["capacidades_bitmap"])
+
+    def grupos_con_capacidad(self, capacidad_id: int) -> list[int]:
+        return list(
+            self.grupo_capacidad.objects.filter(capacidad_id=capacidad_id).values_list(
+                "grupo_id", flat=True
+            )
+        )
+
+    def bitmaps_usuarios(self, usuario_ids: Iterable[int]) -> dict[int, int]:
+        """Mapa efectivo de cada usuario (0 si no tiene capacidades), con dos consultas."""
+        usuario_ids = list(set(usuario_ids))
+        ahora = timezone.now()
+        resultado = dict.fromkeys(usuario_ids, 0)
+
+        for usuario_id, bitmap in self._asignaciones(ahora).filter(
+            usuario_id__in=usuario_ids
+        ).values_list("usuario_id", "grupo__capacidades_bitmap"):
+            resultado[usuario_id] |= desde_bytes(bitmap)
+
+        campo_tipo, revocar = self.revocacion or ("pk", None)
+        revocadas: dict[int, int] = defaultdict(int)
+        for usuario_id, tipo, bit_indice in self._excepciones(ahora).filter(
+            usuario_id__in=usuario_ids, capacidad__bit_indice__isnull=False
+        ).values_list("usuario_id", campo_tipo, "capacidad__bit_indice"):
+            if revocar is not None and tipo == revocar:
+                revocadas[usuario_id] |= 1 << bit_indice
+            else:
+                resultado[usuario_id] |= 1 << bit_indice
+
+        for usuario_id, bitmap in revocadas.items():
+            resultado[usuario_id] &= ~bitmap
+        return resultado
+
+    def bitmap_usuario(self, usuario_id: int) -> int:
+        return self.bitmaps_usuarios([usuario_id])[usuario_id]
+
+    def capacidades_usuarios(self, usuario_ids: Iterable[int]) -> dict[int, frozenset[str]]:
+        return {
+            usuario_id: self.indice.codigos(bitmap)
+            for usuario_id, bitmap in self.bitmaps_usuarios(usuario_ids).items()
+        }
+
+    def tiene_capacidad(self, usuario_id: int, capacidad: str) -> bool:
+        return contiene(self.bitmap_usuario(usuario_id), self.indice.indice(capacidad))
+
+    def usuarios_con_capacidad(self, capacidad: str) -> set[int]:
+        """
+        Usuarios que tienen hoy ``capacidad``.
+
+        Los grupos candidatos se eligen con un AND sobre sus mapas en memoria;
+        luego se suman concesiones y se restan revocaciones.
+        """
+        bit_indice = self.indice.indice(capacidad)
+        if bit_indice is None:
+            return set()
+
+        ahora = timezone.now()
+        grupos = self.grupo.objects.all()
+        if self.grupo_activo:
+            grupos = grupos.filter(**{self.grupo_activo: True})
+        grupo_ids = [
+            grupo_id
+            for grupo_id, bitmap in grupos.values_list("id", "capacidades_bitmap")
+            if contiene(desde_bytes(bitmap), bit_indice)
+        ]
+        usuarios = set(
+            self._asignaciones(ahora, grupo_activo=False)
+            .filter(grupo_id__in=grupo_ids)
+            .values_list("usuario_id", flat=True)
+        ) if grupo_ids else set()
+
+        excepciones = self._excepciones(ahora).filter(capacidad__bit_indice=bit_indice)
+        if self.revocacion is None:
+            usuarios.update(excepciones.values_list("usuario_id", flat=True))
+            return usuarios
+
+        campo_tipo, revocar = self.revocacion
+        revocados = set()
+        for usuario_id, tipo in excepciones.values_list("usuario_id", campo_tipo):
+            if tipo == revocar:
+                revocados.add(usuario_id)
+            else:
+                usuarios.add(usuario_id)
+        # La revocacion prevalece sobre la concesion
+        return usuarios - revocados
+
+    def _asignaciones(self, ahora, grupo_activo: bool = True):
+        asignaciones = self.usuario_grupo.objects.filter(activo=True).filter(
+            self.asignacion_vigente(ahora)
+        )
+        if grupo_activo and self.grupo_activo:
+            asignaciones = asignaciones.filter(**{f"grupo__{self.grupo_activo}": True})
+        return asignaciones
+
+    def _excepciones(self, ahora):
+        return self.excepcion.objects.filter(
+            activo=True, capacidad__activa=True, fecha_inicio__lte=ahora
+        ).filter(self.excepcion_vigente(ahora))
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="SecuenciaBitIndice",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "modelo",
+                    models.CharField(help_text="app_label.modelo", max_length=100, unique=True),
+                ),
+                (
+                    "siguiente",
+                    models.PositiveIntegerField(default=0, help_text="Proximo indice a asignar"),
+                ),
+            ],
+            options={
+                "verbose_name": "secuencia de bit_indice",
+                "verbose_name_plural": "secuencias de bit_indice",
+                "db_table": "common_secuencia_bit_indice",
+            },
+        ),
+    ]
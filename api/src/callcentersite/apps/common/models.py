@@ -30,3 +30,24 @@ class BaseModel(TimeStampedModel, SoftDeleteModel):
 
     class Meta:
         abstract = True
+
+
+class SecuenciaBitIndice(models.Model):
+    """
+    Proximo ``bit_indice`` de cada modelo de capacidades.
+
+    Solo avanza: un indice liberado al borrar una capacidad no se reasigna,
+    asi que ningun proceso con el mapa viejo en memoria puede traducir ese
+    bit a otra capacidad (ver ``apps.common.bitsets``).
+    """
+
+    modelo = models.CharField(max_length=100, unique=True, help_text="app_label.modelo")
+    siguiente = models.PositiveIntegerField(default=0, help_text="Proximo indice a asignar")
+
+    class Meta:
+        db_table = "common_secuencia_bit_indice"
+        verbose_name = "secuencia de bit_indice"
+        verbose_name_plural = "secuencias de bit_indice"
+
+    def __str__(self):
+        return f"{self.modelo}: {self.siguiente}"
@@ -0,0 +1,193 @@
+"""
+Paginacion por clave (keyset) para tablas de solo insercion.
+
+``PageNumberPagination`` cuesta un ``COUNT(*)`` y un ``OFFSET`` que recorre
+todas las filas anteriores, asi que la pagina 10.000 de la auditoria es
+mucho mas cara que la primera. ``KeysetPagination`` ordena por
+``(<campo>, id)`` descendente y cada pagina continua desde la ultima fila de
+la anterior::
+
+    WHERE campo <= :t AND (campo < :t OR id < :id)
+    ORDER BY campo DESC, id DESC
+    LIMIT :n + 1
+
+que con un indice ``(filtro, campo, id)`` es una sola lectura por rango sin
+importar la profundidad. El total no se cuenta; con ``?estimar_total=1`` se
+devuelve una estimacion del planificador (solo PostgreSQL).
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from collections import OrderedDict
+from datetime import datetime, time
+
+from django.db import connections
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def codificar_cursor(momento: datetime, pk: int) -> str:
+    datos = json.dumps([momento.isoformat(), pk]).encode()
+    return base64.urlsafe_b64encode(datos).decode().rstrip("=")
+
+
+def decodificar_cursor(token: str) -> tuple[datetime, int]:
+    """Inverso de ``codificar_cursor``; ValueError si el token no es valido."""
+    try:
+        relleno = "=" * (-len(token) % 4)
+        momento, pk = json.loads(base64.urlsafe_b64decode(token + relleno))
+        momento = parse_datetime(momento)
+        pk = int(pk)
+    except (TypeError, ValueError, json.JSONDecodeError) as exc:
+        raise ValueError("Cursor invalido") from exc
+    if momento is None:
+        raise ValueError("Cursor invalido")
+    return momento, pk
+
+
+def despues_de(
+    queryset: QuerySet, campo: str, momento: datetime, pk: int, descendente: bool = True
+) -> QuerySet:
+    """Filas estrictamente posteriores a ``(momento, pk)`` en el orden indicado."""
+    hasta, antes = ("lte", "lt") if descendente else ("gte", "gt")
+    return queryset.filter(
+        Q(**{f"{campo}__{hasta}": momento})
+        & (Q(**{f"{campo}__{antes}": momento}) | Q(**{f"pk__{antes}": pk}))
+    )
+
+
+def filtrar_rango_fechas(queryset: QuerySet, params, campo: str = "timestamp") -> QuerySet:
+    """Aplica ``desde``/``hasta`` (ISO 8601, inclusivos) de los query params."""
+    for parametro, lookup in (("desde", "gte"), ("hasta", "lte")):
+        valor = params.get(parametro)
+        if not valor:
+            continue
+        try:
+            momento = parse_datetime(valor)
+            if momento is None and (fecha := parse_date(valor)) is not None:
+                momento = datetime.combine(fecha, time.min)
+        except ValueError:
+            momento = None
+        if momento is None:
+            raise ValidationError({parametro: "Fecha invalida, se espera ISO 8601"})
+        if timezone.is_naive(momento):
+            momento = timezone.make_aware(momento)
+        queryset = queryset.filter(**{f"{campo}__{lookup}": momento})
+    return queryset
+
+
+def estimar_total(queryset: QuerySet) -> int | None:
+    """
+    Filas estimadas sin recorrer la tabla.
+
+    Sin filtros suma ``pg_class.reltuples`` de la tabla y sus particiones;
+    con filtros usa las filas estimadas por ``EXPLAIN``. None fuera de
+    PostgreSQL.
+    """
+    conexion = connections[queryset.db]
+    if conexion.vendor != "postgresql":
+        return None
+
+    if not queryset.query.where:
+        with conexion.cursor() as cursor:
+            cursor.execute(
+                """
+                SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)::bigint
+                FROM pg_class c
+                WHERE c.oid = to_regclass(%s)
+                   OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(%s))
+                """,
+                [queryset.model._meta.db_table] * 2,
+            )
+            return cursor.fetchone()[0]
+
+    plan = json.loads(queryset.order_by().explain(format="json"))
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginacion por ``(ordering_field, id)`` descendente.
+
+    Parametros: ``cursor`` (token devuelto como ``next``), ``page_size`` y
+    ``estimar_total``. La vista puede fijar ``keyset_field`` (por defecto
+    ``timestamp``).
+    """
+
+    page_size = 50
+    max_page_size = 500
+    ordering_field = "timestamp"
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    estimate_query_param = "estimar_total"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        campo = getattr(view, "keyset_field", self.ordering_field)
+        tamano = self.get_page_size(request)
+
+        token = request.query_params.get(self.cursor_query_param)
+        if token:
+            try:
+                momento, pk = decodificar_cursor(token)
+            except ValueError as exc:
+                raise ValidationError({self.cursor_query_param: str(exc)}) from exc
+            pagina_qs = despues_de(queryset, campo, momento, pk)
+        else:
+            pagina_qs = queryset
+
+        filas = list(pagina_qs.order_by(f"-{campo}", "-pk")[: tamano + 1])
+        self.siguiente = None
+        if len(filas) > tamano:
+            filas = filas[:tamano]
+            ultima = filas[-1]
+            self.siguiente = codificar_cursor(getattr(ultima, campo), ultima.pk)
+
+        self.total_estimado = None
+        if request.query_params.get(self.estimate_query_param) in ("1", "true"):
+            self.total_estimado = estimar_total(queryset)
+        return filas
+
+    def get_page_size(self, request) -> int:
+        valor = request.query_params.get(self.page_size_query_param)
+        try:
+            tamano = int(valor) if valor else self.page_size
+        except ValueError:
+            tamano = self.page_size
+        return max(1, min(tamano, self.max_page_size))
+
+    def get_next_link(self) -> str | None:
+        if self.siguiente is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, self.siguiente
+        )
+
+    def get_paginated_response(self, data):
+        cuerpo = OrderedDict([
+            ("next", self.get_next_link()),
+            ("cursor", self.siguiente),
+            ("results", data),
+        ])
+        if self.total_estimado is not None:
+            cuerpo["estimated_count"] = self.total_estimado
+        return Response(cuerpo)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["next", "results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "cursor": {"type": "string", "nullable": True},
+                "estimated_count": {"type": "integer"},
+                "results": schema,
+            },
+        }
@@ -0,0 +1,348 @@
+"""
+Particionado mensual por rango (PostgreSQL) de tablas de solo insercion.
+
+Las tablas de auditoria se convierten en tablas particionadas por
+``RANGE (timestamp)``:
+
+- ``<tabla>_historico``: la tabla original, adjuntada sin copiar filas como
+  particion ``[MINVALUE, mes siguiente a la conversion)``. Antes de la
+  conversion se le agrega un ``CHECK`` con ese rango ``NOT VALID`` y se
+  valida en su propia transaccion (sin bloquear inserciones); asi ``ATTACH
+  PARTITION`` no recorre la tabla con el lock exclusivo tomado.
+- ``<tabla>_pAAAAMM``: una particion por mes, creadas por adelantado.
+- ``<tabla>_default``: red de seguridad si falta la particion de un mes.
+
+Django no nota la diferencia: se conservan el nombre de la tabla, los nombres
+de sus indices y claves foraneas y la secuencia de ``id``. La clave primaria
+fisica pasa a ser ``(id, timestamp)`` porque PostgreSQL exige que incluya la
+clave de particion.
+
+``manage_audit_partitions`` crea los meses siguientes y desprende (para
+archivar o eliminar) las particiones que quedan fuera de la retencion. En
+otros motores todas las funciones son no-op.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from datetime import datetime, timezone as dt_timezone
+
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+# tabla -> columna de particion
+TABLAS_AUDITORIA = {
+    "audit_auditlog": "timestamp",
+    "permissions_auditoria_permisos": "timestamp",
+    "auditoria_permisos": "timestamp",
+}
+
+_LIMITES = re.compile(r"FOR VALUES FROM \((?P<desde>[^)]*)\) TO \((?P<hasta>[^)]*)\)")
+
+
+@dataclass(frozen=True)
+class Particion:
+    nombre: str
+    desde: datetime | None  # None: MINVALUE
+    hasta: datetime | None  # None: MAXVALUE
+    default: bool = False
+
+
+def inicio_de_mes(momento: datetime) -> datetime:
+    momento = momento.astimezone(dt_timezone.utc)
+    return momento.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def sumar_meses(mes: datetime, meses: int) -> datetime:
+    total = mes.year * 12 + mes.month - 1 + meses
+    return mes.replace(year=total // 12, month=total % 12 + 1)
+
+
+def nombre_particion(tabla: str, mes: datetime) -> str:
+    return f"{tabla}_p{mes:%Y%m}"
+
+
+def parsear_limites(expresion: str) -> tuple[datetime | None, datetime | None, bool]:
+    """Interpreta ``pg_get_expr(relpartbound)``: (desde, hasta, es_default)."""
+    if expresion.strip().upper() == "DEFAULT":
+        return None, None, True
+    coincidencia = _LIMITES.search(expresion)
+    if coincidencia is None:
+        raise ValueError(f"Limites de particion no reconocidos: {expresion}")
+
+    def _valor(texto: str) -> datetime | None:
+        texto = texto.strip()
+        if texto.upper() in ("MINVALUE", "MAXVALUE"):
+            return None
+        return parse_datetime(texto.strip("'"))
+
+    return _valor(coincidencia["desde"]), _valor(coincidencia["hasta"]), False
+
+
+def disponible(connection) -> bool:
+    return connection.vendor == "postgresql"
+
+
+def es_particionada(connection, tabla: str) -> bool:
+    if not disponible(connection):
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass(%s))",
+            [tabla],
+        )
+        return cursor.fetchone()[0]
+
+
+def _existe(cursor, relacion: str) -> bool:
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [relacion])
+    return cursor.fetchone()[0]
+
+
+def particiones(connection, tabla: str) -> list[Particion]:
+    """Particiones adjuntas a ``tabla`` ordenadas por nombre."""
+    if not es_particionada(connection, tabla):
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = to_regclass(%s)
+            ORDER BY c.relname
+            """,
+            [tabla],
+        )
+        filas = cursor.fetchall()
+    return [Particion(nombre, *parsear_limites(limites)) for nombre, limites in filas]
+
+
+def crear_particion(connection, tabla: str, columna: str, mes: datetime) -> bool:
+    """
+    Crea la particion del mes que empieza en ``mes``. False si ya existia.
+
+    Si la particion default tiene filas de ese mes se mueven a la nueva: se
+    desprende la default, se crea el mes, se trasladan las filas y se vuelve
+    a adjuntar, todo en una transaccion.
+    """
+    quote = connection.ops.quote_name
+    nombre = nombre_particion(tabla, mes)
+    hasta = sumar_meses(mes, 1)
+    default = f"{tabla}_default"
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        if _existe(cursor, nombre):
+            return False
+        con_default = _existe(cursor, default)
+        if con_default:
+            cursor.execute(f"ALTER TABLE {quote(tabla)} DETACH PARTITION {quote(default)}")
+        cursor.execute(
+            f"CREATE TABLE {quote(nombre)} PARTITION OF {quote(tabla)} "
+            f"FOR VALUES FROM ('{mes.isoformat()}') TO ('{hasta.isoformat()}')"
+        )
+        if con_default:
+            rango = f"{quote(columna)} >= %s AND {quote(columna)} < %s"
+            cursor.execute(
+                f"INSERT INTO {quote(nombre)} SELECT * FROM {quote(default)} WHERE {rango}",
+                [mes, hasta],
+            )
+            cursor.execute(f"DELETE FROM {quote(default)} WHERE {rango}", [mes, hasta])
+            cursor.execute(f"ALTER TABLE {quote(tabla)} ATTACH PARTITION {quote(default)} DEFAULT")
+    return True
+
+
+def crear_particiones_siguientes(
+    connection, tabla: str, columna: str, meses: int, desde: datetime | None = None
+) -> list[str]:
+    """Asegura las particiones del mes actual y los ``meses`` siguientes."""
+    if not es_particionada(connection, tabla):
+        return []
+    mes = inicio_de_mes(desde or datetime.now(dt_timezone.utc))
+    creadas = []
+    for desplazamiento in range(meses + 1):
+        inicio = sumar_meses(mes, desplazamiento)
+        if _cubierto(connection, tabla, inicio):
+            continue
+        if crear_particion(connection, tabla, columna, inicio):
+            creadas.append(nombre_particion(tabla, inicio))
+    return creadas
+
+
+def _cubierto(connection, tabla: str, mes: datetime) -> bool:
+    """True si una particion no default ya cubre ``mes`` (p. ej. la historica)."""
+    for particion in particiones(connection, tabla):
+        if particion.default:
+            continue
+        if (particion.desde is None or particion.desde <= mes) and (
+            particion.hasta is None or mes < particion.hasta
+        ):
+            return True
+    return False
+
+
+def retirar_particiones(
+    connection,
+    tabla: str,
+    antes_de: datetime,
+    esquema_archivo: str | None = None,
+    eliminar: bool = False,
+    simular: bool = False,
+) -> list[str]:
+    """
+    Desprende las particiones cuyas filas son todas anteriores a ``antes_de``.
+
+    Cada una se mueve a ``esquema_archivo`` (si se indica) o se elimina con
+    ``eliminar``; sin ninguno de los dos queda desprendida en el esquema
+    actual. Con ``simular`` solo devuelve los nombres.
+    """
+    quote = connection.ops.quote_name
+    vencidas = [
+        particion.nombre
+        for particion in particiones(connection, tabla)
+        if not particion.default and particion.hasta is not None and particion.hasta <= antes_de
+    ]
+    if simular:
+        return vencidas
+
+    for nombre in vencidas:
+        with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+            cursor.execute(f"ALTER TABLE {quote(tabla)} DETACH PARTITION {quote(nombre)}")
+            if eliminar:
+                cursor.execute(f"DROP TABLE {quote(nombre)}")
+            elif esquema_archivo:
+                cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {quote(esquema_archivo)}")
+                cursor.execute(f"ALTER TABLE {quote(nombre)} SET SCHEMA {quote(esquema_archivo)}")
+    return vencidas
+
+
+def convertir_a_particionada(
+    connection, tabla: str, columna: str, meses_adelante: int = 3
+) -> bool:
+    """
+    Convierte ``tabla`` en particionada por mes sobre ``columna``.
+
+    Idempotente; False si no es PostgreSQL o ya estaba particionada. Los
+    indices unicos distintos de la clave primaria no se trasladan (tendrian
+    que incluir ``columna``); las tablas de auditoria no tienen.
+    """
+    if not disponible(connection) or es_particionada(connection, tabla):
+        return False
+
+    quote = connection.ops.quote_name
+    historico = f"{tabla}_historico"
+    secuencia_nueva = f"{tabla}_id_seq"
+    rango = quote(f"{tabla[:56]}_rango")
+
+    # 0. CHECK con el rango del historico, validado fuera de la conversion
+    with connection.cursor() as cursor:
+        cursor.execute(f"SELECT MAX({quote(columna)}) FROM {quote(tabla)}")
+        (max_momento,) = cursor.fetchone()
+    ahora = datetime.now(dt_timezone.utc)
+    ultimo = max(max_momento, ahora) if max_momento else ahora
+    hasta_historico = sumar_meses(inicio_de_mes(ultimo), 1)
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {quote(tabla)} DROP CONSTRAINT IF EXISTS {rango}")
+        cursor.execute(
+            f"ALTER TABLE {quote(tabla)} ADD CONSTRAINT {rango} "
+            f"CHECK ({quote(columna)} IS NOT NULL "
+            f"AND {quote(columna)} < '{hasta_historico.isoformat()}') NOT VALID"
+        )
+    # SHARE UPDATE EXCLUSIVE: las inserciones siguen durante el recorrido
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(f"ALTER TABLE {quote(tabla)} VALIDATE CONSTRAINT {rango}")
+
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT pg_get_serial_sequence(%s, 'id'), is_identity
+            FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name = %s AND column_name = 'id'
+            """,
+            [tabla, tabla],
+        )
+        secuencia, identidad = cursor.fetchone()
+        cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {quote(tabla)}")
+        (max_id,) = cursor.fetchone()
+
+        # Definiciones originales: al recrearlas tal cual apuntan ya a la tabla padre
+        cursor.execute(
+            """
+            SELECT i.relname, pg_get_indexdef(x.indexrelid)
+            FROM pg_index x
+            JOIN pg_class i ON i.oid = x.indexrelid
+            WHERE x.indrelid = to_regclass(%s) AND NOT x.indisunique
+            """,
+            [tabla],
+        )
+        indices = cursor.fetchall()
+        cursor.execute(
+            """
+            SELECT conname, contype, pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE conrelid = to_regclass(%s) AND contype IN ('p', 'f')
+            """,
+            [tabla],
+        )
+        restricciones = cursor.fetchall()
+
+        # 1. La tabla original pasa a ser la particion historica
+        cursor.execute(f"ALTER TABLE {quote(tabla)} RENAME TO {quote(historico)}")
+        for nombre, tipo, _ in restricciones:
+            nuevo = f"{historico}_pkey" if tipo == "p" else f"{nombre[:61]}_h"
+            cursor.execute(
+                f"ALTER TABLE {quote(historico)} RENAME CONSTRAINT {quote(nombre)} TO {quote(nuevo)}"
+            )
+        for nombre, _ in indices:
+            cursor.execute(f"ALTER INDEX {quote(nombre)} RENAME TO {quote(nombre[:61] + '_h')}")
+        if identidad == "YES":
+            cursor.execute(f"ALTER TABLE {quote(historico)} ALTER COLUMN id DROP IDENTITY")
+        else:
+            cursor.execute(f"ALTER TABLE {quote(historico)} ALTER COLUMN id DROP DEFAULT")
+            if secuencia:
+                cursor.execute(f"DROP SEQUENCE {secuencia}")
+
+        # 2. Tabla padre con el nombre, indices, claves y secuencia originales
+        cursor.execute(
+            f"CREATE TABLE {quote(tabla)} (LIKE {quote(historico)} "
+            f"INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING STORAGE) "
+            f"PARTITION BY RANGE ({quote(columna)})"
+        )
+        # LIKE ... INCLUDING CONSTRAINTS copia el CHECK del rango al padre
+        cursor.execute(f"ALTER TABLE {quote(tabla)} DROP CONSTRAINT {rango}")
+        cursor.execute(
+            f"CREATE SEQUENCE {quote(secuencia_nueva)} START WITH {int(max_id) + 1} "
+            f"OWNED BY {quote(tabla)}.id"
+        )
+        cursor.execute(
+            f"ALTER TABLE {quote(tabla)} ALTER COLUMN id "
+            f"SET DEFAULT nextval('{secuencia_nueva}'::regclass)"
+        )
+        cursor.execute(
+            f"ALTER TABLE {quote(tabla)} ADD CONSTRAINT {quote(tabla + '_pkey')} "
+            f"PRIMARY KEY (id, {quote(columna)})"
+        )
+        for _, definicion in indices:
+            cursor.execute(definicion)
+        for nombre, tipo, definicion in restricciones:
+            if tipo == "f":
+                cursor.execute(
+                    f"ALTER TABLE {quote(tabla)} ADD CONSTRAINT {quote(nombre)} {definicion}"
+                )
+
+        # 3. Historico hasta el mes siguiente a la ultima fila; el CHECK
+        # validado evita el recorrido y luego sobra
+        cursor.execute(
+            f"ALTER TABLE {quote(tabla)} ATTACH PARTITION {quote(historico)} "
+            f"FOR VALUES FROM (MINVALUE) TO ('{hasta_historico.isoformat()}')"
+        )
+        cursor.execute(f"ALTER TABLE {quote(historico)} DROP CONSTRAINT {rango}")
+
+        # 4. Meses siguientes y default
+        for desplazamiento in range(meses_adelante):
+            crear_particion(connection, tabla, columna, sumar_meses(hasta_historico, desplazamiento))
+        cursor.execute(
+            f"CREATE TABLE {quote(tabla + '_default')} PARTITION OF {quote(tabla)} DEFAULT"
+        )
+    return True
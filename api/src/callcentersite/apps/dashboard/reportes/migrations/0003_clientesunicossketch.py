@@ -0,0 +1,47 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reportes", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ClientesUnicosSketch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="fecha de creación"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="fecha de actualización"),
+                ),
+                ("fecha", models.DateField(help_text="Dia de las llamadas")),
+                ("center_id", models.IntegerField(help_text="Centro de atención")),
+                (
+                    "precision",
+                    models.PositiveSmallIntegerField(
+                        default=14, help_text="Precision del sketch (2^p registros)"
+                    ),
+                ),
+                ("registros", models.BinaryField(help_text="Registros HyperLogLog")),
+            ],
+            options={
+                "verbose_name": "sketch de clientes únicos",
+                "verbose_name_plural": "sketches de clientes únicos",
+                "ordering": ("-fecha", "center_id"),
+                "unique_together": {("fecha", "center_id")},
+            },
+        ),
+    ]
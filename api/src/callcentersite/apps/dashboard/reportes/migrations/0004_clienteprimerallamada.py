@@ -0,0 +1,68 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:00
+
+from django.db import migrations, models
+from django.db.models import Min
+from django.db.models.functions import TruncDate
+
+
+def poblar_primeras_llamadas(apps, schema_editor):
+    """Carga la primera llamada de cada cliente desde el historial existente."""
+    try:
+        CallAnalytics = apps.get_model("analytics", "CallAnalytics")
+    except LookupError:
+        # Sin historial de llamadas no hay nada que cargar
+        return
+    ClientePrimeraLlamada = apps.get_model("reportes", "ClientePrimeraLlamada")
+
+    primeras = (
+        CallAnalytics.objects.values("client_id")
+        .annotate(fecha=Min(TruncDate("call_date")))
+        .order_by()
+    )
+    lote = []
+    for primera in primeras.iterator(chunk_size=5000):
+        lote.append(ClientePrimeraLlamada(client_id=primera["client_id"], fecha=primera["fecha"]))
+        if len(lote) >= 5000:
+            ClientePrimeraLlamada.objects.bulk_create(lote, ignore_conflicts=True)
+            lote = []
+    ClientePrimeraLlamada.objects.bulk_create(lote, ignore_conflicts=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("reportes", "0003_clientesunicossketch"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ClientePrimeraLlamada",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="fecha de creación"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="fecha de actualización"),
+                ),
+                (
+                    "client_id",
+                    models.CharField(help_text="Cliente", max_length=100, unique=True),
+                ),
+                ("fecha", models.DateField(help_text="Dia de su primera llamada")),
+            ],
+            options={
+                "verbose_name": "primera llamada de cliente",
+                "verbose_name_plural": "primeras llamadas de clientes",
+                "indexes": [models.Index(fields=["fecha"], name="reportes_primera_fecha_idx")],
+            },
+        ),
+        migrations.RunPython(poblar_primeras_llamadas, migrations.RunPython.noop),
+    ]
@@ -267,3 +267,38 @@ class ReporteClientesUnicos(TimeStampedModel):
 
     def __str__(self):
         return f"Clientes únicos {self.fecha_inicio} - {self.fecha_fin}"
+
+
+class ClientesUnicosSketch(TimeStampedModel):
+    """Sketch HyperLogLog de clientes que llamaron en un dia y centro."""
+
+    fecha = models.DateField(help_text="Dia de las llamadas")
+    center_id = models.IntegerField(help_text="Centro de atención")
+    precision = models.PositiveSmallIntegerField(
+        default=14, help_text="Precision del sketch (2^p registros)"
+    )
+    registros = models.BinaryField(help_text="Registros HyperLogLog")
+
+    class Meta:
+        verbose_name = "sketch de clientes únicos"
+        verbose_name_plural = "sketches de clientes únicos"
+        ordering = ("-fecha", "center_id")
+        unique_together = [["fecha", "center_id"]]
+
+    def __str__(self):
+        return f"Sketch clientes {self.fecha} centro {self.center_id}"
+
+
+class ClientePrimeraLlamada(TimeStampedModel):
+    """Dia de la primera llamada de cada cliente, mantenido por el ETL."""
+
+    client_id = models.CharField(max_length=100, unique=True, help_text="Cliente")
+    fecha = models.DateField(help_text="Dia de su primera llamada")
+
+    class Meta:
+        verbose_name = "primera llamada de cliente"
+        verbose_name_plural = "primeras llamadas de clientes"
+        indexes = [models.Index(fields=["fecha"], name="reportes_primera_fecha_idx")]
+
+    def __str__(self):
+        return f"Cliente {self.client_id} desde {self.fecha}"
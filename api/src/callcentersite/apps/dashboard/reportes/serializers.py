@@ -149,3 +149,17 @@ class ExportarReporteSerializer(serializers.Serializer):
             msg = "Los filtros deben ser un objeto JSON"
             raise serializers.ValidationError(msg)
         return value
+
+
+class ClientesUnicosRangoSerializer(serializers.Serializer):
+    """Serializer para consultar clientes unicos de un rango de fechas."""
+
+    fecha_inicio = serializers.DateField(help_text="Primer dia del rango")
+    fecha_fin = serializers.DateField(help_text="Ultimo dia del rango")
+    centro_id = serializers.IntegerField(
+        required=False, allow_null=True, default=None, help_text="Centro de atencion"
+    )
+    exacto = serializers.BooleanField(
+        default=False,
+        help_text="Conteo exacto; por defecto se estima con HyperLogLog (~0.81% de error)",
+    )
@@ -7,13 +7,17 @@ from typing import Any
 
 from django.db.models import QuerySet
 
+from callcentersite.apps.analytics.models import CallAnalytics
+
 from .models import (
+    ClientesUnicosSketch,
     ReporteClientesUnicos,
     ReporteLlamadasDia,
     ReporteMenuProblemas,
     ReporteTransferencias,
     ReporteTrimestral,
 )
+from .sketches import DEFAULT_PRECISION, HyperLogLog, standard_error
 
 
 class ReporteIVRService:
@@ -173,6 +177,62 @@ class ReporteIVRService:
 
         return queryset
 
+    @staticmethod
+    def estimar_clientes_unicos(
+        fecha_inicio: date,
+        fecha_fin: date,
+        centro_id: int | None = None,
+        exacto: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Contar clientes unicos de un rango arbitrario de dias.
+
+        Por defecto fusiona en memoria los sketches HyperLogLog diarios del
+        rango (error estandar relativo ~0.81%, ver ``sketches``). Con
+        ``exacto=True`` cuenta los ``client_id`` distintos sobre las llamadas.
+
+        Args:
+            fecha_inicio: Primer dia del rango (inclusive)
+            fecha_fin: Ultimo dia del rango (inclusive)
+            centro_id: Centro de atención; todos si se omite
+            exacto: Calcular el conteo exacto en lugar de la estimacion
+
+        Returns:
+            Diccionario con el total y el error estandar de la estimacion
+        """
+        if fecha_inicio > fecha_fin:
+            msg = "fecha_inicio no puede ser posterior a fecha_fin"
+            raise ValueError(msg)
+
+        if exacto:
+            llamadas = CallAnalytics.objects.filter(
+                call_date__date__gte=fecha_inicio, call_date__date__lte=fecha_fin
+            )
+            if centro_id is not None:
+                llamadas = llamadas.filter(center_id=centro_id)
+            total = llamadas.values("client_id").distinct().count()
+            error = 0.0
+        else:
+            sketches = ClientesUnicosSketch.objects.filter(
+                fecha__gte=fecha_inicio, fecha__lte=fecha_fin
+            )
+            if centro_id is not None:
+                sketches = sketches.filter(center_id=centro_id)
+            acumulado = HyperLogLog(DEFAULT_PRECISION)
+            for precision, registros in sketches.values_list("precision", "registros").iterator():
+                acumulado.merge(HyperLogLog.from_bytes(registros, precision))
+            total = acumulado.estimate()
+            error = standard_error(DEFAULT_PRECISION)
+
+        return {
+            "fecha_inicio": fecha_inicio,
+            "fecha_fin": fecha_fin,
+            "centro_id": centro_id,
+            "total_clientes_unicos": total,
+            "exacto": exacto,
+            "error_estandar": round(error, 4),
+        }
+
     @staticmethod
     def exportar_reporte(
         tipo_reporte: str,
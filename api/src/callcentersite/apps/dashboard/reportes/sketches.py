@@ -0,0 +1,74 @@
+"""
+Sketch HyperLogLog para conteo aproximado de clientes unicos.
+
+Con precision ``p`` el sketch usa ``m = 2**p`` registros de un byte y su
+error estandar relativo es ``1.04 / sqrt(m)``: con ``p = 14`` (16 KiB por
+sketch) el error tipico es ~0.81% y el 99% de las estimaciones queda dentro
+de ~2.4% del valor real. La union de sketches es el maximo registro a
+registro, por lo que fusionar cualquier rango de dias cuesta O(m) por dia
+sin volver a leer las llamadas.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+from typing import Iterable
+
+DEFAULT_PRECISION = 14
+
+
+def standard_error(precision: int = DEFAULT_PRECISION) -> float:
+    """Error estandar relativo de un sketch con la precision indicada."""
+    return 1.04 / math.sqrt(1 << precision)
+
+
+class HyperLogLog:
+    """Estimador de cardinalidad mergeable y serializable a bytes."""
+
+    def __init__(self, precision: int = DEFAULT_PRECISION, registers: bytes | None = None):
+        if not 4 <= precision <= 18:
+            raise ValueError("La precision debe estar entre 4 y 18")
+        self.precision = precision
+        self.size = 1 << precision
+        if registers is None:
+            self.registers = bytearray(self.size)
+        elif len(registers) != self.size:
+            raise ValueError("El numero de registros no coincide con la precision")
+        else:
+            self.registers = bytearray(registers)
+
+    def add(self, value: object) -> None:
+        digest = hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest()
+        hashed = int.from_bytes(digest, "big")
+        index = hashed >> (64 - self.precision)
+        remainder = hashed & ((1 << (64 - self.precision)) - 1)
+        rank = (64 - self.precision) - remainder.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values: Iterable[object]) -> None:
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "HyperLogLog") -> None:
+        """Incorpora ``other`` a este sketch (union de conjuntos)."""
+        if other.precision != self.precision:
+            raise ValueError("No se pueden fusionar sketches de distinta precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def estimate(self) -> int:
+        alpha = 0.7213 / (1 + 1.079 / self.size)
+        raw = alpha * self.size * self.size / sum(2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if raw <= 2.5 * self.size and zeros:
+            # Correccion de rango pequeno (linear counting).
+            return round(self.size * math.log(self.size / zeros))
+        return round(raw)
+
+    def to_bytes(self) -> bytes:
+        return bytes(self.registers)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, precision: int = DEFAULT_PRECISION) -> "HyperLogLog":
+        return cls(precision, bytes(data))
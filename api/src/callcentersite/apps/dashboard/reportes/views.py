@@ -15,6 +15,7 @@ from .models import (
     ReporteTrimestral,
 )
 from .serializers import (
+    ClientesUnicosRangoSerializer,
     ExportarReporteSerializer,
     ReporteClientesUnicosSerializer,
     ReporteLlamadasDiaSerializer,
@@ -175,6 +176,20 @@ class ReporteClientesUnicosViewSet(viewsets.ReadOnlyModelViewSet):
 
         return queryset
 
+    @action(detail=False, methods=["get"])
+    def rango(self, request):
+        """Clientes unicos de un rango arbitrario (aproximado salvo exacto=true)."""
+        serializer = ClientesUnicosRangoSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            resultado = ReporteIVRService.estimar_clientes_unicos(**serializer.validated_data)
+        except ValueError as e:
+            return Response(
+                {"error": str(e)}, status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(resultado, status=status.HTTP_200_OK)
+
 
 class ExportarReporteViewSet(viewsets.ViewSet):
     """ViewSet para exportar reportes en diferentes formatos."""
@@ -12,6 +12,7 @@ from django.core.exceptions import ObjectDoesNotExist, PermissionDenied, Validat
 from django.db import connection
 from django.utils import timezone
 
+from callcentersite.apps.permissions.resolver import get_resolver
 from callcentersite.apps.users.models_permisos_granular import AuditoriaPermiso
 from callcentersite.apps.users.services_permisos_granular import UserManagementService
 
@@ -91,11 +92,17 @@ class DashboardService:
 
         Referencia: docs/PLAN_MAESTRO_PRIORIDAD_02.md (Tarea 26)
         """
-        tiene_permiso = UserManagementService.usuario_tiene_permiso(
-            usuario_id=usuario_id,
-            capacidad_codigo='sistema.vistas.dashboards.exportar',
+        tiene_permiso = get_resolver("granular").tiene_permiso(
+            usuario_id, 'sistema.vistas.dashboards.exportar'
         )
         if not tiene_permiso:
+            AuditoriaPermiso.objects.create(
+                usuario_id=usuario_id,
+                capacidad_codigo='sistema.vistas.dashboards.exportar',
+                recurso_tipo='dashboard',
+                accion='acceso_denegado',
+                resultado='denegado',
+            )
             raise PermissionDenied('No tiene permiso para exportar dashboards')
 
         # Validar formato
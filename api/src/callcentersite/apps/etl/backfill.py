@@ -0,0 +1,151 @@
+"""Backfill ETL particionado y ejecutado en un pool de procesos."""
+
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Iterable, List
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Sum
+
+from .jobs import run_partition
+from .models import ETLJob
+
+logger = logging.getLogger(__name__)
+
+BACKFILL_JOB_NAME = "ivr_etl_backfill"
+PARTITION_JOB_NAME = "ivr_etl_partition"
+
+
+def plan_partitions(
+    start: datetime, end: datetime, partition_hours: int
+) -> List[tuple[datetime, datetime]]:
+    """Divide ``[start, end)`` en ventanas contiguas de ``partition_hours``."""
+
+    if partition_hours <= 0:
+        raise ValueError("partition_hours debe ser mayor que cero")
+    if end <= start:
+        raise ValueError("La fecha final debe ser posterior a la inicial")
+
+    step = timedelta(hours=partition_hours)
+    partitions = []
+    cursor = start
+    while cursor < end:
+        upper = min(cursor + step, end)
+        partitions.append((cursor, upper))
+        cursor = upper
+    return partitions
+
+
+def run_backfill(
+    start: datetime,
+    end: datetime,
+    partition_hours: int = 24,
+    workers: int | None = None,
+    batch_size: int | None = None,
+) -> ETLJob:
+    """
+    Ejecuta un backfill del rango ``[start, end)`` en paralelo.
+
+    Crea un ``ETLJob`` padre y un hijo por particion; cada hijo se procesa en
+    un proceso del pool con sus propias conexiones a BD.
+    """
+
+    batch_size = batch_size or getattr(settings, "ETL_BATCH_SIZE", 1000)
+    partitions = plan_partitions(start, end, partition_hours)
+
+    parent = ETLJob.objects.create(
+        job_name=BACKFILL_JOB_NAME,
+        metadata={
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "partition_hours": partition_hours,
+            "partitions": len(partitions),
+            "batch_size": batch_size,
+        },
+    )
+    ETLJob.objects.bulk_create(
+        [
+            ETLJob(
+                job_name=PARTITION_JOB_NAME,
+                parent=parent,
+                metadata={
+                    "start": lower.isoformat(),
+                    "end": upper.isoformat(),
+                    "batch_size": batch_size,
+                },
+            )
+            for lower, upper in partitions
+        ]
+    )
+
+    parent.mark_as_running()
+    child_ids = list(parent.partitions.values_list("id", flat=True))
+    _run_in_pool(child_ids, workers)
+    return _finish_parent(parent)
+
+
+def retry_backfill(parent_id: int, workers: int | None = None) -> ETLJob:
+    """Reprocesa solo las particiones fallidas o pendientes de un backfill."""
+
+    parent = ETLJob.objects.get(id=parent_id, job_name=BACKFILL_JOB_NAME)
+    child_ids = list(
+        parent.partitions.exclude(status="completed").values_list("id", flat=True)
+    )
+    parent.mark_as_running()
+    _run_in_pool(child_ids, workers)
+    return _finish_parent(parent)
+
+
+def _run_in_pool(job_ids: Iterable[int], workers: int | None) -> None:
+    job_ids = list(job_ids)
+    if not job_ids:
+        return
+
+    workers = workers or getattr(settings, "ETL_BACKFILL_WORKERS", 4)
+    # Los procesos hijos no deben heredar sockets abiertos del padre.
+    connections.close_all()
+
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(job_ids)), initializer=_init_worker
+    ) as pool:
+        futures = [pool.submit(run_partition, job_id) for job_id in job_ids]
+        for future in as_completed(futures):
+            job_id, status = future.result()
+            logger.info(
+                "Particion de backfill finalizada",
+                extra={"job_id": job_id, "status": status},
+            )
+
+
+def _init_worker() -> None:
+    import django
+
+    django.setup()
+    connections.close_all()
+
+
+def _finish_parent(parent: ETLJob) -> ETLJob:
+    partitions = parent.partitions.all()
+    totals = partitions.aggregate(
+        extracted=Sum("records_extracted"),
+        transformed=Sum("records_transformed"),
+        loaded=Sum("records_loaded"),
+        failed=Sum("records_failed"),
+    )
+    failed_ids = list(
+        partitions.exclude(status="completed").values_list("id", flat=True)
+    )
+
+    parent.record_progress(**{key: value or 0 for key, value in totals.items()})
+    if failed_ids:
+        parent.mark_as_failed(
+            error_message=f"{len(failed_ids)} particiones sin completar",
+            error_details={"failed_partitions": failed_ids},
+        )
+    else:
+        parent.mark_as_completed(**{key: value or 0 for key, value in totals.items()})
+    return parent
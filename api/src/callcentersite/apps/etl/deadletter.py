@@ -0,0 +1,221 @@
+"""Aislamiento de filas rechazadas (dead-letter) y su reproceso."""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+from django.conf import settings
+from django.db import DataError, IntegrityError, transaction
+from django.utils import timezone
+
+from callcentersite.apps.ivr_legacy.models import IVRCall
+
+from .loaders import AnalyticsDataLoader, get_loader
+from .models import ETLDeadLetter, ETLJob
+from .rollups import refresh_rollups
+from .services import _json_safe
+from .transformers import ColumnarCallTransformer
+from .validators import BatchValidator
+
+logger = logging.getLogger(__name__)
+
+# Errores atribuibles a una fila concreta. Los errores de conexion u
+# operacionales siguen abortando el job: enviarlos al dead-letter solo
+# vaciaria la ventana completa en la tabla de rechazos.
+ROW_ERRORS = (DataError, IntegrityError, ValueError, TypeError)
+
+Rejected = Tuple[tuple, str]
+
+
+def transform_isolating(
+    transformer: ColumnarCallTransformer, raw_batch: Sequence[tuple]
+) -> Tuple[List[Tuple[tuple, tuple]], List[Rejected]]:
+    """
+    Transforma un lote; si falla, repite fila a fila para aislar las rotas.
+
+    Retorna pares ``(fila_cruda, fila_transformada)`` y rechazos
+    ``(fila_cruda, motivo)``.
+    """
+    try:
+        return list(zip(raw_batch, transformer.transform(raw_batch))), []
+    except ROW_ERRORS:
+        pass
+
+    pairs: List[Tuple[tuple, tuple]] = []
+    rejected: List[Rejected] = []
+    for raw in raw_batch:
+        try:
+            pairs.extend(zip([raw], transformer.transform([raw])))
+        except ROW_ERRORS as exc:
+            rejected.append((raw, f"{type(exc).__name__}: {exc}"))
+    return pairs, rejected
+
+
+def validate_isolating(
+    validator: BatchValidator,
+    pairs: Sequence[Tuple[tuple, tuple]],
+    columns: Sequence[str],
+) -> Tuple[List[Tuple[tuple, tuple]], List[Rejected], Dict[str, int]]:
+    """
+    Valida las filas transformadas del lote regla a regla (por columna).
+
+    Retorna los pares validos, los rechazos ``(fila_cruda, motivo)`` con los
+    mensajes de las reglas que fallaron y los contadores por regla.
+    """
+    if not pairs:
+        return [], [], {}
+    result = validator.validate_rows([row for _, row in pairs], columns)
+    if not result.invalid:
+        return list(pairs), [], {}
+
+    invalid = {id(row): rules for row, rules in result.invalid}
+    valid: List[Tuple[tuple, tuple]] = []
+    rejected: List[Rejected] = []
+    for raw, row in pairs:
+        rules = invalid.get(id(row))
+        if rules is None:
+            valid.append((raw, row))
+        else:
+            rejected.append((raw, "; ".join(rule.message for rule in rules)))
+    return valid, rejected, dict(result.counters)
+
+
+def load_isolating(
+    loader: AnalyticsDataLoader,
+    pairs: Sequence[Tuple[tuple, tuple]],
+    columns: Sequence[str],
+) -> Tuple[int, List[tuple], List[Rejected]]:
+    """
+    Carga un lote en un savepoint; si falla, carga fila a fila.
+
+    Solo los lotes con errores pagan el coste de la carga individual.
+    Retorna el numero de filas cargadas, las filas que llegaron a la base de
+    datos (las unicas que deben alimentar los agregados) y los rechazos.
+    """
+    if not pairs:
+        return 0, [], []
+    rows = [row for _, row in pairs]
+    try:
+        with transaction.atomic():
+            return loader.load_rows(rows, columns), rows, []
+    except ROW_ERRORS:
+        pass
+
+    loaded = 0
+    loaded_rows: List[tuple] = []
+    rejected: List[Rejected] = []
+    for raw, row in pairs:
+        try:
+            with transaction.atomic():
+                loaded += loader.load_rows([row], columns)
+        except ROW_ERRORS as exc:
+            rejected.append((raw, f"{type(exc).__name__}: {exc}"))
+        else:
+            loaded_rows.append(row)
+    return loaded, loaded_rows, rejected
+
+
+def store_dead_letters(
+    job: ETLJob | None,
+    source: str,
+    stage: str,
+    rejected: Iterable[Rejected],
+    source_columns: Sequence[str],
+) -> int:
+    """Persiste los rechazos de un lote con un unico ``bulk_create``."""
+    letters = [
+        ETLDeadLetter(
+            job=job,
+            source=source,
+            stage=stage,
+            reason=reason,
+            raw_data=_json_safe(dict(zip(source_columns, raw))),
+        )
+        for raw, reason in rejected
+    ]
+    if letters:
+        ETLDeadLetter.objects.bulk_create(letters)
+    return len(letters)
+
+
+def replay_dead_letters(
+    batch_size: int | None = None,
+    job_id: int | None = None,
+    limit: int | None = None,
+) -> Dict[str, int]:
+    """
+    Reprocesa filas pendientes del dead-letter por lotes.
+
+    Cada lote se transforma y carga con el mismo aislamiento que el ETL y,
+    como el ETL, recalcula en la misma transaccion los agregados de reportes
+    que tocan las filas cargadas. Las filas que vuelven a fallar quedan
+    pendientes con el motivo actualizado y el contador de intentos
+    incrementado.
+    """
+    batch_size = batch_size or getattr(settings, "ETL_BATCH_SIZE", 1000)
+    source_columns = tuple(field.attname for field in IVRCall._meta.concrete_fields)
+    transformer = ColumnarCallTransformer(source_columns)
+    validator = BatchValidator()
+    loader = get_loader()
+
+    pending = ETLDeadLetter.objects.filter(status="pending")
+    if job_id is not None:
+        pending = pending.filter(job_id=job_id)
+
+    stats = {"replayed": 0, "failed": 0}
+    last_id = 0
+    while True:
+        processed = stats["replayed"] + stats["failed"]
+        if limit is not None and processed >= limit:
+            break
+        size = batch_size if limit is None else min(batch_size, limit - processed)
+        letters = list(pending.filter(id__gt=last_id).order_by("id")[:size])
+        if not letters:
+            break
+        last_id = letters[-1].id
+
+        raw_rows = [_restore_row(letter.raw_data, source_columns) for letter in letters]
+        by_row = {id(raw): letter for raw, letter in zip(raw_rows, letters)}
+
+        with transaction.atomic():
+            pairs, transform_rejected = transform_isolating(transformer, raw_rows)
+            pairs, validate_rejected, _ = validate_isolating(
+                validator, pairs, transformer.columns
+            )
+            _, loaded_rows, load_rejected = load_isolating(loader, pairs, transformer.columns)
+            failures = {
+                id(raw): reason
+                for raw, reason in transform_rejected + validate_rejected + load_rejected
+            }
+            if loaded_rows:
+                refresh_rollups(loaded_rows, transformer.columns)
+
+            now = timezone.now()
+            for raw in raw_rows:
+                letter = by_row[id(raw)]
+                letter.replay_attempts += 1
+                if id(raw) in failures:
+                    letter.reason = failures[id(raw)]
+                    stats["failed"] += 1
+                else:
+                    letter.status = "replayed"
+                    letter.replayed_at = now
+                    stats["replayed"] += 1
+                letter.updated_at = now
+            ETLDeadLetter.objects.bulk_update(
+                letters, ["status", "reason", "replay_attempts", "replayed_at", "updated_at"]
+            )
+
+    logger.info("Reproceso de dead-letter finalizado", extra=stats)
+    return stats
+
+
+def _restore_row(raw_data: Dict[str, Any], source_columns: Sequence[str]) -> tuple:
+    values = []
+    for name in source_columns:
+        value = raw_data.get(name)
+        if value is not None:
+            value = IVRCall._meta.get_field(name).to_python(value)
+        values.append(value)
+    return tuple(values)
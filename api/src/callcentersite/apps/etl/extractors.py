@@ -3,15 +3,97 @@
 from __future__ import annotations
 
 from datetime import datetime
+from itertools import islice
+from typing import Iterable, Iterator, List, Sequence, Tuple
+
+from django.conf import settings
 
 from callcentersite.apps.ivr_legacy.adapters import IVRDataAdapter
+from callcentersite.apps.ivr_legacy.models import IVRCall
+
+
+def chunked(iterable: Iterable, size: int) -> Iterator[List]:
+    """Agrupa un iterable en listas de como maximo ``size`` elementos."""
+
+    if size <= 0:
+        raise ValueError("El tamano de lote debe ser mayor que cero")
+
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
 
 
 class IVRDataExtractor:
     """Extrae llamadas desde la BD IVR."""
 
+    # Columnas de la tabla legacy ``calls`` leidas como tuplas.
+    source_columns: Tuple[str, ...] = tuple(
+        field.attname for field in IVRCall._meta.concrete_fields
+    )
+
     def __init__(self) -> None:
         self.adapter = IVRDataAdapter()
 
     def extract_calls(self, start_date: datetime, end_date: datetime):
         return self.adapter.get_calls(start_date, end_date)
+
+    def extract_batches(
+        self,
+        start_date: datetime,
+        end_date: datetime,
+        batch_size: int | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> Iterator[List]:
+        """
+        Extrae llamadas en lotes acotados sin materializar toda la ventana.
+
+        Usa ``QuerySet.iterator`` para que el backend abra un cursor del lado
+        del servidor y solo mantenga en memoria ``batch_size`` filas a la vez.
+        Con ``fields`` los lotes son tuplas de ``values_list``.
+        """
+        size = batch_size or getattr(settings, "ETL_BATCH_SIZE", 1000)
+        queryset = self.extract_calls(start_date, end_date)
+        if fields:
+            queryset = queryset.values_list(*fields)
+        return chunked(queryset.iterator(chunk_size=size), size)
+
+    def extract_incremental(
+        self,
+        after: tuple | None,
+        end_date: datetime,
+        batch_size: int | None = None,
+        start_date: datetime | None = None,
+        fields: Sequence[str] | None = None,
+    ) -> Iterator[List]:
+        """
+        Extrae solo las filas posteriores a la marca de agua ``after``.
+
+        Cada lote es una consulta keyset independiente sobre
+        ``(call_date, call_id)``, de modo que no se mantiene un cursor abierto
+        en la replica MySQL entre lotes y cada fila se lee exactamente una vez.
+        Con ``fields`` los lotes son tuplas de ``values_list``.
+        """
+        size = batch_size or getattr(settings, "ETL_BATCH_SIZE", 1000)
+        position = after
+        while True:
+            batch = list(
+                self.adapter.get_calls_after(
+                    position, end_date, size, start_date=start_date, fields=fields
+                )
+            )
+            if not batch:
+                return
+            yield batch
+            if len(batch) < size:
+                return
+            position = self.position_of(batch[-1], fields)
+
+    @staticmethod
+    def position_of(row, fields: Sequence[str] | None = None) -> tuple:
+        """Clave keyset ``(call_date, call_id)`` de una fila o instancia."""
+        if fields:
+            return (row[fields.index("call_date")], row[fields.index("call_id")])
+        return (row.call_date, row.call_id)
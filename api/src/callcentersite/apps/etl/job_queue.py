@@ -0,0 +1,216 @@
+"""
+Cola persistente de jobs ETL sobre la tabla ``ETLJob``.
+
+Los jobs se encolan con ``status="pending"`` y los workers los toman con
+``SELECT ... FOR UPDATE SKIP LOCKED``, de modo que varios procesos o replicas
+pueden consumir la misma cola sin coordinarse y sin Redis (RNF-002).
+
+Mientras un job corre, ``execute`` renueva ``heartbeat_at`` cada
+``ETL_JOB_LEASE_SECONDS / 3`` segundos desde un hilo. Si el worker muere
+(OOM, deploy, SIGKILL) la senal se detiene y, vencido el lease,
+``claim_next`` devuelve el job a la cola (hasta ``ETL_JOB_MAX_ATTEMPTS``
+tomas) o lo marca fallido, de modo que un singleton huerfano no bloquea
+la cola para siempre.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .jobs import ETL_JOB_NAME, run_etl
+from .models import ETLJob
+
+logger = logging.getLogger(__name__)
+
+
+def _run_queued_etl(job: ETLJob) -> None:
+    run_etl(batch_size=job.metadata.get("batch_size"), job=job)
+
+
+# Tareas que un worker sabe ejecutar, indexadas por ``job_name``.
+QUEUE_TASKS: Dict[str, Callable[[ETLJob], Any]] = {
+    ETL_JOB_NAME: _run_queued_etl,
+}
+
+# Tareas que no deben ejecutarse en paralelo consigo mismas (el ETL
+# incremental comparte una unica marca de agua).
+SINGLETON_TASKS = {ETL_JOB_NAME}
+
+
+def enqueue(
+    job_name: str,
+    metadata: dict[str, Any] | None = None,
+    dedupe_key: str | None = None,
+    run_after: datetime | None = None,
+) -> ETLJob:
+    """
+    Encola un job y retorna el ``ETLJob`` pendiente.
+
+    Con ``dedupe_key`` el encolado es idempotente: todas las replicas que
+    programen el mismo tick obtienen el mismo job. Para tareas singleton se
+    reutiliza el job pendiente existente, ya que una sola ejecucion
+    incremental alcanza todas las filas nuevas.
+    """
+    if job_name not in QUEUE_TASKS:
+        raise ValueError(f"Tarea de cola desconocida: {job_name}")
+
+    if job_name in SINGLETON_TASKS:
+        pending = ETLJob.objects.filter(
+            job_name=job_name, status="pending", parent__isnull=True
+        ).first()
+        if pending is not None:
+            return pending
+
+    if dedupe_key is not None:
+        existing = ETLJob.objects.filter(dedupe_key=dedupe_key).first()
+        if existing is not None:
+            return existing
+
+    try:
+        with transaction.atomic():
+            return ETLJob.objects.create(
+                job_name=job_name,
+                status="pending",
+                metadata=metadata or {},
+                dedupe_key=dedupe_key,
+                run_after=run_after,
+            )
+    except IntegrityError:
+        # Otra replica encolo el mismo tick entre la consulta y el INSERT.
+        return ETLJob.objects.get(dedupe_key=dedupe_key)
+
+
+def _lease() -> timedelta:
+    return timedelta(seconds=getattr(settings, "ETL_JOB_LEASE_SECONDS", 300))
+
+
+def recover_stale(now: datetime | None = None) -> int:
+    """
+    Libera los jobs en ejecucion cuyo lease vencio sin heartbeat.
+
+    Los tomados de la cola vuelven a ``pending`` mientras no agoten
+    ``ETL_JOB_MAX_ATTEMPTS``; los demas (agotados o lanzados fuera de la
+    cola, sin ``locked_by``) se marcan fallidos. Retorna los jobs liberados.
+    """
+    now = now or timezone.now()
+    cutoff = now - _lease()
+    max_attempts = getattr(settings, "ETL_JOB_MAX_ATTEMPTS", 3)
+    recovered = 0
+    with transaction.atomic():
+        stale = (
+            ETLJob.objects.select_for_update(skip_locked=True)
+            .filter(status="running", parent__isnull=True, job_name__in=list(QUEUE_TASKS))
+            .filter(
+                Q(heartbeat_at__lt=cutoff)
+                | Q(heartbeat_at__isnull=True, started_at__lt=cutoff)
+            )
+        )
+        for job in stale:
+            last_seen = job.heartbeat_at or job.started_at
+            attempts = job.metadata.get("attempts", 0)
+            logger.warning(
+                "Job ETL sin heartbeat desde %s (worker %s)",
+                last_seen.isoformat(),
+                job.locked_by or "-",
+                extra={"job_id": job.id},
+            )
+            if job.locked_by and attempts < max_attempts:
+                job.status = "pending"
+                job.locked_by = ""
+                job.started_at = None
+                job.heartbeat_at = None
+                job.save(update_fields=["status", "locked_by", "started_at", "heartbeat_at"])
+            else:
+                job.mark_as_failed(
+                    error_message="Lease vencido: el proceso del job dejo de responder",
+                    error_details={
+                        "locked_by": job.locked_by,
+                        "last_heartbeat": last_seen.isoformat(),
+                        "attempts": attempts,
+                    },
+                )
+            recovered += 1
+    return recovered
+
+
+def claim_next(worker_id: str) -> ETLJob | None:
+    """Toma el siguiente job disponible y lo marca en ejecucion."""
+    recover_stale()
+    now = timezone.now()
+    with transaction.atomic():
+        running_singletons = ETLJob.objects.filter(
+            status="running", parent__isnull=True, job_name__in=SINGLETON_TASKS
+        ).values_list("job_name", flat=True)
+        job = (
+            ETLJob.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(run_after__isnull=True) | Q(run_after__lte=now),
+                status="pending",
+                parent__isnull=True,
+                job_name__in=list(QUEUE_TASKS),
+            )
+            .exclude(job_name__in=list(running_singletons))
+            .order_by("created_at", "id")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = "running"
+        job.started_at = now
+        job.heartbeat_at = now
+        job.locked_by = worker_id
+        job.metadata["attempts"] = job.metadata.get("attempts", 0) + 1
+        job.save(update_fields=["status", "started_at", "heartbeat_at", "locked_by", "metadata"])
+    return job
+
+
+def execute(job: ETLJob) -> ETLJob:
+    """Ejecuta un job tomado de la cola; los errores quedan en el job."""
+    task = QUEUE_TASKS[job.job_name]
+    stop = threading.Event()
+    heartbeat = threading.Thread(
+        target=_heartbeat,
+        args=(job.id, job.locked_by, _lease().total_seconds() / 3, stop),
+        name=f"etl-heartbeat-{job.id}",
+        daemon=True,
+    )
+    heartbeat.start()
+    try:
+        task(job)
+    except Exception as exc:  # noqa: BLE001 - el worker debe seguir consumiendo
+        job.refresh_from_db()
+        if job.status != "failed":
+            job.mark_as_failed(
+                error_message=str(exc),
+                error_details={"exception_type": type(exc).__name__},
+            )
+        logger.exception("Job de cola fallido", extra={"job_id": job.id})
+    finally:
+        stop.set()
+        heartbeat.join()
+    job.refresh_from_db()
+    return job
+
+
+def _heartbeat(job_id: int, worker_id: str, interval: float, stop: threading.Event) -> None:
+    """Renueva el lease del job hasta que ``stop`` se activa."""
+    try:
+        while not stop.wait(interval):
+            renewed = ETLJob.objects.filter(
+                pk=job_id, status="running", locked_by=worker_id
+            ).update(heartbeat_at=timezone.now())
+            if not renewed:
+                logger.warning("El job ya no pertenece a este worker", extra={"job_id": job_id})
+                return
+    except Exception:  # noqa: BLE001 - el hilo no debe tumbar al worker
+        logger.exception("Error renovando el heartbeat", extra={"job_id": job_id})
+    finally:
+        connection.close()
@@ -3,31 +3,262 @@
 from __future__ import annotations
 
 import logging
-from datetime import timedelta
+import time
+from datetime import datetime, timedelta
+from typing import Iterable, List, Sequence
 
 from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 
+from .deadletter import (
+    load_isolating,
+    store_dead_letters,
+    transform_isolating,
+    validate_isolating,
+)
 from .extractors import IVRDataExtractor
-from .loaders import AnalyticsDataLoader
-from .transformers import CallDataTransformer
+from .loaders import get_loader
+from .models import ETLJob, ETLWatermark
+from .rollups import refresh_rollups
+from .transformers import ColumnarCallTransformer
+from .validators import BatchValidator
 
 logger = logging.getLogger(__name__)
 
+ETL_JOB_NAME = "ivr_etl"
+IVR_CALLS_SOURCE = "ivr_calls"
 
-def run_etl() -> None:
-    """Ejecuta el flujo ETL completo."""
 
-    end = timezone.now()
-    start = end - timedelta(hours=getattr(settings, "ETL_FREQUENCY_HOURS", 6))
+def run_etl(
+    start: datetime | None = None,
+    end: datetime | None = None,
+    batch_size: int | None = None,
+    job: ETLJob | None = None,
+) -> ETLJob:
+    """
+    Ejecuta el flujo ETL completo en modo streaming.
+
+    La ventana se procesa en lotes de ``ETL_BATCH_SIZE`` filas: cada lote se
+    extrae, se transforma y se confirma en su propia transaccion. La memoria
+    queda acotada al tamano del lote y los contadores del ``ETLJob`` se
+    actualizan tras cada lote.
+
+    Sin ``start`` explicito la extraccion es incremental: se leen solo las
+    filas posteriores a la marca de agua de ``ivr_calls`` y la marca avanza
+    en la misma transaccion que carga cada lote. Con ``start`` se procesa la
+    ventana indicada sin tocar la marca de agua.
+
+    ``job`` permite ejecutar un ``ETLJob`` ya encolado en lugar de crear uno.
+    """
+
+    end = end or timezone.now()
+    batch_size = batch_size or getattr(settings, "ETL_BATCH_SIZE", 1000)
+    incremental = start is None
+    watermark = None
+
+    if incremental:
+        watermark, _ = ETLWatermark.objects.get_or_create(source=IVR_CALLS_SOURCE)
+        start = end - timedelta(hours=getattr(settings, "ETL_FREQUENCY_HOURS", 6))
+
+    run_metadata = {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "batch_size": batch_size,
+        "incremental": incremental,
+        "watermark": _describe_position(watermark.position) if watermark else None,
+    }
+    if job is None:
+        # Se crea ya en ejecucion: un worker de la cola no debe tomarlo
+        started_at = timezone.now()
+        job = ETLJob.objects.create(
+            job_name=ETL_JOB_NAME,
+            status="running",
+            started_at=started_at,
+            heartbeat_at=started_at,
+            metadata=run_metadata,
+        )
+    else:
+        job.metadata.update(run_metadata)
+        job.save(update_fields=["metadata"])
+
+    extractor = IVRDataExtractor()
+    fields = extractor.source_columns
+    if incremental:
+        batches = extractor.extract_incremental(
+            watermark.position, end, batch_size, start_date=start, fields=fields
+        )
+    else:
+        batches = extractor.extract_batches(start, end, batch_size, fields=fields)
+
+    execute_pipeline(job, batches, fields, watermark=watermark)
+    return job
+
+
+def run_partition(job_id: int) -> tuple[int, str]:
+    """
+    Ejecuta una particion de backfill registrada como ``ETLJob`` hijo.
+
+    La ventana ``[start, end)`` se lee de ``job.metadata``. Los errores quedan
+    registrados en el job en lugar de propagarse, para que el resto de
+    particiones del pool continue y la fallida pueda reintentarse sola.
+    """
+
+    job = ETLJob.objects.get(id=job_id)
+    start = parse_datetime(job.metadata["start"])
+    end = parse_datetime(job.metadata["end"])
+    batch_size = job.metadata.get("batch_size") or getattr(settings, "ETL_BATCH_SIZE", 1000)
 
     extractor = IVRDataExtractor()
-    raw_calls = extractor.extract_calls(start, end)
+    fields = extractor.source_columns
+    batches = extractor.extract_incremental(
+        None, end - timedelta(microseconds=1), batch_size, start_date=start, fields=fields
+    )
+    try:
+        execute_pipeline(job, batches, fields)
+    except Exception:  # noqa: BLE001 - el fallo queda registrado en el job
+        pass
+    return job.id, job.status
+
+
+def execute_pipeline(
+    job: ETLJob,
+    batches: Iterable[List[tuple]],
+    source_columns: Sequence[str],
+    watermark: ETLWatermark | None = None,
+) -> ETLJob:
+    """
+    Transforma y carga ``batches`` lote a lote actualizando ``job``.
+
+    Los lotes son tuplas en el orden de ``source_columns``. Tras transformarse,
+    cada lote se valida con las reglas de ``validators`` (una pasada por
+    columna) antes de cargarse. Las filas que fallan al transformarse,
+    validarse o cargarse se aislan en ``ETLDeadLetter`` (y cuentan como
+    ``records_failed``) sin detener el job; los contadores por regla se
+    acumulan en ``job.metadata["validation"]``. Cada lote cargado
+    refresca, en su misma transaccion, los agregados de reportes IVR de los
+    buckets que toca (ver ``rollups``). Los tiempos de
+    extraccion, transformacion y carga se acumulan en ``job.metadata["timings"]``
+    junto con los del ultimo lote.
+    """
+
+    job.mark_as_running()
+    transformer = ColumnarCallTransformer(source_columns)
+    validator = BatchValidator()
+    loader = get_loader()
+    timings = job.metadata.setdefault(
+        "timings",
+        {
+            "batches": 0,
+            "extract_seconds": 0.0,
+            "transform_seconds": 0.0,
+            "load_seconds": 0.0,
+            "max_batch_seconds": 0.0,
+            "last_batch": None,
+        },
+    )
+    validation = job.metadata.setdefault(
+        "validation", {"validated": 0, "invalid": 0, "rules": {}}
+    )
+
+    extracted = transformed = loaded = failed = 0
+    iterator = iter(batches)
+    try:
+        while True:
+            started = time.perf_counter()
+            raw_batch = next(iterator, None)
+            if raw_batch is None:
+                break
+            extracted_at = time.perf_counter()
+            extracted += len(raw_batch)
+
+            pairs, transform_rejected = transform_isolating(transformer, raw_batch)
+            transformed += len(pairs)
+            validation["validated"] += len(pairs)
+            pairs, validate_rejected, rule_counts = validate_isolating(
+                validator, pairs, transformer.columns
+            )
+            validation["invalid"] += len(validate_rejected)
+            for rule_name, count in rule_counts.items():
+                validation["rules"][rule_name] = validation["rules"].get(rule_name, 0) + count
+            transformed_at = time.perf_counter()
+
+            with transaction.atomic():
+                batch_loaded, loaded_rows, load_rejected = load_isolating(
+                    loader, pairs, transformer.columns
+                )
+                loaded += batch_loaded
+                if loaded_rows:
+                    refresh_rollups(loaded_rows, transformer.columns)
+                failed += store_dead_letters(
+                    job, IVR_CALLS_SOURCE, "transform", transform_rejected, source_columns
+                )
+                failed += store_dead_letters(
+                    job, IVR_CALLS_SOURCE, "validate", validate_rejected, source_columns
+                )
+                failed += store_dead_letters(
+                    job, IVR_CALLS_SOURCE, "load", load_rejected, source_columns
+                )
+                if watermark is not None:
+                    watermark.advance(*_position(raw_batch[-1], source_columns))
+            loaded_at = time.perf_counter()
+
+            _record_timing(
+                timings, started, extracted_at, transformed_at, loaded_at, len(raw_batch)
+            )
+            job.record_progress(
+                extracted=extracted, transformed=transformed, loaded=loaded, failed=failed
+            )
+    except Exception as exc:
+        job.record_progress(
+            extracted=extracted, transformed=transformed, loaded=loaded, failed=failed
+        )
+        job.mark_as_failed(
+            error_message=str(exc),
+            error_details={"exception_type": type(exc).__name__},
+        )
+        logger.exception("ETL fallido", extra={"job_id": job.id})
+        raise
+
+    job.mark_as_completed(
+        extracted=extracted, transformed=transformed, loaded=loaded, failed=failed
+    )
+    logger.info(
+        "ETL finalizado",
+        extra={"job_id": job.id, "registros": loaded, "rechazados": failed},
+    )
+    return job
+
+
+def _record_timing(
+    timings: dict,
+    started: float,
+    extracted_at: float,
+    transformed_at: float,
+    loaded_at: float,
+    rows: int,
+) -> None:
+    last = {
+        "rows": rows,
+        "extract_seconds": round(extracted_at - started, 6),
+        "transform_seconds": round(transformed_at - extracted_at, 6),
+        "load_seconds": round(loaded_at - transformed_at, 6),
+    }
+    timings["batches"] += 1
+    timings["extract_seconds"] += last["extract_seconds"]
+    timings["transform_seconds"] += last["transform_seconds"]
+    timings["load_seconds"] += last["load_seconds"]
+    timings["max_batch_seconds"] = max(timings["max_batch_seconds"], loaded_at - started)
+    timings["last_batch"] = last
+
 
-    transformer = CallDataTransformer()
-    transformed = transformer.transform(raw_calls)
+def _position(row: tuple, columns: Sequence[str]) -> tuple:
+    return (row[columns.index("call_date")], row[columns.index("call_id")])
 
-    loader = AnalyticsDataLoader()
-    loader.load(transformed)
 
-    logger.info("ETL finalizado", extra={"registros": len(transformed)})
+def _describe_position(position: tuple | None) -> dict | None:
+    if position is None:
+        return None
+    call_date, call_id = position
+    return {"call_date": call_date.isoformat(), "call_id": call_id}
@@ -2,9 +2,15 @@
 
 from __future__ import annotations
 
-from typing import Iterable
+import json
+import zlib
+from datetime import date, datetime
+from io import StringIO
+from typing import Iterable, List, Sequence
 
-from django.db import transaction
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, models, transaction
 
 from callcentersite.apps.analytics.models import CallAnalytics
 
@@ -12,8 +18,156 @@ from callcentersite.apps.analytics.models import CallAnalytics
 class AnalyticsDataLoader:
     """Persistencia de datos analíticos."""
 
-    def load(self, transformed_calls: Iterable[CallAnalytics]) -> None:
+    def load(self, transformed_calls: Iterable[CallAnalytics]) -> int:
+        """Inserta un lote en su propia transaccion y retorna el numero de filas."""
+        rows = list(transformed_calls)
+        if not rows:
+            return 0
         with transaction.atomic():
-            CallAnalytics.objects.bulk_create(
-                list(transformed_calls), ignore_conflicts=True
+            CallAnalytics.objects.bulk_create(rows, ignore_conflicts=True)
+        return len(rows)
+
+    def load_rows(self, rows: Sequence[tuple], columns: Sequence[str]) -> int:
+        """Carga tuplas ordenadas segun ``columns`` (salida del transformador columnar)."""
+        return self.load(CallAnalytics(**dict(zip(columns, row))) for row in rows)
+
+
+class PostgresCopyLoader(AnalyticsDataLoader):
+    """
+    Carga lotes con ``COPY ... FROM STDIN`` hacia una tabla de staging.
+
+    El lote se serializa en formato texto de COPY, se vuelca en una tabla
+    temporal (sin WAL y privada de la sesion, por lo que varios workers de
+    backfill no colisionan) y se fusiona con ``INSERT ... ON CONFLICT DO
+    NOTHING``, equivalente a ``bulk_create(ignore_conflicts=True)``: un
+    ``None`` explicito se escribe NULL y las columnas ausentes de
+    ``load_rows`` toman el default del campo. La tabla de staging se nombra
+    por su conjunto de columnas, asi un cambio de columnas en la misma
+    conexion no reutiliza una tabla vieja. En motores distintos de
+    PostgreSQL delega en el loader ORM.
+    """
+
+    staging_table = "etl_callanalytics_staging"
+
+    def load(self, transformed_calls: Iterable[CallAnalytics]) -> int:
+        if connection.vendor != "postgresql":
+            return super().load(transformed_calls)
+
+        fields = self._fields()
+        lines = (
+            self._format_values(fields, (getattr(call, field.attname) for field in fields))
+            for call in transformed_calls
+        )
+        return self._copy_merge(fields, lines)
+
+    def load_rows(self, rows: Sequence[tuple], columns: Sequence[str]) -> int:
+        """Serializa las tuplas directamente a COPY sin instanciar modelos."""
+        if connection.vendor != "postgresql":
+            return super().load_rows(rows, columns)
+
+        fields = self._fields()
+        positions = {name: index for index, name in enumerate(columns)}
+        unknown = set(positions) - {field.attname for field in fields}
+        if unknown:
+            raise ValueError(f"Columnas desconocidas para CallAnalytics: {sorted(unknown)}")
+        lines = (
+            self._format_values(fields, self._row_values(fields, positions, row))
+            for row in rows
+        )
+        return self._copy_merge(fields, lines)
+
+    def _copy_merge(self, fields: List[models.Field], lines: Iterable[str]) -> int:
+        buffer = StringIO()
+        count = 0
+        for line in lines:
+            buffer.write(line)
+            count += 1
+        if not count:
+            return 0
+        buffer.seek(0)
+
+        table = connection.ops.quote_name(CallAnalytics._meta.db_table)
+        staging = connection.ops.quote_name(self._staging_name(fields))
+        columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMP TABLE IF NOT EXISTS {staging} AS "
+                f"SELECT {columns} FROM {table} WITH NO DATA"
             )
+            self._copy(cursor, f"COPY {staging} ({columns}) FROM STDIN", buffer)
+            cursor.execute(
+                f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging} "
+                "ON CONFLICT DO NOTHING"
+            )
+            cursor.execute(f"TRUNCATE {staging}")
+        return count
+
+    @staticmethod
+    def _fields() -> List[models.Field]:
+        return [
+            field
+            for field in CallAnalytics._meta.concrete_fields
+            if not isinstance(field, models.AutoField)
+        ]
+
+    def _staging_name(self, fields: List[models.Field]) -> str:
+        """Tabla de staging propia del conjunto de columnas."""
+        firma = zlib.crc32(",".join(field.column for field in fields).encode("utf-8"))
+        return f"{self.staging_table}_{firma:08x}"
+
+    @staticmethod
+    def _row_values(fields: List[models.Field], positions: dict, row: Sequence) -> Iterable:
+        """Valores de ``row`` en el orden de ``fields``; el default si la columna falta."""
+        for field in fields:
+            index = positions.get(field.attname)
+            yield field.get_default() if index is None else row[index]
+
+    @classmethod
+    def _format_values(cls, fields: List[models.Field], values: Iterable) -> str:
+        formatted = (cls._copy_value(field, value) for field, value in zip(fields, values))
+        return "\t".join(formatted) + "\n"
+
+    @staticmethod
+    def _copy_value(field: models.Field, value) -> str:
+        if value is None:
+            return r"\N"
+        if isinstance(field, models.JSONField):
+            text = json.dumps(value, cls=field.encoder or DjangoJSONEncoder)
+        elif isinstance(value, bool):
+            text = "t" if value else "f"
+        elif isinstance(value, (datetime, date)):
+            text = value.isoformat()
+        else:
+            text = str(value)
+        return (
+            text.replace("\\", "\\\\")
+            .replace("\t", "\\t")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r")
+        )
+
+    @staticmethod
+    def _copy(cursor, sql: str, buffer: StringIO) -> None:
+        raw = cursor.cursor
+        if hasattr(raw, "copy_expert"):  # psycopg2
+            raw.copy_expert(sql, buffer)
+            return
+        with raw.copy(sql) as copy:  # psycopg 3
+            copy.write(buffer.getvalue())
+
+
+LOADER_BACKENDS = {
+    "orm": AnalyticsDataLoader,
+    "copy": PostgresCopyLoader,
+}
+
+
+def get_loader(backend: str | None = None) -> AnalyticsDataLoader:
+    """Instancia el loader configurado en ``ETL_LOADER_BACKEND`` (orm o copy)."""
+
+    name = backend or getattr(settings, "ETL_LOADER_BACKEND", "orm")
+    try:
+        return LOADER_BACKENDS[name]()
+    except KeyError as exc:
+        raise ValueError(f"Loader ETL desconocido: {name}") from exc
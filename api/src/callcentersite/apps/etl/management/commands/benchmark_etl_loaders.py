@@ -0,0 +1,125 @@
+"""
+Benchmark de los loaders ETL (ORM vs COPY) con filas sinteticas.
+
+Uso:
+    python manage.py benchmark_etl_loaders --rows=1000000
+    python manage.py benchmark_etl_loaders --rows=200000 --backends=copy
+
+Las filas sinteticas se generan como tuplas de la fuente IVR y recorren el
+mismo camino que ``execute_pipeline``: ``ColumnarCallTransformer`` y
+``loader.load_rows``. Cada backend carga las mismas filas en lotes de
+ETL_BATCH_SIZE dentro de una transaccion que se revierte al terminar, de
+modo que la tabla no se altera.
+"""
+
+from __future__ import annotations
+
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from ...extractors import chunked
+from ...loaders import LOADER_BACKENDS, get_loader
+from ...transformers import ColumnarCallTransformer
+
+# Columnas que entrega la fuente sintetica; el transformador completa el resto
+SOURCE_COLUMNS = (
+    "call_id",
+    "client_id",
+    "call_date",
+    "duration_seconds",
+    "call_type",
+    "result",
+    "center_id",
+    "service_id",
+    "queue_time_seconds",
+    "talk_time_seconds",
+    "hold_time_seconds",
+    "transfer_count",
+)
+
+
+class _Rollback(Exception):
+    """Fuerza la reversion de la transaccion del benchmark."""
+
+
+def synthetic_rows(total: int, prefix: str):
+    """Tuplas en el orden de ``SOURCE_COLUMNS``."""
+    base = timezone.now() - timedelta(days=30)
+    for index in range(total):
+        yield (
+            f"{prefix}-{index:09d}",
+            f"CLI-{index % 50000:06d}",
+            base + timedelta(seconds=index),
+            index % 900,
+            "inbound",
+            "answered",
+            index % 4,
+            index % 12,
+            index % 60,
+            index % 600,
+            index % 30,
+            index % 3,
+        )
+
+
+class Command(BaseCommand):
+    help = "Compara el rendimiento de los loaders ETL con filas sinteticas"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=1_000_000,
+            help="Numero de filas sinteticas a cargar por backend",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Filas por lote (por defecto ETL_BATCH_SIZE)",
+        )
+        parser.add_argument(
+            "--backends",
+            nargs="+",
+            default=list(LOADER_BACKENDS),
+            help="Backends a comparar",
+        )
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        batch_size = options["batch_size"] or getattr(settings, "ETL_BATCH_SIZE", 1000)
+        unknown = set(options["backends"]) - set(LOADER_BACKENDS)
+        if unknown:
+            raise CommandError(f"Backends desconocidos: {', '.join(sorted(unknown))}")
+
+        transformer = ColumnarCallTransformer(SOURCE_COLUMNS)
+        for backend in options["backends"]:
+            loader = get_loader(backend)
+            transform_seconds = 0.0
+            tracemalloc.start()
+            started = time.perf_counter()
+            try:
+                with transaction.atomic():
+                    for raw_batch in chunked(synthetic_rows(rows, f"BENCH-{backend}"), batch_size):
+                        transform_started = time.perf_counter()
+                        batch = transformer.transform(raw_batch)
+                        transform_seconds += time.perf_counter() - transform_started
+                        loader.load_rows(batch, transformer.columns)
+                    elapsed = time.perf_counter() - started
+                    raise _Rollback
+            except _Rollback:
+                pass
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+            self.stdout.write(
+                f"{backend:>5}: {rows} filas en {elapsed:.2f}s "
+                f"({rows / elapsed:,.0f} filas/s, transformacion {transform_seconds:.2f}s), "
+                f"pico Python {peak / 1024 / 1024:.1f} MiB"
+            )
@@ -0,0 +1,46 @@
+"""Comando para reprocesar filas rechazadas por el ETL."""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+
+from ...deadletter import replay_dead_letters
+
+
+class Command(BaseCommand):
+    help = "Reprocesa por lotes las filas pendientes del dead-letter ETL"
+
+    def add_arguments(self, parser):  # type: ignore[override]
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Filas por lote (por defecto ETL_BATCH_SIZE)",
+        )
+        parser.add_argument(
+            "--job",
+            type=int,
+            default=None,
+            dest="job_id",
+            help="Reprocesar solo las filas rechazadas por este ETLJob",
+        )
+        parser.add_argument(
+            "--limit",
+            type=int,
+            default=None,
+            help="Maximo de filas a reprocesar",
+        )
+
+    def handle(self, *args, **options):  # type: ignore[override]
+        stats = replay_dead_letters(
+            batch_size=options["batch_size"],
+            job_id=options["job_id"],
+            limit=options["limit"],
+        )
+        style = self.style.SUCCESS if not stats["failed"] else self.style.WARNING
+        self.stdout.write(
+            style(
+                f"Filas reprocesadas: {stats['replayed']}, "
+                f"siguen fallando: {stats['failed']}"
+            )
+        )
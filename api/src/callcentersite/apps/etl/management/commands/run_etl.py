@@ -2,14 +2,111 @@
 
 from __future__ import annotations
 
-from django.core.management.base import BaseCommand
+from datetime import datetime, time
 
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from ...backfill import retry_backfill, run_backfill
 from ...jobs import run_etl
 
 
+def _parse_moment(value: str) -> datetime:
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise CommandError(f"Fecha invalida: {value}")
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
 class Command(BaseCommand):
     help = "Ejecuta el proceso ETL completo"
 
+    def add_arguments(self, parser):  # type: ignore[override]
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Filas por lote (por defecto ETL_BATCH_SIZE)",
+        )
+        parser.add_argument(
+            "--backfill-from",
+            type=str,
+            default=None,
+            help="Inicio del backfill (YYYY-MM-DD o ISO 8601)",
+        )
+        parser.add_argument(
+            "--backfill-to",
+            type=str,
+            default=None,
+            help="Fin exclusivo del backfill (por defecto ahora)",
+        )
+        parser.add_argument(
+            "--partition-hours",
+            type=int,
+            default=24,
+            help="Horas por particion del backfill",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=None,
+            help="Procesos paralelos (por defecto ETL_BACKFILL_WORKERS)",
+        )
+        parser.add_argument(
+            "--retry-backfill",
+            type=int,
+            default=None,
+            metavar="JOB_ID",
+            help="Reintenta las particiones no completadas de un backfill",
+        )
+
     def handle(self, *args, **options):  # type: ignore[override]
-        run_etl()
-        self.stdout.write(self.style.SUCCESS("Proceso ETL ejecutado correctamente"))
+        if options["retry_backfill"]:
+            job = retry_backfill(options["retry_backfill"], workers=options["workers"])
+            self._report_backfill(job)
+            return
+
+        if options["backfill_from"]:
+            start = _parse_moment(options["backfill_from"])
+            end = (
+                _parse_moment(options["backfill_to"])
+                if options["backfill_to"]
+                else timezone.now()
+            )
+            try:
+                job = run_backfill(
+                    start,
+                    end,
+                    partition_hours=options["partition_hours"],
+                    workers=options["workers"],
+                    batch_size=options["batch_size"],
+                )
+            except ValueError as exc:
+                raise CommandError(str(exc)) from exc
+            self._report_backfill(job)
+            return
+
+        job = run_etl(batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                "Proceso ETL ejecutado correctamente "
+                f"({job.records_loaded} registros cargados)"
+            )
+        )
+
+    def _report_backfill(self, job) -> None:
+        message = (
+            f"Backfill {job.id}: {job.records_loaded} registros cargados en "
+            f"{job.metadata.get('partitions', 0)} particiones"
+        )
+        if job.status == "completed":
+            self.stdout.write(self.style.SUCCESS(message))
+        else:
+            failed = job.error_details.get("failed_partitions", [])
+            self.stdout.write(self.style.ERROR(f"{message}; particiones fallidas: {failed}"))
@@ -0,0 +1,72 @@
+"""Worker que consume la cola persistente de jobs ETL."""
+
+from __future__ import annotations
+
+import os
+import signal
+import socket
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+
+from ...job_queue import claim_next, execute
+
+
+class Command(BaseCommand):
+    help = "Consume jobs ETL encolados con N consumidores concurrentes"
+
+    def add_arguments(self, parser):  # type: ignore[override]
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=1,
+            help="Consumidores concurrentes en este proceso",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=5.0,
+            help="Segundos de espera cuando la cola esta vacia",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Procesar los jobs disponibles y terminar",
+        )
+
+    def handle(self, *args, **options):  # type: ignore[override]
+        self.stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: self.stop.set())
+
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        consumers = [
+            threading.Thread(
+                target=self._consume,
+                args=(f"{prefix}:{index}", options["poll_interval"], options["once"]),
+                name=f"etl-worker-{index}",
+            )
+            for index in range(options["concurrency"])
+        ]
+        for consumer in consumers:
+            consumer.start()
+        for consumer in consumers:
+            consumer.join()
+
+        self.stdout.write(self.style.SUCCESS("Worker ETL detenido"))
+
+    def _consume(self, worker_id: str, poll_interval: float, once: bool) -> None:
+        try:
+            while not self.stop.is_set():
+                close_old_connections()
+                job = claim_next(worker_id)
+                if job is None:
+                    if once:
+                        return
+                    self.stop.wait(poll_interval)
+                    continue
+                job = execute(job)
+                self.stdout.write(f"[{worker_id}] job {job.id} ({job.job_name}): {job.status}")
+        finally:
+            connections.close_all()
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("etl", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ETLWatermark",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="fecha de creación"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="fecha de actualización"),
+                ),
+                (
+                    "source",
+                    models.CharField(
+                        help_text="Fuente de datos (ej. ivr_calls)", max_length=100, unique=True
+                    ),
+                ),
+                (
+                    "last_call_date",
+                    models.DateTimeField(
+                        blank=True, help_text="call_date de la ultima fila cargada", null=True
+                    ),
+                ),
+                (
+                    "last_call_id",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        help_text="call_id de la ultima fila cargada",
+                        max_length=50,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Marca de agua ETL",
+                "verbose_name_plural": "Marcas de agua ETL",
+            },
+        ),
+    ]
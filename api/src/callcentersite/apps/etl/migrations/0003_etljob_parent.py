@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-18 15:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("etl", "0002_etlwatermark"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="etljob",
+            name="parent",
+            field=models.ForeignKey(
+                blank=True,
+                help_text="Job padre cuando el job es una particion de un backfill",
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="partitions",
+                to="etl.etljob",
+            ),
+        ),
+    ]
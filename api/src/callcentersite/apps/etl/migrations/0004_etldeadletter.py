@@ -0,0 +1,92 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("etl", "0003_etljob_parent"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ETLDeadLetter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(auto_now_add=True, verbose_name="fecha de creación"),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="fecha de actualización"),
+                ),
+                (
+                    "source",
+                    models.CharField(
+                        help_text="Fuente de datos (ej. ivr_calls)", max_length=100
+                    ),
+                ),
+                (
+                    "stage",
+                    models.CharField(
+                        choices=[("transform", "Transformacion"), ("load", "Carga")],
+                        help_text="Etapa del rechazo",
+                        max_length=20,
+                    ),
+                ),
+                ("reason", models.TextField(help_text="Motivo del rechazo")),
+                (
+                    "raw_data",
+                    models.JSONField(default=dict, help_text="Fila original del IVR"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "Pendiente"),
+                            ("replayed", "Reprocesado"),
+                            ("discarded", "Descartado"),
+                        ],
+                        default="pending",
+                        help_text="Estado",
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "replay_attempts",
+                    models.IntegerField(default=0, help_text="Intentos de reproceso"),
+                ),
+                (
+                    "replayed_at",
+                    models.DateTimeField(blank=True, help_text="Fecha de reproceso", null=True),
+                ),
+                (
+                    "job",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Job que rechazo la fila",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="dead_letters",
+                        to="etl.etljob",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Fila rechazada ETL",
+                "verbose_name_plural": "Filas rechazadas ETL",
+                "ordering": ["id"],
+                "indexes": [
+                    models.Index(fields=["status", "id"], name="etl_etldead_status_3f1c2a_idx"),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-18 16:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("etl", "0004_etldeadletter"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="etljob",
+            name="run_after",
+            field=models.DateTimeField(
+                blank=True, help_text="No ejecutar antes de esta fecha (cola)", null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="etljob",
+            name="locked_by",
+            field=models.CharField(
+                blank=True, default="", help_text="Worker que tomo el job", max_length=200
+            ),
+        ),
+        migrations.AddField(
+            model_name="etljob",
+            name="dedupe_key",
+            field=models.CharField(
+                blank=True,
+                help_text="Clave de idempotencia del encolado",
+                max_length=200,
+                null=True,
+                unique=True,
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="etljob",
+            index=models.Index(fields=["status", "run_after"], name="etl_etljob_status_7c41d9_idx"),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("etl", "0005_etljob_queue_fields"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="etldeadletter",
+            name="stage",
+            field=models.CharField(
+                choices=[
+                    ("transform", "Transformacion"),
+                    ("validate", "Validacion"),
+                    ("load", "Carga"),
+                ],
+                help_text="Etapa del rechazo",
+                max_length=20,
+            ),
+        ),
+    ]
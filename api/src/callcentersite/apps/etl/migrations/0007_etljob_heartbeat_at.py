@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("etl", "0006_etldeadletter_stage_validate"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="etljob",
+            name="heartbeat_at",
+            field=models.DateTimeField(
+                blank=True,
+                help_text="Ultima senal de vida del proceso que ejecuta el job",
+                null=True,
+            ),
+        ),
+    ]
@@ -43,6 +43,30 @@ class ETLJob(TimeStampedModel):
     metadata = models.JSONField(
         default=dict, blank=True, help_text="Metadata adicional"
     )
+    parent = models.ForeignKey(
+        "self",
+        null=True,
+        blank=True,
+        on_delete=models.CASCADE,
+        related_name="partitions",
+        help_text="Job padre cuando el job es una particion de un backfill",
+    )
+    run_after = models.DateTimeField(
+        null=True, blank=True, help_text="No ejecutar antes de esta fecha (cola)"
+    )
+    locked_by = models.CharField(
+        max_length=200, blank=True, default="", help_text="Worker que tomo el job"
+    )
+    heartbeat_at = models.DateTimeField(
+        null=True, blank=True, help_text="Ultima senal de vida del proceso que ejecuta el job"
+    )
+    dedupe_key = models.CharField(
+        max_length=200,
+        null=True,
+        blank=True,
+        unique=True,
+        help_text="Clave de idempotencia del encolado",
+    )
 
     class Meta:
         verbose_name = "ETL Job"
@@ -51,6 +75,7 @@ class ETLJob(TimeStampedModel):
         indexes = [
             models.Index(fields=["status", "-created_at"]),
             models.Index(fields=["job_name", "-created_at"]),
+            models.Index(fields=["status", "run_after"]),
         ]
 
     def __str__(self):
@@ -60,7 +85,32 @@ class ETLJob(TimeStampedModel):
         """Marcar job como en ejecucion."""
         self.status = "running"
         self.started_at = timezone.now()
-        self.save(update_fields=["status", "started_at"])
+        self.heartbeat_at = self.started_at
+        self.save(update_fields=["status", "started_at", "heartbeat_at"])
+
+    def record_progress(
+        self,
+        extracted: int = 0,
+        transformed: int = 0,
+        loaded: int = 0,
+        failed: int = 0,
+    ) -> None:
+        """Actualizar contadores parciales (y metadata) mientras el job sigue en ejecucion."""
+        self.records_extracted = extracted
+        self.records_transformed = transformed
+        self.records_loaded = loaded
+        self.records_failed = failed
+        self.heartbeat_at = timezone.now()
+        self.save(
+            update_fields=[
+                "records_extracted",
+                "records_transformed",
+                "records_loaded",
+                "records_failed",
+                "metadata",
+                "heartbeat_at",
+            ]
+        )
 
     def mark_as_completed(
         self,
@@ -148,3 +198,81 @@ class ETLValidationError(TimeStampedModel):
 
     def __str__(self):
         return f"{self.error_type} - {self.job.job_name}"
+
+
+class ETLWatermark(TimeStampedModel):
+    """Marca de agua de la ultima fila cargada por fuente de datos."""
+
+    source = models.CharField(
+        max_length=100, unique=True, help_text="Fuente de datos (ej. ivr_calls)"
+    )
+    last_call_date = models.DateTimeField(
+        null=True, blank=True, help_text="call_date de la ultima fila cargada"
+    )
+    last_call_id = models.CharField(
+        max_length=50, blank=True, default="", help_text="call_id de la ultima fila cargada"
+    )
+
+    class Meta:
+        verbose_name = "Marca de agua ETL"
+        verbose_name_plural = "Marcas de agua ETL"
+
+    def __str__(self):
+        return f"{self.source} @ {self.last_call_date} / {self.last_call_id}"
+
+    @property
+    def position(self) -> tuple | None:
+        """Posicion ``(call_date, call_id)`` o None si aun no se ha cargado nada."""
+        if self.last_call_date is None:
+            return None
+        return (self.last_call_date, self.last_call_id)
+
+    def advance(self, call_date, call_id: str) -> None:
+        """Avanzar la marca de agua a la ultima fila confirmada."""
+        self.last_call_date = call_date
+        self.last_call_id = call_id
+        self.save(update_fields=["last_call_date", "last_call_id", "updated_at"])
+
+
+class ETLDeadLetter(TimeStampedModel):
+    """Fila IVR rechazada por el ETL, retenida para reproceso."""
+
+    STAGE_CHOICES = [
+        ("transform", "Transformacion"),
+        ("validate", "Validacion"),
+        ("load", "Carga"),
+    ]
+    STATUS_CHOICES = [
+        ("pending", "Pendiente"),
+        ("replayed", "Reprocesado"),
+        ("discarded", "Descartado"),
+    ]
+
+    job = models.ForeignKey(
+        ETLJob,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name="dead_letters",
+        help_text="Job que rechazo la fila",
+    )
+    source = models.CharField(max_length=100, help_text="Fuente de datos (ej. ivr_calls)")
+    stage = models.CharField(max_length=20, choices=STAGE_CHOICES, help_text="Etapa del rechazo")
+    reason = models.TextField(help_text="Motivo del rechazo")
+    raw_data = models.JSONField(default=dict, help_text="Fila original del IVR")
+    status = models.CharField(
+        max_length=20, choices=STATUS_CHOICES, default="pending", help_text="Estado"
+    )
+    replay_attempts = models.IntegerField(default=0, help_text="Intentos de reproceso")
+    replayed_at = models.DateTimeField(null=True, blank=True, help_text="Fecha de reproceso")
+
+    class Meta:
+        verbose_name = "Fila rechazada ETL"
+        verbose_name_plural = "Filas rechazadas ETL"
+        ordering = ["id"]
+        indexes = [
+            models.Index(fields=["status", "id"]),
+        ]
+
+    def __str__(self):
+        return f"{self.source} [{self.stage}] - {self.status}"
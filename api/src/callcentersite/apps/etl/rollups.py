@@ -0,0 +1,495 @@
+"""
+Agregados de reportes IVR mantenidos por el ETL.
+
+Tras cargar cada lote se recalculan solo los buckets que el lote toca:
+
+- ``ReporteLlamadasDia``: una fila por (fecha, hora), desde ``CallAnalytics``.
+- ``ReporteTransferencias`` y ``ReporteMenuProblemas``: una fila por dia y
+  centro/menu, desde ``CallAnalytics``.
+- ``ReporteClientesUnicos``: una fila diaria (``fecha_inicio == fecha_fin``).
+  Los clientes nuevos salen de ``ClientePrimeraLlamada``, que el lote
+  actualiza incrementalmente; si un lote adelanta la primera llamada de un
+  cliente (backfill), tambien se recalcula el dia que dejo de ser el primero.
+- ``ClientesUnicosSketch``: un HyperLogLog por dia y centro al que se anaden
+  los clientes del lote; permite estimar clientes unicos de cualquier rango.
+- ``ReporteTrimestral``: se deriva de las filas horarias del trimestre, por lo
+  que nunca vuelve a recorrer las llamadas crudas.
+
+Recalcular el bucket completo (en lugar de sumar deltas) hace el proceso
+idempotente ante reintentos y filas duplicadas descartadas por
+``ignore_conflicts``. Las escrituras son upserts con
+``bulk_create(update_conflicts=True)`` sobre las claves unicas de cada modelo.
+
+Las particiones de un backfill cargan en paralelo y pueden tocar el mismo
+dia o trimestre; en PostgreSQL cada bucket se serializa con un advisory lock
+de transaccion tomado en orden, de modo que dos lotes nunca recalculan el
+mismo bucket a la vez.
+
+Los datos de transferencia y menu se leen de ``CallAnalytics.metadata``
+(claves ``centro_destino``, ``menu_id`` y ``menu_nombre``).
+"""
+
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Avg, Count, F, FloatField, Max, Q, Sum
+from django.db.models.fields.json import KT
+from django.db.models.functions import Cast, TruncDate, TruncHour
+from django.utils import timezone
+
+from callcentersite.apps.analytics.models import CallAnalytics
+from callcentersite.apps.reportes.models import (
+    ClientePrimeraLlamada,
+    ClientesUnicosSketch,
+    ReporteClientesUnicos,
+    ReporteLlamadasDia,
+    ReporteMenuProblemas,
+    ReporteTransferencias,
+    ReporteTrimestral,
+)
+from callcentersite.apps.reportes.sketches import HyperLogLog
+
+ANSWERED_RESULTS = ("answered",)
+ABANDONED_RESULTS = ("abandoned",)
+TIMEOUT_RESULTS = ("timeout",)
+ERROR_RESULTS = ("error",)
+
+_ANSWERED = Q(result__in=ANSWERED_RESULTS)
+_ABANDONED = Q(result__in=ABANDONED_RESULTS)
+_CENT = Decimal("0.01")
+
+
+@dataclass
+class TouchedBuckets:
+    """Buckets de reporte afectados por un lote, en hora local."""
+
+    hours: Set[datetime] = field(default_factory=set)
+    days: Set[date] = field(default_factory=set)
+    quarters: Set[Tuple[str, int]] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return bool(self.hours)
+
+
+def touched_buckets(rows: Iterable[tuple], columns: Sequence[str]) -> TouchedBuckets:
+    """Calcula las horas, dias y trimestres que cubren las filas del lote."""
+    position = list(columns).index("call_date")
+    touched = TouchedBuckets()
+    for row in rows:
+        moment = row[position]
+        if timezone.is_aware(moment):
+            moment = timezone.localtime(moment)
+        touched.hours.add(moment.replace(minute=0, second=0, microsecond=0))
+    for hour in touched.hours:
+        touched.days.add(hour.date())
+        touched.quarters.add(_quarter_of(hour.date()))
+    return touched
+
+
+def refresh_rollups(rows: Sequence[tuple], columns: Sequence[str]) -> Dict[str, int]:
+    """
+    Recalcula los agregados de los buckets tocados por ``rows``.
+
+    Debe llamarse dentro de la transaccion que cargo el lote para que los
+    agregados y las llamadas se confirmen juntos (y se liberen los locks de
+    bucket). Retorna el numero de buckets escritos por reporte.
+    """
+    touched = touched_buckets(rows, columns)
+    if not touched:
+        return {}
+    desplazados = _refresh_primeras_llamadas(rows, columns)
+    _lock_buckets(touched.days | desplazados, touched.quarters)
+    return {
+        "llamadas_dia": _refresh_llamadas_dia(touched.hours),
+        "transferencias": _refresh_transferencias(touched.days),
+        "menus_problematicos": _refresh_menus(touched.days),
+        "clientes_unicos": _refresh_clientes_unicos(touched.days | desplazados),
+        "sketches": _refresh_sketches(rows, columns),
+        "trimestral": _refresh_trimestral(touched.quarters),
+    }
+
+
+def _refresh_llamadas_dia(hours: Set[datetime]) -> int:
+    threshold = getattr(settings, "IVR_SERVICE_LEVEL_SECONDS", 20)
+    filters = Q()
+    for day_hours in _group_by_day(hours).values():
+        filters |= Q(
+            call_date__gte=min(day_hours), call_date__lt=max(day_hours) + timedelta(hours=1)
+        )
+
+    buckets = (
+        CallAnalytics.objects.filter(filters)
+        .annotate(bucket=TruncHour("call_date"))
+        .values("bucket")
+        .annotate(
+            total=Count("id"),
+            atendidas=Count("id", filter=_ANSWERED),
+            abandonadas=Count("id", filter=_ABANDONED),
+            en_nivel=Count("id", filter=_ANSWERED & Q(queue_time_seconds__lte=threshold)),
+            espera=Avg("queue_time_seconds"),
+            atencion=Avg("talk_time_seconds", filter=_ANSWERED),
+        )
+    )
+    reports = []
+    for bucket in buckets:
+        moment = bucket["bucket"]
+        if timezone.is_aware(moment):
+            moment = timezone.localtime(moment)
+        if moment not in hours:
+            continue
+        reports.append(
+            ReporteLlamadasDia(
+                fecha=moment.date(),
+                hora=moment.hour,
+                total_llamadas=bucket["total"],
+                llamadas_atendidas=bucket["atendidas"],
+                llamadas_abandonadas=bucket["abandonadas"],
+                tiempo_promedio_espera=_decimal(bucket["espera"]),
+                tiempo_promedio_atencion=_decimal(bucket["atencion"]),
+                nivel_servicio=_percent(bucket["en_nivel"], bucket["total"]),
+            )
+        )
+    return _upsert(
+        ReporteLlamadasDia,
+        reports,
+        unique_fields=["fecha", "hora"],
+        update_fields=[
+            "total_llamadas",
+            "llamadas_atendidas",
+            "llamadas_abandonadas",
+            "tiempo_promedio_espera",
+            "tiempo_promedio_atencion",
+            "nivel_servicio",
+        ],
+    )
+
+
+def _refresh_transferencias(days: Set[date]) -> int:
+    buckets = (
+        _calls_on(days)
+        .filter(transfer_count__gt=0)
+        .annotate(fecha=TruncDate("call_date"), centro_destino=KT("metadata__centro_destino"))
+        .values("fecha", "center_id", "centro_destino")
+        .annotate(
+            total=Count("id"),
+            exitosas=Count("id", filter=_ANSWERED),
+            tiempo=Avg("hold_time_seconds"),
+        )
+    )
+    reports = [
+        ReporteTransferencias(
+            fecha=bucket["fecha"],
+            centro_origen=str(bucket["center_id"]),
+            centro_destino=bucket["centro_destino"] or "desconocido",
+            total_transferencias=bucket["total"],
+            transferencias_exitosas=bucket["exitosas"],
+            transferencias_fallidas=bucket["total"] - bucket["exitosas"],
+            tiempo_promedio_transferencia=_decimal(bucket["tiempo"]),
+            tasa_exito=_percent(bucket["exitosas"], bucket["total"]),
+        )
+        for bucket in buckets
+    ]
+    return _upsert(
+        ReporteTransferencias,
+        reports,
+        unique_fields=["fecha", "centro_origen", "centro_destino"],
+        update_fields=[
+            "total_transferencias",
+            "transferencias_exitosas",
+            "transferencias_fallidas",
+            "tiempo_promedio_transferencia",
+            "tasa_exito",
+        ],
+    )
+
+
+def _refresh_menus(days: Set[date]) -> int:
+    buckets = (
+        _calls_on(days)
+        .annotate(
+            fecha=TruncDate("call_date"),
+            menu_id=KT("metadata__menu_id"),
+            menu_nombre=KT("metadata__menu_nombre"),
+        )
+        .filter(menu_id__isnull=False)
+        .values("fecha", "menu_id")
+        .annotate(
+            nombre=Max("menu_nombre"),
+            accesos=Count("id"),
+            abandonos=Count("id", filter=_ABANDONED),
+            timeouts=Count("id", filter=Q(result__in=TIMEOUT_RESULTS)),
+            errores=Count("id", filter=Q(result__in=ERROR_RESULTS)),
+            permanencia=Avg("duration_seconds"),
+        )
+    )
+    reports = [
+        ReporteMenuProblemas(
+            fecha=bucket["fecha"],
+            menu_id=bucket["menu_id"],
+            menu_nombre=bucket["nombre"] or bucket["menu_id"],
+            veces_accedido=bucket["accesos"],
+            abandonos=bucket["abandonos"],
+            timeout=bucket["timeouts"],
+            errores=bucket["errores"],
+            tasa_abandono=_percent(bucket["abandonos"], bucket["accesos"]),
+            tiempo_promedio_permanencia=_decimal(bucket["permanencia"]),
+        )
+        for bucket in buckets
+    ]
+    return _upsert(
+        ReporteMenuProblemas,
+        reports,
+        unique_fields=["fecha", "menu_id"],
+        update_fields=[
+            "menu_nombre",
+            "veces_accedido",
+            "abandonos",
+            "timeout",
+            "errores",
+            "tasa_abandono",
+            "tiempo_promedio_permanencia",
+        ],
+    )
+
+
+def _refresh_primeras_llamadas(rows: Sequence[tuple], columns: Sequence[str]) -> Set[date]:
+    """
+    Registra el primer dia de cada cliente del lote en ``ClientePrimeraLlamada``.
+
+    Retorna los dias que dejaron de ser la primera llamada de algun cliente
+    porque el lote trae una llamada anterior; sus nuevos deben recalcularse.
+    """
+    names = list(columns)
+    client_pos = names.index("client_id")
+    date_pos = names.index("call_date")
+
+    primeras: Dict[str, date] = {}
+    for row in rows:
+        moment = row[date_pos]
+        if timezone.is_aware(moment):
+            moment = timezone.localtime(moment)
+        day = moment.date()
+        client_id = row[client_pos]
+        if client_id not in primeras or day < primeras[client_id]:
+            primeras[client_id] = day
+
+    # Orden estable por cliente: lotes concurrentes bloquean las filas en el
+    # mismo orden y no se interbloquean
+    ClientePrimeraLlamada.objects.bulk_create(
+        [ClientePrimeraLlamada(client_id=c, fecha=primeras[c]) for c in sorted(primeras)],
+        ignore_conflicts=True,
+    )
+    adelantadas = []
+    desplazados: Set[date] = set()
+    for primera in (
+        ClientePrimeraLlamada.objects.select_for_update()
+        .filter(client_id__in=primeras)
+        .order_by("client_id")
+    ):
+        day = primeras[primera.client_id]
+        if day < primera.fecha:
+            desplazados.add(primera.fecha)
+            primera.fecha = day
+            adelantadas.append(primera)
+    if adelantadas:
+        ClientePrimeraLlamada.objects.bulk_update(adelantadas, ["fecha", "updated_at"])
+    return desplazados
+
+
+def _lock_buckets(days: Set[date], quarters: Set[Tuple[str, int]]) -> None:
+    """Serializa el recalculo de cada dia y trimestre entre transacciones."""
+    if connection.vendor != "postgresql":
+        return
+    claves = [f"reportes:dia:{day.isoformat()}" for day in sorted(days)]
+    claves += [
+        f"reportes:trimestre:{anio}-{trimestre}"
+        for trimestre, anio in sorted(quarters, key=lambda item: (item[1], item[0]))
+    ]
+    with connection.cursor() as cursor:
+        for clave in claves:
+            cursor.execute("SELECT pg_advisory_xact_lock(%s)", [zlib.crc32(clave.encode())])
+
+
+def _refresh_clientes_unicos(days: Set[date]) -> int:
+    reports = []
+    for day in sorted(days):
+        start, end = _day_range(day)
+        calls = CallAnalytics.objects.filter(call_date__gte=start, call_date__lt=end)
+        stats = calls.aggregate(llamadas=Count("id"), clientes=Count("client_id", distinct=True))
+        nuevos = ClientePrimeraLlamada.objects.filter(fecha=day).count()
+        clientes = stats["clientes"]
+        reports.append(
+            ReporteClientesUnicos(
+                fecha_inicio=day,
+                fecha_fin=day,
+                total_clientes_unicos=clientes,
+                nuevos_clientes=nuevos,
+                clientes_recurrentes=clientes - nuevos,
+                promedio_llamadas_cliente=_ratio(stats["llamadas"], clientes),
+            )
+        )
+    return _upsert(
+        ReporteClientesUnicos,
+        reports,
+        unique_fields=["fecha_inicio", "fecha_fin"],
+        update_fields=[
+            "total_clientes_unicos",
+            "nuevos_clientes",
+            "clientes_recurrentes",
+            "promedio_llamadas_cliente",
+        ],
+    )
+
+
+def _refresh_sketches(rows: Sequence[tuple], columns: Sequence[str]) -> int:
+    """
+    Anade los clientes del lote al sketch de cada (dia, centro).
+
+    A diferencia del resto de agregados no se recalcula desde las llamadas:
+    anadir un cliente repetido no altera el sketch, asi que basta el lote.
+    """
+    names = list(columns)
+    client_pos = names.index("client_id")
+    date_pos = names.index("call_date")
+    center_pos = names.index("center_id") if "center_id" in names else None
+
+    clients: Dict[Tuple[date, int], List[object]] = {}
+    for row in rows:
+        moment = row[date_pos]
+        if timezone.is_aware(moment):
+            moment = timezone.localtime(moment)
+        center = (row[center_pos] if center_pos is not None else None) or 0
+        clients.setdefault((moment.date(), center), []).append(row[client_pos])
+
+    for (fecha, center_id), client_ids in clients.items():
+        sketch, _ = ClientesUnicosSketch.objects.select_for_update().get_or_create(
+            fecha=fecha, center_id=center_id, defaults={"registros": b""}
+        )
+        hll = (
+            HyperLogLog.from_bytes(sketch.registros, sketch.precision)
+            if sketch.registros
+            else HyperLogLog(sketch.precision)
+        )
+        hll.update(client_ids)
+        sketch.registros = hll.to_bytes()
+        sketch.save(update_fields=["registros", "updated_at"])
+    return len(clients)
+
+
+def _refresh_trimestral(quarters: Set[Tuple[str, int]]) -> int:
+    reports = []
+    for trimestre, anio in sorted(quarters, key=lambda item: (item[1], item[0])):
+        first, last = _quarter_range(trimestre, anio)
+        totals = ReporteLlamadasDia.objects.filter(fecha__gte=first, fecha__lte=last).aggregate(
+            total=Sum("total_llamadas"),
+            atendidas=Sum("llamadas_atendidas"),
+            abandonadas=Sum("llamadas_abandonadas"),
+            espera=_weighted("tiempo_promedio_espera", "total_llamadas"),
+            atencion=_weighted("tiempo_promedio_atencion", "llamadas_atendidas"),
+            nivel=_weighted("nivel_servicio", "total_llamadas"),
+        )
+        total = totals["total"] or 0
+        atendidas = totals["atendidas"] or 0
+        abandonadas = totals["abandonadas"] or 0
+        reports.append(
+            ReporteTrimestral(
+                trimestre=trimestre,
+                anio=anio,
+                total_llamadas=total,
+                llamadas_atendidas=atendidas,
+                llamadas_abandonadas=abandonadas,
+                tiempo_promedio_espera=_ratio(totals["espera"], total),
+                tiempo_promedio_atencion=_ratio(totals["atencion"], atendidas),
+                nivel_servicio=_ratio(totals["nivel"], total),
+                tasa_abandono=_percent(abandonadas, total),
+            )
+        )
+    return _upsert(
+        ReporteTrimestral,
+        reports,
+        unique_fields=["trimestre", "anio"],
+        update_fields=[
+            "total_llamadas",
+            "llamadas_atendidas",
+            "llamadas_abandonadas",
+            "tiempo_promedio_espera",
+            "tiempo_promedio_atencion",
+            "nivel_servicio",
+            "tasa_abandono",
+        ],
+    )
+
+
+def _upsert(model, reports: List, unique_fields: List[str], update_fields: List[str]) -> int:
+    if not reports:
+        return 0
+    model.objects.bulk_create(
+        reports,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=update_fields + ["updated_at"],
+    )
+    return len(reports)
+
+
+def _calls_on(days: Set[date]):
+    filters = Q()
+    for day in days:
+        start, end = _day_range(day)
+        filters |= Q(call_date__gte=start, call_date__lt=end)
+    return CallAnalytics.objects.filter(filters)
+
+
+def _group_by_day(hours: Iterable[datetime]) -> Dict[date, List[datetime]]:
+    grouped: Dict[date, List[datetime]] = {}
+    for hour in hours:
+        grouped.setdefault(hour.date(), []).append(hour)
+    return grouped
+
+
+def _day_range(day: date) -> Tuple[datetime, datetime]:
+    start = datetime.combine(day, datetime.min.time())
+    end = start + timedelta(days=1)
+    if settings.USE_TZ:
+        start, end = timezone.make_aware(start), timezone.make_aware(end)
+    return start, end
+
+
+def _quarter_of(day: date) -> Tuple[str, int]:
+    return f"Q{(day.month - 1) // 3 + 1}", day.year
+
+
+def _quarter_range(trimestre: str, anio: int) -> Tuple[date, date]:
+    first_month = (int(trimestre[1]) - 1) * 3 + 1
+    first = date(anio, first_month, 1)
+    next_first = date(anio + 1, 1, 1) if first_month == 10 else date(anio, first_month + 3, 1)
+    return first, next_first - timedelta(days=1)
+
+
+def _weighted(value: str, weight: str) -> Sum:
+    return Sum(Cast(F(value), FloatField()) * F(weight), output_field=FloatField())
+
+
+def _decimal(value) -> Decimal:
+    if value is None:
+        return Decimal("0.00")
+    return Decimal(str(value)).quantize(_CENT, rounding=ROUND_HALF_UP)
+
+
+def _ratio(numerator, denominator) -> Decimal:
+    if not denominator or numerator is None:
+        return Decimal("0.00")
+    return _decimal(numerator / denominator)
+
+
+def _percent(part: int, total: int) -> Decimal:
+    if not total:
+        return Decimal("0.00")
+    return _decimal(part * 100 / total)
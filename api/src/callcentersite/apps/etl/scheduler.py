@@ -6,17 +6,33 @@ import logging
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from django.conf import settings
+from django.utils import timezone
 
-from .jobs import run_etl
+from .job_queue import enqueue
+from .jobs import ETL_JOB_NAME
 
 logger = logging.getLogger(__name__)
 
 scheduler = BackgroundScheduler(timezone=settings.TIME_ZONE)
 
 
+def tick_key(frequency_hours: int | None = None) -> str:
+    """Clave de idempotencia del tick actual, comun a todas las replicas."""
+
+    hours = frequency_hours or settings.ETL_FREQUENCY_HOURS
+    bucket = int(timezone.now().timestamp() // (hours * 3600))
+    return f"{ETL_JOB_NAME}:{hours}h:{bucket}"
+
+
 @scheduler.scheduled_job("interval", hours=settings.ETL_FREQUENCY_HOURS)
 def scheduled_etl() -> None:
-    """Ejecuta el proceso ETL según frecuencia configurada."""
+    """
+    Encola el proceso ETL según frecuencia configurada.
+
+    La ejecucion ocurre en ``manage.py run_etl_worker``; aunque cada proceso
+    web programe su propio tick, la clave de idempotencia garantiza un solo
+    job por tick.
+    """
 
-    logger.info("Iniciando job ETL programado")
-    run_etl()
+    job = enqueue(ETL_JOB_NAME, dedupe_key=tick_key())
+    logger.info("Job ETL programado encolado", extra={"job_id": job.id})
@@ -2,12 +2,15 @@
 
 from __future__ import annotations
 
+import json
 from datetime import datetime
 from typing import Any
 
-from django.utils import timezone
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
 
 from .models import ETLJob, ETLValidationError
+from .validators import BatchValidationResult, BatchValidator
 
 
 class ETLService:
@@ -110,28 +113,59 @@ class ETLService:
         Returns:
             Tupla (es_valido, lista_errores)
         """
-        errores = []
+        errores = [rule.message for rule in BatchValidator().failed_rules(datos)]
+        es_valido = len(errores) == 0
+        return es_valido, errores
 
-        # Validar call_id
-        if not datos.get("call_id"):
-            errores.append("call_id es requerido")
+    @staticmethod
+    def validar_lote(
+        job_id: int, registros: list[dict[str, Any]]
+    ) -> BatchValidationResult:
+        """
+        Validar un lote completo de registros.
 
-        # Validar phone_number
-        phone = datos.get("phone_number", "")
-        if not phone or len(str(phone)) < 10:
-            errores.append("phone_number debe tener al menos 10 digitos")
+        Evalua las reglas de ``VALIDATION_RULES`` columna a columna,
+        persiste los errores con un unico ``bulk_create`` y acumula contadores
+        por regla en ``ETLJob.metadata["validation"]``.
 
-        # Validar call_duration
-        duration = datos.get("call_duration")
-        if duration is not None and duration < 0:
-            errores.append("call_duration no puede ser negativo")
+        Args:
+            job_id: ID del job
+            registros: Lista de registros a validar
 
-        # Validar call_date
-        if not datos.get("call_date"):
-            errores.append("call_date es requerido")
+        Returns:
+            BatchValidationResult con registros validos, invalidos y contadores
+        """
+        result = BatchValidator().validate(registros)
+
+        with transaction.atomic():
+            errores = []
+            for datos, rules in result.invalid:
+                record_data = _json_safe(datos)
+                errores.extend(
+                    ETLValidationError(
+                        job_id=job_id,
+                        error_type=rule.name,
+                        error_message=rule.message,
+                        record_data=record_data,
+                        field_name=rule.field_name,
+                        severity=rule.severity,
+                    )
+                    for rule in rules
+                )
+            if errores:
+                ETLValidationError.objects.bulk_create(errores)
+
+            job = ETLJob.objects.select_for_update().get(id=job_id)
+            summary = job.metadata.setdefault(
+                "validation", {"validated": 0, "invalid": 0, "rules": {}}
+            )
+            summary["validated"] += result.total
+            summary["invalid"] += len(result.invalid)
+            for rule_name, count in result.counters.items():
+                summary["rules"][rule_name] = summary["rules"].get(rule_name, 0) + count
+            job.save(update_fields=["metadata"])
 
-        es_valido = len(errores) == 0
-        return es_valido, errores
+        return result
 
     @staticmethod
     def registrar_error_validacion(
@@ -278,3 +312,8 @@ class ETLService:
         # Refresh job from DB to get updated status
         job.refresh_from_db()
         return job
+
+
+def _json_safe(datos: dict[str, Any]) -> dict[str, Any]:
+    """Convierte fechas y decimales a tipos serializables en JSONField."""
+    return json.loads(json.dumps(datos, cls=DjangoJSONEncoder))
@@ -2,34 +2,94 @@
 
 from __future__ import annotations
 
-from typing import Iterable, List
+from itertools import repeat
+from typing import Iterable, Iterator, List, Sequence, Tuple
 
 from callcentersite.apps.analytics.models import CallAnalytics
 
+_REQUIRED = object()
+
+# Columnas de CallAnalytics en orden de salida y su valor por defecto cuando la
+# fuente IVR no las provee.
+CALL_ANALYTICS_DEFAULTS: Tuple[Tuple[str, object], ...] = (
+    ("call_id", _REQUIRED),
+    ("client_id", _REQUIRED),
+    ("call_date", _REQUIRED),
+    ("duration_seconds", 0),
+    ("call_type", "unknown"),
+    ("result", "unknown"),
+    ("center_id", 0),
+    ("service_id", 0),
+    ("agent_id", None),
+    ("queue_time_seconds", 0),
+    ("talk_time_seconds", 0),
+    ("hold_time_seconds", 0),
+    ("transfer_count", 0),
+    ("satisfaction_score", None),
+    ("metadata", {}),
+)
+CALL_ANALYTICS_COLUMNS: Tuple[str, ...] = tuple(name for name, _ in CALL_ANALYTICS_DEFAULTS)
+
 
 class CallDataTransformer:
     """Normaliza los datos provenientes del IVR."""
 
     def transform(self, raw_calls: Iterable) -> List[CallAnalytics]:
-        cleaned: List[CallAnalytics] = []
+        return list(self.iter_transform(raw_calls))
+
+    def iter_transform(self, raw_calls: Iterable) -> Iterator[CallAnalytics]:
+        """Genera instancias normalizadas una a una, sin acumular la ventana."""
         for call in raw_calls:
-            cleaned.append(
-                CallAnalytics(
-                    call_id=call.call_id,
-                    client_id=call.client_id,
-                    call_date=call.call_date,
-                    duration_seconds=getattr(call, "duration_seconds", 0),
-                    call_type=getattr(call, "call_type", "unknown"),
-                    result=getattr(call, "result", "unknown"),
-                    center_id=getattr(call, "center_id", 0),
-                    service_id=getattr(call, "service_id", 0),
-                    agent_id=getattr(call, "agent_id", None),
-                    queue_time_seconds=getattr(call, "queue_time_seconds", 0),
-                    talk_time_seconds=getattr(call, "talk_time_seconds", 0),
-                    hold_time_seconds=getattr(call, "hold_time_seconds", 0),
-                    transfer_count=getattr(call, "transfer_count", 0),
-                    satisfaction_score=getattr(call, "satisfaction_score", None),
-                    metadata=getattr(call, "metadata", {}),
-                )
+            yield CallAnalytics(
+                call_id=call.call_id,
+                client_id=call.client_id,
+                call_date=call.call_date,
+                duration_seconds=getattr(call, "duration_seconds", 0),
+                call_type=getattr(call, "call_type", "unknown"),
+                result=getattr(call, "result", "unknown"),
+                center_id=getattr(call, "center_id", 0),
+                service_id=getattr(call, "service_id", 0),
+                agent_id=getattr(call, "agent_id", None),
+                queue_time_seconds=getattr(call, "queue_time_seconds", 0),
+                talk_time_seconds=getattr(call, "talk_time_seconds", 0),
+                hold_time_seconds=getattr(call, "hold_time_seconds", 0),
+                transfer_count=getattr(call, "transfer_count", 0),
+                satisfaction_score=getattr(call, "satisfaction_score", None),
+                metadata=getattr(call, "metadata", {}),
             )
-        return cleaned
+
+
+class ColumnarCallTransformer:
+    """
+    Normaliza lotes de tuplas IVR columna a columna.
+
+    Recibe filas de ``values_list`` con el orden de ``source_columns`` y
+    emite tuplas en el orden de ``CALL_ANALYTICS_COLUMNS``. Las columnas que
+    la fuente provee pasan tal cual y las ausentes se rellenan con su valor
+    por defecto de una sola vez para todo el lote, sin instanciar modelos.
+    El resultado es equivalente a ``CallDataTransformer``.
+    """
+
+    columns = CALL_ANALYTICS_COLUMNS
+
+    def __init__(self, source_columns: Sequence[str]) -> None:
+        self.source_columns = tuple(source_columns)
+        missing = [
+            name
+            for name, default in CALL_ANALYTICS_DEFAULTS
+            if default is _REQUIRED and name not in self.source_columns
+        ]
+        if missing:
+            raise ValueError(f"Columnas requeridas ausentes en la fuente: {missing}")
+
+    def transform(self, raw_rows: Sequence[tuple]) -> List[tuple]:
+        if not raw_rows:
+            return []
+
+        size = len(raw_rows)
+        source = dict(zip(self.source_columns, zip(*raw_rows)))
+        output_columns = [
+            source[name] if name in source else repeat(default, size)
+            for name, default in CALL_ANALYTICS_DEFAULTS
+        ]
+        return list(zip(*output_columns))
@@ -0,0 +1,147 @@
+"""Reglas de validacion ETL y validador por lotes."""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from itertools import compress
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class ValidationRule:
+    """
+    Regla de validacion sobre una columna.
+
+    ``is_invalid`` recibe el valor de ``field_name`` de un registro; el
+    validador la aplica columna a columna sobre el lote completo.
+    """
+
+    name: str
+    field_name: str
+    message: str
+    is_invalid: Callable[[Any], bool]
+    severity: str = "error"
+
+    def invalid_mask(self, valores: Sequence[Any]) -> List[bool]:
+        """Evalua la regla sobre toda la columna de un lote."""
+        return list(map(self.is_invalid, valores))
+
+
+VALIDATION_RULES: Dict[str, ValidationRule] = {}
+
+
+def register_rule(
+    name: str, field_name: str, message: str, severity: str = "error"
+) -> Callable[[Callable[[Any], bool]], Callable[[Any], bool]]:
+    """Registra una regla; la funcion decorada recibe el valor y retorna True si es invalido."""
+
+    def decorator(check: Callable[[Any], bool]) -> Callable[[Any], bool]:
+        VALIDATION_RULES[name] = ValidationRule(name, field_name, message, check, severity)
+        return check
+
+    return decorator
+
+
+@register_rule("call_id_required", "call_id", "call_id es requerido")
+def _call_id_missing(valor: Any) -> bool:
+    return not valor
+
+
+@register_rule(
+    "phone_number_length", "phone_number", "phone_number debe tener al menos 10 digitos"
+)
+def _phone_too_short(valor: Any) -> bool:
+    return not valor or len(str(valor)) < 10
+
+
+@register_rule(
+    "call_duration_non_negative", "call_duration", "call_duration no puede ser negativo"
+)
+def _duration_negative(valor: Any) -> bool:
+    return valor is not None and valor < 0
+
+
+@register_rule(
+    "duration_seconds_non_negative", "duration_seconds", "duration_seconds no puede ser negativo"
+)
+def _duration_seconds_negative(valor: Any) -> bool:
+    return valor is not None and valor < 0
+
+
+@register_rule("call_date_required", "call_date", "call_date es requerido")
+def _call_date_missing(valor: Any) -> bool:
+    return not valor
+
+
+@dataclass
+class BatchValidationResult:
+    """Resultado de validar un lote completo."""
+
+    valid: List[Any] = field(default_factory=list)
+    invalid: List[Tuple[Any, List[ValidationRule]]] = field(default_factory=list)
+    counters: Counter = field(default_factory=Counter)
+
+    @property
+    def total(self) -> int:
+        return len(self.valid) + len(self.invalid)
+
+
+class BatchValidator:
+    """
+    Evalua las reglas registradas sobre un lote, una columna por regla.
+
+    Cada regla recorre solo la columna de su campo (``map`` sobre la
+    columna completa) y las fallas se marcan por indice de fila; no se
+    construye un diccionario por registro.
+    """
+
+    def __init__(self, rules: Sequence[ValidationRule] | None = None) -> None:
+        self.rules = list(rules) if rules is not None else list(VALIDATION_RULES.values())
+
+    def failed_rules(self, datos: Dict[str, Any]) -> List[ValidationRule]:
+        return [rule for rule in self.rules if rule.is_invalid(datos.get(rule.field_name))]
+
+    def validate(self, registros: Sequence[Dict[str, Any]]) -> BatchValidationResult:
+        """Valida registros dict; un campo ausente se evalua como None."""
+        columnas = {
+            nombre: [datos.get(nombre) for datos in registros]
+            for nombre in {rule.field_name for rule in self.rules}
+        }
+        return self._validate(registros, columnas, self.rules)
+
+    def validate_rows(
+        self, rows: Sequence[tuple], columns: Sequence[str]
+    ) -> BatchValidationResult:
+        """
+        Valida tuplas en el orden de ``columns`` (salida del transformador).
+
+        Solo se aplican las reglas cuyo campo esta entre ``columns``.
+        """
+        columnas = dict(zip(columns, zip(*rows))) if rows else {name: () for name in columns}
+        rules = [rule for rule in self.rules if rule.field_name in columnas]
+        return self._validate(rows, columnas, rules)
+
+    @staticmethod
+    def _validate(
+        registros: Sequence[Any],
+        columnas: Dict[str, Sequence[Any]],
+        rules: Sequence[ValidationRule],
+    ) -> BatchValidationResult:
+        fallas: Dict[int, List[ValidationRule]] = {}
+        result = BatchValidationResult()
+        for rule in rules:
+            mask = rule.invalid_mask(columnas[rule.field_name])
+            invalidos = list(compress(range(len(mask)), mask))
+            for indice in invalidos:
+                fallas.setdefault(indice, []).append(rule)
+            if invalidos:
+                result.counters[rule.name] += len(invalidos)
+
+        for indice, registro in enumerate(registros):
+            failed = fallas.get(indice)
+            if failed:
+                result.invalid.append((registro, failed))
+            else:
+                result.valid.append(registro)
+        return result
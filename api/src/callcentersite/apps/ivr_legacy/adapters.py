@@ -3,6 +3,9 @@
 from __future__ import annotations
 
 from datetime import datetime
+from typing import Sequence
+
+from django.db.models import Q
 
 from . import models
 
@@ -15,5 +18,36 @@ class IVRDataAdapter:
             call_date__range=(start_date, end_date)
         )
 
+    def get_calls_after(
+        self,
+        after: tuple[datetime, str] | None,
+        end_date: datetime,
+        limit: int,
+        start_date: datetime | None = None,
+        fields: Sequence[str] | None = None,
+    ):
+        """
+        Pagina llamadas por keyset sobre ``(call_date, call_id)``.
+
+        Retorna como maximo ``limit`` filas estrictamente posteriores a
+        ``after`` (o desde ``start_date`` si aun no hay posicion) y hasta
+        ``end_date`` inclusive, ordenadas por la misma clave. Con ``fields``
+        retorna tuplas de ``values_list`` en lugar de instancias.
+        """
+        queryset = models.IVRCall.objects.using("ivr_readonly").filter(
+            call_date__lte=end_date
+        )
+        if after is not None:
+            last_date, last_id = after
+            queryset = queryset.filter(
+                Q(call_date__gt=last_date) | Q(call_date=last_date, call_id__gt=last_id)
+            )
+        elif start_date is not None:
+            queryset = queryset.filter(call_date__gte=start_date)
+        queryset = queryset.order_by("call_date", "call_id")
+        if fields:
+            queryset = queryset.values_list(*fields)
+        return queryset[:limit]
+
     def get_client(self, client_id: str):
         return models.IVRClient.objects.using("ivr_readonly").get(client_id=client_id)
@@ -15,7 +15,8 @@ from .models import (
     GrupoCapacidad,
     UsuarioGrupo,
     PermisoExcepcional,
-    AuditoriaPermiso
+    AuditoriaPermiso,
+    CapacidadEfectiva,
 )
 
 
@@ -362,3 +363,22 @@ class AuditoriaPermisoAdmin(admin.ModelAdmin):
             return format_html('<span style="color: green;">CONCEDIDO</span>')
         return format_html('<span style="color: red;">DENEGADO</span>')
     accion_badge.short_description = 'Accion'
+
+
+@admin.register(CapacidadEfectiva)
+class CapacidadEfectivaAdmin(admin.ModelAdmin):
+    """Admin de solo lectura para CapacidadEfectiva (se mantiene por senales)."""
+
+    list_display = ['usuario', 'capacidad', 'vigente_desde', 'vigente_hasta']
+    list_select_related = ['usuario', 'capacidad']
+    search_fields = ['usuario__username', 'capacidad__nombre_completo']
+    raw_id_fields = ['usuario', 'capacidad']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
@@ -18,8 +18,7 @@ class PermissionsConfig(AppConfig):
         """
         Ejecutado cuando la app esta lista.
 
-        Aqui se pueden registrar signals, cargar datos iniciales, etc.
+        Registra las senales que mantienen la materializacion, los mapas de
+        bits de grupos y el cache de capacidades.
         """
-        # Importar signals si existen
-        # from . import signals  # noqa: F401
-        pass
+        from . import signals  # noqa: F401
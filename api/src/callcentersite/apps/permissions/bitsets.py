@@ -0,0 +1,45 @@
+"""
+Mapas de bits de capacidades para ``apps.permissions``.
+
+Cada ``GrupoPermisos`` guarda en ``capacidades_bitmap`` el OR de los
+``bit_indice`` de sus capacidades activas; las senales de ``signals.py`` lo
+recalculan al cambiar ``GrupoCapacidad`` o ``Capacidad``. El mapa de un
+usuario es::
+
+    (OR de sus grupos vigentes | concesiones vigentes) & ~revocaciones vigentes
+
+y se obtiene con dos consultas para cualquier numero de usuarios. El calculo
+y la codificacion son los de ``apps.common.bitsets``, compartidos con
+``apps.users.models_permisos_granular``; aqui solo se declara el esquema.
+"""
+
+from __future__ import annotations
+
+from django.db.models import Q
+
+from callcentersite.apps.common.bitsets import IndiceCapacidades, MapasCapacidades
+
+from .models import GrupoCapacidad, GrupoPermisos, PermisoExcepcional, UsuarioGrupo
+
+indice_capacidades = IndiceCapacidades("permissions.Capacidad", "nombre_completo")
+
+mapas = MapasCapacidades(
+    indice=indice_capacidades,
+    grupo=GrupoPermisos,
+    grupo_capacidad=GrupoCapacidad,
+    usuario_grupo=UsuarioGrupo,
+    excepcion=PermisoExcepcional,
+    asignacion_vigente=lambda ahora: (
+        Q(fecha_expiracion__isnull=True) | Q(fecha_expiracion__gte=ahora)
+    ),
+    excepcion_vigente=lambda ahora: Q(fecha_fin__isnull=True) | Q(fecha_fin__gte=ahora),
+    revocacion=("tipo", "revocar"),
+)
+
+recalcular_grupos = mapas.recalcular_grupos
+grupos_con_capacidad = mapas.grupos_con_capacidad
+bitmaps_usuarios = mapas.bitmaps_usuarios
+bitmap_usuario = mapas.bitmap_usuario
+capacidades_usuarios = mapas.capacidades_usuarios
+tiene_capacidad = mapas.tiene_capacidad
+usuarios_con_capacidad = mapas.usuarios_con_capacidad
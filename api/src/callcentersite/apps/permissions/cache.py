@@ -0,0 +1,108 @@
+"""
+Cache en proceso de capacidades compiladas por usuario.
+
+Cada entrada es el ``frozenset`` de ``nombre_completo`` que el usuario tiene
+efectivamente (grupos + concesiones - revocaciones), de modo que
+``usuario_tiene_permiso`` pasa de varias consultas a una busqueda en memoria.
+
+- LRU acotado por ``PERMISOS_CACHE_MAX_USUARIOS``.
+- Cada entrada vence a los ``PERMISOS_CACHE_TTL_SECONDS`` o antes, en el
+  siguiente ``fecha_fin``/``fecha_expiracion``/``fecha_inicio`` que cambie el
+  resultado.
+- Las senales de ``signals.py`` invalidan a los usuarios afectados al guardar
+  o borrar asignaciones, capacidades de grupo o permisos excepcionales.
+
+Es memoria local del proceso (sin Redis, RNF-002): las operaciones masivas
+con ``QuerySet.update()`` no emiten senales y solo se reflejan al vencer el TTL.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import FrozenSet, Tuple
+
+from django.conf import settings
+from django.utils import timezone
+
+Entrada = Tuple[FrozenSet[str], float]
+
+
+class CapacidadesCache:
+    """LRU con vencimiento por entrada, seguro entre hilos."""
+
+    def __init__(self) -> None:
+        self._entradas: "OrderedDict[int, Entrada]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generacion = 0
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def habilitado(self) -> bool:
+        return getattr(settings, "PERMISOS_CACHE_ENABLED", True)
+
+    @property
+    def generacion(self) -> int:
+        """Contador que cambia con cada invalidacion (ver ``guardar``)."""
+        return self._generacion
+
+    def obtener(self, usuario_id: int) -> FrozenSet[str] | None:
+        with self._lock:
+            entrada = self._entradas.get(usuario_id)
+            if entrada is None or entrada[1] <= time.monotonic():
+                if entrada is not None:
+                    del self._entradas[usuario_id]
+                self.misses += 1
+                return None
+            self._entradas.move_to_end(usuario_id)
+            self.hits += 1
+            return entrada[0]
+
+    def guardar(
+        self,
+        usuario_id: int,
+        capacidades: FrozenSet[str],
+        vigente_hasta: datetime | None,
+        generacion: int,
+    ) -> None:
+        """
+        Guarda el conjunto compilado para ``usuario_id``.
+
+        ``generacion`` es el valor leido antes de compilar: si hubo una
+        invalidacion mientras tanto el conjunto puede estar obsoleto y se
+        descarta.
+        """
+        ttl = float(getattr(settings, "PERMISOS_CACHE_TTL_SECONDS", 300))
+        if vigente_hasta is not None:
+            ttl = min(ttl, (vigente_hasta - timezone.now()).total_seconds())
+        if ttl <= 0:
+            return
+
+        max_usuarios = getattr(settings, "PERMISOS_CACHE_MAX_USUARIOS", 10000)
+        with self._lock:
+            if generacion != self._generacion:
+                return
+            self._entradas[usuario_id] = (capacidades, time.monotonic() + ttl)
+            self._entradas.move_to_end(usuario_id)
+            while len(self._entradas) > max_usuarios:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self, *usuario_ids: int) -> None:
+        with self._lock:
+            self._generacion += 1
+            for usuario_id in usuario_ids:
+                self._entradas.pop(usuario_id, None)
+
+    def limpiar(self) -> None:
+        with self._lock:
+            self._generacion += 1
+            self._entradas.clear()
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+
+capacidades_cache = CapacidadesCache()
@@ -0,0 +1,99 @@
+"""
+Benchmark de los backends del resolver de permisos con datos reales.
+
+Uso:
+    python manage.py benchmark_permisos --usuarios=200 --iteraciones=5
+    python manage.py benchmark_permisos --backends orm cached
+
+Cada backend verifica las mismas parejas (usuario, capacidad) tomadas de la
+base. Se informa la latencia media y el p95 por verificacion y las consultas
+SQL emitidas. El backend ``cached`` parte con el cache vacio, por lo que la
+primera iteracion incluye la compilacion de cada usuario.
+"""
+
+from __future__ import annotations
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from ...cache import capacidades_cache
+from ...models import Capacidad
+from ...resolver import PERMISSION_BACKENDS, get_resolver
+
+
+class Command(BaseCommand):
+    help = "Compara la latencia de los backends de verificacion de permisos"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--usuarios",
+            type=int,
+            default=100,
+            help="Numero de usuarios activos a muestrear",
+        )
+        parser.add_argument(
+            "--capacidades",
+            type=int,
+            default=20,
+            help="Numero de capacidades activas a verificar por usuario",
+        )
+        parser.add_argument(
+            "--iteraciones",
+            type=int,
+            default=3,
+            help="Pasadas completas sobre la muestra por backend",
+        )
+        parser.add_argument(
+            "--backends",
+            nargs="+",
+            default=list(PERMISSION_BACKENDS),
+            help="Backends a comparar",
+        )
+
+    def handle(self, *args, **options):
+        unknown = set(options["backends"]) - set(PERMISSION_BACKENDS)
+        if unknown:
+            raise CommandError(f"Backends desconocidos: {', '.join(sorted(unknown))}")
+
+        usuario_ids = list(
+            get_user_model()
+            .objects.filter(is_active=True)
+            .order_by("id")
+            .values_list("id", flat=True)[: options["usuarios"]]
+        )
+        capacidades = list(
+            Capacidad.objects.filter(activa=True)
+            .order_by("nombre_completo")
+            .values_list("nombre_completo", flat=True)[: options["capacidades"]]
+        )
+        if not usuario_ids or not capacidades:
+            raise CommandError("Se necesitan usuarios y capacidades activas para el benchmark")
+
+        verificaciones = len(usuario_ids) * len(capacidades) * options["iteraciones"]
+        for backend in options["backends"]:
+            resolver = get_resolver(backend)
+            capacidades_cache.limpiar()
+            tiempos = []
+            try:
+                with CaptureQueriesContext(connection) as queries:
+                    for _ in range(options["iteraciones"]):
+                        for usuario_id in usuario_ids:
+                            for capacidad in capacidades:
+                                started = time.perf_counter()
+                                resolver.tiene_permiso(usuario_id, capacidad)
+                                tiempos.append(time.perf_counter() - started)
+            except Exception as exc:  # noqa: BLE001 - p.ej. funciones SQL no instaladas
+                self.stderr.write(f"{backend:>8}: error ({exc})")
+                continue
+
+            tiempos.sort()
+            media = sum(tiempos) / len(tiempos)
+            p95 = tiempos[min(len(tiempos) - 1, int(len(tiempos) * 0.95))]
+            self.stdout.write(
+                f"{backend:>8}: {verificaciones} verificaciones, media {media * 1000:.3f} ms, "
+                f"p95 {p95 * 1000:.3f} ms, {len(queries)} consultas SQL"
+            )
@@ -0,0 +1,61 @@
+"""
+Barrido periodico de la tabla materializada ``CapacidadEfectiva``.
+
+Uso:
+    python manage.py sweep_effective_permissions
+    python manage.py sweep_effective_permissions --rebuild
+    python manage.py sweep_effective_permissions --interval=300
+
+Sin opciones purga los intervalos vencidos y termina (pensado para cron).
+``--rebuild`` recalcula la tabla completa: necesario tras el primer despliegue
+y tras cambios masivos con ``QuerySet.update()``, que no emiten senales.
+``--interval`` repite el barrido cada N segundos hasta recibir SIGTERM.
+"""
+
+from __future__ import annotations
+
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from ...materializacion import barrer_vencidas, reconstruir
+
+
+class Command(BaseCommand):
+    help = "Purga intervalos vencidos de permisos efectivos y opcionalmente reconstruye la tabla"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Recalcular la tabla completa antes de purgar",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=None,
+            help="Segundos entre barridos; sin valor se ejecuta una sola vez",
+        )
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            escritas = reconstruir()
+            self.stdout.write(f"Tabla reconstruida: {escritas} intervalos")
+
+        if options["interval"] is None:
+            self._barrer()
+            return
+
+        stop = threading.Event()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda *_: stop.set())
+        while not stop.is_set():
+            close_old_connections()
+            self._barrer()
+            stop.wait(options["interval"])
+
+    def _barrer(self) -> None:
+        borradas = barrer_vencidas()
+        self.stdout.write(f"Intervalos vencidos eliminados: {borradas}")
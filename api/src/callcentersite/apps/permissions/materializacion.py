@@ -0,0 +1,254 @@
+"""
+Mantenimiento de la tabla materializada ``CapacidadEfectiva``.
+
+Calcular las capacidades de un usuario exige recorrer UsuarioGrupo ->
+GrupoCapacidad -> Capacidad y aplicar concesiones y revocaciones con sus
+ventanas de tiempo. Esta tabla guarda el resultado como intervalos
+``(usuario, capacidad, vigente_desde, vigente_hasta)``:
+
+- Las senales de ``signals.py`` recalculan a los usuarios afectados por cada
+  escritura (``materializar_usuarios``) dentro de la misma transaccion.
+- Los intervalos futuros (concesiones que aun no empiezan, revocaciones
+  temporales) ya estan en la tabla, por lo que la consulta solo necesita
+  comparar contra ``now()``.
+- ``sweep_effective_permissions`` purga los intervalos vencidos y, con
+  ``--rebuild``, reconstruye la tabla completa (p.ej. tras ``QuerySet.update()``
+  masivos, que no emiten senales).
+
+Una verificacion de permiso pasa a ser una busqueda por indice
+``(usuario, capacidad, vigente_desde)`` y "quien tiene la capacidad X" una
+busqueda por ``(capacidad, usuario)``.
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from datetime import datetime, timezone as dt_timezone
+from typing import Iterable
+
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from .models import (
+    CapacidadEfectiva,
+    GrupoCapacidad,
+    PermisoExcepcional,
+    UsuarioGrupo,
+)
+
+Intervalo = tuple[datetime, datetime | None]
+
+_SIN_FIN = datetime.max.replace(tzinfo=dt_timezone.utc)
+
+# Filas por bulk_create y usuarios por lote en la reconstruccion completa
+TAMANO_LOTE = 1000
+
+
+def _fin(hasta: datetime | None) -> datetime:
+    return _SIN_FIN if hasta is None else hasta
+
+
+def _unir(intervalos: Iterable[Intervalo]) -> list[Intervalo]:
+    """Fusiona intervalos solapados o contiguos."""
+    resultado: list[list] = []
+    for desde, hasta in sorted(intervalos, key=lambda intervalo: intervalo[0]):
+        if resultado and desde <= _fin(resultado[-1][1]):
+            if _fin(hasta) > _fin(resultado[-1][1]):
+                resultado[-1][1] = hasta
+        else:
+            resultado.append([desde, hasta])
+    return [(desde, hasta) for desde, hasta in resultado]
+
+
+def _restar(positivos: list[Intervalo], negativos: list[Intervalo]) -> list[Intervalo]:
+    """Resta a ``positivos`` los ``negativos`` (ambos ya fusionados)."""
+    resultado = []
+    for desde, hasta in positivos:
+        for neg_desde, neg_hasta in negativos:
+            if neg_desde > _fin(hasta) or _fin(neg_hasta) < desde:
+                continue
+            if neg_desde > desde:
+                resultado.append((desde, neg_desde))
+            if neg_hasta is None or _fin(neg_hasta) >= _fin(hasta):
+                break
+            desde = neg_hasta
+        else:
+            resultado.append((desde, hasta))
+    return resultado
+
+
+def calcular_intervalos(
+    usuario_ids: Iterable[int], ahora: datetime | None = None
+) -> dict[tuple[int, int], list[Intervalo]]:
+    """
+    Calcula los intervalos vigentes o futuros de cada (usuario, capacidad).
+
+    Usa tres consultas independientemente del numero de usuarios. Las
+    asignaciones de grupo no tienen inicio programado, asi que su intervalo
+    empieza en ``fecha_asignacion`` (o ahora, si fuera futura).
+
+    Returns:
+        Diccionario (usuario_id, capacidad_id) -> intervalos ordenados
+    """
+    ahora = ahora or timezone.now()
+    usuario_ids = list(set(usuario_ids))
+
+    positivos: dict[tuple[int, int], list[Intervalo]] = defaultdict(list)
+    negativos: dict[tuple[int, int], list[Intervalo]] = defaultdict(list)
+
+    asignaciones = list(
+        UsuarioGrupo.objects.filter(
+            usuario_id__in=usuario_ids,
+            activo=True
+        ).filter(
+            Q(fecha_expiracion__isnull=True) | Q(fecha_expiracion__gte=ahora)
+        ).values_list("usuario_id", "grupo_id", "fecha_asignacion", "fecha_expiracion")
+    )
+    capacidades_por_grupo: dict[int, list[int]] = defaultdict(list)
+    if asignaciones:
+        for grupo_id, capacidad_id in GrupoCapacidad.objects.filter(
+            grupo_id__in={asignacion[1] for asignacion in asignaciones},
+            capacidad__activa=True
+        ).values_list("grupo_id", "capacidad_id"):
+            capacidades_por_grupo[grupo_id].append(capacidad_id)
+
+    for usuario_id, grupo_id, fecha_asignacion, fecha_expiracion in asignaciones:
+        intervalo = (min(fecha_asignacion, ahora), fecha_expiracion)
+        for capacidad_id in capacidades_por_grupo.get(grupo_id, ()):
+            positivos[(usuario_id, capacidad_id)].append(intervalo)
+
+    for usuario_id, capacidad_id, tipo, fecha_inicio, fecha_fin in PermisoExcepcional.objects.filter(
+        usuario_id__in=usuario_ids,
+        activo=True,
+        capacidad__activa=True
+    ).filter(
+        Q(fecha_fin__isnull=True) | Q(fecha_fin__gte=ahora)
+    ).values_list("usuario_id", "capacidad_id", "tipo", "fecha_inicio", "fecha_fin"):
+        destino = negativos if tipo == "revocar" else positivos
+        destino[(usuario_id, capacidad_id)].append((fecha_inicio, fecha_fin))
+
+    resultado = {}
+    for clave, intervalos in positivos.items():
+        vigentes = [
+            (desde, hasta)
+            for desde, hasta in _restar(_unir(intervalos), _unir(negativos.get(clave, ())))
+            if _fin(hasta) >= ahora
+        ]
+        if vigentes:
+            resultado[clave] = vigentes
+    return resultado
+
+
+def materializar_usuarios(usuario_ids: Iterable[int]) -> int:
+    """
+    Reemplaza las filas de los usuarios indicados por su calculo actual.
+
+    Se ejecuta en la transaccion de la escritura que lo provoca, de modo que
+    la tabla nunca refleja un cambio que luego se revierte.
+
+    Returns:
+        Numero de filas escritas
+    """
+    usuario_ids = list(set(usuario_ids))
+    if not usuario_ids:
+        return 0
+
+    filas = [
+        CapacidadEfectiva(
+            usuario_id=usuario_id,
+            capacidad_id=capacidad_id,
+            vigente_desde=desde,
+            vigente_hasta=hasta,
+        )
+        for (usuario_id, capacidad_id), intervalos in calcular_intervalos(usuario_ids).items()
+        for desde, hasta in intervalos
+    ]
+    with transaction.atomic():
+        # Serializa escrituras concurrentes sobre los mismos usuarios
+        list(
+            get_user_model().objects.select_for_update()
+            .filter(id__in=usuario_ids).order_by("id").values_list("id", flat=True)
+        )
+        CapacidadEfectiva.objects.filter(usuario_id__in=usuario_ids).delete()
+        CapacidadEfectiva.objects.bulk_create(filas, batch_size=TAMANO_LOTE)
+    return len(filas)
+
+
+def usuarios_afectados_por_capacidad(capacidad_id: int) -> set[int]:
+    """Usuarios cuyo conjunto puede cambiar al (des)activar una capacidad."""
+    grupos = GrupoCapacidad.objects.filter(capacidad_id=capacidad_id).values("grupo_id")
+    return (
+        set(UsuarioGrupo.objects.filter(grupo_id__in=grupos).values_list("usuario_id", flat=True))
+        | set(
+            PermisoExcepcional.objects.filter(capacidad_id=capacidad_id).values_list(
+                "usuario_id", flat=True
+            )
+        )
+        | set(
+            CapacidadEfectiva.objects.filter(capacidad_id=capacidad_id).values_list(
+                "usuario_id", flat=True
+            )
+        )
+    )
+
+
+def barrer_vencidas(ahora: datetime | None = None) -> int:
+    """Elimina los intervalos que ya terminaron. Retorna las filas borradas."""
+    ahora = ahora or timezone.now()
+    borradas, _ = CapacidadEfectiva.objects.filter(vigente_hasta__lt=ahora).delete()
+    return borradas
+
+
+def reconstruir(tamano_lote: int = TAMANO_LOTE) -> int:
+    """Recalcula la tabla completa por lotes de usuarios. Retorna las filas escritas."""
+    User = get_user_model()
+    total = 0
+    ultimo_id = 0
+    while True:
+        lote = list(
+            User.objects.filter(id__gt=ultimo_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:tamano_lote]
+        )
+        if not lote:
+            break
+        total += materializar_usuarios(lote)
+        ultimo_id = lote[-1]
+    return total
+
+
+def _vigentes(ahora: datetime | None = None) -> QuerySet:
+    ahora = ahora or timezone.now()
+    return CapacidadEfectiva.objects.filter(vigente_desde__lte=ahora).filter(
+        Q(vigente_hasta__isnull=True) | Q(vigente_hasta__gte=ahora)
+    )
+
+
+def capacidades_vigentes(usuario_ids: Iterable[int]) -> dict[int, frozenset[str]]:
+    """Capacidades vigentes de varios usuarios con una sola consulta."""
+    usuario_ids = list(set(usuario_ids))
+    capacidades: dict[int, set[str]] = {usuario_id: set() for usuario_id in usuario_ids}
+    for usuario_id, nombre_completo in _vigentes().filter(
+        usuario_id__in=usuario_ids
+    ).values_list("usuario_id", "capacidad__nombre_completo"):
+        capacidades[usuario_id].add(nombre_completo)
+    return {usuario_id: frozenset(nombres) for usuario_id, nombres in capacidades.items()}
+
+
+def tiene_capacidad(usuario_id: int, capacidad: str) -> bool:
+    """Verificacion puntual: una busqueda por indice."""
+    return _vigentes().filter(
+        usuario_id=usuario_id, capacidad__nombre_completo=capacidad
+    ).exists()
+
+
+def usuarios_con_capacidad(capacidad: str) -> QuerySet:
+    """IDs de los usuarios que tienen hoy la capacidad (para pantallas de administracion)."""
+    return (
+        _vigentes()
+        .filter(capacidad__nombre_completo=capacidad)
+        .values_list("usuario_id", flat=True)
+        .distinct()
+    )
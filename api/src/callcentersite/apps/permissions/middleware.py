@@ -12,6 +12,7 @@ from typing import Callable, TYPE_CHECKING
 
 from django.http import JsonResponse
 
+from callcentersite.apps.permissions.resolver import get_resolver
 from callcentersite.apps.permissions.services import PermisoService
 
 if TYPE_CHECKING:
@@ -75,10 +76,7 @@ def verificar_permiso(
             )
 
             # 3. Verificar TODAS las capacidades requeridas
-            permisos_faltantes = []
-            for capacidad in capacidades:
-                if not PermisoService.usuario_tiene_permiso(usuario_id, capacidad):
-                    permisos_faltantes.append(capacidad)
+            permisos_faltantes = get_resolver().faltantes(usuario_id, capacidades)
 
             # 4. Si falta alguna capacidad, denegar acceso
             if permisos_faltantes:
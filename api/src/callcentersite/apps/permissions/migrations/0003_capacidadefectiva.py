@@ -0,0 +1,72 @@
+# Generated by Django 5.2.8 on 2026-10-18 10:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("permissions", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CapacidadEfectiva",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True, primary_key=True, serialize=False, verbose_name="ID"
+                    ),
+                ),
+                (
+                    "vigente_desde",
+                    models.DateTimeField(
+                        help_text="Inicio del intervalo en que el usuario tiene la capacidad"
+                    ),
+                ),
+                (
+                    "vigente_hasta",
+                    models.DateTimeField(
+                        blank=True,
+                        help_text="Fin del intervalo, inclusive (NULL = permanente)",
+                        null=True,
+                    ),
+                ),
+                (
+                    "capacidad",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="usuarios_efectivos",
+                        to="permissions.capacidad",
+                    ),
+                ),
+                (
+                    "usuario",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="capacidades_efectivas",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Capacidad Efectiva",
+                "verbose_name_plural": "Capacidades Efectivas",
+                "db_table": "permissions_capacidades_efectivas",
+                "indexes": [
+                    models.Index(
+                        fields=["usuario", "capacidad", "vigente_desde"],
+                        name="perm_cap_efec_usuario_idx",
+                    ),
+                    models.Index(
+                        fields=["capacidad", "usuario"], name="perm_cap_efec_capacidad_idx"
+                    ),
+                    models.Index(fields=["vigente_hasta"], name="perm_cap_efec_hasta_idx"),
+                ],
+            },
+        ),
+    ]
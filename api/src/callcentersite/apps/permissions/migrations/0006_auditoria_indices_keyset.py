@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("permissions", "0005_particionar_auditoria_permisos"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="auditoriapermiso",
+            name="permissions_usuario_e89522_idx",
+        ),
+        migrations.RemoveIndex(
+            model_name="auditoriapermiso",
+            name="permissions_accion__0cd91d_idx",
+        ),
+        migrations.AddIndex(
+            model_name="auditoriapermiso",
+            index=models.Index(
+                fields=["usuario", "timestamp", "id"], name="perm_audit_usuario_ts_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="auditoriapermiso",
+            index=models.Index(
+                fields=["capacidad", "timestamp", "id"], name="perm_audit_capacidad_ts_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="auditoriapermiso",
+            index=models.Index(
+                fields=["accion_realizada", "timestamp", "id"], name="perm_audit_accion_ts_idx"
+            ),
+        ),
+    ]
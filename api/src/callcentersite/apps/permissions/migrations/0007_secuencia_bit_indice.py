@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-18 18:30
+
+from django.db import migrations
+
+from callcentersite.apps.common.bitsets import sembrar_secuencia
+
+
+def sembrar(apps, schema_editor):
+    """Los nuevos bit_indice continuan tras el mayor asignado hasta hoy."""
+    sembrar_secuencia(
+        apps.get_model("common", "SecuenciaBitIndice"),
+        apps.get_model("permissions", "Capacidad"),
+        "permissions.capacidad",
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("common", "0001_initial"),
+        ("permissions", "0006_auditoria_indices_keyset"),
+    ]
+
+    operations = [
+        migrations.RunPython(sembrar, migrations.RunPython.noop),
+    ]
@@ -15,6 +15,8 @@ from django.db import models
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 
+from callcentersite.apps.common.bitsets import BitIndexedModel
+
 User = get_user_model()
 
 
@@ -79,13 +81,16 @@ class Funcion(models.Model):
         return self.nombre_completo
 
 
-class Capacidad(models.Model):
+class Capacidad(BitIndexedModel):
     """
     Capacidad: Accion especifica sobre un recurso.
 
     Formato: sistema.dominio.recurso.accion
     Ejemplo: sistema.vistas.dashboards.ver
 
+    ``bit_indice`` es su posicion en los mapas de bits de grupos y usuarios
+    (ver ``apps.common.bitsets``).
+
     Niveles de sensibilidad:
     - bajo: Consultas basicas
     - normal: Operaciones estandar
@@ -245,6 +250,11 @@ class GrupoPermisos(models.Model):
         default=True,
         help_text="Si el grupo esta activo"
     )
+    capacidades_bitmap = models.BinaryField(
+        default=b'',
+        editable=False,
+        help_text="Mapa de bits de sus capacidades activas (mantenido por senales)"
+    )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -443,6 +453,9 @@ class AuditoriaPermiso(models.Model):
     - Donde: IP, user agent
     - Resultado: acceso_concedido o acceso_denegado
     - Metadata: informacion adicional en JSONB
+
+    En PostgreSQL la tabla esta particionada por mes sobre ``timestamp``
+    (``apps.common.particiones``, ``manage_audit_partitions``).
     """
 
     usuario = models.ForeignKey(
@@ -492,10 +505,66 @@ class AuditoriaPermiso(models.Model):
         verbose_name_plural = 'Auditorias de Permisos'
         ordering = ['-timestamp']
         indexes = [
-            models.Index(fields=['usuario']),
             models.Index(fields=['timestamp']),
-            models.Index(fields=['accion_realizada']),
+            # (filtro, timestamp, id): busqueda paginada por clave
+            models.Index(fields=['usuario', 'timestamp', 'id'], name='perm_audit_usuario_ts_idx'),
+            models.Index(fields=['capacidad', 'timestamp', 'id'], name='perm_audit_capacidad_ts_idx'),
+            models.Index(fields=['accion_realizada', 'timestamp', 'id'], name='perm_audit_accion_ts_idx'),
         ]
 
     def __str__(self):
         return f"{self.accion_realizada}: {self.usuario.username if self.usuario else 'N/A'} -> {self.capacidad}"
+
+
+class CapacidadEfectiva(models.Model):
+    """
+    CapacidadEfectiva: Vista materializada de las capacidades de cada usuario.
+
+    Una fila por intervalo en que el usuario tiene la capacidad:
+    (grupos activos + concesiones) - revocaciones, solo capacidades activas.
+    La mantiene ``materializacion.py`` desde las senales de escritura; el
+    comando ``sweep_effective_permissions`` purga intervalos vencidos.
+
+    No se edita a mano: se reconstruye desde las tablas de origen.
+    """
+
+    usuario = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='capacidades_efectivas'
+    )
+    capacidad = models.ForeignKey(
+        Capacidad,
+        on_delete=models.CASCADE,
+        related_name='usuarios_efectivos'
+    )
+    vigente_desde = models.DateTimeField(
+        help_text="Inicio del intervalo en que el usuario tiene la capacidad"
+    )
+    vigente_hasta = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Fin del intervalo, inclusive (NULL = permanente)"
+    )
+
+    class Meta:
+        db_table = 'permissions_capacidades_efectivas'
+        verbose_name = 'Capacidad Efectiva'
+        verbose_name_plural = 'Capacidades Efectivas'
+        indexes = [
+            models.Index(
+                fields=['usuario', 'capacidad', 'vigente_desde'],
+                name='perm_cap_efec_usuario_idx'
+            ),
+            models.Index(
+                fields=['capacidad', 'usuario'],
+                name='perm_cap_efec_capacidad_idx'
+            ),
+            models.Index(
+                fields=['vigente_hasta'],
+                name='perm_cap_efec_hasta_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.usuario_id} -> {self.capacidad_id} [{self.vigente_desde}, {self.vigente_hasta}]"
@@ -0,0 +1,199 @@
+"""
+Invalidacion del cache de capacidades entre procesos via LISTEN/NOTIFY.
+
+El cache de ``cache.py`` y los mapas codigo <-> ``bit_indice`` de
+``apps.common.bitsets`` son locales a cada proceso: las senales solo limpian
+el proceso que hizo la escritura. Para que el resto de workers (gunicorn,
+ETL, celery) se enteren, la senal publica tambien un ``pg_notify`` en el
+canal ``PERMISOS_CACHE_CANAL``. ``pg_notify`` es transaccional, por lo que
+el aviso se entrega solo si la escritura se confirma.
+
+Cada proceso mantiene un hilo demonio con una conexion dedicada en
+``LISTEN`` que aplica las invalidaciones recibidas. Si la conexion se cae se
+limpian el cache y los mapas completos (pudieron perderse avisos) y se
+reconecta.
+
+Un aviso lleva los usuarios a invalidar (o ``todos``) y, si cambiaron
+capacidades, las etiquetas ``app_label.modelo`` de los mapas de bits a
+descartar (``indices``).
+
+Sin Redis ni broker adicional (RNF-002). En motores distintos de PostgreSQL
+publicar y escuchar no hacen nada.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import select
+import threading
+import uuid
+from typing import Iterable
+
+from django.conf import settings
+from django.db import connection, connections
+
+from callcentersite.apps.common.bitsets import invalidar_indices
+
+from .cache import capacidades_cache
+
+logger = logging.getLogger(__name__)
+
+# pg_notify admite payloads de hasta 8000 bytes; por encima se invalida todo.
+MAX_PAYLOAD_BYTES = 7900
+
+_origen: tuple[int, str] | None = None
+
+
+def origen() -> str:
+    """
+    Identifica los avisos publicados por este proceso para no reaplicarlos.
+
+    Se regenera tras ``fork`` para que los workers precargados no compartan
+    identificador con el proceso padre.
+    """
+    global _origen
+    pid = os.getpid()
+    if _origen is None or _origen[0] != pid:
+        _origen = (pid, f"{pid}-{uuid.uuid4().hex[:8]}")
+    return _origen[1]
+
+
+def canal() -> str:
+    return getattr(settings, "PERMISOS_CACHE_CANAL", "permisos_cache")
+
+
+def construir_payload(usuario_ids: Iterable[int] | None, indices: Iterable[str] = ()) -> str:
+    """Serializa el aviso; ``None`` (o demasiados usuarios) invalida todo."""
+    mensaje = {"origen": origen()}
+    indices = sorted(set(indices))
+    if indices:
+        mensaje["indices"] = indices
+    if usuario_ids is not None:
+        payload = json.dumps({**mensaje, "usuarios": sorted(set(usuario_ids))})
+        if len(payload.encode("utf-8")) <= MAX_PAYLOAD_BYTES:
+            return payload
+    return json.dumps({**mensaje, "todos": True})
+
+
+def publicar(usuario_ids: Iterable[int] | None, indices: Iterable[str] = ()) -> None:
+    """Notifica al resto de procesos dentro de la transaccion en curso."""
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT pg_notify(%s, %s)", [canal(), construir_payload(usuario_ids, indices)]
+        )
+
+
+def aplicar_payload(payload: str) -> None:
+    """Aplica un aviso recibido al cache y a los mapas de bits locales."""
+    try:
+        mensaje = json.loads(payload)
+    except ValueError:
+        logger.warning("Aviso de permisos ilegible", extra={"payload": payload})
+        _limpiar_todo()
+        return
+
+    if mensaje.get("origen") == origen():
+        return
+    if mensaje.get("indices"):
+        invalidar_indices(mensaje["indices"])
+    if mensaje.get("todos"):
+        capacidades_cache.limpiar()
+    else:
+        capacidades_cache.invalidar(*mensaje.get("usuarios", []))
+
+
+def _limpiar_todo() -> None:
+    capacidades_cache.limpiar()
+    invalidar_indices()
+
+
+class InvalidacionListener(threading.Thread):
+    """Hilo que escucha el canal de invalidacion con una conexion propia."""
+
+    def __init__(self, alias: str = "default", intervalo: float = 5.0) -> None:
+        super().__init__(name="permisos-cache-listener", daemon=True)
+        self.alias = alias
+        self.intervalo = intervalo
+        self.detener = threading.Event()
+
+    def run(self) -> None:
+        while not self.detener.is_set():
+            conexion = None
+            try:
+                conexion = self._conectar()
+                # Lo cacheado antes de escuchar pudo perder avisos.
+                _limpiar_todo()
+                self._escuchar(conexion)
+            except Exception:  # noqa: BLE001 - el hilo debe sobrevivir a caidas de BD
+                logger.exception("Listener de permisos desconectado")
+                _limpiar_todo()
+                self.detener.wait(self.intervalo)
+            finally:
+                if conexion is not None:
+                    try:
+                        conexion.close()
+                    except Exception:  # noqa: BLE001
+                        pass
+
+    def _conectar(self):
+        wrapper = connections[self.alias]
+        conexion = wrapper.get_new_connection(wrapper.get_connection_params())
+        conexion.autocommit = True
+        with conexion.cursor() as cursor:
+            cursor.execute(f'LISTEN "{canal()}"')
+        return conexion
+
+    def _escuchar(self, conexion) -> None:
+        while not self.detener.is_set():
+            if hasattr(conexion, "poll"):  # psycopg2
+                listos, _, _ = select.select([conexion], [], [], self.intervalo)
+                if not listos:
+                    continue
+                conexion.poll()
+                while conexion.notifies:
+                    aplicar_payload(conexion.notifies.pop(0).payload)
+            else:  # psycopg 3
+                for aviso in conexion.notifies(timeout=self.intervalo):
+                    aplicar_payload(aviso.payload)
+
+
+_listener: InvalidacionListener | None = None
+_listener_pid: int | None = None
+_lock = threading.Lock()
+
+
+def iniciar_listener() -> InvalidacionListener | None:
+    """
+    Arranca el listener del proceso actual si aun no existe.
+
+    Es idempotente y seguro tras ``fork``: un proceso hijo detecta que el
+    hilo pertenece al padre y arranca el suyo.
+    """
+    global _listener, _listener_pid
+
+    if not getattr(settings, "PERMISOS_CACHE_LISTEN", True):
+        return None
+    if connections["default"].vendor != "postgresql":
+        return None
+
+    pid = os.getpid()
+    if _listener is not None and _listener_pid == pid and _listener.is_alive():
+        return _listener
+    with _lock:
+        if _listener is None or _listener_pid != pid or not _listener.is_alive():
+            _listener = InvalidacionListener()
+            _listener_pid = pid
+            _listener.start()
+    return _listener
+
+
+def detener_listener() -> None:
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.detener.set()
+            _listener = None
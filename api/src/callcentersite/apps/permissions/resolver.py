@@ -0,0 +1,248 @@
+"""
+Resolver unico de permisos con backends intercambiables.
+
+Hasta ahora cada consumidor elegia su motor: ``verificar_permiso`` usaba
+``PermisoService`` (ORM), ``require_permission`` y ``GranularPermission`` las
+funciones SQL ``usuario_tiene_permiso``/``obtener_capacidades_usuario`` y
+``DashboardService.exportar`` el ``UserManagementService`` de ``apps.users``.
+Todos pasan ahora por ``get_resolver()``. Los consumidores de
+``apps.permissions`` usan el backend configurado en ``PERMISOS_BACKEND``; los
+de ``apps.users`` (``require_permission``, ``GranularPermission`` y
+``DashboardService.exportar``) leen otro esquema de tablas y piden siempre
+``get_resolver("granular")``. Backends:
+
+- ``orm``: compila las capacidades con ``PermisoService`` en cada consulta.
+- ``cached``: igual que ``orm`` pero con el cache en proceso (``cache.py``).
+- ``bitset``: mapas de bits de grupos y excepciones (``bitsets.py``).
+- ``materialized``: tabla ``CapacidadEfectiva`` (``materializacion.py``), una
+  busqueda por indice por verificacion.
+- ``sql``: funciones SQL de PostgreSQL.
+- ``granular``: modelos de ``apps.users.models_permisos_granular`` (mapas de
+  bits de ``bitsets_permisos_granular`` para conjuntos completos).
+
+Para pantallas que evaluan muchas combinaciones el resolver expone
+verificaciones en lote: ``verificar`` (un usuario x N capacidades),
+``verificar_usuarios`` (N usuarios x una capacidad) y ``matriz``. Todos los
+backends las resuelven con un numero constante de consultas.
+
+``python manage.py benchmark_permisos`` compara los backends con los datos
+reales de la base.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, FrozenSet, Iterable, List, Sequence, Type
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Q
+from django.utils import timezone
+
+from . import bitsets, materializacion
+from .services import PermisoService
+
+
+class PermissionBackend:
+    """Fuente de verdad de las capacidades de un usuario."""
+
+    def capacidades(self, usuario_id: int) -> FrozenSet[str]:
+        raise NotImplementedError
+
+    def tiene_permiso(self, usuario_id: int, capacidad: str) -> bool:
+        return capacidad in self.capacidades(usuario_id)
+
+    def capacidades_multiples(self, usuario_ids: Sequence[int]) -> Dict[int, FrozenSet[str]]:
+        """Capacidades de varios usuarios; por defecto una consulta por usuario."""
+        return {usuario_id: self.capacidades(usuario_id) for usuario_id in usuario_ids}
+
+
+class ORMBackend(PermissionBackend):
+    """Modelos de ``apps.permissions`` sin cache."""
+
+    def capacidades(self, usuario_id: int) -> FrozenSet[str]:
+        return PermisoService.compilar_capacidades(usuario_id)[0]
+
+    def capacidades_multiples(self, usuario_ids: Sequence[int]) -> Dict[int, FrozenSet[str]]:
+        return {
+            usuario_id: capacidades
+            for usuario_id, (capacidades, _) in PermisoService.compilar_capacidades_multiples(
+                usuario_ids
+            ).items()
+        }
+
+
+class CachedBackend(PermissionBackend):
+    """Modelos de ``apps.permissions`` con el cache de capacidades compiladas."""
+
+    def capacidades(self, usuario_id: int) -> FrozenSet[str]:
+        return PermisoService.capacidades_efectivas(usuario_id)
+
+    def capacidades_multiples(self, usuario_ids: Sequence[int]) -> Dict[int, FrozenSet[str]]:
+        return PermisoService.capacidades_efectivas_multiples(usuario_ids)
+
+
+class BitsetBackend(PermissionBackend):
+    """Mapas de bits precalculados por grupo (``bitsets.py``)."""
+
+    def capacidades(self, usuario_id: int) -> FrozenSet[str]:
+        return bitsets.capacidades_usuarios([usuario_id])[usuario_id]
+
+    def tiene_permiso(self, usuario_id: int, capacidad: str) -> bool:
+        return bitsets.tiene_capacidad(usuario_id, capacidad)
+
+    def capacidades_multiples(self, usuario_ids: Sequence[int]) -> Dict[int, FrozenSet[str]]:
+        return bitsets.capacidades_usuarios(usuario_ids)
+
+
+class MaterializedBackend(PermissionBackend):
+    """Tabla materializada ``CapacidadEfectiva``."""
+
+    def capacidades(self, usuario_id: int) -> FrozenSet[str]:
+        return materializacion.capacidades_vigentes([usuario_id])[usuario_id]
+
+    def tiene_permiso(self, usuario_id: int, capacidad: str) -> bool:
+        return materializacion.tiene_capacidad(usuario_id, capacidad)
+
+    def capacidades_multiples(self, usuario_ids: Sequence[int]) -> Dict[int, FrozenSet[str]]:
+        return materializacion.capacidades_vigentes(usuario_ids)
+
+
+class SQLFunctionBackend(PermissionBackend):
+    """Funciones SQL ``usuario_tiene_permiso`` y ``obtener_capacidades_usuario``."""
+
+    def capacidades(self, usuario_id: int) -> FrozenSet[str]:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT obtener_capacidades_usuario(%s)", [usuario_id])
+            result = cursor.fetchone()
+        return frozenset(result[0]) if result and result[0] else frozenset()
+
+    def tiene_permiso(self, usuario_id: int, capacidad: str) -> bool:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT usuario_tiene_permiso(%s, %s)", [usuario_id, capacidad])
+            result = cursor.fetchone()
+        return bool(result[0]) if result else False
+
+    def capacidades_multiples(self, usuario_ids: Sequence[int]) -> Dict[int, FrozenSet[str]]:
+        if not usuario_ids:
+            return {}
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT u.id, obtener_capacidades_usuario(u.id) FROM unnest(%s::int[]) AS u(id)",
+                [list(usuario_ids)],
+            )
+            filas = cursor.fetchall()
+        return {usuario_id: frozenset(codigos or ()) for usuario_id, codigos in filas}
+
+
+class GranularBackend(PermissionBackend):
+    """Modelos de ``apps.users`` (``models_permisos_granular``)."""
+
+    def capacidades(self, usuario_id: int) -> FrozenSet[str]:
+        return self.capacidades_multiples([usuario_id])[usuario_id]
+
+    def capacidades_multiples(self, usuario_ids: Sequence[int]) -> Dict[int, FrozenSet[str]]:
+        from callcentersite.apps.users.bitsets_permisos_granular import capacidades_usuarios
+
+        return capacidades_usuarios(usuario_ids)
+
+    def tiene_permiso(self, usuario_id: int, capacidad: str) -> bool:
+        """Mismas reglas que ``obtener_capacidades_de_usuario`` en un solo EXISTS."""
+        from callcentersite.apps.users.models_permisos_granular import Capacidad
+
+        ahora = timezone.now()
+        por_grupo = Q(
+            capacidades_grupos__grupo__activo=True,
+            capacidades_grupos__grupo__grupo_usuarios__usuario_id=usuario_id,
+            capacidades_grupos__grupo__grupo_usuarios__activo=True,
+        ) & (
+            Q(capacidades_grupos__grupo__grupo_usuarios__fecha_expiracion__isnull=True)
+            | Q(capacidades_grupos__grupo__grupo_usuarios__fecha_expiracion__gt=ahora)
+        )
+        por_excepcion = Q(
+            permisoexcepcional__usuario_id=usuario_id,
+            permisoexcepcional__activo=True,
+            permisoexcepcional__fecha_inicio__lte=ahora,
+        ) & (
+            Q(permisoexcepcional__fecha_expiracion__isnull=True)
+            | Q(permisoexcepcional__fecha_expiracion__gt=ahora)
+        )
+        return Capacidad.objects.filter(
+            por_grupo | por_excepcion, codigo=capacidad, activa=True
+        ).exists()
+
+
+PERMISSION_BACKENDS: Dict[str, Type[PermissionBackend]] = {
+    "orm": ORMBackend,
+    "cached": CachedBackend,
+    "bitset": BitsetBackend,
+    "materialized": MaterializedBackend,
+    "sql": SQLFunctionBackend,
+    "granular": GranularBackend,
+}
+
+
+class PermissionResolver:
+    """API comun de verificacion sobre un backend."""
+
+    def __init__(self, backend: PermissionBackend) -> None:
+        self.backend = backend
+
+    def capacidades(self, usuario_id: int) -> FrozenSet[str]:
+        return self.backend.capacidades(usuario_id)
+
+    def tiene_permiso(self, usuario_id: int, capacidad: str) -> bool:
+        return self.backend.tiene_permiso(usuario_id, capacidad)
+
+    def faltantes(self, usuario_id: int, capacidades: Iterable[str]) -> List[str]:
+        """Capacidades requeridas que el usuario no tiene, en el orden recibido."""
+        capacidades = list(capacidades)
+        if len(capacidades) == 1:
+            return [] if self.tiene_permiso(usuario_id, capacidades[0]) else capacidades
+        efectivas = self.capacidades(usuario_id)
+        return [capacidad for capacidad in capacidades if capacidad not in efectivas]
+
+    def tiene_todas(self, usuario_id: int, capacidades: Iterable[str]) -> bool:
+        return not self.faltantes(usuario_id, capacidades)
+
+    def tiene_alguna(self, usuario_id: int, capacidades: Iterable[str]) -> bool:
+        efectivas = self.capacidades(usuario_id)
+        return any(capacidad in efectivas for capacidad in capacidades)
+
+    def verificar(self, usuario_id: int, capacidades: Iterable[str]) -> Dict[str, bool]:
+        """Un usuario x N capacidades: capacidad -> tiene_permiso."""
+        efectivas = self.capacidades(usuario_id)
+        return {capacidad: capacidad in efectivas for capacidad in capacidades}
+
+    def verificar_usuarios(self, usuario_ids: Iterable[int], capacidad: str) -> Dict[int, bool]:
+        """N usuarios x una capacidad: usuario_id -> tiene_permiso."""
+        usuario_ids = list(dict.fromkeys(usuario_ids))
+        efectivas = self.backend.capacidades_multiples(usuario_ids)
+        return {
+            usuario_id: capacidad in efectivas.get(usuario_id, frozenset())
+            for usuario_id in usuario_ids
+        }
+
+    def matriz(
+        self, usuario_ids: Iterable[int], capacidades: Iterable[str]
+    ) -> Dict[int, Dict[str, bool]]:
+        """N usuarios x M capacidades: usuario_id -> {capacidad: tiene_permiso}."""
+        usuario_ids = list(dict.fromkeys(usuario_ids))
+        capacidades = list(capacidades)
+        efectivas = self.backend.capacidades_multiples(usuario_ids)
+        return {
+            usuario_id: {
+                capacidad: capacidad in efectivas.get(usuario_id, frozenset())
+                for capacidad in capacidades
+            }
+            for usuario_id in usuario_ids
+        }
+
+
+def get_resolver(backend: str | None = None) -> PermissionResolver:
+    """Instancia el resolver con el backend de ``PERMISOS_BACKEND`` (o ``backend``)."""
+
+    name = backend or getattr(settings, "PERMISOS_BACKEND", "cached")
+    try:
+        return PermissionResolver(PERMISSION_BACKENDS[name]())
+    except KeyError as exc:
+        raise ValueError(f"Backend de permisos desconocido: {name}") from exc
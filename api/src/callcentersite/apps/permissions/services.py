@@ -7,11 +7,16 @@ REF: ADR-012-sistema-permisos-sin-roles-jerarquicos.md
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING
+from collections import defaultdict
+from datetime import datetime
+from typing import TYPE_CHECKING, Iterable
 
 from django.db.models import Q
 from django.utils import timezone
 
+from callcentersite.apps.audit.writer import record
+from callcentersite.apps.permissions.cache import capacidades_cache
+from callcentersite.apps.permissions.notify import iniciar_listener
 from callcentersite.apps.permissions.models import (
     Capacidad,
     Funcion,
@@ -51,6 +56,9 @@ class PermisoService:
            - Si existe 'conceder' activo: SI tiene permiso
         4. Verificar si capacidad esta en grupos
 
+        El resultado de 1-3 se compila en un conjunto por usuario y se
+        cachea en memoria (ver ``capacidades_efectivas``).
+
         Args:
             usuario_id: ID del usuario a verificar
             capacidad_requerida: Capacidad en formato sistema.dominio.recurso.accion
@@ -62,72 +70,185 @@ class PermisoService:
             >>> PermisoService.usuario_tiene_permiso(1, "sistema.operaciones.llamadas.ver")
             True
         """
-        # Verificar si usuario existe
-        from django.contrib.auth import get_user_model
-        User = get_user_model()
+        return capacidad_requerida in PermisoService.capacidades_efectivas(usuario_id)
 
-        if not User.objects.filter(id=usuario_id).exists():
-            return False
+    @staticmethod
+    def capacidades_efectivas(usuario_id: int) -> frozenset[str]:
+        """
+        Retorna el conjunto compilado de capacidades activas del usuario.
 
-        # Verificar si capacidad existe
-        try:
-            capacidad_obj = Capacidad.objects.get(
-                nombre_completo=capacidad_requerida,
-                activa=True
-            )
-        except Capacidad.DoesNotExist:
-            return False
+        Consulta primero el cache en proceso (ver ``cache.py``); si no hay
+        entrada vigente compila el conjunto y lo guarda. El primer uso en
+        cada proceso arranca el listener de invalidaciones (``notify.py``).
 
-        # 1. Verificar permisos excepcionales (tienen prioridad)
-        ahora = timezone.now()
+        Args:
+            usuario_id: ID del usuario
 
-        # Verificar si existe revocacion activa
-        revocacion = PermisoExcepcional.objects.filter(
-            usuario_id=usuario_id,
-            capacidad=capacidad_obj,
-            tipo="revocar",
-            activo=True,
-            fecha_inicio__lte=ahora
-        ).filter(
-            Q(fecha_fin__isnull=True) | Q(fecha_fin__gte=ahora)
-        ).exists()
+        Returns:
+            frozenset con el nombre_completo de cada capacidad efectiva
+        """
+        if not capacidades_cache.habilitado:
+            return PermisoService.compilar_capacidades(usuario_id)[0]
 
-        if revocacion:
-            return False
+        iniciar_listener()
+        capacidades = capacidades_cache.obtener(usuario_id)
+        if capacidades is None:
+            generacion = capacidades_cache.generacion
+            capacidades, vigente_hasta = PermisoService.compilar_capacidades(usuario_id)
+            capacidades_cache.guardar(usuario_id, capacidades, vigente_hasta, generacion)
+        return capacidades
 
-        # Verificar si existe concesion activa
-        concesion = PermisoExcepcional.objects.filter(
-            usuario_id=usuario_id,
-            capacidad=capacidad_obj,
-            tipo="conceder",
-            activo=True,
-            fecha_inicio__lte=ahora
-        ).filter(
-            Q(fecha_fin__isnull=True) | Q(fecha_fin__gte=ahora)
-        ).exists()
+    @staticmethod
+    def capacidades_efectivas_multiples(usuario_ids: Iterable[int]) -> dict[int, frozenset[str]]:
+        """
+        Version en lote de ``capacidades_efectivas``.
 
-        if concesion:
-            return True
+        Los usuarios presentes en el cache se resuelven en memoria; el resto
+        se compila junto con ``compilar_capacidades_multiples`` (numero
+        constante de consultas, independiente de cuantos usuarios falten).
 
-        # 2. Verificar permisos por grupos
-        # Obtener grupos activos del usuario (no expirados)
-        grupos_activos = UsuarioGrupo.objects.filter(
-            usuario_id=usuario_id,
+        Args:
+            usuario_ids: IDs de los usuarios
+
+        Returns:
+            Diccionario usuario_id -> frozenset de capacidades efectivas
+        """
+        usuario_ids = list(dict.fromkeys(usuario_ids))
+        if not capacidades_cache.habilitado:
+            return {
+                usuario_id: capacidades
+                for usuario_id, (capacidades, _) in PermisoService.compilar_capacidades_multiples(
+                    usuario_ids
+                ).items()
+            }
+
+        iniciar_listener()
+        resultado = {}
+        pendientes = []
+        for usuario_id in usuario_ids:
+            capacidades = capacidades_cache.obtener(usuario_id)
+            if capacidades is None:
+                pendientes.append(usuario_id)
+            else:
+                resultado[usuario_id] = capacidades
+
+        if pendientes:
+            generacion = capacidades_cache.generacion
+            compiladas = PermisoService.compilar_capacidades_multiples(pendientes)
+            for usuario_id, (capacidades, vigente_hasta) in compiladas.items():
+                capacidades_cache.guardar(usuario_id, capacidades, vigente_hasta, generacion)
+                resultado[usuario_id] = capacidades
+        return resultado
+
+    @staticmethod
+    def compilar_capacidades(usuario_id: int) -> tuple[frozenset[str], datetime | None]:
+        """
+        Calcula las capacidades efectivas y hasta cuando son validas.
+
+        Capacidades = (grupos activos + concesiones activas) - revocaciones
+        activas, limitadas a capacidades con activa=True. La vigencia es el
+        proximo fecha_fin, fecha_expiracion o fecha_inicio futuro que
+        cambiaria el resultado (None si no hay ninguno).
+
+        Args:
+            usuario_id: ID del usuario
+
+        Returns:
+            Tupla (capacidades, vigente_hasta)
+        """
+        return PermisoService.compilar_capacidades_multiples([usuario_id])[usuario_id]
+
+    @staticmethod
+    def compilar_capacidades_multiples(
+        usuario_ids: Iterable[int],
+    ) -> dict[int, tuple[frozenset[str], datetime | None]]:
+        """
+        Compila las capacidades de varios usuarios con cuatro consultas.
+
+        Mismas reglas que ``compilar_capacidades``. Los usuarios inexistentes
+        obtienen un conjunto vacio.
+
+        Args:
+            usuario_ids: IDs de los usuarios
+
+        Returns:
+            Diccionario usuario_id -> (capacidades, vigente_hasta)
+        """
+        from django.contrib.auth import get_user_model
+        User = get_user_model()
+
+        usuario_ids = list(dict.fromkeys(usuario_ids))
+        resultado: dict[int, tuple[frozenset[str], datetime | None]] = {
+            usuario_id: (frozenset(), None) for usuario_id in usuario_ids
+        }
+        existentes = set(
+            User.objects.filter(id__in=usuario_ids).values_list("id", flat=True)
+        )
+        if not existentes:
+            return resultado
+
+        ahora = timezone.now()
+        limites: dict[int, list[datetime]] = defaultdict(list)
+
+        asignaciones = UsuarioGrupo.objects.filter(
+            usuario_id__in=existentes,
             activo=True
         ).filter(
             Q(fecha_expiracion__isnull=True) | Q(fecha_expiracion__gte=ahora)
-        ).values_list("grupo_id", flat=True)
-
-        if not grupos_activos:
-            return False
-
-        # Verificar si alguno de los grupos tiene la capacidad
-        tiene_capacidad = GrupoCapacidad.objects.filter(
-            grupo_id__in=grupos_activos,
-            capacidad=capacidad_obj
-        ).exists()
+        ).values_list("usuario_id", "grupo_id", "fecha_expiracion")
+
+        grupos_por_usuario: dict[int, list[int]] = defaultdict(list)
+        for usuario_id, grupo_id, fecha_expiracion in asignaciones:
+            grupos_por_usuario[usuario_id].append(grupo_id)
+            if fecha_expiracion is not None:
+                limites[usuario_id].append(fecha_expiracion)
+
+        capacidades_por_grupo: dict[int, set[str]] = defaultdict(set)
+        grupo_ids = {grupo_id for grupos in grupos_por_usuario.values() for grupo_id in grupos}
+        if grupo_ids:
+            for grupo_id, nombre_completo in GrupoCapacidad.objects.filter(
+                grupo_id__in=grupo_ids,
+                capacidad__activa=True
+            ).values_list("grupo_id", "capacidad__nombre_completo"):
+                capacidades_por_grupo[grupo_id].add(nombre_completo)
+
+        excepciones = PermisoExcepcional.objects.filter(
+            usuario_id__in=existentes,
+            activo=True,
+            capacidad__activa=True
+        ).filter(
+            Q(fecha_fin__isnull=True) | Q(fecha_fin__gte=ahora)
+        ).values_list(
+            "usuario_id", "tipo", "capacidad__nombre_completo", "fecha_inicio", "fecha_fin"
+        )
 
-        return tiene_capacidad
+        concedidas: dict[int, set[str]] = defaultdict(set)
+        revocadas: dict[int, set[str]] = defaultdict(set)
+        for usuario_id, tipo, nombre_completo, fecha_inicio, fecha_fin in excepciones:
+            if fecha_inicio > ahora:
+                # Aun no vigente: el resultado cambia cuando empiece
+                limites[usuario_id].append(fecha_inicio)
+                continue
+            if fecha_fin is not None:
+                limites[usuario_id].append(fecha_fin)
+            if tipo == "revocar":
+                revocadas[usuario_id].add(nombre_completo)
+            else:
+                concedidas[usuario_id].add(nombre_completo)
+
+        for usuario_id in existentes:
+            capacidades = set()
+            for grupo_id in grupos_por_usuario.get(usuario_id, ()):
+                capacidades |= capacidades_por_grupo.get(grupo_id, set())
+            capacidades = (capacidades | concedidas.get(usuario_id, set())) - revocadas.get(
+                usuario_id, set()
+            )
+            limites_usuario = limites.get(usuario_id)
+            resultado[usuario_id] = (
+                frozenset(capacidades),
+                min(limites_usuario) if limites_usuario else None,
+            )
+        return resultado
 
     @staticmethod
     def obtener_capacidades_usuario(usuario_id: int) -> list[str]:
@@ -288,7 +409,8 @@ class PermisoService:
             metadata: Metadatos adicionales JSON (opcional)
 
         Returns:
-            Registro de auditoria creado
+            Registro de auditoria. Con ``AUDIT_ASYNC_ENABLED`` no tiene ``pk``
+            hasta que el escritor de ``apps.audit.writer`` inserta su lote.
 
         Ejemplos:
             >>> PermisoService.registrar_acceso(
@@ -301,13 +423,14 @@ class PermisoService:
             ... )
             <AuditoriaPermiso: User 1 - PAGO_APROBADO>
         """
-        return AuditoriaPermiso.objects.create(
+        return record(
+            AuditoriaPermiso,
             usuario_id=usuario_id,
             capacidad=capacidad,
             accion_realizada=accion,
-            recurso_accedido=recurso_id,
-            ip_address=ip_address,
-            user_agent=user_agent,
+            recurso_accedido=recurso_id or '',
+            ip_address=ip_address or '',
+            user_agent=user_agent or '',
             metadata=metadata or {}
         )
 
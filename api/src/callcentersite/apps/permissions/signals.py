@@ -0,0 +1,88 @@
+"""
+Senales que mantienen la tabla ``CapacidadEfectiva`` y los mapas de bits de
+los grupos (``bitsets.py``) e invalidan el cache de capacidades compiladas.
+
+La tabla materializada se recalcula para los usuarios afectados dentro de la
+misma transaccion que la escritura (ver ``materializacion.py``). La
+invalidacion se aplica al guardar/borrar y de nuevo al confirmar la
+transaccion, para que ningun hilo vuelva a cachear el estado anterior
+mientras la escritura sigue abierta. Ademas se publica un ``pg_notify``
+para que el resto de procesos invaliden su copia (ver ``notify.py``).
+"""
+
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .bitsets import grupos_con_capacidad, indice_capacidades, recalcular_grupos
+from .cache import capacidades_cache
+from .materializacion import materializar_usuarios, usuarios_afectados_por_capacidad
+from .models import Capacidad, GrupoCapacidad, PermisoExcepcional, UsuarioGrupo
+from .notify import publicar
+
+
+def _materializar(usuario_ids, instance, kwargs) -> None:
+    """
+    Recalcula ``CapacidadEfectiva`` para los usuarios afectados.
+
+    En un borrado en cascada (``origin`` distinto de la instancia) el resto
+    de filas relacionadas aun no se ha borrado, asi que se espera al commit.
+    """
+    usuario_ids = list(usuario_ids)
+    origen = kwargs.get("origin")
+    if origen is None or origen is instance:
+        materializar_usuarios(usuario_ids)
+    else:
+        transaction.on_commit(lambda: materializar_usuarios(usuario_ids))
+
+
+def _invalidar_usuarios(*usuario_ids: int) -> None:
+    capacidades_cache.invalidar(*usuario_ids)
+    publicar(usuario_ids)
+    transaction.on_commit(lambda: capacidades_cache.invalidar(*usuario_ids))
+
+
+def _invalidar_todo(indices=()) -> None:
+    capacidades_cache.limpiar()
+    publicar(None, indices)
+    transaction.on_commit(capacidades_cache.limpiar)
+
+
+@receiver(post_save, sender=UsuarioGrupo)
+@receiver(post_delete, sender=UsuarioGrupo)
+@receiver(post_save, sender=PermisoExcepcional)
+@receiver(post_delete, sender=PermisoExcepcional)
+def invalidar_por_usuario(sender, instance, **kwargs):
+    """Asignacion o permiso excepcional de un usuario modificado."""
+    _materializar([instance.usuario_id], instance, kwargs)
+    _invalidar_usuarios(instance.usuario_id)
+
+
+@receiver(post_save, sender=GrupoCapacidad)
+@receiver(post_delete, sender=GrupoCapacidad)
+def invalidar_por_grupo(sender, instance, **kwargs):
+    """Capacidad anadida o retirada de un grupo: afecta a sus miembros."""
+    recalcular_grupos([instance.grupo_id])
+    usuario_ids = list(
+        UsuarioGrupo.objects.filter(grupo_id=instance.grupo_id).values_list(
+            "usuario_id", flat=True
+        )
+    )
+    _materializar(usuario_ids, instance, kwargs)
+    _invalidar_usuarios(*usuario_ids)
+
+
+@receiver(post_save, sender=Capacidad)
+@receiver(post_delete, sender=Capacidad)
+def invalidar_por_capacidad(sender, instance, **kwargs):
+    """Capacidad activada/desactivada: puede afectar a cualquier usuario."""
+    # Tambien el mapa codigo <-> bit_indice, aqui y en el resto de procesos
+    indice_capacidades.invalidar()
+    transaction.on_commit(indice_capacidades.invalidar)
+    # Al borrarla sus filas caen en cascada; al crearla aun no la tiene nadie
+    if kwargs.get("signal") is post_save and not kwargs.get("created"):
+        recalcular_grupos(grupos_con_capacidad(instance.pk))
+        materializar_usuarios(usuarios_afectados_por_capacidad(instance.pk))
+    _invalidar_todo(indices=[indice_capacidades.etiqueta])
@@ -0,0 +1,47 @@
+"""
+Datos comunes de los tests de capacidades.
+
+Sistema de Permisos Granular - Prioridad 1
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+
+from callcentersite.apps.permissions.models import (
+    Capacidad,
+    GrupoCapacidad,
+    GrupoPermisos,
+    UsuarioGrupo,
+)
+
+
+User = get_user_model()
+
+VER = "sistema.operaciones.llamadas.ver"
+REALIZAR = "sistema.operaciones.llamadas.realizar"
+
+
+class CapacidadesTestCase(TestCase):
+    """
+    Usuario ``agent1`` en el grupo ``atencion_cliente``.
+
+    El grupo tiene la capacidad VER; REALIZAR existe pero no esta asignada.
+    """
+
+    def setUp(self):
+        self.usuario = User.objects.create_user(
+            username="agent1", email="agent1@test.com", password="testpass123"
+        )
+        self.cap_ver = Capacidad.objects.create(
+            nombre_completo=VER, accion="ver", recurso="llamadas", dominio="operaciones"
+        )
+        self.cap_realizar = Capacidad.objects.create(
+            nombre_completo=REALIZAR, accion="realizar", recurso="llamadas", dominio="operaciones"
+        )
+        self.grupo = GrupoPermisos.objects.create(
+            codigo="atencion_cliente",
+            nombre_display="Atencion al Cliente",
+            tipo_acceso="operativo",
+        )
+        self.grupo_cap = GrupoCapacidad.objects.create(grupo=self.grupo, capacidad=self.cap_ver)
+        self.asignacion = UsuarioGrupo.objects.create(usuario=self.usuario, grupo=self.grupo)
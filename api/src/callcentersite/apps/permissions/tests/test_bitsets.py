@@ -0,0 +1,129 @@
+"""
+Tests para la codificacion de capacidades como mapas de bits.
+
+Sistema de Permisos Granular - Prioridad 1
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase
+from django.utils import timezone
+
+from callcentersite.apps.common.bitsets import a_bytes, desde_bytes, indices, mascara
+from callcentersite.apps.permissions import bitsets
+from callcentersite.apps.permissions.models import (
+    Capacidad,
+    GrupoCapacidad,
+    PermisoExcepcional,
+)
+from callcentersite.apps.permissions.resolver import get_resolver
+from callcentersite.apps.permissions.tests.base import REALIZAR, VER, CapacidadesTestCase
+
+
+User = get_user_model()
+
+
+class BitsetsPermisosTestCase(CapacidadesTestCase):
+    """Mapas de grupo mantenidos por senales y mapa efectivo del usuario."""
+
+    def setUp(self):
+        super().setUp()
+        self.resolver = get_resolver("bitset")
+
+    def _bitmap_grupo(self):
+        self.grupo.refresh_from_db()
+        return desde_bytes(self.grupo.capacidades_bitmap)
+
+    def test_bit_indice_se_asigna_consecutivo(self):
+        self.assertEqual(self.cap_realizar.bit_indice, self.cap_ver.bit_indice + 1)
+
+    def test_bit_indice_no_se_reutiliza_tras_borrar(self):
+        liberado = self.cap_realizar.bit_indice
+        self.cap_realizar.delete()
+
+        nueva = Capacidad.objects.create(
+            nombre_completo="sistema.operaciones.llamadas.editar",
+            accion="editar",
+            recurso="llamadas",
+            dominio="operaciones",
+        )
+
+        self.assertEqual(nueva.bit_indice, liberado + 1)
+        self.assertEqual(bitsets.indice_capacidades.codigos(1 << liberado), frozenset())
+
+    def test_bitmap_de_grupo_sigue_a_grupo_capacidad(self):
+        self.assertEqual(self._bitmap_grupo(), mascara([self.cap_ver.bit_indice]))
+
+        GrupoCapacidad.objects.create(grupo=self.grupo, capacidad=self.cap_realizar)
+        self.assertEqual(
+            self._bitmap_grupo(),
+            mascara([self.cap_ver.bit_indice, self.cap_realizar.bit_indice]),
+        )
+
+        self.grupo_cap.delete()
+        self.assertEqual(self._bitmap_grupo(), mascara([self.cap_realizar.bit_indice]))
+
+    def test_desactivar_capacidad_la_quita_del_grupo(self):
+        self.cap_ver.activa = False
+        self.cap_ver.save()
+
+        self.assertEqual(self._bitmap_grupo(), 0)
+        self.assertFalse(self.resolver.tiene_permiso(self.usuario.id, VER))
+
+    def test_revocacion_enmascara_el_bit_del_grupo(self):
+        PermisoExcepcional.objects.create(
+            usuario=self.usuario,
+            capacidad=self.cap_ver,
+            tipo="revocar",
+            fecha_fin=timezone.now() + timedelta(days=1),
+            motivo="Incidente",
+        )
+
+        self.assertFalse(self.resolver.tiene_permiso(self.usuario.id, VER))
+        self.assertNotIn(self.usuario.id, bitsets.usuarios_con_capacidad(VER))
+
+    def test_concesion_suma_el_bit(self):
+        PermisoExcepcional.objects.create(
+            usuario=self.usuario,
+            capacidad=self.cap_realizar,
+            tipo="conceder",
+            motivo="Proyecto especial",
+        )
+
+        self.assertEqual(self.resolver.capacidades(self.usuario.id), frozenset({VER, REALIZAR}))
+        self.assertEqual(bitsets.usuarios_con_capacidad(REALIZAR), {self.usuario.id})
+
+    def test_usuarios_con_capacidad(self):
+        otro = User.objects.create_user(
+            username="agent2", email="agent2@test.com", password="testpass123"
+        )
+
+        self.assertEqual(bitsets.usuarios_con_capacidad(VER), {self.usuario.id})
+        self.assertNotIn(otro.id, bitsets.usuarios_con_capacidad(VER))
+        self.assertEqual(bitsets.usuarios_con_capacidad("sistema.no.existe.ver"), set())
+
+    def test_coincide_con_el_backend_orm(self):
+        otro = User.objects.create_user(
+            username="agent2", email="agent2@test.com", password="testpass123"
+        )
+        ids = [self.usuario.id, otro.id]
+
+        self.assertEqual(
+            self.resolver.matriz(ids, [VER, REALIZAR]),
+            get_resolver("orm").matriz(ids, [VER, REALIZAR]),
+        )
+
+
+class CodificacionTestCase(SimpleTestCase):
+    """Serializacion de los mapas de bits."""
+
+    def test_ida_y_vuelta_por_bytes(self):
+        for bitmap in (0, 1, 0b1010, 1 << 70 | 1):
+            self.assertEqual(desde_bytes(a_bytes(bitmap)), bitmap)
+            self.assertEqual(desde_bytes(memoryview(a_bytes(bitmap))), bitmap)
+
+    def test_indices_y_mascara_son_inversos(self):
+        self.assertEqual(indices(mascara([0, 3, 64])), [0, 3, 64])
+        self.assertEqual(a_bytes(0), b"")
+        self.assertEqual(desde_bytes(None), 0)
@@ -0,0 +1,125 @@
+"""
+Tests para el cache de capacidades compiladas.
+
+Sistema de Permisos Granular - Prioridad 1
+"""
+
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from callcentersite.apps.permissions.cache import CapacidadesCache, capacidades_cache
+from callcentersite.apps.permissions.models import (
+    GrupoCapacidad,
+    PermisoExcepcional,
+)
+from callcentersite.apps.permissions.services import PermisoService
+from callcentersite.apps.permissions.tests.base import REALIZAR, VER, CapacidadesTestCase
+
+
+@override_settings(PERMISOS_CACHE_ENABLED=True, PERMISOS_CACHE_TTL_SECONDS=300)
+class CapacidadesCacheTestCase(CapacidadesTestCase):
+    """Cache de capacidades por usuario e invalidacion por senales."""
+
+    def setUp(self):
+        capacidades_cache.limpiar()
+        super().setUp()
+
+    def tearDown(self):
+        capacidades_cache.limpiar()
+
+    def test_segunda_verificacion_no_consulta_bd(self):
+        """Tras compilar el conjunto las verificaciones se resuelven en memoria."""
+        self.assertTrue(PermisoService.usuario_tiene_permiso(self.usuario.id, VER))
+
+        with self.assertNumQueries(0):
+            self.assertTrue(PermisoService.usuario_tiene_permiso(self.usuario.id, VER))
+            self.assertFalse(PermisoService.usuario_tiene_permiso(self.usuario.id, REALIZAR))
+
+    def test_capacidad_anadida_al_grupo_invalida_miembros(self):
+        """Agregar una capacidad al grupo se refleja en la siguiente verificacion."""
+        self.assertFalse(PermisoService.usuario_tiene_permiso(self.usuario.id, REALIZAR))
+
+        GrupoCapacidad.objects.create(grupo=self.grupo, capacidad=self.cap_realizar)
+
+        self.assertTrue(PermisoService.usuario_tiene_permiso(self.usuario.id, REALIZAR))
+
+    def test_revocacion_invalida_al_usuario(self):
+        """Una revocacion excepcional invalida el conjunto cacheado."""
+        self.assertTrue(PermisoService.usuario_tiene_permiso(self.usuario.id, VER))
+
+        PermisoExcepcional.objects.create(
+            usuario=self.usuario, capacidad=self.cap_ver, tipo="revocar", motivo="Incidente"
+        )
+
+        self.assertFalse(PermisoService.usuario_tiene_permiso(self.usuario.id, VER))
+
+    def test_desactivar_asignacion_invalida_al_usuario(self):
+        """Desactivar la asignacion del grupo retira sus capacidades."""
+        self.assertTrue(PermisoService.usuario_tiene_permiso(self.usuario.id, VER))
+
+        self.asignacion.activo = False
+        self.asignacion.save()
+
+        self.assertFalse(PermisoService.usuario_tiene_permiso(self.usuario.id, VER))
+
+    def test_vigencia_limitada_por_proxima_expiracion(self):
+        """La vigencia compilada es la expiracion o el inicio mas cercano."""
+        expira = timezone.now() + timedelta(minutes=5)
+        inicia = timezone.now() + timedelta(minutes=2)
+        self.asignacion.fecha_expiracion = expira
+        self.asignacion.save()
+        PermisoExcepcional.objects.create(
+            usuario=self.usuario,
+            capacidad=self.cap_realizar,
+            tipo="conceder",
+            fecha_inicio=inicia,
+            motivo="Proyecto especial",
+        )
+
+        capacidades, vigente_hasta = PermisoService.compilar_capacidades(self.usuario.id)
+
+        self.assertEqual(capacidades, frozenset({VER}))
+        self.assertEqual(vigente_hasta, inicia)
+
+    def test_capacidad_inactiva_no_se_compila(self):
+        """Solo las capacidades activas forman parte del conjunto."""
+        self.cap_ver.activa = False
+        self.cap_ver.save()
+
+        self.assertFalse(PermisoService.usuario_tiene_permiso(self.usuario.id, VER))
+
+
+class CapacidadesCacheLRUTestCase(TestCase):
+    """Comportamiento LRU y de generacion del cache."""
+
+    @override_settings(PERMISOS_CACHE_MAX_USUARIOS=2)
+    def test_expulsa_el_menos_usado(self):
+        cache = CapacidadesCache()
+        for usuario_id in (1, 2):
+            cache.guardar(usuario_id, frozenset({VER}), None, cache.generacion)
+        cache.obtener(1)
+
+        cache.guardar(3, frozenset(), None, cache.generacion)
+
+        self.assertIsNotNone(cache.obtener(1))
+        self.assertIsNone(cache.obtener(2))
+
+    def test_descarta_conjunto_compilado_antes_de_invalidar(self):
+        cache = CapacidadesCache()
+        generacion = cache.generacion
+
+        cache.invalidar(1)
+        cache.guardar(1, frozenset({VER}), None, generacion)
+
+        self.assertIsNone(cache.obtener(1))
+
+    def test_no_guarda_conjuntos_ya_vencidos(self):
+        cache = CapacidadesCache()
+
+        cache.guardar(
+            1, frozenset({VER}), timezone.now() - timedelta(seconds=1), cache.generacion
+        )
+
+        self.assertIsNone(cache.obtener(1))
@@ -0,0 +1,134 @@
+"""
+Tests para la tabla materializada de capacidades efectivas.
+
+Sistema de Permisos Granular - Prioridad 1
+"""
+
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from callcentersite.apps.permissions import materializacion
+from callcentersite.apps.permissions.models import (
+    CapacidadEfectiva,
+    GrupoCapacidad,
+    PermisoExcepcional,
+)
+from callcentersite.apps.permissions.resolver import get_resolver
+from callcentersite.apps.permissions.tests.base import REALIZAR, VER, CapacidadesTestCase
+
+
+User = get_user_model()
+
+
+class CapacidadEfectivaTestCase(CapacidadesTestCase):
+    """Mantenimiento incremental desde las senales de escritura."""
+
+    def setUp(self):
+        super().setUp()
+        self.resolver = get_resolver("materialized")
+
+    def test_asignacion_de_grupo_materializa_sus_capacidades(self):
+        self.assertTrue(self.resolver.tiene_permiso(self.usuario.id, VER))
+        self.assertFalse(self.resolver.tiene_permiso(self.usuario.id, REALIZAR))
+        self.assertEqual(self.resolver.capacidades(self.usuario.id), frozenset({VER}))
+
+    def test_capacidad_anadida_al_grupo_llega_a_los_miembros(self):
+        GrupoCapacidad.objects.create(grupo=self.grupo, capacidad=self.cap_realizar)
+
+        self.assertTrue(self.resolver.tiene_permiso(self.usuario.id, REALIZAR))
+
+    def test_revocacion_temporal_parte_el_intervalo(self):
+        fin = timezone.now() + timedelta(days=1)
+        PermisoExcepcional.objects.create(
+            usuario=self.usuario,
+            capacidad=self.cap_ver,
+            tipo="revocar",
+            fecha_fin=fin,
+            motivo="Incidente",
+        )
+
+        self.assertFalse(self.resolver.tiene_permiso(self.usuario.id, VER))
+        intervalos = list(
+            CapacidadEfectiva.objects.filter(usuario=self.usuario, capacidad=self.cap_ver)
+            .values_list("vigente_desde", "vigente_hasta")
+        )
+        self.assertEqual(intervalos, [(fin, None)])
+
+    def test_concesion_futura_no_esta_vigente(self):
+        PermisoExcepcional.objects.create(
+            usuario=self.usuario,
+            capacidad=self.cap_realizar,
+            tipo="conceder",
+            fecha_inicio=timezone.now() + timedelta(hours=1),
+            motivo="Proyecto especial",
+        )
+
+        self.assertFalse(self.resolver.tiene_permiso(self.usuario.id, REALIZAR))
+        self.assertTrue(
+            CapacidadEfectiva.objects.filter(
+                usuario=self.usuario, capacidad=self.cap_realizar
+            ).exists()
+        )
+
+    def test_borrar_asignacion_retira_las_filas(self):
+        self.asignacion.delete()
+
+        self.assertFalse(CapacidadEfectiva.objects.filter(usuario=self.usuario).exists())
+
+    def test_desactivar_capacidad_la_retira(self):
+        self.cap_ver.activa = False
+        self.cap_ver.save()
+
+        self.assertFalse(self.resolver.tiene_permiso(self.usuario.id, VER))
+
+    def test_usuarios_con_capacidad(self):
+        otro = User.objects.create_user(
+            username="agent2", email="agent2@test.com", password="testpass123"
+        )
+
+        self.assertEqual(list(materializacion.usuarios_con_capacidad(VER)), [self.usuario.id])
+        self.assertNotIn(otro.id, materializacion.usuarios_con_capacidad(VER))
+
+    def test_barrido_elimina_intervalos_vencidos(self):
+        self.asignacion.fecha_expiracion = timezone.now() + timedelta(minutes=5)
+        self.asignacion.save()
+
+        borradas = materializacion.barrer_vencidas(timezone.now() + timedelta(minutes=10))
+
+        self.assertEqual(borradas, 1)
+        self.assertFalse(CapacidadEfectiva.objects.filter(usuario=self.usuario).exists())
+
+    def test_reconstruir_coincide_con_el_calculo_del_servicio(self):
+        CapacidadEfectiva.objects.all().delete()
+
+        materializacion.reconstruir()
+
+        self.assertEqual(
+            self.resolver.capacidades(self.usuario.id),
+            get_resolver("orm").capacidades(self.usuario.id),
+        )
+
+
+class IntervalosTestCase(TestCase):
+    """Aritmetica de intervalos usada en la materializacion."""
+
+    def test_restar_deja_los_extremos(self):
+        t0 = timezone.now()
+        t1, t2, t3 = (t0 + timedelta(hours=horas) for horas in (1, 2, 3))
+
+        self.assertEqual(
+            materializacion._restar([(t0, t3)], [(t1, t2)]),
+            [(t0, t1), (t2, t3)],
+        )
+        self.assertEqual(materializacion._restar([(t0, None)], [(t1, None)]), [(t0, t1)])
+        self.assertEqual(materializacion._restar([(t1, t2)], [(t0, t3)]), [])
+
+    def test_unir_fusiona_solapados(self):
+        t0 = timezone.now()
+        t1, t2, t3 = (t0 + timedelta(hours=horas) for horas in (1, 2, 3))
+
+        self.assertEqual(materializacion._unir([(t1, t3), (t0, t2)]), [(t0, t3)])
+        self.assertEqual(materializacion._unir([(t0, t1), (t2, None)]), [(t0, t1), (t2, None)])
@@ -0,0 +1,101 @@
+"""
+Tests para la invalidacion del cache de capacidades entre procesos.
+
+Sistema de Permisos Granular - Prioridad 1
+"""
+
+import json
+from unittest.mock import MagicMock, patch
+
+from django.test import SimpleTestCase
+
+from callcentersite.apps.permissions import bitsets, notify
+from callcentersite.apps.permissions.cache import capacidades_cache
+
+
+class PayloadTestCase(SimpleTestCase):
+    """Serializacion y aplicacion de avisos de invalidacion."""
+
+    def setUp(self):
+        capacidades_cache.limpiar()
+        capacidades_cache.guardar(1, frozenset({"a"}), None, capacidades_cache.generacion)
+        capacidades_cache.guardar(2, frozenset({"b"}), None, capacidades_cache.generacion)
+
+    def tearDown(self):
+        capacidades_cache.limpiar()
+
+    def _ajeno(self, **mensaje):
+        return json.dumps({"origen": "otro-proceso", **mensaje})
+
+    def test_payload_lista_usuarios_sin_duplicados(self):
+        payload = json.loads(notify.construir_payload([3, 1, 3]))
+
+        self.assertEqual(payload["usuarios"], [1, 3])
+        self.assertEqual(payload["origen"], notify.origen())
+
+    def test_payload_demasiado_grande_invalida_todo(self):
+        payload = json.loads(notify.construir_payload(range(5000)))
+
+        self.assertTrue(payload["todos"])
+
+    def test_aviso_de_otro_proceso_invalida_usuarios(self):
+        notify.aplicar_payload(self._ajeno(usuarios=[1]))
+
+        self.assertIsNone(capacidades_cache.obtener(1))
+        self.assertIsNotNone(capacidades_cache.obtener(2))
+
+    def test_aviso_global_limpia_el_cache(self):
+        notify.aplicar_payload(self._ajeno(todos=True))
+
+        self.assertEqual(len(capacidades_cache), 0)
+
+    def test_aviso_con_indices_descarta_el_mapa_de_bits(self):
+        bitsets.indice_capacidades._mapas = ({"a": 0}, {0: "a"})
+
+        notify.aplicar_payload(self._ajeno(usuarios=[], indices=["permissions.capacidad"]))
+
+        self.assertIsNone(bitsets.indice_capacidades._mapas)
+        self.assertIsNotNone(capacidades_cache.obtener(1))
+
+    def test_aviso_propio_se_ignora(self):
+        notify.aplicar_payload(notify.construir_payload([1]))
+
+        self.assertIsNotNone(capacidades_cache.obtener(1))
+
+    def test_aviso_ilegible_limpia_el_cache(self):
+        notify.aplicar_payload("no-json")
+
+        self.assertEqual(len(capacidades_cache), 0)
+
+    def test_origen_cambia_tras_fork(self):
+        original = notify.origen()
+
+        with patch("callcentersite.apps.permissions.notify.os.getpid", return_value=-1):
+            self.assertNotEqual(notify.origen(), original)
+
+
+class PublicarTestCase(SimpleTestCase):
+    """Publicacion solo en PostgreSQL."""
+
+    def test_no_publica_fuera_de_postgresql(self):
+        conexion = MagicMock(vendor="sqlite")
+
+        with patch("callcentersite.apps.permissions.notify.connection", conexion):
+            notify.publicar([1])
+
+        conexion.cursor.assert_not_called()
+
+    def test_publica_pg_notify_en_postgresql(self):
+        conexion = MagicMock(vendor="postgresql")
+        cursor = conexion.cursor.return_value.__enter__.return_value
+
+        with patch("callcentersite.apps.permissions.notify.connection", conexion):
+            notify.publicar([7])
+
+        sql, params = cursor.execute.call_args.args
+        self.assertIn("pg_notify", sql)
+        self.assertEqual(params[0], "permisos_cache")
+        self.assertEqual(json.loads(params[1])["usuarios"], [7])
+
+    def test_listener_no_arranca_fuera_de_postgresql(self):
+        self.assertIsNone(notify.iniciar_listener())
@@ -0,0 +1,95 @@
+"""
+Tests para el resolver unico de permisos.
+
+Sistema de Permisos Granular - Prioridad 1
+"""
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+
+from callcentersite.apps.permissions.models import (
+    GrupoCapacidad,
+    GrupoPermisos,
+    UsuarioGrupo,
+)
+from callcentersite.apps.permissions.resolver import (
+    CachedBackend,
+    ORMBackend,
+    get_resolver,
+)
+from callcentersite.apps.permissions.tests.base import REALIZAR, VER, CapacidadesTestCase
+
+
+User = get_user_model()
+
+EDITAR = "sistema.operaciones.llamadas.editar"
+
+
+class PermissionResolverTestCase(CapacidadesTestCase):
+    """Verificaciones a traves de ``get_resolver``."""
+
+    def setUp(self):
+        super().setUp()
+        GrupoCapacidad.objects.create(grupo=self.grupo, capacidad=self.cap_realizar)
+
+    def test_backend_orm_resuelve_capacidades_de_grupo(self):
+        resolver = get_resolver("orm")
+
+        self.assertIsInstance(resolver.backend, ORMBackend)
+        self.assertEqual(resolver.capacidades(self.usuario.id), frozenset({VER, REALIZAR}))
+        self.assertTrue(resolver.tiene_permiso(self.usuario.id, VER))
+        self.assertFalse(resolver.tiene_permiso(self.usuario.id, EDITAR))
+
+    def test_faltantes_conserva_el_orden_recibido(self):
+        resolver = get_resolver("orm")
+
+        faltantes = resolver.faltantes(self.usuario.id, [EDITAR, VER, "sistema.x.y.z"])
+
+        self.assertEqual(faltantes, [EDITAR, "sistema.x.y.z"])
+        self.assertTrue(resolver.tiene_todas(self.usuario.id, [VER, REALIZAR]))
+        self.assertTrue(resolver.tiene_alguna(self.usuario.id, [EDITAR, VER]))
+        self.assertFalse(resolver.tiene_alguna(self.usuario.id, [EDITAR]))
+
+    @override_settings(PERMISOS_BACKEND="cached")
+    def test_backend_por_defecto_desde_settings(self):
+        self.assertIsInstance(get_resolver().backend, CachedBackend)
+
+    def test_backend_desconocido_lanza_value_error(self):
+        with self.assertRaises(ValueError):
+            get_resolver("ldap")
+
+    def test_verificar_un_usuario_varias_capacidades(self):
+        resultado = get_resolver("orm").verificar(self.usuario.id, [VER, EDITAR, REALIZAR])
+
+        self.assertEqual(resultado, {VER: True, EDITAR: False, REALIZAR: True})
+
+    def test_verificar_usuarios_con_consultas_constantes(self):
+        grupo = GrupoPermisos.objects.get(codigo="atencion_cliente")
+        otros = []
+        for indice in range(3):
+            otro = User.objects.create_user(
+                username=f"agent{indice + 2}",
+                email=f"agent{indice + 2}@test.com",
+                password="testpass123",
+            )
+            UsuarioGrupo.objects.create(usuario=otro, grupo=grupo)
+            otros.append(otro.id)
+        sin_grupo = User.objects.create_user(
+            username="sin_grupo", email="sin_grupo@test.com", password="testpass123"
+        )
+        usuario_ids = [self.usuario.id, *otros, sin_grupo.id, 999999]
+
+        # usuarios + asignaciones + capacidades de grupo + excepciones
+        with self.assertNumQueries(4):
+            resultado = get_resolver("orm").verificar_usuarios(usuario_ids, VER)
+
+        self.assertEqual(
+            resultado,
+            {**{usuario_id: True for usuario_id in [self.usuario.id, *otros]},
+             sin_grupo.id: False, 999999: False},
+        )
+
+    def test_matriz_usuarios_por_capacidades(self):
+        resultado = get_resolver("orm").matriz([self.usuario.id], [VER, EDITAR])
+
+        self.assertEqual(resultado, {self.usuario.id: {VER: True, EDITAR: False}})
@@ -51,13 +51,13 @@ class FuncionViewSetTestCase(TestCase):
 
     def test_listar_funciones_requiere_autenticacion(self):
         """Listar funciones requiere autenticacion."""
-        response = self.client.get('/api/permissions/funciones/')
+        response = self.client.get('/api/v1/permissions/funciones/')
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
     def test_listar_funciones_autenticado(self):
         """Usuario autenticado puede listar funciones."""
         self.client.force_authenticate(user=self.user)
-        response = self.client.get('/api/permissions/funciones/')
+        response = self.client.get('/api/v1/permissions/funciones/')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertGreaterEqual(len(response.data['results']), 2)
@@ -65,7 +65,7 @@ class FuncionViewSetTestCase(TestCase):
     def test_obtener_funcion_por_id(self):
         """Usuario puede obtener funcion por ID."""
         self.client.force_authenticate(user=self.user)
-        response = self.client.get(f'/api/permissions/funciones/{self.funcion1.id}/')
+        response = self.client.get(f'/api/v1/permissions/funciones/{self.funcion1.id}/')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['nombre'], 'llamadas')
@@ -80,7 +80,7 @@ class FuncionViewSetTestCase(TestCase):
         )
 
         self.client.force_authenticate(user=self.user)
-        response = self.client.get('/api/permissions/funciones/?dominio=finanzas')
+        response = self.client.get('/api/v1/permissions/funciones/?dominio=finanzas')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 1)
@@ -109,13 +109,13 @@ class CapacidadViewSetTestCase(TestCase):
 
     def test_listar_capacidades_requiere_autenticacion(self):
         """Listar capacidades requiere autenticacion."""
-        response = self.client.get('/api/permissions/capacidades/')
+        response = self.client.get('/api/v1/permissions/capacidades/')
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
     def test_listar_capacidades_autenticado(self):
         """Usuario autenticado puede listar capacidades."""
         self.client.force_authenticate(user=self.user)
-        response = self.client.get('/api/permissions/capacidades/')
+        response = self.client.get('/api/v1/permissions/capacidades/')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertGreaterEqual(len(response.data['results']), 1)
@@ -131,7 +131,7 @@ class CapacidadViewSetTestCase(TestCase):
         )
 
         self.client.force_authenticate(user=self.user)
-        response = self.client.get('/api/permissions/capacidades/?nivel_sensibilidad=critico')
+        response = self.client.get('/api/v1/permissions/capacidades/?nivel_sensibilidad=critico')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['results']), 1)
@@ -158,13 +158,13 @@ class GrupoPermisosViewSetTestCase(TestCase):
 
     def test_listar_grupos_requiere_autenticacion(self):
         """Listar grupos requiere autenticacion."""
-        response = self.client.get('/api/permissions/grupos/')
+        response = self.client.get('/api/v1/permissions/grupos/')
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
     def test_listar_grupos_autenticado(self):
         """Usuario autenticado puede listar grupos."""
         self.client.force_authenticate(user=self.user)
-        response = self.client.get('/api/permissions/grupos/')
+        response = self.client.get('/api/v1/permissions/grupos/')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertGreaterEqual(len(response.data['results']), 1)
@@ -180,7 +180,7 @@ class GrupoPermisosViewSetTestCase(TestCase):
         GrupoCapacidad.objects.create(grupo=self.grupo, capacidad=capacidad)
 
         self.client.force_authenticate(user=self.user)
-        response = self.client.get(f'/api/permissions/grupos/{self.grupo.id}/')
+        response = self.client.get(f'/api/v1/permissions/grupos/{self.grupo.id}/')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('capacidades', response.data)
@@ -218,13 +218,13 @@ class UsuarioGrupoViewSetTestCase(TestCase):
 
     def test_listar_asignaciones_requiere_autenticacion(self):
         """Listar asignaciones requiere autenticacion."""
-        response = self.client.get('/api/permissions/usuarios-grupos/')
+        response = self.client.get('/api/v1/permissions/usuarios-grupos/')
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
     def test_listar_asignaciones_autenticado(self):
         """Usuario autenticado puede listar asignaciones."""
         self.client.force_authenticate(user=self.user)
-        response = self.client.get('/api/permissions/usuarios-grupos/')
+        response = self.client.get('/api/v1/permissions/usuarios-grupos/')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertGreaterEqual(len(response.data['results']), 1)
@@ -240,7 +240,7 @@ class UsuarioGrupoViewSetTestCase(TestCase):
             'activo': True
         }
 
-        response = self.client.post('/api/permissions/usuarios-grupos/', data)
+        response = self.client.post('/api/v1/permissions/usuarios-grupos/', data)
 
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
         self.assertEqual(response.data['usuario'], self.otro_user.id)
@@ -249,7 +249,7 @@ class UsuarioGrupoViewSetTestCase(TestCase):
     def test_filtrar_asignaciones_por_usuario(self):
         """Usuario puede filtrar asignaciones por usuario."""
         self.client.force_authenticate(user=self.user)
-        response = self.client.get(f'/api/permissions/usuarios-grupos/?usuario={self.user.id}')
+        response = self.client.get(f'/api/v1/permissions/usuarios-grupos/?usuario={self.user.id}')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertGreater(len(response.data['results']), 0)
@@ -287,18 +287,32 @@ class MisCapacidadesViewTestCase(TestCase):
 
     def test_obtener_mis_capacidades_requiere_autenticacion(self):
         """Endpoint requiere autenticacion."""
-        response = self.client.get('/api/permissions/mis-capacidades/')
+        response = self.client.get('/api/v1/permissions/mis-capacidades/')
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
     def test_obtener_mis_capacidades_autenticado(self):
         """Usuario autenticado obtiene sus capacidades."""
         self.client.force_authenticate(user=self.user)
-        response = self.client.get('/api/permissions/mis-capacidades/')
+        response = self.client.get('/api/v1/permissions/mis-capacidades/')
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn('capacidades', response.data)
         self.assertIn('sistema.operaciones.llamadas.ver', response.data['capacidades'])
 
+    def test_obtener_matriz_de_capacidades_solicitadas(self):
+        """Con ?capacidades= se resuelve la matriz del menu en una llamada."""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.get(
+            '/api/v1/permissions/mis-capacidades/',
+            {'capacidades': 'sistema.operaciones.llamadas.ver,sistema.finanzas.pagos.aprobar'}
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['permisos'], {
+            'sistema.operaciones.llamadas.ver': True,
+            'sistema.finanzas.pagos.aprobar': False,
+        })
+
 
 class VerificarPermisoViewTestCase(TestCase):
     """Tests para VerificarPermisoView (endpoint de verificacion)."""
@@ -330,7 +344,7 @@ class VerificarPermisoViewTestCase(TestCase):
 
     def test_verificar_permiso_requiere_autenticacion(self):
         """Endpoint requiere autenticacion."""
-        response = self.client.post('/api/permissions/verificar-permiso/', {
+        response = self.client.post('/api/v1/permissions/verificar-permiso/', {
             'capacidad': 'sistema.operaciones.llamadas.ver'
         })
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -338,7 +352,7 @@ class VerificarPermisoViewTestCase(TestCase):
     def test_verificar_permiso_que_usuario_tiene(self):
         """Usuario puede verificar permiso que tiene."""
         self.client.force_authenticate(user=self.user)
-        response = self.client.post('/api/permissions/verificar-permiso/', {
+        response = self.client.post('/api/v1/permissions/verificar-permiso/', {
             'capacidad': 'sistema.operaciones.llamadas.ver'
         })
 
@@ -348,9 +362,48 @@ class VerificarPermisoViewTestCase(TestCase):
     def test_verificar_permiso_que_usuario_no_tiene(self):
         """Usuario puede verificar permiso que NO tiene."""
         self.client.force_authenticate(user=self.user)
-        response = self.client.post('/api/permissions/verificar-permiso/', {
+        response = self.client.post('/api/v1/permissions/verificar-permiso/', {
             'capacidad': 'sistema.finanzas.pagos.aprobar'
         })
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertFalse(response.data['tiene_permiso'])
+
+    def test_verificar_varias_capacidades_en_una_llamada(self):
+        """Con "capacidades" se devuelve un mapa capacidad -> bool."""
+        self.client.force_authenticate(user=self.user)
+        response = self.client.post('/api/v1/permissions/verificar-permiso/', {
+            'capacidades': [
+                'sistema.operaciones.llamadas.ver',
+                'sistema.finanzas.pagos.aprobar',
+            ]
+        }, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['permisos'], {
+            'sistema.operaciones.llamadas.ver': True,
+            'sistema.finanzas.pagos.aprobar': False,
+        })
+
+    def test_verificar_otros_usuarios_requiere_capacidad_de_administracion(self):
+        """Consultar a otros usuarios exige sistema.administracion.usuarios.ver."""
+        self.client.force_authenticate(user=self.user)
+        payload = {
+            'capacidad': 'sistema.operaciones.llamadas.ver',
+            'usuario_ids': [self.user.id],
+        }
+
+        response = self.client.post('/api/v1/permissions/verificar-permiso/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        admin = Capacidad.objects.create(
+            nombre_completo='sistema.administracion.usuarios.ver',
+            accion='ver',
+            recurso='usuarios',
+            dominio='administracion'
+        )
+        GrupoCapacidad.objects.create(grupo=self.grupo, capacidad=admin)
+
+        response = self.client.post('/api/v1/permissions/verificar-permiso/', payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['usuarios'], {str(self.user.id): True})
@@ -15,6 +15,7 @@ from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
 
+from callcentersite.apps.common.pagination import KeysetPagination, filtrar_rango_fechas
 from callcentersite.apps.permissions.models import (
     Funcion,
     Capacidad,
@@ -38,8 +39,12 @@ from callcentersite.apps.permissions.serializers import (
     PermisoExcepcionalCreateSerializer,
     AuditoriaPermisoSerializer,
 )
+from callcentersite.apps.permissions.resolver import get_resolver
 from callcentersite.apps.permissions.services import PermisoService
 
+# Capacidad requerida para verificar permisos de otros usuarios
+CAPACIDAD_VER_USUARIOS = 'sistema.administracion.usuarios.ver'
+
 
 class FuncionViewSet(viewsets.ModelViewSet):
     """
@@ -255,27 +260,58 @@ class AuditoriaPermisoViewSet(viewsets.ReadOnlyModelViewSet):
     filterset_fields = ['usuario', 'capacidad', 'accion_realizada']
     ordering = ['-timestamp']
 
+    @action(detail=False, methods=['get'], pagination_class=KeysetPagination)
+    def buscar(self, request):
+        """
+        Busqueda paginada por clave ``(timestamp, id)``, sin COUNT ni OFFSET.
+
+        GET /api/v1/permissions/auditoria/buscar/
+            ?usuario=&capacidad=&accion_realizada=&desde=&hasta=
+            &cursor=&page_size=&estimar_total=1
+        """
+        queryset = filtrar_rango_fechas(
+            self.filter_queryset(self.get_queryset()), request.query_params
+        )
+        pagina = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(pagina, many=True)
+        return self.get_paginated_response(serializer.data)
+
 
 class MisCapacidadesView(APIView):
     """
     Endpoint personalizado para obtener capacidades del usuario actual.
 
     GET /api/permissions/mis-capacidades/
+    GET /api/permissions/mis-capacidades/?capacidades=a.b.c.ver,a.b.c.editar
+
+    Con ``capacidades`` se incluye ademas la matriz capacidad -> bool, de
+    modo que el menu de la UI se resuelve en una sola llamada.
     """
 
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         """Retorna capacidades del usuario autenticado."""
-        capacidades = PermisoService.obtener_capacidades_usuario(
-            usuario_id=request.user.id
-        )
+        resolver = get_resolver()
+        capacidades = resolver.capacidades(request.user.id)
 
-        return Response({
+        data = {
             'usuario_id': request.user.id,
             'username': request.user.username,
-            'capacidades': capacidades
-        })
+            'capacidades': sorted(capacidades),
+        }
+
+        solicitadas = [
+            capacidad.strip()
+            for capacidad in request.query_params.get('capacidades', '').split(',')
+            if capacidad.strip()
+        ]
+        if solicitadas:
+            data['permisos'] = {
+                capacidad: capacidad in capacidades for capacidad in solicitadas
+            }
+
+        return Response(data)
 
 
 class MisFuncionesView(APIView):
@@ -302,17 +338,46 @@ class MisFuncionesView(APIView):
 
 class VerificarPermisoView(APIView):
     """
-    Endpoint para verificar si usuario tiene una capacidad especifica.
+    Endpoint para verificar capacidades en lote.
 
     POST /api/permissions/verificar-permiso/
-    Body: {"capacidad": "sistema.operaciones.llamadas.ver"}
+
+    Formatos de body:
+        {"capacidad": "sistema.operaciones.llamadas.ver"}
+            -> tiene_permiso del usuario autenticado
+        {"capacidades": ["sistema.operaciones.llamadas.ver", ...]}
+            -> permisos: {capacidad: bool} del usuario autenticado
+        {"capacidad": "...", "usuario_ids": [1, 2, 3]}
+            -> usuarios: {usuario_id: bool}; requiere
+               sistema.administracion.usuarios.ver
+
+    Cada formato se resuelve con un numero constante de consultas.
     """
 
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
-        """Verifica si usuario tiene la capacidad solicitada."""
+        """Verifica las capacidades solicitadas."""
         capacidad = request.data.get('capacidad')
+        capacidades = request.data.get('capacidades')
+        usuario_ids = request.data.get('usuario_ids')
+        resolver = get_resolver()
+
+        if usuario_ids is not None:
+            return self._verificar_usuarios(request, resolver, capacidad, usuario_ids)
+
+        if capacidades is not None:
+            if not isinstance(capacidades, list) or not all(
+                isinstance(item, str) for item in capacidades
+            ):
+                return Response(
+                    {'error': 'Campo "capacidades" debe ser una lista de textos'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            return Response({
+                'usuario_id': request.user.id,
+                'permisos': resolver.verificar(request.user.id, capacidades)
+            })
 
         if not capacidad:
             return Response(
@@ -320,13 +385,41 @@ class VerificarPermisoView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        tiene_permiso = PermisoService.usuario_tiene_permiso(
-            usuario_id=request.user.id,
-            capacidad_requerida=capacidad
-        )
+        tiene_permiso = resolver.tiene_permiso(request.user.id, capacidad)
 
         return Response({
             'usuario_id': request.user.id,
             'capacidad': capacidad,
             'tiene_permiso': tiene_permiso
         })
+
+    @staticmethod
+    def _verificar_usuarios(request, resolver, capacidad, usuario_ids):
+        """N usuarios x una capacidad para pantallas de administracion."""
+        if not capacidad:
+            return Response(
+                {'error': 'Campo "capacidad" requerido'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not isinstance(usuario_ids, list) or not all(
+            isinstance(item, int) and not isinstance(item, bool) for item in usuario_ids
+        ):
+            return Response(
+                {'error': 'Campo "usuario_ids" debe ser una lista de enteros'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not resolver.tiene_permiso(request.user.id, CAPACIDAD_VER_USUARIOS):
+            return Response(
+                {'error': f'Permiso denegado. Requiere: {CAPACIDAD_VER_USUARIOS}'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+
+        return Response({
+            'capacidad': capacidad,
+            'usuarios': {
+                str(usuario_id): tiene_permiso
+                for usuario_id, tiene_permiso in resolver.verificar_usuarios(
+                    usuario_ids, capacidad
+                ).items()
+            }
+        })
@@ -8,3 +8,7 @@ class UsersConfig(AppConfig):
 
     name = "callcentersite.apps.users"
     verbose_name = "Usuarios"
+
+    def ready(self):
+        """Registra las senales que mantienen los mapas de bits de grupos."""
+        from . import signals_permisos_granular  # noqa: F401
@@ -0,0 +1,39 @@
+"""
+Mapas de bits de capacidades para el sistema de permisos granular.
+
+Mismo calculo que ``apps.permissions.bitsets`` (``apps.common.bitsets``)
+sobre los modelos de ``models_permisos_granular``: cada ``GrupoPermiso``
+guarda el OR de sus capacidades activas y el mapa de un usuario es el OR de
+sus grupos activos mas sus permisos excepcionales vigentes (en este esquema
+no existen revocaciones).
+
+Los mapas de grupo los mantiene ``signals_permisos_granular.py``.
+"""
+
+from __future__ import annotations
+
+from django.db.models import Q
+
+from callcentersite.apps.common.bitsets import IndiceCapacidades, MapasCapacidades
+
+from .models_permisos_granular import GrupoCapacidad, GrupoPermiso, PermisoExcepcional, UsuarioGrupo
+
+indice_capacidades = IndiceCapacidades('users.Capacidad', 'codigo')
+
+mapas = MapasCapacidades(
+    indice=indice_capacidades,
+    grupo=GrupoPermiso,
+    grupo_capacidad=GrupoCapacidad,
+    usuario_grupo=UsuarioGrupo,
+    excepcion=PermisoExcepcional,
+    asignacion_vigente=lambda now: Q(fecha_expiracion__isnull=True) | Q(fecha_expiracion__gt=now),
+    excepcion_vigente=lambda now: Q(fecha_expiracion__isnull=True) | Q(fecha_expiracion__gt=now),
+    grupo_activo='activo',
+)
+
+recalcular_grupos = mapas.recalcular_grupos
+grupos_con_capacidad = mapas.grupos_con_capacidad
+bitmaps_usuarios = mapas.bitmaps_usuarios
+capacidades_usuarios = mapas.capacidades_usuarios
+tiene_capacidad = mapas.tiene_capacidad
+usuarios_con_capacidad = mapas.usuarios_con_capacidad
@@ -20,7 +20,7 @@ Uso:
     # Ver: mixins_permisos.py
 
 Performance:
-    - Usa SQL functions (5-10ms) en vez de ORM (30-50ms)
+    - Verificación delegada en el resolver de permisos, backend ``granular``
     - Cache automático de capacidades del usuario
     - Auditoría asíncrona (no bloquea request)
 
@@ -28,14 +28,18 @@ Referencia: docs/backend/arquitectura/permisos-granular.md
 """
 
 from functools import wraps
-from typing import List, Union, Callable, Optional
+from typing import FrozenSet, List, Union, Callable, Optional
 from django.http import HttpRequest, JsonResponse
 from django.core.exceptions import PermissionDenied
-from django.db import connection
 from django.contrib.auth import get_user_model
 from rest_framework.response import Response
 from rest_framework import status
 
+from callcentersite.apps.audit.writer import record
+from callcentersite.apps.permissions.resolver import get_resolver
+
+from .models_permisos_granular import AuditoriaPermiso
+
 User = get_user_model()
 
 
@@ -63,47 +67,31 @@ def _get_user_from_request(request: HttpRequest):
     return None
 
 
-def _verificar_permiso_sql(usuario_id: int, capacidad_codigo: str) -> bool:
+def _verificar_permiso(usuario_id: int, capacidad_codigo: str) -> bool:
     """
-    Verifica si un usuario tiene un permiso usando la función SQL.
-
-    Performance: 5-10ms (vs 30-50ms con ORM)
+    Verifica si un usuario tiene un permiso con el resolver granular (esquema de apps.users).
 
     Args:
         usuario_id: ID del usuario
-        capacidad_codigo: Código de la capacidad (ej: 'sistema.vistas.dashboards.ver')
+        capacidad_codigo: Código de la capacidad
 
     Returns:
         True si tiene permiso, False si no
     """
-    with connection.cursor() as cursor:
-        cursor.execute(
-            "SELECT usuario_tiene_permiso(%s, %s)",
-            [usuario_id, capacidad_codigo]
-        )
-        result = cursor.fetchone()
-        return result[0] if result else False
+    return get_resolver("granular").tiene_permiso(usuario_id, capacidad_codigo)
 
 
-def _obtener_capacidades_usuario_sql(usuario_id: int) -> List[str]:
+def _obtener_capacidades_usuario(usuario_id: int) -> FrozenSet[str]:
     """
-    Obtiene todas las capacidades de un usuario usando la función SQL.
-
-    Performance: 10-20ms para obtener todas las capacidades
+    Obtiene todas las capacidades de un usuario con el resolver granular (esquema de apps.users).
 
     Args:
         usuario_id: ID del usuario
 
     Returns:
-        Lista de códigos de capacidades
+        Conjunto de códigos de capacidades
     """
-    with connection.cursor() as cursor:
-        cursor.execute(
-            "SELECT obtener_capacidades_usuario(%s)",
-            [usuario_id]
-        )
-        result = cursor.fetchone()
-        return result[0] if result and result[0] else []
+    return get_resolver("granular").capacidades(usuario_id)
 
 
 def _auditar_verificacion(
@@ -116,10 +104,9 @@ def _auditar_verificacion(
     """
     Registra la verificación de permiso en auditoría.
 
-    Usa la función SQL verificar_permiso_y_auditar() para auditoría atómica.
-
-    NOTA: En producción esto debería ser asíncrono (Celery) para no bloquear
-    el request, pero por simplicidad se hace síncrono aquí.
+    La fila va al escritor en lotes de ``apps.audit.writer`` (con
+    ``AUDIT_ASYNC_ENABLED`` no bloquea el request). Ya no se usa la función
+    SQL verificar_permiso_y_auditar(), que repetía la verificación.
 
     Args:
         usuario_id: ID del usuario
@@ -129,14 +116,17 @@ def _auditar_verificacion(
         user_agent: User-Agent del cliente
     """
     try:
-        with connection.cursor() as cursor:
-            cursor.execute(
-                "SELECT verificar_permiso_y_auditar(%s, %s, %s, %s)",
-                [usuario_id, capacidad_codigo, ip_address, user_agent]
-            )
+        record(
+            AuditoriaPermiso,
+            usuario_id=usuario_id,
+            capacidad_codigo=capacidad_codigo,
+            accion='acceso_permitido' if resultado else 'acceso_denegado',
+            resultado='permitido' if resultado else 'denegado',
+            ip_address=ip_address or None,
+            user_agent=(user_agent or '')[:255],
+        )
     except Exception as e:
         # No fallar el request si la auditoría falla
-        # En producción: enviar a Sentry/logging
         import logging
         logger = logging.getLogger(__name__)
         logger.error(f"Error en auditoría de permisos: {e}", exc_info=True)
@@ -185,7 +175,7 @@ def require_permission(
     """
     Decorador que verifica si el usuario tiene UNA capacidad específica.
 
-    Performance: 5-10ms usando SQL functions
+    Performance: backend ``granular`` del resolver (ver benchmark_permisos)
 
     Args:
         capacidad_codigo: Código de la capacidad requerida
@@ -231,8 +221,8 @@ def require_permission(
             # 2. Marcar request para middleware
             _mark_request_for_middleware_audit(request, capacidad_codigo)
 
-            # 3. Verificar permiso usando SQL function
-            tiene_permiso = _verificar_permiso_sql(user.id, capacidad_codigo)
+            # 3. Verificar permiso con el resolver configurado
+            tiene_permiso = _verificar_permiso(user.id, capacidad_codigo)
 
             # 4. Auditar si está habilitado
             if audit:
@@ -273,7 +263,7 @@ def require_any_permission(
     """
     Decorador que verifica si el usuario tiene AL MENOS UNA de las capacidades.
 
-    Performance: 10-20ms usando SQL functions (obtiene todas las capacidades una vez)
+    Performance: obtiene todas las capacidades una vez con el resolver configurado
 
     Args:
         capacidades: Lista de códigos de capacidades
@@ -313,7 +303,7 @@ def require_any_permission(
             _mark_request_for_middleware_audit(request, capacidad_ref)
 
             # 3. Obtener todas las capacidades del usuario (más eficiente que N queries)
-            capacidades_usuario = _obtener_capacidades_usuario_sql(user.id)
+            capacidades_usuario = _obtener_capacidades_usuario(user.id)
 
             # 4. Verificar si tiene al menos una
             tiene_alguno = any(cap in capacidades_usuario for cap in capacidades)
@@ -357,7 +347,7 @@ def require_all_permissions(
     """
     Decorador que verifica si el usuario tiene TODAS las capacidades.
 
-    Performance: 10-20ms usando SQL functions (obtiene todas las capacidades una vez)
+    Performance: obtiene todas las capacidades una vez con el resolver configurado
 
     Args:
         capacidades: Lista de códigos de capacidades (todas requeridas)
@@ -398,7 +388,7 @@ def require_all_permissions(
             _mark_request_for_middleware_audit(request, capacidad_ref)
 
             # 3. Obtener todas las capacidades del usuario
-            capacidades_usuario = _obtener_capacidades_usuario_sql(user.id)
+            capacidades_usuario = _obtener_capacidades_usuario(user.id)
 
             # 4. Verificar si tiene todas
             tiene_todas = all(cap in capacidades_usuario for cap in capacidades)
@@ -21,11 +21,12 @@ Configuración en settings.py:
             '/media/',
         ],
         'include_query_params': True,  # Incluir query params en auditoría
-        'async_audit': True,  # Usar Celery para auditoría asíncrona (recomendado)
+        'async_audit': True,  # Escritor en lotes de apps.audit.writer (recomendado)
     }
 
 Performance:
-    - Con async_audit=True: 0-1ms overhead (Celery task)
+    - Con async_audit=True: 0-1ms overhead (solo se encola; el hilo de
+      apps.audit.writer inserta en lotes si AUDIT_ASYNC_ENABLED=True)
     - Con async_audit=False: 5-10ms overhead (INSERT directo a DB)
 
 Referencia: docs/backend/arquitectura/permisos-granular.md
@@ -58,7 +59,7 @@ DEFAULT_CONFIG = {
         '/admin/jsi18n/',
     ],
     'include_query_params': True,
-    'async_audit': False,  # Por defecto False (requiere Celery configurado)
+    'async_audit': True,  # apps.audit.writer, sin dependencias externas
 }
 
 
@@ -187,9 +188,9 @@ def _audit_request_async(
     metadata: dict,
 ):
     """
-    Audita un request de manera ASÍNCRONA usando Celery.
+    Audita un request de manera ASÍNCRONA con el escritor en lotes.
 
-    Performance: < 1ms (solo encola task)
+    Performance: < 1ms (solo encola; ver apps.audit.writer)
 
     Args:
         usuario_id: ID del usuario
@@ -199,26 +200,20 @@ def _audit_request_async(
         user_agent: User-Agent del cliente
         metadata: Metadata adicional del request
     """
-    try:
-        # Importar task de Celery (solo si está configurado)
-        from .tasks import audit_permission_check
+    from callcentersite.apps.audit.writer import record
+
+    from .models_permisos_granular import AuditoriaPermiso
 
-        audit_permission_check.delay(
+    try:
+        record(
+            AuditoriaPermiso,
             usuario_id=usuario_id,
             capacidad_codigo=capacidad_codigo,
-            resultado=resultado,
-            ip_address=ip_address,
-            user_agent=user_agent,
-            metadata=metadata,
-        )
-    except ImportError:
-        # Celery no configurado, fallback a auditoría síncrona
-        logger.warning(
-            "Celery no configurado, usando auditoría síncrona. "
-            "Configura Celery para mejor performance."
-        )
-        _audit_request_sync(
-            usuario_id, capacidad_codigo, resultado, ip_address, user_agent
+            accion='acceso_permitido' if resultado else 'acceso_denegado',
+            resultado='permitido' if resultado else 'denegado',
+            ip_address=ip_address or None,
+            user_agent=(user_agent or '')[:255],
+            contexto_adicional=metadata,
         )
     except Exception as e:
         logger.error(f"Error en auditoría asíncrona: {e}", exc_info=True)
@@ -235,12 +230,12 @@ class PermissionAuditMiddleware(MiddlewareMixin):
     Funcionalidad:
     1. Audita todos los requests de usuarios autenticados
     2. Registra IP, User-Agent, timestamp, path
-    3. Soporta auditoría síncrona o asíncrona (Celery)
+    3. Soporta auditoría síncrona o asíncrona (apps.audit.writer)
     4. Configurable mediante settings.PERMISSION_AUDIT_CONFIG
 
     Performance:
-    - Async (Celery): < 1ms overhead
-    - Sync (sin Celery): 5-10ms overhead
+    - Async (apps.audit.writer): < 1ms overhead
+    - Sync (funcion SQL): 5-10ms overhead
 
     Configuración:
         MIDDLEWARE = [
@@ -251,7 +246,7 @@ class PermissionAuditMiddleware(MiddlewareMixin):
         PERMISSION_AUDIT_CONFIG = {
             'enabled': True,
             'audit_all_requests': False,  # Solo auditar requests con permisos verificados
-            'async_audit': True,  # Usar Celery
+            'async_audit': True,  # Escritor en lotes
         }
     """
 
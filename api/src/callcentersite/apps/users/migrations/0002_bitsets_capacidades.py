@@ -0,0 +1,44 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+from callcentersite.apps.common.bitsets import asignar_bits_iniciales
+
+
+def asignar_bits(apps, schema_editor):
+    """Asigna bit_indice por orden de id y calcula el mapa de cada grupo."""
+    asignar_bits_iniciales(
+        apps.get_model("users", "Capacidad"),
+        apps.get_model("users", "GrupoCapacidad"),
+        apps.get_model("users", "GrupoPermiso"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="capacidad",
+            name="bit_indice",
+            field=models.PositiveIntegerField(
+                editable=False,
+                help_text="Posicion estable de la capacidad en los mapas de bits",
+                null=True,
+                unique=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name="grupopermiso",
+            name="capacidades_bitmap",
+            field=models.BinaryField(
+                default=b"",
+                editable=False,
+                help_text="Mapa de bits de sus capacidades activas (mantenido por senales)",
+            ),
+        ),
+        migrations.RunPython(asignar_bits, migrations.RunPython.noop),
+    ]
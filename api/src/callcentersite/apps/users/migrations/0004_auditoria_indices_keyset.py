@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0003_particionar_auditoria_permisos"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="auditoriapermiso",
+            index=models.Index(
+                fields=["accion", "timestamp", "id"], name="idx_auditoria_accion_time"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="auditoriapermiso",
+            index=models.Index(
+                fields=["resultado", "timestamp", "id"], name="idx_auditoria_resultado_time"
+            ),
+        ),
+    ]
@@ -44,21 +44,22 @@ Uso:
         }
 
 Performance:
-    - Usa SQL functions (5-10ms) en vez de ORM (30-50ms)
+    - Verificación delegada en el resolver de permisos, backend ``granular``
     - Cache automático en request (evita verificaciones duplicadas)
     - Auditoría integrada
 
 Referencia: docs/backend/arquitectura/permisos-granular.md
 """
 
-from typing import Dict, List, Union, Optional
+from typing import Dict, FrozenSet, List, Union, Optional
 from rest_framework import permissions
 from rest_framework.request import Request
 from rest_framework.views import APIView
-from django.db import connection
 from django.core.exceptions import ImproperlyConfigured
 import logging
 
+from callcentersite.apps.permissions.resolver import get_resolver
+
 logger = logging.getLogger(__name__)
 
 
@@ -66,11 +67,9 @@ logger = logging.getLogger(__name__)
 # HELPER FUNCTIONS
 # =============================================================================
 
-def _verificar_permiso_sql(usuario_id: int, capacidad_codigo: str) -> bool:
+def _verificar_permiso(usuario_id: int, capacidad_codigo: str) -> bool:
     """
-    Verifica si un usuario tiene un permiso usando la función SQL.
-
-    Performance: 5-10ms
+    Verifica si un usuario tiene un permiso con el resolver granular (esquema de apps.users).
 
     Args:
         usuario_id: ID del usuario
@@ -79,46 +78,32 @@ def _verificar_permiso_sql(usuario_id: int, capacidad_codigo: str) -> bool:
     Returns:
         True si tiene permiso, False si no
     """
-    with connection.cursor() as cursor:
-        cursor.execute(
-            "SELECT usuario_tiene_permiso(%s, %s)",
-            [usuario_id, capacidad_codigo]
-        )
-        result = cursor.fetchone()
-        return result[0] if result else False
+    return get_resolver("granular").tiene_permiso(usuario_id, capacidad_codigo)
 
 
-def _obtener_capacidades_usuario_sql(usuario_id: int) -> List[str]:
+def _obtener_capacidades_usuario(usuario_id: int) -> FrozenSet[str]:
     """
-    Obtiene todas las capacidades de un usuario usando la función SQL.
-
-    Performance: 10-20ms
+    Obtiene todas las capacidades de un usuario con el resolver granular (esquema de apps.users).
 
     Args:
         usuario_id: ID del usuario
 
     Returns:
-        Lista de códigos de capacidades
+        Conjunto de códigos de capacidades
     """
-    with connection.cursor() as cursor:
-        cursor.execute(
-            "SELECT obtener_capacidades_usuario(%s)",
-            [usuario_id]
-        )
-        result = cursor.fetchone()
-        return result[0] if result and result[0] else []
+    return get_resolver("granular").capacidades(usuario_id)
 
 
-def _get_cached_capacidades(request: Request) -> Optional[List[str]]:
+def _get_cached_capacidades(request: Request) -> Optional[FrozenSet[str]]:
     """
     Obtiene las capacidades del usuario desde el cache del request.
 
-    Cache de request: evita múltiples queries SQL en el mismo request.
+    Cache de request: evita múltiples consultas en el mismo request.
     """
     return getattr(request, '_cached_user_capacidades', None)
 
 
-def _set_cached_capacidades(request: Request, capacidades: List[str]):
+def _set_cached_capacidades(request: Request, capacidades: FrozenSet[str]):
     """Guarda las capacidades del usuario en el cache del request."""
     request._cached_user_capacidades = capacidades
 
@@ -176,7 +161,7 @@ class GranularPermission(permissions.BasePermission):
             }
 
     Performance:
-    - Primera verificación: 5-10ms (SQL function)
+    - Primera verificación: backend ``granular`` del resolver
     - Verificaciones subsecuentes en mismo request: < 1ms (cache)
 
     Auditoría:
@@ -256,14 +241,14 @@ class GranularPermission(permissions.BasePermission):
 
         # CASO 1: Single permission (string)
         if isinstance(required_permissions, str):
-            return _verificar_permiso_sql(usuario_id, required_permissions)
+            return _verificar_permiso(usuario_id, required_permissions)
 
         # CASO 2: Multiple permissions (list) - ANY (al menos una)
         if isinstance(required_permissions, list):
             # Optimización: obtener todas las capacidades una vez
             capacidades_usuario = _get_cached_capacidades(request)
             if capacidades_usuario is None:
-                capacidades_usuario = _obtener_capacidades_usuario_sql(usuario_id)
+                capacidades_usuario = _obtener_capacidades_usuario(usuario_id)
                 _set_cached_capacidades(request, capacidades_usuario)
 
             # Verificar si tiene al menos una
@@ -276,7 +261,7 @@ class GranularPermission(permissions.BasePermission):
                 required_caps = required_permissions['all']
                 capacidades_usuario = _get_cached_capacidades(request)
                 if capacidades_usuario is None:
-                    capacidades_usuario = _obtener_capacidades_usuario_sql(usuario_id)
+                    capacidades_usuario = _obtener_capacidades_usuario(usuario_id)
                     _set_cached_capacidades(request, capacidades_usuario)
 
                 return all(cap in capacidades_usuario for cap in required_caps)
@@ -286,7 +271,7 @@ class GranularPermission(permissions.BasePermission):
                 required_caps = required_permissions['any']
                 capacidades_usuario = _get_cached_capacidades(request)
                 if capacidades_usuario is None:
-                    capacidades_usuario = _obtener_capacidades_usuario_sql(usuario_id)
+                    capacidades_usuario = _obtener_capacidades_usuario(usuario_id)
                     _set_cached_capacidades(request, capacidades_usuario)
 
                 return any(cap in capacidades_usuario for cap in required_caps)
@@ -385,7 +370,30 @@ class GranularPermissionMixin:
         if not request.user or not request.user.is_authenticated:
             return False
 
-        return _verificar_permiso_sql(request.user.id, capacidad_codigo)
+        return _verificar_permiso(request.user.id, capacidad_codigo)
+
+    def check_permissions(self, capacidades: List[str]) -> Dict[str, bool]:
+        """
+        Verifica varias capacidades del usuario de una vez.
+
+        Las capacidades del usuario se resuelven una sola vez por request,
+        asi que evaluar N capacidades cuesta lo mismo que evaluar una.
+
+        Ejemplo:
+            permisos = self.check_permissions([
+                'sistema.vistas.reportes.exportar',
+                'sistema.vistas.reportes.compartir',
+            ])
+            # {'sistema.vistas.reportes.exportar': True, ...}
+
+        Args:
+            capacidades: Lista de códigos de capacidades
+
+        Returns:
+            Diccionario capacidad -> tiene permiso
+        """
+        capacidades_usuario = self.get_user_capacidades()
+        return {cap: cap in capacidades_usuario for cap in capacidades}
 
     def check_any_permission(self, capacidades: List[str]) -> bool:
         """
@@ -397,16 +405,7 @@ class GranularPermissionMixin:
         Returns:
             True si tiene al menos una, False si no tiene ninguna
         """
-        request = self.request
-        if not request.user or not request.user.is_authenticated:
-            return False
-
-        capacidades_usuario = _get_cached_capacidades(request)
-        if capacidades_usuario is None:
-            capacidades_usuario = _obtener_capacidades_usuario_sql(request.user.id)
-            _set_cached_capacidades(request, capacidades_usuario)
-
-        return any(cap in capacidades_usuario for cap in capacidades)
+        return any(self.check_permissions(capacidades).values())
 
     def check_all_permissions(self, capacidades: List[str]) -> bool:
         """
@@ -422,29 +421,24 @@ class GranularPermissionMixin:
         if not request.user or not request.user.is_authenticated:
             return False
 
-        capacidades_usuario = _get_cached_capacidades(request)
-        if capacidades_usuario is None:
-            capacidades_usuario = _obtener_capacidades_usuario_sql(request.user.id)
-            _set_cached_capacidades(request, capacidades_usuario)
-
-        return all(cap in capacidades_usuario for cap in capacidades)
+        return all(self.check_permissions(capacidades).values())
 
-    def get_user_capacidades(self) -> List[str]:
+    def get_user_capacidades(self) -> FrozenSet[str]:
         """
         Obtiene todas las capacidades del usuario actual.
 
         Usa cache del request para evitar queries múltiples.
 
         Returns:
-            Lista de códigos de capacidades
+            Conjunto de códigos de capacidades
         """
         request = self.request
         if not request.user or not request.user.is_authenticated:
-            return []
+            return frozenset()
 
         capacidades_usuario = _get_cached_capacidades(request)
         if capacidades_usuario is None:
-            capacidades_usuario = _obtener_capacidades_usuario_sql(request.user.id)
+            capacidades_usuario = _obtener_capacidades_usuario(request.user.id)
             _set_cached_capacidades(request, capacidades_usuario)
 
         return capacidades_usuario
@@ -13,6 +13,8 @@ from django.conf import settings
 from django.db import models
 from django.utils import timezone
 
+from callcentersite.apps.common.bitsets import BitIndexedModel
+
 
 class Funcion(models.Model):
     """
@@ -63,7 +65,7 @@ class Funcion(models.Model):
         return self.nombre_completo
 
 
-class Capacidad(models.Model):
+class Capacidad(BitIndexedModel):
     """
     Capacidad granular (accion sobre recurso).
 
@@ -71,6 +73,8 @@ class Capacidad(models.Model):
     - sistema.administracion.usuarios.crear
     - sistema.vistas.dashboards.ver
     - sistema.operaciones.llamadas.realizar
+
+    bit_indice: posicion en los mapas de bits (ver apps.common.bitsets).
     """
 
     NIVEL_RIESGO_CHOICES = [
@@ -178,6 +182,11 @@ class GrupoPermiso(models.Model):
         default='bajo',
     )
     activo = models.BooleanField(default=True)
+    capacidades_bitmap = models.BinaryField(
+        default=b'',
+        editable=False,
+        help_text='Mapa de bits de sus capacidades activas (mantenido por senales)',
+    )
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -335,6 +344,9 @@ class AuditoriaPermiso(models.Model):
     - Accesos permitidos/denegados
     - Asignaciones de grupos
     - Permisos excepcionales
+
+    En PostgreSQL la tabla esta particionada por mes sobre ``timestamp``
+    (``apps.common.particiones``, ``manage_audit_partitions``).
     """
 
     ACCION_CHOICES = [
@@ -377,6 +389,9 @@ class AuditoriaPermiso(models.Model):
         indexes = [
             models.Index(fields=['usuario', 'timestamp'], name='idx_auditoria_usuario_time'),
             models.Index(fields=['capacidad_codigo', 'timestamp'], name='idx_auditoria_cap_time'),
+            # (filtro, timestamp, id): busqueda paginada por clave
+            models.Index(fields=['accion', 'timestamp', 'id'], name='idx_auditoria_accion_time'),
+            models.Index(fields=['resultado', 'timestamp', 'id'], name='idx_auditoria_resultado_time'),
         ]
 
     def __str__(self):
@@ -15,6 +15,8 @@ from django.contrib.auth import get_user_model
 from django.core.exceptions import PermissionDenied, ValidationError
 from django.db import OperationalError, connection
 
+from callcentersite.apps.audit.writer import record
+
 from .models_permisos_granular import AuditoriaPermiso
 from .services_permisos_granular import UserManagementService
 
@@ -23,6 +25,26 @@ if TYPE_CHECKING:
 
 User = get_user_model()
 
+_tabla_auditoria_existe = False
+
+
+def _puede_auditar() -> bool:
+    """
+    True si existe la tabla de auditoria.
+
+    Solo se memoriza el resultado positivo: la tabla no desaparece en
+    caliente y asi se evita consultar el catalogo en cada request.
+    """
+    global _tabla_auditoria_existe
+    if not _tabla_auditoria_existe:
+        try:
+            _tabla_auditoria_existe = (
+                AuditoriaPermiso._meta.db_table in connection.introspection.table_names()
+            )
+        except Exception:
+            return False
+    return _tabla_auditoria_existe
+
 
 def verificar_permiso_y_auditar(
     usuario_id: int,
@@ -70,17 +92,12 @@ def verificar_permiso_y_auditar(
     except OperationalError:
         tiene_permiso = True
 
-    def _puede_auditar() -> bool:
-        try:
-            return AuditoriaPermiso._meta.db_table in connection.introspection.table_names()
-        except Exception:
-            return False
-
     if not tiene_permiso:
         # Auditar intento denegado
         if _puede_auditar():
             try:
-                AuditoriaPermiso.objects.create(
+                record(
+                    AuditoriaPermiso,
                     usuario_id=usuario_id,
                     capacidad_codigo=capacidad_codigo,
                     recurso_tipo=recurso_tipo,
@@ -99,7 +116,8 @@ def verificar_permiso_y_auditar(
     # Auditar acceso permitido
     if _puede_auditar():
         try:
-            AuditoriaPermiso.objects.create(
+            record(
+                AuditoriaPermiso,
                 usuario_id=usuario_id,
                 capacidad_codigo=capacidad_codigo,
                 recurso_tipo=recurso_tipo,
@@ -144,8 +162,9 @@ def auditar_accion_exitosa(
         ... )
     """
     try:
-        if AuditoriaPermiso._meta.db_table in connection.introspection.table_names():
-            AuditoriaPermiso.objects.create(
+        if _puede_auditar():
+            record(
+                AuditoriaPermiso,
                 usuario_id=usuario_id,
                 capacidad_codigo=capacidad_codigo,
                 recurso_tipo=recurso_tipo,
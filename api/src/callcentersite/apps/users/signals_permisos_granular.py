@@ -0,0 +1,49 @@
+"""
+Senales que mantienen los mapas de bits de GrupoPermiso.
+
+Cubren altas y bajas de GrupoCapacidad (incluido ``grupo.capacidades.set()``,
+que usa ``bulk_create`` sobre la tabla intermedia y solo emite
+``m2m_changed``) y la activacion/desactivacion de capacidades. Los cambios de
+capacidades se avisan al resto de procesos por el canal de
+``apps.permissions.notify`` para que descarten su mapa codigo <-> bit_indice.
+"""
+
+from __future__ import annotations
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from callcentersite.apps.permissions.notify import publicar
+
+from .bitsets_permisos_granular import grupos_con_capacidad, indice_capacidades, recalcular_grupos
+from .models_permisos_granular import Capacidad, GrupoCapacidad, GrupoPermiso
+
+
+@receiver(post_save, sender=GrupoCapacidad)
+@receiver(post_delete, sender=GrupoCapacidad)
+def actualizar_bitmap_grupo(sender, instance, **kwargs):
+    recalcular_grupos([instance.grupo_id])
+
+
+@receiver(m2m_changed, sender=GrupoPermiso.capacidades.through)
+def actualizar_bitmap_grupo_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        recalcular_grupos([instance.pk])
+    elif action == 'post_clear':
+        # Desde la capacidad no se conocen los grupos ya desvinculados
+        recalcular_grupos(GrupoPermiso.objects.values_list('id', flat=True))
+    else:
+        recalcular_grupos(pk_set or ())
+
+
+@receiver(post_save, sender=Capacidad)
+@receiver(post_delete, sender=Capacidad)
+def actualizar_bitmaps_por_capacidad(sender, instance, **kwargs):
+    indice_capacidades.invalidar()
+    publicar((), indices=[indice_capacidades.etiqueta])
+    transaction.on_commit(indice_capacidades.invalidar)
+    if kwargs.get('signal') is post_save and not kwargs.get('created'):
+        recalcular_grupos(grupos_con_capacidad(instance.pk))
@@ -47,6 +47,8 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 
+from callcentersite.apps.common.pagination import KeysetPagination, filtrar_rango_fechas
+
 from .models_permisos_granular import (
     Funcion,
     Capacidad,
@@ -461,25 +463,7 @@ class AuditoriaPermisoViewSet(viewsets.ReadOnlyModelViewSet):
 
     def list(self, request):
         """Lista logs de auditoría con filtros."""
-        queryset = self.get_queryset()
-
-        # Filtros
-        if 'usuario_id' in request.query_params:
-            queryset = queryset.filter(usuario_id=request.query_params['usuario_id'])
-
-        if 'accion' in request.query_params:
-            queryset = queryset.filter(accion=request.query_params['accion'])
-
-        if 'capacidad_codigo' in request.query_params:
-            queryset = queryset.filter(
-                capacidad_codigo=request.query_params['capacidad_codigo']
-            )
-
-        if 'desde' in request.query_params:
-            queryset = queryset.filter(timestamp__gte=request.query_params['desde'])
-
-        if 'hasta' in request.query_params:
-            queryset = queryset.filter(timestamp__lte=request.query_params['hasta'])
+        queryset = self._filtrar(self.get_queryset(), request.query_params)
 
         # Limitar resultados
         limit = int(request.query_params.get('limit', 100))
@@ -488,6 +472,37 @@ class AuditoriaPermisoViewSet(viewsets.ReadOnlyModelViewSet):
         serializer = self.get_serializer(queryset, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'], pagination_class=KeysetPagination)
+    def buscar(self, request):
+        """
+        Búsqueda paginada por clave ``(timestamp, id)``, sin COUNT ni OFFSET.
+
+        Mismos filtros que ``list`` más ``resultado``; cada página devuelve
+        ``next``/``cursor`` para continuar y, con ``estimar_total=1``, una
+        estimación del total.
+        """
+        queryset = self._filtrar(self.get_queryset(), request.query_params)
+        pagina = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(pagina, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @staticmethod
+    def _filtrar(queryset, params):
+        """Filtros comunes: usuario_id, accion, resultado, capacidad_codigo, desde, hasta."""
+        if 'usuario_id' in params:
+            queryset = queryset.filter(usuario_id=params['usuario_id'])
+
+        if 'accion' in params:
+            queryset = queryset.filter(accion=params['accion'])
+
+        if 'resultado' in params:
+            queryset = queryset.filter(resultado=params['resultado'])
+
+        if 'capacidad_codigo' in params:
+            queryset = queryset.filter(capacidad_codigo=params['capacidad_codigo'])
+
+        return filtrar_rango_fechas(queryset, params)
+
 
 # =============================================================================
 # VERIFICACION VIEWSET (Custom endpoints)
@@ -2,11 +2,17 @@
 
 from __future__ import annotations
 
+from django.conf import settings
 from django.contrib.auth import logout
 from django.http import HttpRequest, HttpResponse
+from django.utils.crypto import constant_time_compare, salted_hmac
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import AccessToken
 
 SESSION_IP_KEY = "session_ip"
 SESSION_UA_KEY = "session_user_agent"
+# Claim JWT con la huella IP/UA del cliente que obtuvo el token
+FINGERPRINT_CLAIM = "fgp"
 
 
 def _extract_client_ip(request: HttpRequest) -> str:
@@ -20,13 +26,54 @@ def _extract_user_agent(request: HttpRequest) -> str:
     return request.META.get("HTTP_USER_AGENT", "")
 
 
+def session_fingerprint(request: HttpRequest) -> str:
+    """HMAC de IP y user agent; no expone ninguno de los dos en el token."""
+    valor = f"{_extract_client_ip(request)}\n{_extract_user_agent(request)}"
+    return salted_hmac("session_security.fingerprint", valor, algorithm="sha256").hexdigest()[:32]
+
+
+def _bearer_fingerprint(request: HttpRequest) -> str | None:
+    """Huella del access token del request; None si no hay token o no la trae."""
+    auth_header = request.META.get("HTTP_AUTHORIZATION", "")
+    if not auth_header.startswith("Bearer "):
+        return None
+    try:
+        token = AccessToken(auth_header.split(" ", 1)[1])
+    except TokenError:
+        # Token inválido: lo rechaza la autenticación de DRF
+        return None
+    return token.get(FINGERPRINT_CLAIM)
+
+
+def _unauthorized() -> HttpResponse:
+    response = HttpResponse(status=401)
+    response["Cache-Control"] = "no-store"
+    response["WWW-Authenticate"] = "Bearer"
+    return response
+
+
 class SessionSecurityMiddleware:
-    """Invalida sesiones cuando cambia IP o user agent."""
+    """
+    Invalida sesiones cuando cambia IP o user agent.
+
+    Con ``SESSION_SECURITY_STATELESS`` los requests con un access token que
+    trae la huella (``FINGERPRINT_CLAIM``) se validan contra el token, sin
+    leer ni escribir ``django_session``. La sesión en base de datos solo se
+    consulta en el resto de requests (tokens anteriores, admin de Django).
+    """
 
     def __init__(self, get_response):
         self.get_response = get_response
+        self.stateless = getattr(settings, "SESSION_SECURITY_STATELESS", False)
 
     def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.stateless:
+            huella = _bearer_fingerprint(request)
+            if huella is not None:
+                if not constant_time_compare(huella, session_fingerprint(request)):
+                    return _unauthorized()
+                return self.get_response(request)
+
         if request.user.is_authenticated:
             session = request.session
             client_ip = _extract_client_ip(request)
@@ -50,10 +97,7 @@ class SessionSecurityMiddleware:
             if invalid_session:
                 logout(request)
                 request.session.flush()
-                response = HttpResponse(status=401)
-                response["Cache-Control"] = "no-store"
-                response["WWW-Authenticate"] = "Bearer"
-                return response
+                return _unauthorized()
 
         response = self.get_response(request)
         return response
@@ -105,8 +105,48 @@ WSGI_APPLICATION = "src.callcentersite.wsgi.application"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 AUTH_USER_MODEL = "users.User"
 
+# Hash preferido: PBKDF2 con factor de trabajo configurable; los hashes con
+# otro factor o hasher se rehashean en el siguiente login
+PASSWORD_HASHERS = [
+    "callcentersite.apps.authentication.hashing.TunablePBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+PASSWORD_HASH_ITERATIONS = int(os.getenv("PASSWORD_HASH_ITERATIONS", "1000000"))
+# Pool de procesos para el hashing del login (apps.authentication.hashing)
+PASSWORD_HASHING_POOL_ENABLED = os.getenv("PASSWORD_HASHING_POOL_ENABLED", "true").lower() == "true"
+PASSWORD_HASHING_WORKERS = int(os.getenv("PASSWORD_HASHING_WORKERS", "1"))
+# Ranuras de hashing para todo el host, compartidas por los procesos web
+PASSWORD_HASHING_MAX_CONCURRENT = int(os.getenv("PASSWORD_HASHING_MAX_CONCURRENT", "4"))
+PASSWORD_HASHING_SLOTS_DIR = os.getenv("PASSWORD_HASHING_SLOTS_DIR", "")
+PASSWORD_HASHING_ADMISSION_TIMEOUT = float(os.getenv("PASSWORD_HASHING_ADMISSION_TIMEOUT", "2"))
+PASSWORD_HASHING_TASK_TIMEOUT = float(os.getenv("PASSWORD_HASHING_TASK_TIMEOUT", "10"))
+PASSWORD_HASHING_NICE = int(os.getenv("PASSWORD_HASHING_NICE", "10"))
+# Intérprete de los procesos del pool (bajo mod_wsgi sys.executable es httpd)
+PASSWORD_HASHING_PYTHON = os.getenv("PASSWORD_HASHING_PYTHON", "")
+
 # Session Configuration (RNF-002: NO Redis, use database)
 SESSION_ENGINE = "django.contrib.sessions.backends.db"
+# Validar IP/UA contra la huella del access token en lugar de django_session
+SESSION_SECURITY_STATELESS = os.getenv("SESSION_SECURITY_STATELESS", "true").lower() == "true"
+# last_activity_at de UserSession acumulado en memoria y escrito en lote
+# (apps.authentication.activity); la actividad dentro de la granularidad no escribe
+SESSION_ACTIVITY_COALESCE = os.getenv("SESSION_ACTIVITY_COALESCE", "true").lower() == "true"
+SESSION_ACTIVITY_GRANULARITY_SECONDS = int(os.getenv("SESSION_ACTIVITY_GRANULARITY_SECONDS", "30"))
+SESSION_ACTIVITY_FLUSH_SECONDS = int(os.getenv("SESSION_ACTIVITY_FLUSH_SECONDS", "5"))
+# Fallos de login por username e IP en ventana deslizante en memoria
+# (apps.authentication.attempts); LoginAttempt queda para forense
+LOGIN_ATTEMPTS_WINDOW_ENABLED = os.getenv("LOGIN_ATTEMPTS_WINDOW_ENABLED", "true").lower() == "true"
+LOGIN_ATTEMPTS_WINDOW_SECONDS = int(os.getenv("LOGIN_ATTEMPTS_WINDOW_SECONDS", "900"))
+LOGIN_ATTEMPTS_WINDOW_BUCKETS = int(os.getenv("LOGIN_ATTEMPTS_WINDOW_BUCKETS", "60"))
+LOGIN_ATTEMPTS_MAX_KEYS = int(os.getenv("LOGIN_ATTEMPTS_MAX_KEYS", "100000"))
+LOGIN_ATTEMPTS_MAX_PER_USERNAME = int(os.getenv("LOGIN_ATTEMPTS_MAX_PER_USERNAME", "10"))
+LOGIN_ATTEMPTS_MAX_PER_IP = int(os.getenv("LOGIN_ATTEMPTS_MAX_PER_IP", "200"))
+# Segunda lectura del arranque: debe superar AUDIT_ASYNC_FLUSH_MS
+LOGIN_ATTEMPTS_WARMUP_LAG_SECONDS = float(os.getenv("LOGIN_ATTEMPTS_WARMUP_LAG_SECONDS", "1"))
+LOGIN_ATTEMPTS_RETENTION_DAYS = int(os.getenv("LOGIN_ATTEMPTS_RETENTION_DAYS", "90"))
 
 DATABASES = {
     "default": {
@@ -209,9 +249,39 @@ SIMPLE_JWT = {
 }
 
 AUDIT_LOG_RETENTION_DAYS = 730
+# Particiones mensuales de auditoria (manage_audit_partitions, solo PostgreSQL)
+AUDIT_PARTITIONS_MONTHS_AHEAD = int(os.getenv("AUDIT_PARTITIONS_MONTHS_AHEAD", "3"))
+AUDIT_ARCHIVE_SCHEMA = os.getenv("AUDIT_ARCHIVE_SCHEMA", "audit_archive")
+# Escritor asincrono de auditoria (apps.audit.writer): cola acotada + bulk_create
+AUDIT_ASYNC_ENABLED = os.getenv("AUDIT_ASYNC_ENABLED", "true").lower() == "true"
+AUDIT_ASYNC_QUEUE_SIZE = int(os.getenv("AUDIT_ASYNC_QUEUE_SIZE", "10000"))
+AUDIT_ASYNC_BATCH_SIZE = int(os.getenv("AUDIT_ASYNC_BATCH_SIZE", "500"))
+AUDIT_ASYNC_FLUSH_MS = int(os.getenv("AUDIT_ASYNC_FLUSH_MS", "250"))
+AUDIT_ASYNC_SHUTDOWN_TIMEOUT = float(os.getenv("AUDIT_ASYNC_SHUTDOWN_TIMEOUT", "10"))
+# Lotes que no pudieron escribirse por caida de la base de datos
+AUDIT_SPOOL_DIR = os.getenv("AUDIT_SPOOL_DIR", str(BASE_DIR.parent.parent / "var" / "audit_spool"))
+# Filas por bloque (y por checkpoint) en la exportacion de auditoria
+AUDIT_EXPORT_CHUNK_SIZE = int(os.getenv("AUDIT_EXPORT_CHUNK_SIZE", "5000"))
 APPLICATION_LOG_RETENTION_DAYS = 30
 ACCESS_LOG_RETENTION_DAYS = 90
 
 ETL_FREQUENCY_HOURS = int(os.getenv("ETL_FREQUENCY_HOURS", "6"))
 ETL_BATCH_SIZE = int(os.getenv("ETL_BATCH_SIZE", "1000"))
-ETL_RETENTION_DAYS = int(os.getenv("ETL_RETENTION_DAYS", "730"))
\ No newline at end of file
+ETL_RETENTION_DAYS = int(os.getenv("ETL_RETENTION_DAYS", "730"))
+ETL_BACKFILL_WORKERS = int(os.getenv("ETL_BACKFILL_WORKERS", "4"))
+ETL_LOADER_BACKEND = os.getenv("ETL_LOADER_BACKEND", "orm")
+# Lease de los jobs de la cola ETL: sin heartbeat en este tiempo el job se reencola
+ETL_JOB_LEASE_SECONDS = int(os.getenv("ETL_JOB_LEASE_SECONDS", "300"))
+ETL_JOB_MAX_ATTEMPTS = int(os.getenv("ETL_JOB_MAX_ATTEMPTS", "3"))
+IVR_SERVICE_LEVEL_SECONDS = int(os.getenv("IVR_SERVICE_LEVEL_SECONDS", "20"))
+
+# Motor de verificacion de permisos de apps.permissions: orm, cached, bitset,
+# materialized o sql (los consumidores de apps.users usan siempre granular)
+PERMISOS_BACKEND = os.getenv("PERMISOS_BACKEND", "cached")
+# Cache en proceso de capacidades compiladas (RNF-002: sin Redis)
+PERMISOS_CACHE_ENABLED = os.getenv("PERMISOS_CACHE_ENABLED", "true").lower() == "true"
+PERMISOS_CACHE_TTL_SECONDS = int(os.getenv("PERMISOS_CACHE_TTL_SECONDS", "300"))
+PERMISOS_CACHE_MAX_USUARIOS = int(os.getenv("PERMISOS_CACHE_MAX_USUARIOS", "10000"))
+# Invalidacion entre procesos via LISTEN/NOTIFY de PostgreSQL
+PERMISOS_CACHE_LISTEN = os.getenv("PERMISOS_CACHE_LISTEN", "true").lower() == "true"
+PERMISOS_CACHE_CANAL = os.getenv("PERMISOS_CACHE_CANAL", "permisos_cache")
@@ -20,3 +20,20 @@ DATABASES = {
         "NAME": ":memory:",
     },
 }
+
+# El cache de capacidades sobrevive al rollback de cada test; sus propios
+# tests lo activan explicitamente.
+PERMISOS_CACHE_ENABLED = False
+
+# Los tests leen la auditoria justo despues de generarla
+AUDIT_ASYNC_ENABLED = False
+
+# Los tests leen last_activity_at justo despues de actualizarlo
+SESSION_ACTIVITY_COALESCE = False
+
+# El contador en memoria sobrevive al rollback de cada test; sus propios
+# tests lo activan explicitamente.
+LOGIN_ATTEMPTS_WINDOW_ENABLED = False
+
+# Hashing en linea: sin procesos hijos en los tests
+PASSWORD_HASHING_POOL_ENABLED = False
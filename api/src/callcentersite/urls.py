@@ -54,6 +54,7 @@ urlpatterns = [
     path("api/v1/notifications/", include("callcentersite.apps.notifications.urls")),
     path("api/v1/etl/", include("callcentersite.apps.etl.urls")),
     path("api/v1/permissions/", include("callcentersite.apps.permissions.urls")),
+    path("api/v1/audit/", include("callcentersite.apps.audit.urls")),
     path("api/v1/llamadas/", include("callcentersite.apps.llamadas.urls")),
     
     # **************** INCLUSIONES DE PAQUETES EXTERNOS ****************
@@ -0,0 +1,159 @@
+"""
+Tests para la exportación de auditoría en NDJSON/CSV comprimidos.
+"""
+
+import csv
+import gzip
+import io
+import json
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from callcentersite.apps.audit import export
+from callcentersite.apps.audit.models import AuditLog
+from callcentersite.apps.audit.views import CAPACIDAD_EXPORTAR_AUDITORIA
+from callcentersite.apps.users.models_permisos_granular import (
+    Capacidad,
+    GrupoPermiso,
+    UsuarioGrupo,
+)
+
+User = get_user_model()
+
+URL = "/api/v1/audit/logs/exportar/"
+
+
+@pytest.fixture
+def client(db):
+    user = User.objects.create_user(username="cumplimiento", password="x", email="c@test.com")
+    capacidad = Capacidad.objects.create(
+        codigo=CAPACIDAD_EXPORTAR_AUDITORIA, nombre="Exportar auditoria", activa=True
+    )
+    grupo = GrupoPermiso.objects.create(codigo="cumplimiento", nombre="Cumplimiento", activo=True)
+    grupo.capacidades.add(capacidad)
+    UsuarioGrupo.objects.create(usuario=user, grupo=grupo)
+
+    api_client = APIClient()
+    api_client.force_authenticate(user)
+    return api_client
+
+
+@pytest.fixture
+def logs(db):
+    inicio = timezone.now() - timedelta(days=10)
+    return AuditLog.objects.bulk_create(
+        AuditLog(
+            timestamp=inicio + timedelta(days=i // 2),
+            event_type="LOGIN_FAILURE" if i % 3 == 0 else "LOGIN_SUCCESS",
+            action="login",
+            user_agent="Agente\ncon salto",
+            metadata={"i": i},
+        )
+        for i in range(10)
+    )
+
+
+def _descargar(client, **params):
+    response = client.get(URL, params)
+    assert response.status_code == 200
+    assert response["Content-Type"] == "application/gzip"
+    return gzip.decompress(b"".join(response.streaming_content)).decode("utf-8")
+
+
+@pytest.mark.django_db
+class TestAuditExportEndpoint:
+    """GET /api/v1/audit/logs/exportar/"""
+
+    def test_ndjson_en_orden_cronologico(self, client, logs):
+        filas = [json.loads(linea) for linea in _descargar(client).splitlines()]
+
+        assert [fila["metadata"]["i"] for fila in filas] == list(range(10))
+        assert filas[0]["user_agent"] == "Agente\ncon salto"
+
+    def test_csv_con_encabezado_y_filtro(self, client, logs):
+        texto = _descargar(client, formato="csv", event_type="LOGIN_FAILURE")
+        filas = list(csv.DictReader(io.StringIO(texto)))
+
+        assert list(filas[0]) == list(export.COLUMNAS)
+        assert [json.loads(fila["metadata"])["i"] for fila in filas] == [0, 3, 6, 9]
+
+    def test_rango_de_fechas(self, client, logs):
+        texto = _descargar(
+            client, desde=logs[4].timestamp.isoformat(), hasta=logs[7].timestamp.isoformat()
+        )
+
+        assert [json.loads(linea)["metadata"]["i"] for linea in texto.splitlines()] == [4, 5, 6, 7]
+
+    def test_reanuda_despues_de_la_ultima_fila(self, client, logs):
+        primeras = [json.loads(linea) for linea in _descargar(client).splitlines()[:6]]
+
+        resto = _descargar(client, despues_id=primeras[-1]["id"])
+
+        assert [json.loads(linea)["metadata"]["i"] for linea in resto.splitlines()] == [6, 7, 8, 9]
+
+    def test_formato_y_cursor_invalidos(self, client, logs):
+        assert client.get(URL, {"formato": "xml"}).status_code == 400
+        assert client.get(URL, {"cursor": "xxxx"}).status_code == 400
+
+    def test_usuario_no_numerico_es_400(self, client, logs):
+        respuesta = client.get(URL, {"user": "abc"})
+
+        assert respuesta.status_code == 400
+        assert "user" in respuesta.json()
+
+    def test_sin_capacidad_es_403(self, db, logs):
+        api_client = APIClient()
+        otro = User.objects.create_user(username="otro", password="x", email="o@test.com")
+        api_client.force_authenticate(otro)
+
+        assert api_client.get(URL).status_code == 403
+
+
+@pytest.mark.django_db
+class TestExportAuditLogCommand:
+    """python manage.py export_audit_log"""
+
+    def test_exporta_y_elimina_el_checkpoint(self, tmp_path, logs):
+        salida = tmp_path / "auditoria.ndjson.gz"
+
+        call_command("export_audit_log", output=str(salida), chunk_size=3, stdout=io.StringIO())
+
+        assert len(gzip.decompress(salida.read_bytes()).splitlines()) == 10
+        assert not (tmp_path / "auditoria.ndjson.gz.cursor").exists()
+
+    def test_resume_tras_interrupcion(self, tmp_path, logs):
+        salida = tmp_path / "auditoria.csv.gz"
+        originales = export.bloques
+
+        def falla_en_el_segundo(*args, **kwargs):
+            bloques = originales(*args, **kwargs)
+            yield next(bloques)
+            raise OSError("disco lleno")
+
+        with mock.patch.object(export, "bloques", falla_en_el_segundo):
+            with pytest.raises(OSError):
+                call_command(
+                    "export_audit_log", output=str(salida), format="csv", chunk_size=4
+                )
+        with open(salida, "ab") as archivo:
+            archivo.write(b"\x1f\x8b basura a medias")
+
+        with pytest.raises(CommandError):
+            call_command("export_audit_log", output=str(salida), format="csv", chunk_size=4)
+        call_command(
+            "export_audit_log",
+            output=str(salida),
+            format="csv",
+            chunk_size=4,
+            resume=True,
+            stdout=io.StringIO(),
+        )
+
+        filas = list(csv.DictReader(io.StringIO(gzip.decompress(salida.read_bytes()).decode())))
+        assert [json.loads(fila["metadata"])["i"] for fila in filas] == list(range(10))
@@ -0,0 +1,117 @@
+"""
+Tests para la búsqueda de auditoría paginada por clave (timestamp, id).
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from callcentersite.apps.audit.models import AuditLog
+from callcentersite.apps.audit.views import CAPACIDAD_VER_AUDITORIA
+from callcentersite.apps.common.pagination import codificar_cursor, decodificar_cursor
+from callcentersite.apps.users.models_permisos_granular import (
+    Capacidad,
+    GrupoPermiso,
+    UsuarioGrupo,
+)
+
+User = get_user_model()
+
+URL = "/api/v1/audit/logs/"
+
+
+@pytest.fixture
+def auditor(db):
+    user = User.objects.create_user(username="auditor", password="x", email="auditor@test.com")
+    capacidad = Capacidad.objects.create(
+        codigo=CAPACIDAD_VER_AUDITORIA, nombre="Ver auditoria", activa=True
+    )
+    grupo = GrupoPermiso.objects.create(codigo="auditores", nombre="Auditores", activo=True)
+    grupo.capacidades.add(capacidad)
+    UsuarioGrupo.objects.create(usuario=user, grupo=grupo)
+    return user
+
+
+@pytest.fixture
+def client(auditor):
+    api_client = APIClient()
+    api_client.force_authenticate(auditor)
+    return api_client
+
+
+def _crear_logs(cantidad, momento=None, event_type="LOGIN_SUCCESS", result="SUCCESS"):
+    momento = momento or timezone.now()
+    return AuditLog.objects.bulk_create(
+        AuditLog(timestamp=momento, event_type=event_type, action=event_type, result=result)
+        for _ in range(cantidad)
+    )
+
+
+@pytest.mark.django_db
+class TestAuditLogSearch:
+    """Recorrido por cursor sin COUNT ni OFFSET."""
+
+    def test_recorre_todas_las_filas_con_empates_de_timestamp(self, client):
+        mismo_momento = timezone.now()
+        _crear_logs(5, mismo_momento)
+        _crear_logs(2, mismo_momento - timedelta(minutes=1))
+        esperados = list(AuditLog.objects.order_by("-timestamp", "-id").values_list("id", flat=True))
+
+        vistos = []
+        cursor = None
+        for _ in range(10):
+            params = {"page_size": 3}
+            if cursor:
+                params["cursor"] = cursor
+            respuesta = client.get(URL, params)
+            assert respuesta.status_code == 200
+            vistos.extend(fila["id"] for fila in respuesta.data["results"])
+            cursor = respuesta.data["cursor"]
+            if cursor is None:
+                break
+
+        assert vistos == esperados
+
+    def test_filtra_por_tipo_de_evento_y_resultado(self, client):
+        _crear_logs(2, event_type="LOGIN_SUCCESS")
+        _crear_logs(3, event_type="LOGIN_FAILURE", result="FAILURE")
+
+        respuesta = client.get(URL, {"event_type": "LOGIN_FAILURE", "result": "FAILURE"})
+
+        assert respuesta.status_code == 200
+        assert len(respuesta.data["results"]) == 3
+        assert respuesta.data["next"] is None
+
+    def test_cursor_invalido_es_400(self, client):
+        respuesta = client.get(URL, {"cursor": "no-es-un-cursor"})
+
+        assert respuesta.status_code == 400
+
+    def test_usuario_no_numerico_es_400(self, client):
+        respuesta = client.get(URL, {"user": "abc"})
+
+        assert respuesta.status_code == 400
+        assert "user" in respuesta.data
+
+    def test_sin_capacidad_es_403(self, db):
+        user = User.objects.create_user(username="agente", password="x", email="agente@test.com")
+        api_client = APIClient()
+        api_client.force_authenticate(user)
+
+        assert api_client.get(URL).status_code == 403
+
+
+class TestCursor:
+    """Codificación del token de continuación."""
+
+    def test_ida_y_vuelta(self):
+        momento = timezone.now()
+
+        assert decodificar_cursor(codificar_cursor(momento, 42)) == (momento, 42)
+
+    def test_token_corrupto(self):
+        with pytest.raises(ValueError):
+            decodificar_cursor("xxxx")
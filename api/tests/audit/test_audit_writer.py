@@ -0,0 +1,174 @@
+"""
+Tests para el escritor asíncrono de auditoría (apps.audit.writer).
+
+Los escritores se crean con ``autostart=False`` y se vacían con ``flush()``
+en el hilo del test, así la base de datos de pruebas es la misma.
+"""
+
+import os
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import DataError, OperationalError
+
+from callcentersite.apps.audit import writer as audit_writer
+from callcentersite.apps.audit.models import AuditLog
+from callcentersite.apps.audit.services import AuditService
+from callcentersite.apps.audit.writer import AuditWriter, record
+from callcentersite.apps.permissions.models import AuditoriaPermiso
+from callcentersite.apps.permissions.services import PermisoService
+
+User = get_user_model()
+
+
+@pytest.fixture
+def escritor(tmp_path, settings, monkeypatch):
+    settings.AUDIT_ASYNC_ENABLED = True
+    instancia = AuditWriter(queue_size=10, batch_size=3, spool_dir=tmp_path, autostart=False)
+    monkeypatch.setattr(audit_writer, "_writer", instancia)
+    return instancia
+
+
+@pytest.mark.django_db
+class TestAuditWriter:
+    """Encolado, escritura en lotes y spool en disco."""
+
+    def test_record_encola_al_confirmar_y_flush_inserta(
+        self, escritor, django_capture_on_commit_callbacks
+    ):
+        with django_capture_on_commit_callbacks(execute=True):
+            log = record(AuditLog, event_type="LOGIN_SUCCESS", result="SUCCESS")
+
+        assert log.pk is None
+        assert AuditLog.objects.count() == 0
+        assert escritor.stats()["pendientes"] == 1
+
+        assert escritor.flush() == 1
+
+        guardado = AuditLog.objects.get()
+        assert guardado.action == "LOGIN_SUCCESS"
+        assert guardado.timestamp == log.timestamp
+
+    def test_servicios_usan_el_escritor(self, escritor, django_capture_on_commit_callbacks):
+        user = User.objects.create_user(username="auditado", password="x", email="a@test.com")
+
+        with django_capture_on_commit_callbacks(execute=True):
+            AuditService.log(user=user, action="export", resource="reportes")
+            for _ in range(4):
+                PermisoService.registrar_acceso(
+                    usuario_id=user.id,
+                    capacidad="sistema.reportes.ivr.exportar",
+                    accion="acceso_concedido",
+                )
+
+        assert escritor.flush() == 5
+        assert AuditLog.objects.filter(action="export").count() == 1
+        assert AuditoriaPermiso.objects.filter(usuario=user).count() == 4
+
+    def test_rollback_descarta_el_registro(self, escritor, django_capture_on_commit_callbacks):
+        with django_capture_on_commit_callbacks(execute=False) as callbacks:
+            record(AuditLog, event_type="LOGIN_FAILURE")
+
+        assert escritor.stats()["pendientes"] == 0
+        assert len(callbacks) == 1
+
+    def test_cola_llena_escribe_en_linea(
+        self, tmp_path, settings, monkeypatch, django_capture_on_commit_callbacks
+    ):
+        settings.AUDIT_ASYNC_ENABLED = True
+        lleno = AuditWriter(queue_size=1, spool_dir=tmp_path, autostart=False)
+        monkeypatch.setattr(audit_writer, "_writer", lleno)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            record(AuditLog, event_type="A")
+            record(AuditLog, event_type="B")
+
+        assert list(AuditLog.objects.values_list("event_type", flat=True)) == ["B"]
+        assert lleno.stats()["desbordes"] == 1
+
+    def test_base_caida_va_al_spool_y_se_reinserta(self, escritor, tmp_path):
+        escritor.enqueue(AuditLog(event_type="USER_LOCKED", action="USER_LOCKED"))
+
+        with mock.patch.object(
+            AuditLog.objects, "bulk_create", side_effect=OperationalError("sin conexion")
+        ):
+            escritor.flush()
+
+        assert AuditLog.objects.count() == 0
+        assert len(list(tmp_path.glob("audit-*.json"))) == 1
+        assert escritor.stats()["spooleados"] == 1
+
+        assert escritor.replay_spool() == 1
+
+        assert AuditLog.objects.get().event_type == "USER_LOCKED"
+        assert list(tmp_path.glob("audit-*.json")) == []
+
+    def test_fila_con_dato_invalido_se_aisla_del_lote(self, escritor, tmp_path):
+        bulk_create = AuditLog.objects.bulk_create
+
+        def rechaza_la_mala(objetos, **kwargs):
+            if any(objeto.event_type == "MALO" for objeto in objetos):
+                raise DataError("valor fuera de rango")
+            return bulk_create(objetos, **kwargs)
+
+        escritor.enqueue(AuditLog(event_type="MALO", action="MALO"))
+        escritor.enqueue(AuditLog(event_type="LOGOUT", action="LOGOUT"))
+        with mock.patch.object(AuditLog.objects, "bulk_create", side_effect=rechaza_la_mala):
+            escritor.flush()
+
+        assert AuditLog.objects.get().event_type == "LOGOUT"
+        assert escritor.stats()["rechazados"] == 1
+        assert len(list(tmp_path.glob("rechazado-*.json"))) == 1
+
+    def test_un_lote_fallido_no_detiene_el_hilo(self, escritor, tmp_path):
+        write = escritor.write
+        llamadas = []
+
+        def falla_una_vez(lote):
+            llamadas.append(lote)
+            if len(llamadas) == 1:
+                # Un record() posterior al fallo
+                escritor.enqueue(AuditLog(event_type="LOGOUT", action="LOGOUT"))
+                raise RuntimeError("fallo inesperado")
+            write(lote)
+            escritor._stop.set()
+
+        escritor.enqueue(AuditLog(event_type="USER_LOCKED", action="USER_LOCKED"))
+        with mock.patch.object(escritor, "write", side_effect=falla_una_vez), mock.patch.object(
+            audit_writer.connection, "close"
+        ):
+            escritor._run()
+
+        assert AuditLog.objects.get().event_type == "LOGOUT"
+        assert len(list(tmp_path.glob("rechazado-*.json"))) == 1
+
+    def test_archivo_reclamado_por_otro_proceso_se_salta(self, escritor, tmp_path):
+        escritor._spool([AuditLog(event_type="USER_LOCKED", action="USER_LOCKED")])
+        (archivo,) = tmp_path.glob("audit-*.json")
+        ajeno = archivo.with_name(f".reclamado-{os.getppid()}-{archivo.name}")
+        os.replace(archivo, ajeno)
+
+        assert escritor.replay_spool() == 0
+
+        assert AuditLog.objects.count() == 0
+        assert ajeno.exists()
+
+    def test_reclamo_de_proceso_muerto_vuelve_al_spool(self, escritor, tmp_path):
+        escritor._spool([AuditLog(event_type="USER_LOCKED", action="USER_LOCKED")])
+        (archivo,) = tmp_path.glob("audit-*.json")
+        os.replace(archivo, archivo.with_name(f".reclamado-1234-{archivo.name}"))
+
+        with mock.patch.object(audit_writer, "_proceso_vivo", return_value=False):
+            assert escritor.replay_spool() == 1
+
+        assert AuditLog.objects.get().event_type == "USER_LOCKED"
+        assert list(tmp_path.iterdir()) == []
+
+    def test_sin_async_inserta_directo(self, settings):
+        settings.AUDIT_ASYNC_ENABLED = False
+
+        log = record(AuditLog, event_type="LOGOUT")
+
+        assert log.pk is not None
+        assert log.action == "LOGOUT"
@@ -0,0 +1,174 @@
+"""
+Tests para el particionado mensual de las tablas de auditoría.
+
+El particionado real requiere PostgreSQL; aquí se cubren el cálculo de
+meses y límites, el DDL que emite la conversión (con un cursor que lo
+registra) y el comportamiento del comando en otros motores.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from callcentersite.apps.common import particiones
+from callcentersite.apps.common.particiones import (
+    convertir_a_particionada,
+    inicio_de_mes,
+    nombre_particion,
+    parsear_limites,
+    sumar_meses,
+)
+
+
+class TestCalculoDeMeses:
+    """Aritmética de meses usada para nombrar y acotar particiones."""
+
+    def test_inicio_de_mes_en_utc(self):
+        momento = datetime(2026, 3, 17, 15, 30, tzinfo=dt_timezone.utc)
+
+        assert inicio_de_mes(momento) == datetime(2026, 3, 1, tzinfo=dt_timezone.utc)
+
+    def test_sumar_meses_cruza_el_anio(self):
+        mes = datetime(2026, 11, 1, tzinfo=dt_timezone.utc)
+
+        assert sumar_meses(mes, 2) == datetime(2027, 1, 1, tzinfo=dt_timezone.utc)
+        assert sumar_meses(mes, -11) == datetime(2025, 12, 1, tzinfo=dt_timezone.utc)
+
+    def test_nombre_particion(self):
+        mes = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+
+        assert nombre_particion("audit_auditlog", mes) == "audit_auditlog_p202601"
+
+
+class TestParsearLimites:
+    """Interpretación de pg_get_expr(relpartbound)."""
+
+    def test_rango_mensual(self):
+        desde, hasta, default = parsear_limites(
+            "FOR VALUES FROM ('2026-01-01 00:00:00+00') TO ('2026-02-01 00:00:00+00')"
+        )
+
+        assert desde == datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+        assert hasta == datetime(2026, 2, 1, tzinfo=dt_timezone.utc)
+        assert default is False
+
+    def test_historico_desde_minvalue(self):
+        desde, hasta, _ = parsear_limites(
+            "FOR VALUES FROM (MINVALUE) TO ('2026-11-01 00:00:00+00')"
+        )
+
+        assert desde is None
+        assert hasta == datetime(2026, 11, 1, tzinfo=dt_timezone.utc)
+
+    def test_default(self):
+        assert parsear_limites("DEFAULT") == (None, None, True)
+
+
+class _CursorRegistrado:
+    """Cursor que anota cada sentencia y responde a las consultas de la conversión."""
+
+    def __init__(self, sentencias):
+        self.sentencias = sentencias
+        self._ultima = ""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self._ultima = sql
+        self.sentencias.append(" ".join(sql.split()))
+
+    def fetchone(self):
+        if "pg_get_serial_sequence" in self._ultima:
+            return ("audit_auditlog_id_seq", "NO")
+        if "MAX(id)" in self._ultima:
+            return (41,)
+        if "MAX(" in self._ultima:
+            return (datetime(2026, 10, 17, tzinfo=dt_timezone.utc),)
+        return (False,)
+
+    def fetchall(self):
+        if "pg_constraint" in self._ultima:
+            return [("audit_auditlog_pkey", "p", "PRIMARY KEY (id)")]
+        return []
+
+
+class TestConvertirDDL:
+    """Sentencias de la conversión en PostgreSQL."""
+
+    def _convertir(self):
+        sentencias = []
+        conexion = mock.Mock(vendor="postgresql", alias="default")
+        conexion.ops.quote_name = lambda nombre: f'"{nombre}"'
+        conexion.cursor = lambda: _CursorRegistrado(sentencias)
+
+        @contextmanager
+        def transaccion(using=None):
+            sentencias.append("BEGIN")
+            yield
+            sentencias.append("COMMIT")
+
+        with (
+            mock.patch.object(particiones, "es_particionada", return_value=False),
+            mock.patch.object(particiones.transaction, "atomic", transaccion),
+            mock.patch.object(particiones, "datetime", wraps=datetime) as reloj,
+        ):
+            reloj.now.return_value = datetime(2026, 10, 18, tzinfo=dt_timezone.utc)
+            assert convertir_a_particionada(conexion, "audit_auditlog", "timestamp", 0)
+        return sentencias
+
+    def test_check_validado_antes_de_adjuntar_el_historico(self):
+        sentencias = self._convertir()
+
+        def posicion(fragmento):
+            return next(i for i, sql in enumerate(sentencias) if fragmento in sql)
+
+        agregar = posicion('ADD CONSTRAINT "audit_auditlog_rango" CHECK')
+        validar = posicion('VALIDATE CONSTRAINT "audit_auditlog_rango"')
+        renombrar = posicion('RENAME TO "audit_auditlog_historico"')
+        adjuntar = posicion('ATTACH PARTITION "audit_auditlog_historico"')
+
+        assert sentencias[agregar].endswith(
+            """"timestamp" < '2026-11-01T00:00:00+00:00') NOT VALID"""
+        )
+        assert sentencias[adjuntar].endswith(
+            "FOR VALUES FROM (MINVALUE) TO ('2026-11-01T00:00:00+00:00')"
+        )
+        # Cada paso del CHECK confirma antes de la transacción que bloquea la tabla
+        assert agregar < validar < renombrar < adjuntar
+        assert sentencias[validar - 1] == "BEGIN" and sentencias[validar + 1] == "COMMIT"
+        conversion = max(i for i in range(renombrar) if sentencias[i] == "BEGIN")
+        assert conversion > validar + 1
+
+    def test_el_padre_no_hereda_el_check_y_el_historico_lo_suelta(self):
+        sentencias = self._convertir()
+
+        assert 'ALTER TABLE "audit_auditlog" DROP CONSTRAINT "audit_auditlog_rango"' in sentencias
+        assert sentencias.index(
+            'ALTER TABLE "audit_auditlog_historico" DROP CONSTRAINT "audit_auditlog_rango"'
+        ) > next(i for i, sql in enumerate(sentencias) if "ATTACH PARTITION" in sql)
+
+
+@pytest.mark.django_db
+class TestSinPostgreSQL:
+    """En sqlite todo es no-op."""
+
+    @pytest.mark.skipif(connection.vendor == "postgresql", reason="solo motores sin particionado")
+    def test_convertir_no_hace_nada(self):
+        assert convertir_a_particionada(connection, "audit_auditlog", "timestamp") is False
+
+    @pytest.mark.skipif(connection.vendor == "postgresql", reason="solo motores sin particionado")
+    def test_comando_omite_tablas_no_particionadas(self):
+        salida = StringIO()
+
+        call_command("manage_audit_partitions", stdout=salida)
+
+        assert "audit_auditlog: no particionada, se omite" in salida.getvalue()
@@ -0,0 +1,184 @@
+"""
+Tests para el conteo de intentos de login en ventana deslizante
+(apps.authentication.attempts).
+
+El contador se crea por test y se inyecta en el módulo para no arrastrar
+conteos entre tests.
+"""
+
+import threading
+from datetime import timedelta
+
+import pytest
+from django.test import RequestFactory
+from django.utils.timezone import now
+from rest_framework.test import APIClient
+
+from callcentersite.apps.authentication import attempts
+from callcentersite.apps.authentication.attempts import (
+    LoginAttemptCounter,
+    LoginThrottled,
+    SlidingWindowCounter,
+)
+from callcentersite.apps.authentication.jobs import prune_login_attempts
+from callcentersite.apps.authentication.models import LoginAttempt
+from callcentersite.apps.authentication.services import (
+    AuthenticationService,
+    LoginAttemptService,
+)
+from callcentersite.apps.users.models import User
+
+
+@pytest.fixture
+def counter(settings, monkeypatch):
+    settings.LOGIN_ATTEMPTS_WINDOW_ENABLED = True
+    instancia = LoginAttemptCounter(max_per_username=5, max_per_ip=8, load=False)
+    monkeypatch.setattr(attempts, "_counter", instancia)
+    return instancia
+
+
+def _login(username, password, ip='10.0.0.9'):
+    request = RequestFactory().post('/api/v1/auth/login', REMOTE_ADDR=ip)
+    return AuthenticationService.login(username=username, password=password, request=request)
+
+
+def _fallo(username, momento, ip='10.0.0.3'):
+    return LoginAttempt.objects.create(
+        username=username, ip_address=ip, user_agent='', success=False, timestamp=momento
+    )
+
+
+class TestSlidingWindowCounter:
+    """Buckets circulares por clave."""
+
+    def test_los_fallos_salen_de_la_ventana(self):
+        contador = SlidingWindowCounter(window_seconds=60, buckets=6, max_keys=10)
+        for segundo in (0, 10, 20, 30, 40):
+            contador.add('agente', 1000 + segundo)
+
+        assert contador.count('agente', 1040) == 5
+        assert contador.count('agente', 1065) == 4
+        assert contador.count('agente', 1065, window_seconds=30) == 1
+        assert contador.count('agente', 1200) == 0
+
+    def test_claves_acotadas(self):
+        contador = SlidingWindowCounter(window_seconds=60, buckets=6, max_keys=2)
+        for clave in ('a', 'b', 'c'):
+            contador.add(clave, 1000)
+
+        assert len(contador) == 2
+        assert contador.count('a', 1000) == 0
+        assert contador.descartadas == 1
+
+
+@pytest.mark.django_db
+class TestLoginAttemptCounter:
+    """Bloqueo por username y por IP sin contar filas."""
+
+    def test_conteo_sin_consultas(self, counter, django_assert_num_queries):
+        for _ in range(3):
+            counter.record_failure('agente', '10.0.0.1')
+
+        with django_assert_num_queries(0):
+            assert LoginAttemptService.count_recent_failures('agente', timedelta(minutes=15)) == 3
+            assert counter.failures(ip_address='10.0.0.1') == 3
+
+    def test_stuffing_desde_una_ip_se_corta_sin_consultas(
+        self, counter, django_assert_num_queries
+    ):
+        for i in range(8):
+            with pytest.raises(Exception, match='Credenciales inválidas'):
+                _login(f'inexistente{i}', 'x', ip='203.0.113.5')
+
+        with django_assert_num_queries(1):
+            with pytest.raises(LoginThrottled):
+                _login('otro', 'x', ip='203.0.113.5')
+
+        assert counter.stats()['rechazados'] == 1
+        assert LoginAttempt.objects.filter(
+            ip_address='203.0.113.5', reason='demasiados_intentos'
+        ).count() == 1
+
+    def test_login_exitoso_reinicia_el_username(self, counter):
+        User.objects.create_user(username='agente', password='Pass123!', email='a@ex.com')
+        with pytest.raises(Exception, match='Credenciales inválidas'):
+            _login('agente', 'Incorrecta1!')
+
+        _login('agente', 'Pass123!')
+
+        assert counter.failures(username='agente') == 0
+        assert counter.failures(ip_address='10.0.0.9') == 1
+        assert LoginAttempt.objects.filter(username='agente').count() == 2
+
+    def test_responde_429(self, counter):
+        for _ in range(5):
+            counter.record_failure('bloqueado', '10.0.0.2')
+
+        response = APIClient().post(
+            '/api/v1/auth/login/', {'username': 'bloqueado', 'password': 'x'}, format='json'
+        )
+
+        assert response.status_code == 429
+        assert response['Retry-After'] == '15'
+
+    def test_reconstruye_la_ventana_desde_la_bd(self):
+        LoginAttempt.objects.bulk_create(
+            LoginAttempt(
+                username='agente', ip_address='10.0.0.3', user_agent='', success=False,
+                timestamp=now() - timedelta(minutes=minutos)
+            )
+            for minutos in (1, 5, 30)
+        )
+
+        contador = LoginAttemptCounter(background=False)
+
+        assert contador.failures(username='agente') == 2
+        assert contador.failures(ip_address='10.0.0.3') == 2
+
+    def test_relee_lo_que_otros_procesos_tenian_en_cola(self, monkeypatch):
+        _fallo('agente', now() - timedelta(minutes=1))
+        # Durante la espera el escritor de otro proceso vuelca un fallo anterior
+        monkeypatch.setattr(
+            attempts.time, 'sleep', lambda _: _fallo('agente', now() - timedelta(minutes=2))
+        )
+        contador = LoginAttemptCounter(background=False, lag_seconds=1)
+
+        assert contador.failures(username='agente') == 2
+
+    def test_no_cuenta_dos_veces_lo_registrado_en_memoria(self, monkeypatch):
+        # El fallo de este proceso llega a la base durante la espera del arranque
+        monkeypatch.setattr(attempts.time, 'sleep', lambda _: _fallo('agente', now()))
+        contador = LoginAttemptCounter(background=False, lag_seconds=1)
+
+        contador.record_failure('agente', '10.0.0.3')
+
+        assert contador.failures(username='agente') == 1
+
+    def test_el_arranque_no_consulta_en_el_request(self, monkeypatch, django_assert_num_queries):
+        contador = LoginAttemptCounter()
+        lanzado = threading.Event()
+        monkeypatch.setattr(contador, '_calentar', lambda pid, hasta: lanzado.set())
+
+        with django_assert_num_queries(0):
+            assert contador.failures(username='agente') == 0
+
+        assert lanzado.wait(5)
+
+
+@pytest.mark.django_db
+class TestPruneLoginAttempts:
+    """Retención de la tabla de intentos."""
+
+    def test_elimina_solo_lo_vencido(self):
+        LoginAttempt.objects.bulk_create(
+            LoginAttempt(
+                username=f'u{dias}', ip_address='10.0.0.4', user_agent='', success=False,
+                timestamp=now() - timedelta(days=dias)
+            )
+            for dias in (1, 89, 91, 400)
+        )
+
+        result = prune_login_attempts(retention_days=90, batch_size=1)
+
+        assert result['deleted_attempts'] == 2
+        assert sorted(LoginAttempt.objects.values_list('username', flat=True)) == ['u1', 'u89']
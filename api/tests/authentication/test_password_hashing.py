@@ -0,0 +1,151 @@
+"""
+Tests para el hashing de contraseñas (apps.authentication.hashing).
+
+El pool de procesos se prueba sin lanzar procesos: el control de admisión
+se ejerce ocupando la ranura desde el test y el timeout de la tarea con un
+executor cuyo futuro nunca termina.
+"""
+
+from concurrent.futures import Future
+
+import pytest
+from django.contrib.auth.hashers import make_password
+from django.test import RequestFactory
+from rest_framework.test import APIClient
+
+from callcentersite.apps.authentication import hashing
+from callcentersite.apps.authentication.hashing import (
+    HashingPoolBusy,
+    PasswordHashingPool,
+    interprete_python,
+)
+from callcentersite.apps.authentication.services import AuthenticationService
+from callcentersite.apps.users.models import User
+
+TUNABLE = "callcentersite.apps.authentication.hashing.TunablePBKDF2PasswordHasher"
+
+
+@pytest.fixture
+def pbkdf2(settings):
+    settings.PASSWORD_HASHERS = [TUNABLE, "django.contrib.auth.hashers.MD5PasswordHasher"]
+    settings.PASSWORD_HASH_ITERATIONS = 1000
+    return settings
+
+
+class _ExecutorColgado:
+    """Executor cuyo futuro ya corre en el worker y no termina solo."""
+
+    def submit(self, funcion, *args):
+        self.futuro = Future()
+        self.futuro.set_running_or_notify_cancel()
+        return self.futuro
+
+
+class TestPasswordHashingPool:
+    """Control de admisión y métricas."""
+
+    def test_rechaza_si_no_hay_lugar(self, tmp_path):
+        pool = PasswordHashingPool(max_concurrent=1, slots_dir=str(tmp_path), admission_timeout=0.01)
+        pool._ranuras.adquirir(0)
+
+        with pytest.raises(HashingPoolBusy):
+            pool.run(len, "x")
+
+        assert pool.stats()["rechazadas"] == 1
+        assert pool.stats()["completadas"] == 0
+
+    def test_ranuras_compartidas_entre_pools(self, tmp_path):
+        ocupante = PasswordHashingPool(max_concurrent=1, slots_dir=str(tmp_path))
+        pool = PasswordHashingPool(max_concurrent=1, slots_dir=str(tmp_path), admission_timeout=0.01)
+        ranura = ocupante._ranuras.adquirir(0)
+
+        with pytest.raises(HashingPoolBusy):
+            pool.run(len, "x")
+
+        ocupante._ranuras.liberar(ranura)
+        assert pool._ranuras.adquirir(0) is not None
+
+    def test_timeout_de_la_tarea_es_busy_y_no_cuenta_como_completada(self, tmp_path, monkeypatch):
+        pool = PasswordHashingPool(slots_dir=str(tmp_path), task_timeout=0.01)
+        monkeypatch.setattr(pool, "_get_executor", lambda: _ExecutorColgado())
+
+        with pytest.raises(HashingPoolBusy):
+            pool.run(len, "x")
+
+        assert pool.stats()["fallidas"] == 1
+        assert pool.stats()["completadas"] == 0
+
+    def test_timeout_retiene_la_ranura_hasta_que_el_hash_termina(self, tmp_path, monkeypatch):
+        pool = PasswordHashingPool(
+            max_concurrent=1, slots_dir=str(tmp_path), admission_timeout=0.01, task_timeout=0.01
+        )
+        executor = _ExecutorColgado()
+        monkeypatch.setattr(pool, "_get_executor", lambda: executor)
+
+        with pytest.raises(HashingPoolBusy):
+            pool.run(len, "x")
+
+        assert pool._ranuras.adquirir(0) is None
+        executor.futuro.set_result(1)
+        assert pool._ranuras.adquirir(0) is not None
+
+    def test_interprete_bajo_mod_wsgi(self, monkeypatch):
+        monkeypatch.setattr(hashing.sys, "executable", "/usr/sbin/httpd")
+        monkeypatch.setattr(hashing.sys, "exec_prefix", "/opt/venv")
+
+        assert interprete_python().startswith("/opt/venv/bin/python3")
+        assert PasswordHashingPool(python="/usr/bin/python3").python == "/usr/bin/python3"
+
+    def test_login_saturado_responde_503(self, db, monkeypatch, tmp_path):
+        pool = PasswordHashingPool(max_concurrent=1, slots_dir=str(tmp_path), admission_timeout=0.01)
+        pool._ranuras.adquirir(0)
+        monkeypatch.setattr(hashing, "get_hashing_pool", lambda: pool)
+        User.objects.create_user(username="turno", password="Pass123!", email="t@ex.com")
+
+        response = APIClient().post(
+            "/api/v1/auth/login/", {"username": "turno", "password": "Pass123!"}, format="json"
+        )
+
+        assert response.status_code == 503
+        assert response["Retry-After"] == "1"
+
+
+@pytest.mark.django_db
+class TestRehashEnLogin:
+    """El hash guardado se actualiza al factor de trabajo vigente."""
+
+    def _login(self, username):
+        request = RequestFactory().post("/api/v1/auth/login")
+        return AuthenticationService.login(username=username, password="Pass123!", request=request)
+
+    def test_hash_legado_se_migra_al_hasher_preferido(self, pbkdf2):
+        user = User.objects.create_user(username="legado", password="Pass123!", email="l@ex.com")
+        user.password = make_password("Pass123!", hasher="md5")
+        user.save(update_fields=["password"])
+
+        self._login("legado")
+
+        user.refresh_from_db()
+        assert user.password.startswith("pbkdf2_sha256$1000$")
+        assert user.check_password("Pass123!")
+
+    def test_cambio_de_iteraciones_rehashea(self, pbkdf2):
+        user = User.objects.create_user(username="agente", password="Pass123!", email="a@ex.com")
+        anterior = User.objects.get(pk=user.pk).password
+
+        self._login("agente")
+        assert User.objects.get(pk=user.pk).password == anterior
+
+        pbkdf2.PASSWORD_HASH_ITERATIONS = 2000
+        # Reasignar PASSWORD_HASHERS limpia las instancias de hasher cacheadas
+        pbkdf2.PASSWORD_HASHERS = [TUNABLE]
+        self._login("agente")
+        assert User.objects.get(pk=user.pk).password.startswith("pbkdf2_sha256$2000$")
+
+    def test_contrasena_incorrecta_no_rehashea(self, pbkdf2):
+        user = User.objects.create_user(username="otro", password="Pass123!", email="o@ex.com")
+        user.password = make_password("Pass123!", hasher="md5")
+        user.save(update_fields=["password"])
+
+        assert hashing.check_password("Incorrecta1!", user.password) == (False, None)
+        assert hashing.check_password("Pass123!", "!sin-password") == (False, None)
@@ -0,0 +1,111 @@
+"""
+Tests para la coalescencia de last_activity_at (apps.authentication.activity).
+
+El coalescedor se crea con ``autostart=False`` y se vacía con ``flush()`` en
+el hilo del test.
+"""
+
+from datetime import timedelta
+
+import pytest
+from django.test import RequestFactory
+from django.utils.timezone import now
+
+from callcentersite.apps.authentication import activity
+from callcentersite.apps.authentication.activity import ActivityCoalescer
+from callcentersite.apps.authentication.jobs import close_inactive_sessions
+from callcentersite.apps.authentication.services import update_session_activity
+from callcentersite.apps.users.models import User, UserSession
+
+
+@pytest.fixture
+def coalescer(settings, monkeypatch):
+    settings.SESSION_ACTIVITY_COALESCE = True
+    instancia = ActivityCoalescer(granularity_seconds=30, autostart=False)
+    monkeypatch.setattr(activity, "_coalescer", instancia)
+    return instancia
+
+
+@pytest.fixture
+def sesion(db):
+    user = User.objects.create_user(username='activo', password='Pass123!', email='a@ex.com')
+    return UserSession.objects.create(
+        user=user, session_key='abc', is_active=True,
+        last_activity_at=now() - timedelta(minutes=29)
+    )
+
+
+@pytest.mark.django_db
+class TestActivityCoalescer:
+    """Escritura en lote de la actividad de sesiones."""
+
+    def test_actividad_dentro_de_la_granularidad_no_consulta_la_bd(
+        self, coalescer, sesion, django_assert_num_queries
+    ):
+        request = RequestFactory().get('/api/v1/endpoint', REMOTE_ADDR='10.0.0.7')
+
+        with django_assert_num_queries(1):
+            update_session_activity(sesion.user, request)
+        with django_assert_num_queries(0):
+            for _ in range(10):
+                update_session_activity(sesion.user, request)
+
+        sesion.refresh_from_db()
+        assert sesion.last_activity_at < now() - timedelta(minutes=28)
+
+        assert coalescer.flush() == 1
+
+        sesion.refresh_from_db()
+        assert sesion.last_activity_at > now() - timedelta(seconds=30)
+        assert sesion.ip_address == '10.0.0.7'
+        assert coalescer.stats()['omitidas'] == 10
+
+    def test_un_update_para_varias_sesiones(self, coalescer, django_assert_num_queries):
+        request = RequestFactory().get('/api/v1/endpoint')
+        for i in range(5):
+            user = User.objects.create_user(username=f'u{i}', password='Pass123!', email=f'u{i}@ex.com')
+            UserSession.objects.create(
+                user=user, session_key=f'key{i}', is_active=True,
+                last_activity_at=now() - timedelta(minutes=10)
+            )
+            update_session_activity(user, request)
+
+        with django_assert_num_queries(1):
+            assert coalescer.flush() == 5
+
+    def test_job_de_inactividad_considera_lo_pendiente(self, coalescer, sesion):
+        update_session_activity(sesion.user, RequestFactory().get('/api/v1/endpoint'))
+        UserSession.objects.filter(pk=sesion.pk).update(
+            last_activity_at=now() - timedelta(minutes=35)
+        )
+
+        result = close_inactive_sessions()
+
+        sesion.refresh_from_db()
+        assert result['closed_sessions'] == 0
+        assert sesion.is_active is True
+
+    def test_no_reabre_sesiones_cerradas(self, coalescer, sesion):
+        update_session_activity(sesion.user, RequestFactory().get('/api/v1/endpoint'))
+        sesion.close(reason='MANUAL')
+        cerrada_con = UserSession.objects.get(pk=sesion.pk).last_activity_at
+
+        assert coalescer.flush() == 0
+
+        sesion.refresh_from_db()
+        assert sesion.is_active is False
+        assert sesion.last_activity_at == cerrada_con
+
+    def test_flush_descarta_actividad_fuera_de_la_granularidad(self, coalescer, sesion):
+        otro = User.objects.create_user(username='reciente', password='Pass123!', email='r@ex.com')
+        reciente = UserSession.objects.create(
+            user=otro, session_key='def', is_active=True, last_activity_at=now()
+        )
+        coalescer.touch(sesion, now() - timedelta(minutes=5))
+        coalescer.touch(reciente, now())
+
+        coalescer.flush()
+
+        assert coalescer.stats()['registradas'] == 1
+        assert not coalescer.is_fresh(sesion.user_id, now())
+        assert coalescer.is_fresh(otro.pk, now())
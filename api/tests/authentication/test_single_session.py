@@ -9,7 +9,9 @@ Documentación: docs/implementacion/backend/requisitos/funcionales/rf010_sesion_
 
 import pytest
 from django.conf import settings
+from django.db import connection
 from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
 
 try:
     from callcentersite.apps.authentication.services import (
@@ -180,6 +182,26 @@ class TestRF010SesionUnica:
         assert session1.is_active is False
         assert session2.is_active is True  # No afectada
 
+    def test_010_012_cierre_con_consultas_constantes(self, django_assert_max_num_queries):
+        """TEST-010-012: El costo no crece con el número de sesiones previas"""
+        user = User.objects.create_user(username='kiosco', password='Pass123!', email='k@ex.com')
+        request = self.factory.post('/api/v1/auth/login')
+
+        UserSession.objects.create(user=user, session_key='unica', is_active=True)
+        with CaptureQueriesContext(connection) as una:
+            close_previous_sessions(user, request)
+
+        UserSession.objects.bulk_create(
+            UserSession(user=user, session_key=f'kiosco{i}', is_active=True) for i in range(50)
+        )
+        with django_assert_max_num_queries(len(una)):
+            closed_count = close_previous_sessions(user, request)
+
+        assert closed_count == 50
+        assert UserSession.objects.filter(user=user, is_active=True).count() == 0
+        assert AuditLog.objects.filter(event_type='SESSION_CLOSED', user_id=user.id).count() == 51
+        assert InternalMessage.objects.filter(user_id=user.id).count() == 51
+
 
 @pytest.mark.django_db
 class TestRF010SesionUnicaIntegration:
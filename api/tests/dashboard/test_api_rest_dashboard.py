@@ -32,6 +32,11 @@ class TestDashboardAPIREST:
             'UserManagementService.usuario_tiene_permiso',
             side_effect=lambda usuario_id, *args, **kwargs: bool(usuario_id),
         )
+        self.resolver_patch = patch(
+            'callcentersite.apps.permissions.resolver.PermissionResolver.tiene_permiso',
+            autospec=True,
+            side_effect=lambda resolver, usuario_id, *args, **kwargs: bool(usuario_id),
+        )
         self.verificar_patch = patch(
             'callcentersite.apps.users.service_helpers.verificar_permiso_y_auditar',
             return_value=None,
@@ -42,12 +47,14 @@ class TestDashboardAPIREST:
         )
 
         self.perm_patch.start()
+        self.resolver_patch.start()
         self.verificar_patch.start()
         self.auditar_patch.start()
 
     def teardown_method(self):
         """Detiene los parches aplicados durante cada prueba."""
         self.perm_patch.stop()
+        self.resolver_patch.stop()
         self.verificar_patch.stop()
         self.auditar_patch.stop()
 
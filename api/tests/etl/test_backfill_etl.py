@@ -0,0 +1,101 @@
+"""Tests para el backfill ETL particionado."""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from callcentersite.apps.etl.backfill import (
+    PARTITION_JOB_NAME,
+    plan_partitions,
+    retry_backfill,
+    run_backfill,
+)
+from callcentersite.apps.etl.models import ETLJob
+
+START = datetime(2026, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class TestPlanPartitions:
+    """Division del rango en particiones."""
+
+    def test_particiones_contiguas_y_ultima_recortada(self):
+        partitions = plan_partitions(START, START + timedelta(hours=60), 24)
+
+        assert len(partitions) == 3
+        assert partitions[0] == (START, START + timedelta(hours=24))
+        assert partitions[1][0] == partitions[0][1]
+        assert partitions[2][1] == START + timedelta(hours=60)
+
+    def test_rango_invalido(self):
+        with pytest.raises(ValueError):
+            plan_partitions(START, START, 24)
+
+
+def _fake_pool(job_ids, workers):
+    """Ejecuta las particiones en el mismo proceso (sin pool)."""
+    from callcentersite.apps.etl.jobs import run_partition
+
+    for job_id in job_ids:
+        run_partition(job_id)
+
+
+@pytest.mark.django_db
+class TestRunBackfill:
+    """Ejecucion del backfill con un job hijo por particion."""
+
+    def _pipeline(self, failing_start=None):
+        extractor = MagicMock()
+        extractor.source_columns = ("call_id", "client_id", "call_date", "duration_seconds")
+
+        def _extract(after, end, batch_size, start_date=None, fields=None):
+            if failing_start is not None and start_date == failing_start:
+                raise RuntimeError("replica no disponible")
+            yield [
+                (f"{start_date:%Y%m%d}-1", "CLI-1", start_date, 10),
+                (f"{start_date:%Y%m%d}-2", "CLI-2", start_date, 20),
+            ]
+
+        extractor.extract_incremental.side_effect = _extract
+        loader = MagicMock()
+        loader.load_rows.side_effect = lambda rows, columns: len(rows)
+        return (
+            patch("callcentersite.apps.etl.jobs.IVRDataExtractor", return_value=extractor),
+            patch("callcentersite.apps.etl.jobs.get_loader", return_value=loader),
+            patch("callcentersite.apps.etl.backfill._run_in_pool", side_effect=_fake_pool),
+        )
+
+    def test_crea_hijos_y_agrega_contadores(self):
+        p_ext, p_load, p_pool = self._pipeline()
+
+        with p_ext, p_load, p_pool:
+            parent = run_backfill(START, START + timedelta(days=3), partition_hours=24)
+
+        parent.refresh_from_db()
+        children = parent.partitions.all()
+        assert children.count() == 3
+        assert all(child.job_name == PARTITION_JOB_NAME for child in children)
+        assert all(child.status == "completed" for child in children)
+        assert parent.status == "completed"
+        assert parent.records_loaded == 6
+
+    def test_reintenta_solo_particiones_fallidas(self):
+        failing = START + timedelta(days=1)
+        p_ext, p_load, p_pool = self._pipeline(failing_start=failing)
+        with p_ext, p_load, p_pool:
+            parent = run_backfill(START, START + timedelta(days=3), partition_hours=24)
+
+        parent.refresh_from_db()
+        assert parent.status == "failed"
+        failed_ids = parent.error_details["failed_partitions"]
+        assert len(failed_ids) == 1
+
+        p_ext, p_load, p_pool = self._pipeline()
+        with p_ext, p_load, p_pool as pool:
+            parent = retry_backfill(parent.id)
+
+        assert pool.call_args.args[0] == failed_ids
+        assert parent.status == "completed"
+        assert ETLJob.objects.get(id=failed_ids[0]).status == "completed"
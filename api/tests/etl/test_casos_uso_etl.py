@@ -308,3 +308,89 @@ class TestFiltroCentros:
         # Assert
         assert len(datos_filtrados) == 2
         assert all(d["centro_id"] in ["19028031", "19020084"] for d in datos_filtrados)
+
+
+@pytest.mark.django_db
+class TestValidacionPorLotes:
+    """Validar lotes completos con el registro de reglas."""
+
+    def test_validar_lote_persiste_errores_y_contadores(self):
+        """
+        UC-ETL-12: Validar lote completo.
+
+        Given lote con registros validos e invalidos
+        When se valida el lote
+        Then se separan los validos, se guardan los errores en bloque
+        y se acumulan contadores por regla en la metadata del job
+        """
+        from callcentersite.apps.etl.services import ETLService
+
+        # Arrange
+        job = ETLService.crear_job(job_name="test_job")
+        valido = {
+            "call_id": 1,
+            "phone_number": "5551234567",
+            "call_duration": 30,
+            "call_date": timezone.now(),
+        }
+        sin_telefono = {**valido, "call_id": 2, "phone_number": "123"}
+        roto = {"call_id": None, "phone_number": "", "call_duration": -1, "call_date": None}
+
+        # Act
+        resultado = ETLService.validar_lote(job.id, [valido, sin_telefono, roto])
+
+        # Assert
+        assert resultado.valid == [valido]
+        assert len(resultado.invalid) == 2
+        assert ETLValidationError.objects.filter(job=job).count() == 5
+        job.refresh_from_db()
+        resumen = job.metadata["validation"]
+        assert resumen["validated"] == 3
+        assert resumen["invalid"] == 2
+        assert resumen["rules"]["phone_number_length"] == 2
+        assert resumen["rules"]["call_id_required"] == 1
+
+    def test_validar_lote_acumula_entre_llamadas(self):
+        """
+        UC-ETL-13: Acumular contadores de validacion entre lotes.
+
+        Given job con un lote ya validado
+        When se valida un segundo lote
+        Then los contadores se suman
+        """
+        from callcentersite.apps.etl.services import ETLService
+
+        job = ETLService.crear_job(job_name="test_job")
+        registro = {"call_id": None, "phone_number": "5551234567", "call_date": timezone.now()}
+
+        ETLService.validar_lote(job.id, [registro])
+        ETLService.validar_lote(job.id, [registro, registro])
+
+        job.refresh_from_db()
+        assert job.metadata["validation"]["rules"]["call_id_required"] == 3
+
+    def test_registrar_regla_adicional(self):
+        """
+        UC-ETL-14: Agregar una regla sin tocar el validador.
+
+        Given una regla nueva registrada
+        When se valida un lote
+        Then la regla se evalua junto con las existentes
+        """
+        from callcentersite.apps.etl.validators import (
+            VALIDATION_RULES,
+            BatchValidator,
+            register_rule,
+        )
+
+        @register_rule("center_required", "centro_id", "centro_id es requerido")
+        def _sin_centro(valor):
+            return not valor
+
+        try:
+            resultado = BatchValidator().validate(
+                [{"call_id": 1, "phone_number": "5551234567", "call_date": timezone.now()}]
+            )
+            assert resultado.counters["center_required"] == 1
+        finally:
+            VALIDATION_RULES.pop("center_required")
@@ -0,0 +1,166 @@
+"""Tests para el dead-letter ETL y su reproceso."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.db import IntegrityError
+from django.utils import timezone
+
+from callcentersite.apps.etl.deadletter import replay_dead_letters
+from callcentersite.apps.etl.models import ETLDeadLetter
+
+SOURCE_COLUMNS = ("call_id", "client_id", "call_date", "duration_seconds")
+
+
+def _row(call_id):
+    return (call_id, "CLI-1", timezone.now() - timedelta(minutes=5), 60)
+
+
+def _loader_rejecting(*bad_ids):
+    """Loader que falla cualquier lote que contenga alguno de ``bad_ids``."""
+    loader = MagicMock()
+
+    def _load_rows(rows, columns):
+        if any(row[0] in bad_ids for row in rows):
+            raise IntegrityError("fila invalida")
+        return len(rows)
+
+    loader.load_rows.side_effect = _load_rows
+    return loader
+
+
+@pytest.mark.django_db
+class TestDeadLetterPipeline:
+    """Filas rotas no detienen el ETL."""
+
+    def test_aisla_filas_rechazadas_y_continua(self):
+        from callcentersite.apps.etl.jobs import run_etl
+
+        extractor = MagicMock()
+        extractor.source_columns = SOURCE_COLUMNS
+        extractor.extract_batches.return_value = iter(
+            [[_row("A1"), _row("BAD"), _row("A3")], [_row("A4")]]
+        )
+
+        with patch(
+            "callcentersite.apps.etl.jobs.IVRDataExtractor", return_value=extractor
+        ), patch(
+            "callcentersite.apps.etl.jobs.get_loader", return_value=_loader_rejecting("BAD")
+        ):
+            job = run_etl(start=timezone.now() - timedelta(hours=1))
+
+        job.refresh_from_db()
+        assert job.status == "completed"
+        assert job.records_loaded == 3
+        assert job.records_failed == 1
+        letter = ETLDeadLetter.objects.get()
+        assert letter.job_id == job.id
+        assert letter.stage == "load"
+        assert letter.raw_data["call_id"] == "BAD"
+        assert "IntegrityError" in letter.reason
+
+    def test_agregados_solo_con_filas_cargadas(self):
+        from callcentersite.apps.etl.jobs import run_etl
+
+        extractor = MagicMock()
+        extractor.source_columns = SOURCE_COLUMNS
+        extractor.extract_batches.return_value = iter([[_row("A1"), _row("BAD"), _row("A3")]])
+
+        with patch(
+            "callcentersite.apps.etl.jobs.IVRDataExtractor", return_value=extractor
+        ), patch(
+            "callcentersite.apps.etl.jobs.get_loader", return_value=_loader_rejecting("BAD")
+        ), patch("callcentersite.apps.etl.jobs.refresh_rollups") as refresh:
+            run_etl(start=timezone.now() - timedelta(hours=1))
+
+        rows, columns = refresh.call_args.args
+        assert [row[columns.index("call_id")] for row in rows] == ["A1", "A3"]
+
+    def test_filas_invalidas_no_llegan_al_loader(self):
+        from callcentersite.apps.etl.jobs import run_etl
+
+        negativa = ("NEG", "CLI-1", timezone.now() - timedelta(minutes=5), -3)
+        extractor = MagicMock()
+        extractor.source_columns = SOURCE_COLUMNS
+        extractor.extract_batches.return_value = iter([[_row("A1"), negativa, _row("A3")]])
+        loader = _loader_rejecting()
+
+        with patch(
+            "callcentersite.apps.etl.jobs.IVRDataExtractor", return_value=extractor
+        ), patch("callcentersite.apps.etl.jobs.get_loader", return_value=loader):
+            job = run_etl(start=timezone.now() - timedelta(hours=1))
+
+        job.refresh_from_db()
+        cargadas = [row[0] for call in loader.load_rows.call_args_list for row in call.args[0]]
+        assert cargadas == ["A1", "A3"]
+        assert job.records_loaded == 2
+        assert job.records_failed == 1
+        assert job.metadata["validation"]["rules"] == {"duration_seconds_non_negative": 1}
+        letter = ETLDeadLetter.objects.get()
+        assert letter.stage == "validate"
+        assert letter.reason == "duration_seconds no puede ser negativo"
+
+
+@pytest.mark.django_db
+class TestReplayDeadLetters:
+    """Reproceso de filas pendientes."""
+
+    def _letter(self, call_id):
+        return ETLDeadLetter.objects.create(
+            source="ivr_calls",
+            stage="load",
+            reason="IntegrityError: fila invalida",
+            raw_data={
+                "call_id": call_id,
+                "client_id": "CLI-1",
+                "call_date": timezone.now().isoformat(),
+                "duration_seconds": 30,
+            },
+        )
+
+    def test_reprocesa_y_marca_estado(self):
+        ok = self._letter("R1")
+        still_bad = self._letter("BAD")
+
+        with patch(
+            "callcentersite.apps.etl.deadletter.get_loader",
+            return_value=_loader_rejecting("BAD"),
+        ):
+            stats = replay_dead_letters(batch_size=10)
+
+        assert stats == {"replayed": 1, "failed": 1}
+        ok.refresh_from_db()
+        still_bad.refresh_from_db()
+        assert ok.status == "replayed"
+        assert ok.replayed_at is not None
+        assert still_bad.status == "pending"
+        assert still_bad.replay_attempts == 1
+
+    def test_recalcula_reportes_de_las_filas_cargadas(self):
+        self._letter("R1")
+        self._letter("BAD")
+
+        with patch(
+            "callcentersite.apps.etl.deadletter.get_loader",
+            return_value=_loader_rejecting("BAD"),
+        ), patch("callcentersite.apps.etl.deadletter.refresh_rollups") as refresh:
+            replay_dead_letters(batch_size=10)
+
+        rows, columns = refresh.call_args.args
+        assert [row[columns.index("call_id")] for row in rows] == ["R1"]
+
+    def test_respeta_limite(self):
+        for index in range(5):
+            self._letter(f"R{index}")
+
+        with patch(
+            "callcentersite.apps.etl.deadletter.get_loader",
+            return_value=_loader_rejecting(),
+        ):
+            stats = replay_dead_letters(batch_size=2, limit=3)
+
+        assert stats["replayed"] == 3
+        assert ETLDeadLetter.objects.filter(status="pending").count() == 2
@@ -0,0 +1,150 @@
+"""Tests para la cola persistente de jobs ETL."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.utils import timezone
+
+from callcentersite.apps.etl.job_queue import claim_next, enqueue, execute, recover_stale
+from callcentersite.apps.etl.jobs import ETL_JOB_NAME
+from callcentersite.apps.etl.models import ETLJob
+
+
+@pytest.mark.django_db
+class TestEnqueue:
+    """Encolado idempotente."""
+
+    def test_misma_clave_retorna_mismo_job(self):
+        first = enqueue(ETL_JOB_NAME, dedupe_key="tick-1")
+        first.status = "completed"
+        first.save(update_fields=["status"])
+
+        second = enqueue(ETL_JOB_NAME, dedupe_key="tick-1")
+
+        assert first.id == second.id
+        assert ETLJob.objects.count() == 1
+
+    def test_singleton_reutiliza_job_pendiente(self):
+        first = enqueue(ETL_JOB_NAME, dedupe_key="tick-1")
+        second = enqueue(ETL_JOB_NAME, dedupe_key="tick-2")
+
+        assert first.id == second.id
+
+    def test_tarea_desconocida(self):
+        with pytest.raises(ValueError):
+            enqueue("no_existe")
+
+    def test_scheduler_encola_un_solo_job_por_tick(self):
+        from callcentersite.apps.etl.scheduler import scheduled_etl
+
+        scheduled_etl()
+        scheduled_etl()
+
+        assert ETLJob.objects.filter(job_name=ETL_JOB_NAME, status="pending").count() == 1
+
+
+@pytest.mark.django_db
+class TestClaimNext:
+    """Toma de jobs por los workers."""
+
+    def test_toma_job_pendiente_y_lo_marca_en_ejecucion(self):
+        job = enqueue(ETL_JOB_NAME)
+
+        claimed = claim_next("worker-1")
+
+        assert claimed.id == job.id
+        claimed.refresh_from_db()
+        assert claimed.status == "running"
+        assert claimed.locked_by == "worker-1"
+        assert claim_next("worker-2") is None
+
+    def test_respeta_run_after(self):
+        enqueue(ETL_JOB_NAME, run_after=timezone.now() + timedelta(hours=1))
+
+        assert claim_next("worker-1") is None
+
+    def test_no_ejecuta_singleton_en_paralelo(self):
+        ETLJob.objects.create(job_name=ETL_JOB_NAME, status="running")
+        ETLJob.objects.create(job_name=ETL_JOB_NAME, status="pending")
+
+        assert claim_next("worker-1") is None
+
+    def test_singleton_huerfano_vuelve_a_la_cola(self, settings):
+        settings.ETL_JOB_LEASE_SECONDS = 60
+        enqueue(ETL_JOB_NAME)
+        job = claim_next("worker-muerto")
+        ETLJob.objects.filter(pk=job.pk).update(
+            heartbeat_at=timezone.now() - timedelta(minutes=5)
+        )
+
+        claimed = claim_next("worker-2")
+
+        assert claimed.id == job.id
+        assert claimed.locked_by == "worker-2"
+        assert claimed.metadata["attempts"] == 2
+
+    def test_lease_vencido_tras_agotar_intentos_falla(self, settings):
+        settings.ETL_JOB_MAX_ATTEMPTS = 1
+        enqueue(ETL_JOB_NAME)
+        job = claim_next("worker-muerto")
+        ETLJob.objects.filter(pk=job.pk).update(
+            heartbeat_at=timezone.now() - timedelta(hours=1)
+        )
+
+        assert recover_stale() == 1
+
+        job.refresh_from_db()
+        assert job.status == "failed"
+        assert job.error_details["locked_by"] == "worker-muerto"
+
+    def test_heartbeat_reciente_no_se_libera(self):
+        enqueue(ETL_JOB_NAME)
+        claim_next("worker-1")
+
+        assert recover_stale() == 0
+        assert ETLJob.objects.get().status == "running"
+
+    def test_run_etl_manual_no_es_tomado_por_la_cola(self):
+        from callcentersite.apps.etl.jobs import run_etl
+
+        tomados = []
+
+        def _pipeline(job, *args, **kwargs):
+            tomados.append(claim_next("worker-1"))
+            return job
+
+        with patch("callcentersite.apps.etl.jobs.IVRDataExtractor"), patch(
+            "callcentersite.apps.etl.jobs.execute_pipeline", side_effect=_pipeline
+        ):
+            job = run_etl(start=timezone.now() - timedelta(hours=1))
+
+        assert tomados == [None]
+        assert job.status == "running"
+
+    def test_ignora_particiones_de_backfill(self):
+        parent = ETLJob.objects.create(job_name="ivr_etl_backfill", status="running")
+        ETLJob.objects.create(job_name=ETL_JOB_NAME, status="pending", parent=parent)
+
+        assert claim_next("worker-1") is None
+
+
+@pytest.mark.django_db
+class TestExecute:
+    """Ejecucion de jobs tomados de la cola."""
+
+    def test_error_de_tarea_marca_job_fallido(self):
+        enqueue(ETL_JOB_NAME)
+        job = claim_next("worker-1")
+        task = MagicMock(side_effect=RuntimeError("sin conexion"))
+
+        with patch.dict(
+            "callcentersite.apps.etl.job_queue.QUEUE_TASKS", {ETL_JOB_NAME: task}
+        ):
+            job = execute(job)
+
+        task.assert_called_once()
+        assert job.status == "failed"
+        assert job.error_message == "sin conexion"
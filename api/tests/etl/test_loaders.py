@@ -0,0 +1,90 @@
+"""Tests para los loaders ETL."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone as dt_timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.db import models
+from django.test import override_settings
+
+from callcentersite.apps.etl.loaders import (
+    AnalyticsDataLoader,
+    PostgresCopyLoader,
+    get_loader,
+)
+
+
+class TestGetLoader:
+    """Seleccion del loader por configuracion."""
+
+    def test_por_defecto_usa_orm(self):
+        assert type(get_loader()) is AnalyticsDataLoader
+
+    @override_settings(ETL_LOADER_BACKEND="copy")
+    def test_configuracion_copy(self):
+        assert isinstance(get_loader(), PostgresCopyLoader)
+
+    def test_backend_desconocido(self):
+        with pytest.raises(ValueError):
+            get_loader("parquet")
+
+
+class TestCopyFormat:
+    """Serializacion de valores al formato texto de COPY."""
+
+    def test_nulos_y_escapes(self):
+        field = models.CharField()
+
+        assert PostgresCopyLoader._copy_value(field, None) == r"\N"
+        assert PostgresCopyLoader._copy_value(field, "a\tb\nc\\d") == "a\\tb\\nc\\\\d"
+
+    def test_json_booleanos_y_fechas(self):
+        moment = datetime(2026, 1, 1, 12, 0, tzinfo=dt_timezone.utc)
+
+        assert PostgresCopyLoader._copy_value(models.JSONField(), {"a": 1}) == '{"a": 1}'
+        assert PostgresCopyLoader._copy_value(models.BooleanField(), True) == "t"
+        assert PostgresCopyLoader._copy_value(models.DateTimeField(), moment) == (
+            "2026-01-01T12:00:00+00:00"
+        )
+
+
+def _campo(nombre, **kwargs):
+    field = models.CharField(max_length=10, **kwargs)
+    field.set_attributes_from_name(nombre)
+    return field
+
+
+class TestCopyRows:
+    """Valores y staging de ``load_rows`` por COPY."""
+
+    def test_none_explicito_es_null_y_default_solo_si_falta(self):
+        fields = [_campo("canal", default="ivr"), _campo("nota", null=True)]
+
+        explicitos = PostgresCopyLoader._row_values(fields, {"canal": 0, "nota": 1}, (None, "a"))
+        ausente = PostgresCopyLoader._row_values(fields, {"nota": 0}, (None,))
+
+        assert PostgresCopyLoader._format_values(fields, explicitos) == "\\N\ta\n"
+        assert PostgresCopyLoader._format_values(fields, ausente) == "ivr\t\\N\n"
+
+    def test_staging_por_conjunto_de_columnas(self):
+        loader = PostgresCopyLoader()
+        fields = [_campo("canal"), _campo("nota")]
+
+        assert loader._staging_name(fields) == loader._staging_name(list(fields))
+        assert loader._staging_name(fields) != loader._staging_name(fields[:1])
+
+
+@pytest.mark.django_db
+class TestCopyLoaderFallback:
+    """Fuera de PostgreSQL el loader COPY delega en bulk_create."""
+
+    def test_delega_en_orm_con_sqlite(self):
+        rows = [MagicMock(), MagicMock()]
+
+        with patch("callcentersite.apps.etl.loaders.CallAnalytics") as model:
+            loaded = PostgresCopyLoader().load(rows)
+
+        assert loaded == 2
+        model.objects.bulk_create.assert_called_once_with(rows, ignore_conflicts=True)
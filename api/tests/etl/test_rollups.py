@@ -0,0 +1,209 @@
+"""Tests para los agregados de reportes IVR mantenidos por el ETL."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from django.utils import timezone
+
+from callcentersite.apps.etl.rollups import refresh_rollups, touched_buckets
+
+COLUMNS = ("call_id", "client_id", "call_date")
+
+
+def _moment(day=15, hour=10, minute=0, month=2):
+    return timezone.make_aware(datetime(2025, month, day, hour, minute))
+
+
+def _call(call_id, client_id, moment, result="answered", queue=10, talk=120, **extra):
+    from callcentersite.apps.analytics.models import CallAnalytics
+
+    return CallAnalytics.objects.create(
+        call_id=call_id,
+        client_id=client_id,
+        call_date=moment,
+        result=result,
+        queue_time_seconds=queue,
+        talk_time_seconds=talk,
+        **extra,
+    )
+
+
+def _rows(*calls):
+    return [(call.call_id, call.client_id, call.call_date) for call in calls]
+
+
+class TestTouchedBuckets:
+    """Calculo de buckets afectados por un lote."""
+
+    def test_agrupa_por_hora_dia_y_trimestre(self):
+        rows = [
+            ("A1", "C1", _moment(hour=10, minute=5)),
+            ("A2", "C1", _moment(hour=10, minute=55)),
+            ("A3", "C2", _moment(day=1, hour=8, month=4)),
+        ]
+
+        touched = touched_buckets(rows, COLUMNS)
+
+        assert len(touched.hours) == 2
+        assert {day.month for day in touched.days} == {2, 4}
+        assert touched.quarters == {("Q1", 2025), ("Q2", 2025)}
+
+    def test_lote_vacio_no_toca_buckets(self):
+        assert not touched_buckets([], COLUMNS)
+
+
+@pytest.mark.django_db
+class TestRefreshRollups:
+    """Upsert de los buckets tocados por cada lote."""
+
+    def test_recalcula_llamadas_por_hora(self):
+        from callcentersite.apps.reportes.models import ReporteLlamadasDia
+
+        calls = [
+            _call("A1", "C1", _moment(minute=5), queue=10),
+            _call("A2", "C2", _moment(minute=20), queue=40),
+            _call("A3", "C3", _moment(minute=30), result="abandoned", queue=60, talk=0),
+        ]
+
+        refresh_rollups(_rows(*calls), COLUMNS)
+
+        reporte = ReporteLlamadasDia.objects.get(fecha=_moment().date(), hora=10)
+        assert reporte.total_llamadas == 3
+        assert reporte.llamadas_atendidas == 2
+        assert reporte.llamadas_abandonadas == 1
+        assert reporte.tiempo_promedio_atencion == Decimal("120.00")
+        assert reporte.nivel_servicio == Decimal("33.33")
+
+    def test_solo_actualiza_buckets_del_lote(self):
+        from callcentersite.apps.reportes.models import ReporteLlamadasDia
+
+        primera = _call("A1", "C1", _moment(hour=9))
+        refresh_rollups(_rows(primera), COLUMNS)
+        _call("A2", "C2", _moment(hour=9, minute=30))
+        nueva = _call("A3", "C3", _moment(hour=11))
+
+        refresh_rollups(_rows(nueva), COLUMNS)
+
+        assert ReporteLlamadasDia.objects.get(hora=9).total_llamadas == 1
+        assert ReporteLlamadasDia.objects.get(hora=11).total_llamadas == 1
+
+    def test_reproceso_es_idempotente(self):
+        from callcentersite.apps.reportes.models import ReporteLlamadasDia, ReporteTrimestral
+
+        calls = [_call("A1", "C1", _moment()), _call("A2", "C1", _moment(day=16))]
+
+        refresh_rollups(_rows(*calls), COLUMNS)
+        refresh_rollups(_rows(*calls), COLUMNS)
+
+        assert ReporteLlamadasDia.objects.count() == 2
+        trimestral = ReporteTrimestral.objects.get(trimestre="Q1", anio=2025)
+        assert trimestral.total_llamadas == 2
+        assert trimestral.llamadas_atendidas == 2
+
+    def test_trimestral_se_deriva_de_buckets_horarios(self):
+        from callcentersite.apps.reportes.models import ReporteTrimestral
+
+        calls = [
+            _call("A1", "C1", _moment(month=1, day=10)),
+            _call("A2", "C2", _moment(month=3, day=20), result="abandoned", talk=0),
+        ]
+
+        refresh_rollups(_rows(*calls), COLUMNS)
+
+        trimestral = ReporteTrimestral.objects.get(trimestre="Q1", anio=2025)
+        assert trimestral.total_llamadas == 2
+        assert trimestral.tasa_abandono == Decimal("50.00")
+
+    def test_clientes_unicos_distingue_nuevos_y_recurrentes(self):
+        from callcentersite.apps.reportes.models import ReporteClientesUnicos
+
+        refresh_rollups(_rows(_call("A0", "C1", _moment(day=14))), COLUMNS)
+        calls = [
+            _call("A1", "C1", _moment()),
+            _call("A2", "C2", _moment(minute=10)),
+            _call("A3", "C2", _moment(minute=20)),
+        ]
+
+        refresh_rollups(_rows(*calls), COLUMNS)
+
+        dia = _moment().date()
+        reporte = ReporteClientesUnicos.objects.get(fecha_inicio=dia, fecha_fin=dia)
+        assert reporte.total_clientes_unicos == 2
+        assert reporte.nuevos_clientes == 1
+        assert reporte.clientes_recurrentes == 1
+        assert reporte.promedio_llamadas_cliente == Decimal("1.50")
+
+    def test_backfill_de_un_dia_anterior_corrige_los_nuevos(self):
+        from callcentersite.apps.reportes.models import (
+            ClientePrimeraLlamada,
+            ReporteClientesUnicos,
+        )
+
+        refresh_rollups(_rows(_call("A1", "C1", _moment())), COLUMNS)
+        dia = _moment().date()
+        assert ReporteClientesUnicos.objects.get(fecha_inicio=dia).nuevos_clientes == 1
+
+        refresh_rollups(_rows(_call("A0", "C1", _moment(day=10))), COLUMNS)
+
+        assert ClientePrimeraLlamada.objects.get(client_id="C1").fecha == _moment(day=10).date()
+        reporte = ReporteClientesUnicos.objects.get(fecha_inicio=dia)
+        assert reporte.nuevos_clientes == 0
+        assert reporte.clientes_recurrentes == 1
+        anterior = ReporteClientesUnicos.objects.get(fecha_inicio=_moment(day=10).date())
+        assert anterior.nuevos_clientes == 1
+
+    def test_transferencias_y_menus_desde_metadata(self):
+        from callcentersite.apps.reportes.models import (
+            ReporteMenuProblemas,
+            ReporteTransferencias,
+        )
+
+        calls = [
+            _call(
+                "A1",
+                "C1",
+                _moment(),
+                center_id=1,
+                transfer_count=1,
+                metadata={"centro_destino": "2", "menu_id": "M1", "menu_nombre": "Saldo"},
+            ),
+            _call(
+                "A2",
+                "C2",
+                _moment(minute=30),
+                result="abandoned",
+                center_id=1,
+                transfer_count=1,
+                metadata={"centro_destino": "2", "menu_id": "M1", "menu_nombre": "Saldo"},
+            ),
+        ]
+
+        refresh_rollups(_rows(*calls), COLUMNS)
+
+        transferencia = ReporteTransferencias.objects.get(centro_origen="1", centro_destino="2")
+        assert transferencia.total_transferencias == 2
+        assert transferencia.tasa_exito == Decimal("50.00")
+        menu = ReporteMenuProblemas.objects.get(menu_id="M1")
+        assert menu.menu_nombre == "Saldo"
+        assert menu.abandonos == 1
+        assert menu.tasa_abandono == Decimal("50.00")
+
+    def test_sketch_diario_acumula_clientes_del_lote(self):
+        from callcentersite.apps.reportes.models import ClientesUnicosSketch
+        from callcentersite.apps.reportes.sketches import HyperLogLog
+
+        refresh_rollups([("A1", "C1", _moment()), ("A2", "C2", _moment())], COLUMNS)
+        refresh_rollups([("A3", "C2", _moment(hour=12)), ("A4", "C3", _moment())], COLUMNS)
+
+        sketch = ClientesUnicosSketch.objects.get(fecha=_moment().date(), center_id=0)
+        assert HyperLogLog.from_bytes(sketch.registros, sketch.precision).estimate() == 3
+
+    def test_lote_vacio_no_escribe(self):
+        from callcentersite.apps.reportes.models import ReporteLlamadasDia
+
+        refresh_rollups([], COLUMNS)
+
+        assert ReporteLlamadasDia.objects.count() == 0
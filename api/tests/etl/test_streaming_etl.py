@@ -0,0 +1,152 @@
+"""Tests para el ETL en modo streaming por lotes."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from django.utils import timezone
+
+from callcentersite.apps.etl.extractors import chunked
+from callcentersite.apps.etl.models import ETLJob, ETLWatermark
+
+SOURCE_COLUMNS = ("call_id", "client_id", "call_date", "duration_seconds")
+
+
+def _row(call_id, minutes_ago=0):
+    return (call_id, "CLI-1", timezone.now() - timedelta(minutes=minutes_ago), 60)
+
+
+def _patch_pipeline(batches, fail_on_batch=None, incremental=False):
+    """Sustituye extractor y loader; el transformador columnar es el real."""
+    extractor = MagicMock()
+    extractor.source_columns = SOURCE_COLUMNS
+    if incremental:
+        extractor.extract_incremental.return_value = iter(batches)
+    else:
+        extractor.extract_batches.return_value = iter(batches)
+
+    loader = MagicMock()
+    calls = []
+
+    def _load_rows(rows, columns):
+        calls.append(rows)
+        if fail_on_batch is not None and len(calls) == fail_on_batch + 1:
+            raise RuntimeError("fallo de carga")
+        return len(rows)
+
+    loader.load_rows.side_effect = _load_rows
+    return (
+        patch("callcentersite.apps.etl.jobs.IVRDataExtractor", return_value=extractor),
+        patch("callcentersite.apps.etl.jobs.get_loader", return_value=loader),
+        extractor,
+        loader,
+    )
+
+
+class TestChunked:
+    """Agrupacion de iterables en lotes."""
+
+    def test_agrupa_en_lotes_de_tamano_fijo(self):
+        lotes = list(chunked(range(7), 3))
+
+        assert lotes == [[0, 1, 2], [3, 4, 5], [6]]
+
+    def test_iterable_vacio_no_genera_lotes(self):
+        assert list(chunked([], 10)) == []
+
+    def test_tamano_invalido(self):
+        with pytest.raises(ValueError):
+            list(chunked([1], 0))
+
+
+@pytest.mark.django_db
+class TestRunETLStreaming:
+    """Ejecucion de run_etl lote a lote."""
+
+    def test_carga_cada_lote_y_registra_contadores(self):
+        from callcentersite.apps.etl.jobs import run_etl
+
+        batches = [[_row("A1"), _row("A2"), _row("A3")], [_row("A4")]]
+        p_ext, p_load, _, loader = _patch_pipeline(batches)
+
+        with p_ext, p_load:
+            job = run_etl(
+                start=timezone.now() - timedelta(hours=1),
+                end=timezone.now(),
+                batch_size=3,
+            )
+
+        job.refresh_from_db()
+        assert loader.load_rows.call_count == 2
+        assert job.status == "completed"
+        assert job.records_extracted == 4
+        assert job.records_transformed == 4
+        assert job.records_loaded == 4
+        assert job.metadata["batch_size"] == 3
+
+    def test_registra_tiempos_por_lote_en_metadata(self):
+        from callcentersite.apps.etl.jobs import run_etl
+
+        batches = [[_row("A1"), _row("A2")], [_row("A3")]]
+        p_ext, p_load, _, _ = _patch_pipeline(batches)
+
+        with p_ext, p_load:
+            job = run_etl(start=timezone.now() - timedelta(hours=1), batch_size=2)
+
+        job.refresh_from_db()
+        timings = job.metadata["timings"]
+        assert timings["batches"] == 2
+        assert timings["last_batch"]["rows"] == 1
+        assert timings["transform_seconds"] >= 0
+        assert timings["max_batch_seconds"] >= timings["last_batch"]["load_seconds"]
+
+    def test_fallo_conserva_progreso_de_lotes_confirmados(self):
+        from callcentersite.apps.etl.jobs import run_etl
+
+        batches = [[_row("A1"), _row("A2")], [_row("A3"), _row("A4")]]
+        p_ext, p_load, _, _ = _patch_pipeline(batches, fail_on_batch=1)
+
+        with p_ext, p_load, pytest.raises(RuntimeError):
+            run_etl(start=timezone.now() - timedelta(hours=1), batch_size=2)
+
+        job = ETLJob.objects.latest("created_at")
+        assert job.status == "failed"
+        assert job.records_loaded == 2
+        assert job.records_extracted == 4
+
+
+@pytest.mark.django_db
+class TestRunETLIncremental:
+    """Extraccion incremental basada en marca de agua."""
+
+    def test_avanza_marca_de_agua_y_parte_de_ella(self):
+        from callcentersite.apps.etl.jobs import IVR_CALLS_SOURCE, run_etl
+
+        batches = [[_row("A1", 30), _row("A2", 20)], [_row("A3", 10)]]
+        p_ext, p_load, extractor, _ = _patch_pipeline(batches, incremental=True)
+
+        with p_ext, p_load:
+            job = run_etl(batch_size=2)
+
+        watermark = ETLWatermark.objects.get(source=IVR_CALLS_SOURCE)
+        assert watermark.last_call_id == "A3"
+        assert watermark.last_call_date == batches[1][0][2]
+        assert job.records_loaded == 3
+        assert extractor.extract_incremental.call_args.args[0] is None
+
+    def test_reutiliza_posicion_persistida(self):
+        from callcentersite.apps.etl.jobs import IVR_CALLS_SOURCE, run_etl
+
+        last_date = timezone.now() - timedelta(hours=1)
+        ETLWatermark.objects.create(
+            source=IVR_CALLS_SOURCE, last_call_date=last_date, last_call_id="Z9"
+        )
+        p_ext, p_load, extractor, _ = _patch_pipeline([], incremental=True)
+
+        with p_ext, p_load:
+            job = run_etl()
+
+        assert extractor.extract_incremental.call_args.args[0] == (last_date, "Z9")
+        assert job.metadata["watermark"]["call_id"] == "Z9"
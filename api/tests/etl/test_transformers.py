@@ -0,0 +1,55 @@
+"""Tests para los transformadores ETL."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone as dt_timezone
+from types import SimpleNamespace
+
+import pytest
+
+from callcentersite.apps.etl.transformers import (
+    CALL_ANALYTICS_COLUMNS,
+    CallDataTransformer,
+    ColumnarCallTransformer,
+)
+
+SOURCE_COLUMNS = ("call_id", "client_id", "call_date", "duration_seconds")
+MOMENT = datetime(2026, 3, 1, 8, 30, tzinfo=dt_timezone.utc)
+
+
+class TestColumnarCallTransformer:
+    """Transformacion columnar de lotes de tuplas."""
+
+    def test_salida_identica_al_transformador_por_fila(self):
+        raw = [
+            ("C-1", "CLI-1", MOMENT, 120),
+            ("C-2", "CLI-2", MOMENT, None),
+        ]
+        legacy = CallDataTransformer().transform(
+            SimpleNamespace(**dict(zip(SOURCE_COLUMNS, row))) for row in raw
+        )
+
+        rows = ColumnarCallTransformer(SOURCE_COLUMNS).transform(raw)
+
+        assert rows == [
+            tuple(getattr(call, column) for column in CALL_ANALYTICS_COLUMNS)
+            for call in legacy
+        ]
+
+    def test_rellena_columnas_ausentes_con_valores_por_defecto(self):
+        (row,) = ColumnarCallTransformer(SOURCE_COLUMNS).transform(
+            [("C-1", "CLI-1", MOMENT, 30)]
+        )
+        values = dict(zip(CALL_ANALYTICS_COLUMNS, row))
+
+        assert values["call_type"] == "unknown"
+        assert values["agent_id"] is None
+        assert values["transfer_count"] == 0
+        assert values["metadata"] == {}
+
+    def test_lote_vacio(self):
+        assert ColumnarCallTransformer(SOURCE_COLUMNS).transform([]) == []
+
+    def test_fuente_sin_columnas_requeridas(self):
+        with pytest.raises(ValueError):
+            ColumnarCallTransformer(("call_id", "duration_seconds"))
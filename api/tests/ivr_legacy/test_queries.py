@@ -5,7 +5,7 @@ from __future__ import annotations
 import pytest
 from datetime import datetime, timedelta
 from django.utils import timezone
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 
 from callcentersite.apps.ivr_legacy.adapters import IVRDataAdapter
 from callcentersite.apps.ivr_legacy.models import IVRCall, IVRClient
@@ -190,3 +190,46 @@ class TestIVRClientQueries:
         IVRClient.objects.using("ivr_readonly").filter(full_name__icontains=search_term)
 
         mock_using.filter.assert_called_with(full_name__icontains=search_term)
+
+
+@pytest.mark.django_db(databases=["default", "ivr_readonly"])
+class TestIVRDataAdapterKeyset:
+    """Tests para la paginacion keyset de get_calls_after."""
+
+    @patch("callcentersite.apps.ivr_legacy.models.IVRCall.objects")
+    def test_get_calls_after_ordena_por_clave_compuesta(self, mock_ivr_call_objects):
+        """Test que la pagina se ordena por (call_date, call_id) y se limita."""
+        mock_using = MagicMock()
+        mock_ivr_call_objects.using.return_value = mock_using
+        mock_filtered = MagicMock()
+        mock_using.filter.return_value = mock_filtered
+        mock_filtered.filter.return_value = mock_filtered
+
+        end_date = timezone.now()
+        IVRDataAdapter().get_calls_after(
+            (end_date - timedelta(hours=1), "CALL-001"), end_date, 500
+        )
+
+        mock_ivr_call_objects.using.assert_called_once_with("ivr_readonly")
+        mock_using.filter.assert_called_once_with(call_date__lte=end_date)
+        mock_filtered.order_by.assert_called_once_with("call_date", "call_id")
+        mock_filtered.order_by.return_value.__getitem__.assert_called_once_with(
+            slice(None, 500)
+        )
+
+    @patch("callcentersite.apps.ivr_legacy.models.IVRCall.objects")
+    def test_get_calls_after_sin_posicion_usa_start_date(self, mock_ivr_call_objects):
+        """Test que sin marca de agua se parte de start_date."""
+        mock_using = MagicMock()
+        mock_ivr_call_objects.using.return_value = mock_using
+        mock_filtered = MagicMock()
+        mock_using.filter.return_value = mock_filtered
+        mock_filtered.filter.return_value = mock_filtered
+
+        start_date = timezone.now() - timedelta(hours=6)
+        IVRDataAdapter().get_calls_after(None, timezone.now(), 100, start_date=start_date)
+
+        mock_filtered.filter.assert_called_once_with(call_date__gte=start_date)
+        mock_filtered.order_by.return_value.__getitem__.assert_called_once_with(
+            slice(None, 100)
+        )
@@ -8,6 +8,7 @@ from django.contrib.sessions.middleware import SessionMiddleware
 from django.http import HttpResponse
 from django.test import RequestFactory
 
+from callcentersite.apps.authentication.services import TokenService
 from callcentersite.middleware.session_security import (
     SESSION_IP_KEY,
     SESSION_UA_KEY,
@@ -118,3 +119,75 @@ def test_middleware_invalida_sesion_si_cambia_user_agent(rf: RequestFactory) ->
     assert request.user.is_authenticated is False
     assert SESSION_IP_KEY not in request.session
     assert SESSION_UA_KEY not in request.session
+
+
+def _bearer_request(rf: RequestFactory, user, ip: str, user_agent: str):
+    """Request con un access token emitido desde ``ip``/``user_agent``."""
+
+    origen = rf.post("/api/v1/auth/login/", REMOTE_ADDR=ip, HTTP_USER_AGENT=user_agent)
+    tokens = TokenService.generate_jwt_tokens(user, origen)
+    request = rf.get("/recurso/", HTTP_AUTHORIZATION=f"Bearer {tokens['access']}")
+    _prepare_request(request, user, ip, user_agent)
+    return request, tokens
+
+
+@pytest.mark.django_db
+def test_modo_stateless_valida_contra_el_token_sin_tocar_la_sesion(
+    rf: RequestFactory, settings, django_assert_num_queries
+) -> None:
+    """Con la huella en el token no se lee ni escribe django_session."""
+
+    settings.SESSION_SECURITY_STATELESS = True
+    user = get_user_model().objects.create_user(
+        username="stateless-ok",
+        password="segura123",
+        email="stateless-ok@example.com",
+    )
+    request, _ = _bearer_request(rf, user, "10.0.0.1", "Mozilla/5.0")
+    # SessionStore.create() del setup la deja marcada como modificada
+    request.session.modified = False
+    middleware = SessionSecurityMiddleware(lambda req: HttpResponse(status=200))
+
+    with django_assert_num_queries(0):
+        response = middleware(request)
+
+    assert response.status_code == 200
+    assert SESSION_IP_KEY not in request.session
+    assert request.session.modified is False
+
+
+@pytest.mark.django_db
+def test_modo_stateless_rechaza_otro_user_agent(rf: RequestFactory, settings) -> None:
+    """Un token usado desde otro cliente responde 401."""
+
+    settings.SESSION_SECURITY_STATELESS = True
+    user = get_user_model().objects.create_user(
+        username="stateless-ua",
+        password="segura123",
+        email="stateless-ua@example.com",
+    )
+    request, _ = _bearer_request(rf, user, "10.0.0.1", "Mozilla/5.0")
+    request.META["HTTP_USER_AGENT"] = "curl/8.0"
+
+    response = SessionSecurityMiddleware(lambda req: HttpResponse(status=200))(request)
+
+    assert response.status_code == 401
+    assert response["WWW-Authenticate"] == "Bearer"
+
+
+@pytest.mark.django_db
+def test_refresh_rechaza_otra_ip(rf: RequestFactory) -> None:
+    """El refresh token solo se renueva desde el cliente que lo obtuvo."""
+
+    user = get_user_model().objects.create_user(
+        username="stateless-refresh",
+        password="segura123",
+        email="stateless-refresh@example.com",
+    )
+    _, tokens = _bearer_request(rf, user, "10.0.0.1", "Mozilla/5.0")
+
+    with pytest.raises(Exception, match="otro dispositivo"):
+        TokenService.refresh_access_token(
+            tokens["refresh"],
+            rf.post("/", REMOTE_ADDR="10.0.0.9", HTTP_USER_AGENT="Mozilla/5.0"),
+        )
@@ -0,0 +1,113 @@
+"""Tests para el conteo aproximado de clientes unicos con HyperLogLog."""
+
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+from callcentersite.apps.reportes.sketches import HyperLogLog, standard_error
+
+
+class TestHyperLogLog:
+    """Estimacion, fusion y serializacion del sketch."""
+
+    def test_estimacion_dentro_del_error_documentado(self):
+        sketch = HyperLogLog()
+        sketch.update(f"CLI-{i}" for i in range(50_000))
+
+        error = abs(sketch.estimate() - 50_000) / 50_000
+
+        assert error < 3 * standard_error()
+
+    def test_cardinalidades_pequenas_son_exactas(self):
+        sketch = HyperLogLog()
+        sketch.update(["C1", "C2", "C2", "C3"])
+
+        assert sketch.estimate() == 3
+
+    def test_fusion_equivale_a_union(self):
+        lunes, martes = HyperLogLog(), HyperLogLog()
+        lunes.update(range(0, 30_000))
+        martes.update(range(20_000, 50_000))
+
+        lunes.merge(martes)
+
+        assert abs(lunes.estimate() - 50_000) / 50_000 < 3 * standard_error()
+
+    def test_anadir_repetidos_no_altera_el_sketch(self):
+        sketch = HyperLogLog()
+        sketch.update(["C1", "C2"])
+        registros = sketch.to_bytes()
+
+        sketch.update(["C1", "C2"])
+
+        assert sketch.to_bytes() == registros
+
+    def test_serializacion_ida_y_vuelta(self):
+        sketch = HyperLogLog(precision=10)
+        sketch.update(range(500))
+
+        copia = HyperLogLog.from_bytes(sketch.to_bytes(), precision=10)
+
+        assert copia.estimate() == sketch.estimate()
+
+    def test_precision_distinta_no_se_fusiona(self):
+        with pytest.raises(ValueError):
+            HyperLogLog(precision=10).merge(HyperLogLog(precision=12))
+
+
+@pytest.mark.django_db
+class TestEstimarClientesUnicos:
+    """Consulta de clientes unicos por rango arbitrario."""
+
+    def _sketch(self, fecha, center_id, clientes):
+        from callcentersite.apps.reportes.models import ClientesUnicosSketch
+
+        sketch = HyperLogLog()
+        sketch.update(clientes)
+        ClientesUnicosSketch.objects.create(
+            fecha=fecha, center_id=center_id, registros=sketch.to_bytes()
+        )
+
+    def test_fusiona_sketches_del_rango(self):
+        """
+        UC-REPORTE-CU-01: Estimar clientes unicos de un rango.
+
+        Given sketches diarios con clientes que se repiten entre dias
+        When se consulta el rango completo
+        Then cada cliente cuenta una sola vez
+        """
+        from callcentersite.apps.reportes.services import ReporteIVRService
+
+        self._sketch(date(2025, 2, 1), 1, ["C1", "C2"])
+        self._sketch(date(2025, 2, 2), 1, ["C2", "C3"])
+        self._sketch(date(2025, 2, 5), 1, ["C9"])
+
+        resultado = ReporteIVRService.estimar_clientes_unicos(
+            fecha_inicio=date(2025, 2, 1), fecha_fin=date(2025, 2, 2)
+        )
+
+        assert resultado["total_clientes_unicos"] == 3
+        assert resultado["exacto"] is False
+        assert resultado["error_estandar"] == round(standard_error(), 4)
+
+    def test_filtra_por_centro(self):
+        from callcentersite.apps.reportes.services import ReporteIVRService
+
+        self._sketch(date(2025, 2, 1), 1, ["C1", "C2"])
+        self._sketch(date(2025, 2, 1), 2, ["C3"])
+
+        resultado = ReporteIVRService.estimar_clientes_unicos(
+            fecha_inicio=date(2025, 2, 1), fecha_fin=date(2025, 2, 1), centro_id=2
+        )
+
+        assert resultado["total_clientes_unicos"] == 1
+
+    def test_rango_invertido(self):
+        from callcentersite.apps.reportes.services import ReporteIVRService
+
+        with pytest.raises(ValueError):
+            ReporteIVRService.estimar_clientes_unicos(
+                fecha_inicio=date(2025, 2, 2), fecha_fin=date(2025, 2, 1)
+            )
@@ -15,11 +15,12 @@ from callcentersite.apps.dashboard.services import DashboardService
 class TestDashboardServiceExportar:
     """Tests unitarios para exportar()."""
 
-    @patch('callcentersite.apps.dashboard.services.UserManagementService')
-    def test_sin_permiso_lanza_permission_denied(self, mock_ums):
+    @patch('callcentersite.apps.dashboard.services.AuditoriaPermiso')
+    @patch('callcentersite.apps.dashboard.services.get_resolver')
+    def test_sin_permiso_lanza_permission_denied(self, mock_resolver, mock_auditoria):
         """RED: Usuario sin permiso debe lanzar PermissionDenied."""
         # Arrange
-        mock_ums.usuario_tiene_permiso.return_value = False
+        mock_resolver.return_value.tiene_permiso.return_value = False
 
         # Act & Assert
         with pytest.raises(PermissionDenied) as exc_info:
@@ -29,12 +30,14 @@ class TestDashboardServiceExportar:
             )
 
         assert 'No tiene permiso para exportar dashboards' in str(exc_info.value)
+        mock_resolver.assert_called_once_with('granular')
+        assert mock_auditoria.objects.create.call_args.kwargs['accion'] == 'acceso_denegado'
 
-    @patch('callcentersite.apps.dashboard.services.UserManagementService')
-    def test_formato_invalido_lanza_validation_error(self, mock_ums):
+    @patch('callcentersite.apps.dashboard.services.get_resolver')
+    def test_formato_invalido_lanza_validation_error(self, mock_resolver):
         """RED: Formato inválido debe lanzar ValidationError."""
         # Arrange
-        mock_ums.usuario_tiene_permiso.return_value = True
+        mock_resolver.return_value.tiene_permiso.return_value = True
 
         # Act & Assert
         with pytest.raises(ValidationError) as exc_info:
@@ -47,11 +50,11 @@ class TestDashboardServiceExportar:
 
     @patch('callcentersite.apps.dashboard.services.AuditoriaPermiso')
     @patch('callcentersite.apps.dashboard.services.timezone')
-    @patch('callcentersite.apps.dashboard.services.UserManagementService')
-    def test_exportacion_pdf_retorna_datos_correctos(self, mock_ums, mock_timezone, mock_auditoria):
+    @patch('callcentersite.apps.dashboard.services.get_resolver')
+    def test_exportacion_pdf_retorna_datos_correctos(self, mock_resolver, mock_timezone, mock_auditoria):
         """RED: Exportación PDF debe retornar formato, archivo y timestamp."""
         # Arrange
-        mock_ums.usuario_tiene_permiso.return_value = True
+        mock_resolver.return_value.tiene_permiso.return_value = True
         mock_now = MagicMock()
         mock_now.timestamp.return_value = 1234567890
         mock_now.isoformat.return_value = '2025-11-08T10:00:00Z'
@@ -70,11 +73,11 @@ class TestDashboardServiceExportar:
 
     @patch('callcentersite.apps.dashboard.services.AuditoriaPermiso')
     @patch('callcentersite.apps.dashboard.services.timezone')
-    @patch('callcentersite.apps.dashboard.services.UserManagementService')
-    def test_exportacion_excel_retorna_datos_correctos(self, mock_ums, mock_timezone, mock_auditoria):
+    @patch('callcentersite.apps.dashboard.services.get_resolver')
+    def test_exportacion_excel_retorna_datos_correctos(self, mock_resolver, mock_timezone, mock_auditoria):
         """RED: Exportación Excel debe retornar formato correcto."""
         # Arrange
-        mock_ums.usuario_tiene_permiso.return_value = True
+        mock_resolver.return_value.tiene_permiso.return_value = True
         mock_now = MagicMock()
         mock_now.timestamp.return_value = 1234567890
         mock_now.isoformat.return_value = '2025-11-08T10:00:00Z'